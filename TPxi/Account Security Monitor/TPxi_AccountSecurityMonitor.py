@@ -36,8 +36,8 @@ from datetime import datetime, timedelta
 
 # ::CONFIG:: Version
 # Bump APP_VERSION on user-visible changes; keep the changelog short.
-APP_VERSION = "0.3.1"
-APP_VERSION_DATE = "2026-06-16"
+APP_VERSION = "0.5.0"
+APP_VERSION_DATE = "2026-10-17"
 # Version history:
 #   0.1.0  - Initial release: HighRisk + Enhanced dashboards
 #   0.2.0  - EnumerationMonitor: CIDR /24 aggregation, IP geo cache,
@@ -47,6 +47,12 @@ APP_VERSION_DATE = "2026-06-16"
 #   0.3.1  - Defensive int coercion on SQL-result KPI values
 #            (some installs return Decimal/str for SUM/COUNT, which
 #            broke '{:,}'.format and crashed the KPI overview)
+#   0.4.0  - Incremental ActivityLog rollup (hourly buckets past an Id
+#            watermark, kept in Special Content) behind the KPI,
+#            pattern, IP and enumeration panels
+#   0.5.0  - Batched IP geolocation (pluggable providers: local CIDR
+#            file, ip-api.com batch) with a rate-limited background
+#            queue; geo cache sharded by /16 with TTL eviction
 
 
 def _to_int(v, default=0):
@@ -102,6 +108,10 @@ def main():
             else:
                 dashboard.get_configuration_form()
 
+        elif view == 'enumeration' and action == 'resolve_ips':
+            # Background geo lookups polled by the enumeration page
+            print safe_json(resolve_pending_ip_geo())
+
         elif view == 'enumeration':
             # Account enumeration detection -- catches the signals the
             # "Failed Login" KPI misses (the activity strings don't
@@ -219,9 +229,14 @@ class UnifiedSecurityHub:
                        AND Activity NOT LIKE '%u+%'))
             """
 
-            kpi_data = q.QuerySql(sql_kpi)
-            critical_ips = q.QuerySql(sql_critical_ips)
-            enum_data = q.QuerySql(sql_enum)
+            rollup = get_activity_rollup()
+            if rollup and rollup.covers(self.kpi_lookback_days):
+                kpi_data, critical_ips, enum_data = rollup.kpi_overview(
+                    self.kpi_lookback_days, self.critical_threshold, self.high_risk_threshold)
+            else:
+                kpi_data = q.QuerySql(sql_kpi)
+                critical_ips = q.QuerySql(sql_critical_ips)
+                enum_data = q.QuerySql(sql_enum)
             
             # ::STEP:: Generate KPI Overview Page
             print """
@@ -1935,6 +1950,39 @@ class HighRiskUserMonitor:
         except Exception as e:
             print_error("Role-Based Analysis Generation", e)
     
+    def get_monitored_users(self, lookback_days, role_where):
+        """UserId -> UserList row (plus lock status) for the monitored roles,
+        used to filter the ActivityLog rollup."""
+        sql_users = """
+            SELECT
+                ul.UserId,
+                ul.Username,
+                ul.PeopleId,
+                ul.Roles,
+                u.IsLockedOut,
+                CASE WHEN u.LastLockedOutDate >= DATEADD(DAY, -{}, GETDATE()) THEN 1 ELSE 0 END AS RecentlyLocked
+            FROM UserList ul
+            LEFT JOIN Users u ON u.UserId = ul.UserId
+            WHERE 1=1 {}
+        """.format(lookback_days, role_where)
+
+        users = {}
+        for row in q.QuerySql(sql_users):
+            roles = (row.Roles or '').lower()
+            if 'admin' in roles:
+                role_label = 'Admin'
+            elif 'finance' in roles:
+                role_label = 'Finance'
+            elif 'developer' in roles:
+                role_label = 'Dev'
+            else:
+                role_label = 'Other'
+            users[_to_int(row.UserId)] = RollupRow(
+                Username=row.Username, PeopleId=row.PeopleId, Roles=row.Roles,
+                IsLockedOut=bool(row.IsLockedOut), RecentlyLocked=_to_int(row.RecentlyLocked) == 1,
+                RoleLabel=role_label)
+        return users
+
     def generate_login_pattern_analysis(self, lookback_days, monitored_roles):
         """Generate login pattern analysis for high-risk users"""
         try:
@@ -1975,7 +2023,12 @@ class HighRiskUserMonitor:
                 ORDER BY TotalEvents DESC;
             """.format(lookback_days, role_where)
             
-            pattern_data = q.QuerySql(sql_patterns)
+            rollup = get_activity_rollup()
+            if rollup and rollup.covers(lookback_days):
+                users = self.get_monitored_users(lookback_days, role_where)
+                pattern_data = rollup.login_patterns(lookback_days, users)
+            else:
+                pattern_data = q.QuerySql(sql_patterns)
             
             if pattern_data and len(pattern_data) > 0:
                 print """
@@ -2110,8 +2163,13 @@ class HighRiskUserMonitor:
                 ORDER BY TotalAttempts DESC, HighRiskUsersTargeted DESC;
             """.format(lookback_days, lookback_days, role_where)
             
-            ip_data = q.QuerySql(sql_ip_analysis)
-            
+            rollup = get_activity_rollup()
+            if rollup and rollup.covers(lookback_days):
+                users = self.get_monitored_users(lookback_days, role_where)
+                ip_data = rollup.ip_targets(lookback_days, users)
+            else:
+                ip_data = q.QuerySql(sql_ip_analysis)
+
             if ip_data and len(ip_data) > 0:
                 print """
 <div style="border: 2px solid #fd7e14; border-radius: 8px; margin: 20px 0; background-color: #ffffff; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
@@ -5658,7 +5716,11 @@ class EnhancedSecurityDashboard:
                     AND ActivityDate >= @StartDate;
             """.format(lookback_days)
             
-            comparison_data = q.QuerySql(sql_comparison)
+            rollup = get_activity_rollup()
+            if rollup and rollup.covers(lookback_days):
+                comparison_data = rollup.login_comparison(lookback_days)
+            else:
+                comparison_data = q.QuerySql(sql_comparison)
             
             if comparison_data and len(comparison_data) > 0:
                 failed_data = None
@@ -5948,14 +6010,41 @@ class EnhancedSecurityDashboard:
 # ============================================================
 # IP enrichment helpers (geo + known-bad networks)
 # ============================================================
-# All lookups go through a Special Content cache so a page load
-# costs <=1 batch API call. Cache TTL is intentionally long
-# (30 days) -- IP -> ASN/ISP relationships rarely change.
+# All lookups go through a Special Content cache sharded by /16 so a
+# page load only reads and rewrites the prefixes it touches. Cache TTL
+# is intentionally long (30 days) -- IP -> ASN/ISP relationships rarely
+# change. Uncached IPs are collected per report and resolved in batches
+# through the providers in IP_GEO_PROVIDERS; whatever the page budget
+# or the rate limit doesn't cover is queued and resolved in the
+# background by the page (action=resolve_ips), never inline per row.
 import json as _json_for_ip
 import re as _re_for_ip
+import bisect as _bisect_for_ip
 
-IP_CACHE_KEY = "TPxi_AccountSecurityMonitor_IpCache"
+IP_CACHE_KEY = "TPxi_AccountSecurityMonitor_IpCache"   # legacy single blob; shards are IP_CACHE_KEY_<a.b>
 IP_CACHE_TTL_DAYS = 30
+IP_CACHE_VERSION = 1
+IP_PENDING_KEY = IP_CACHE_KEY + "_Pending"
+IP_PENDING_MAX = 5000
+IP_THROTTLE_KEY = IP_CACHE_KEY + "_Throttle"
+
+# Providers are tried in order; each only sees the IPs the previous
+# one could not resolve. 'cidr-file' is skipped when its content is empty.
+IP_GEO_PROVIDERS = ['cidr-file', 'ip-api']
+# Local CIDR database: Special Content text, one range per line
+#   cidr,countryCode,country,region,city,isp,org,as
+# e.g. exported from a GeoLite2 / IP2Location CSV. '#' lines are comments.
+IP_GEO_CIDR_CONTENT = "TPxi_AccountSecurityMonitor_GeoCidr"
+# ip-api.com free tier: the batch endpoint takes 100 IPs per call and
+# allows 15 calls/min (the single-IP endpoint allows 45/min).
+IP_API_BATCH_SIZE = 100
+IP_API_BATCH_PER_MIN = 15
+# Batch calls a page render may make before queueing the rest
+IP_GEO_INLINE_CALLS = 1
+
+# Compact shard layout: {"v", "ips": {"<c.d>": [day, country, countryCode,
+# region, city, isp, org, as]}}. Abuse labels are derived on read.
+IP_GEO_FIELDS = ['country', 'countryCode', 'region', 'city', 'isp', 'org', 'as']
 
 # Networks known for bot farms / bulletproof hosting. Annotated on
 # top-IP table so staff can spot "this is a hosting provider, not a
@@ -5975,21 +6064,157 @@ KNOWN_ABUSE_NETWORKS = {
 }
 
 
+def _ipv4_parts(ip):
+    """Dotted-quad octets as ints, or None for IPv6 / malformed input."""
+    parts = str(ip or '').strip().split('.')
+    if len(parts) != 4:
+        return None
+    try:
+        octets = [int(p) for p in parts]
+    except ValueError:
+        return None
+    if any(o < 0 or o > 255 for o in octets):
+        return None
+    return octets
+
+
+def _blank_geo():
+    info = dict((f, '') for f in IP_GEO_FIELDS)
+    info['abuse_label'] = ''
+    info['abuse_severity'] = ''
+    return info
+
+
+def _classify_abuse(info):
+    """Fill abuse_label / abuse_severity from the AS number, falling back
+    to a hosting/datacenter heuristic on the ISP and org names."""
+    info['abuse_label'] = ''
+    info['abuse_severity'] = ''
+    m = _re_for_ip.match(r'^(AS\d+)', info.get('as', '') or '')
+    abuse = KNOWN_ABUSE_NETWORKS.get(m.group(1)) if m else None
+    if abuse:
+        info['abuse_label'] = abuse[0]
+        info['abuse_severity'] = abuse[1]
+    else:
+        # Heuristic flag: ANY hosting/datacenter signature
+        lower = ((info.get('isp') or '') + ' ' + (info.get('org') or '')).lower()
+        if any(k in lower for k in ('hosting', 'datacenter', 'data center',
+                                      'cloud', 'colocation', 'colo', 'vps',
+                                      'server hosting', 'dedicated')):
+            info['abuse_label'] = 'Hosting provider'
+            info['abuse_severity'] = 'med'
+    return info
+
+
+class IpGeoCache:
+    """Geo cache sharded by /16 prefix, loaded lazily per shard.
+
+    Behaves like the old dict cache (get / [] / in) so callers don't
+    change. Expired entries are evicted when their shard loads; save()
+    writes only the shards that changed."""
+
+    def __init__(self):
+        self.shards = {}
+        self.dirty = set()
+        self.today = datetime.now().strftime('%Y-%m-%d')
+        self.cutoff = (datetime.now() - timedelta(days=IP_CACHE_TTL_DAYS)).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def split(ip):
+        octets = _ipv4_parts(ip)
+        if not octets:
+            return None, None
+        return '%d.%d' % (octets[0], octets[1]), '%d.%d' % (octets[2], octets[3])
+
+    def _shard(self, prefix):
+        shard = self.shards.get(prefix)
+        if shard is None:
+            shard = {}
+            try:
+                raw = model.TextContent(IP_CACHE_KEY + '_' + prefix)
+                if raw:
+                    data = _json_for_ip.loads(raw)
+                    if data.get('v') == IP_CACHE_VERSION:
+                        shard = data.get('ips') or {}
+            except:
+                shard = {}
+            expired = [k for k, v in shard.items() if not v or v[0] < self.cutoff]
+            for k in expired:
+                del shard[k]
+            if expired:
+                self.dirty.add(prefix)
+            self.shards[prefix] = shard
+        return shard
+
+    def get(self, ip, default=None):
+        prefix, suffix = self.split(ip)
+        if not prefix:
+            return default
+        entry = self._shard(prefix).get(suffix)
+        if not entry:
+            return default
+        info = dict(zip(IP_GEO_FIELDS, entry[1:]))
+        info['_t'] = entry[0]
+        return _classify_abuse(info)
+
+    def __contains__(self, ip):
+        return self.get(ip) is not None
+
+    def __getitem__(self, ip):
+        info = self.get(ip)
+        if info is None:
+            raise KeyError(ip)
+        return info
+
+    def __setitem__(self, ip, info):
+        self.put(ip, info, self.today)
+
+    def put(self, ip, info, stamped):
+        """Store an entry resolved on `stamped` ('YYYY-MM-DD'); the TTL runs from that date."""
+        prefix, suffix = self.split(ip)
+        if not prefix:
+            return
+        self._shard(prefix)[suffix] = [stamped] + [
+            info.get(f, '') or '' for f in IP_GEO_FIELDS]
+        self.dirty.add(prefix)
+
+    def save(self):
+        """Write the changed shards. Returns False if any write failed;
+        those shards stay dirty for the next save."""
+        failed = set()
+        for prefix in sorted(self.dirty):
+            try:
+                model.WriteContentText(
+                    IP_CACHE_KEY + '_' + prefix,
+                    _json_encode({'v': IP_CACHE_VERSION, 'ips': self.shards[prefix]}), "")
+            except:
+                failed.add(prefix)
+        self.dirty = failed
+        return not failed
+
+
 def _load_ip_cache():
+    cache = IpGeoCache()
+    # One-time migration of the pre-0.5 single-blob cache into shards. Entries
+    # keep their original resolve date, and the blob is only cleared once
+    # every shard was written (a failed run just migrates again next load).
     try:
         raw = model.TextContent(IP_CACHE_KEY)
         if raw:
-            return _json_for_ip.loads(raw)
+            legacy = _json_for_ip.loads(raw)
+            for ip, info in legacy.items():
+                stamped = (info.get('_t') or '')[:10]
+                if stamped >= cache.cutoff:
+                    cache.put(ip, info, stamped)
+            if cache.save():
+                model.WriteContentText(IP_CACHE_KEY, "", "")
     except:
         pass
-    return {}
+    return cache
 
 
 def _save_ip_cache(cache):
-    try:
-        model.WriteContentText(IP_CACHE_KEY, _json_for_ip.dumps(cache), "")
-    except:
-        pass
+    cache.save()
 
 
 def _cidr_24(ip):
@@ -6004,32 +6229,62 @@ def _cidr_24(ip):
     return parts[0] + '.' + parts[1] + '.' + parts[2] + '.0/24'
 
 
-def _lookup_ip_geo(ip, cache):
-    """Return a dict {country, countryCode, region, city, isp, org, as,
-    abuse_label, abuse_severity} for `ip`. Cached up to 30 days.
-    Uses ip-api.com free tier (no auth, 45 req/min). Failures return
-    empty placeholder values, never blocks render."""
-    if not ip or ':' in str(ip):   # skip IPv6 for v0.2
-        return {}
-    cache_entry = cache.get(ip)
-    if cache_entry:
-        ts = cache_entry.get('_t')
+# ::STEP:: Geo providers
+class IpApiBatchProvider:
+    """ip-api.com batch endpoint (no auth). Calls are counted in a shared
+    per-minute window persisted in Special Content, so concurrent page
+    loads and the background resolver stay under the free-tier limit."""
+    name = 'ip-api'
+    url = ("http://ip-api.com/batch"
+           "?fields=status,query,country,countryCode,regionName,city,isp,org,as")
+
+    def calls_left(self):
+        window = datetime.now().strftime('%Y-%m-%dT%H:%M')
+        try:
+            state = _json_for_ip.loads(model.TextContent(IP_THROTTLE_KEY) or '{}')
+        except:
+            state = {}
+        if state.get('window') != window:
+            return IP_API_BATCH_PER_MIN
+        return max(0, IP_API_BATCH_PER_MIN - _to_int(state.get('calls')))
+
+    def _count_call(self):
+        window = datetime.now().strftime('%Y-%m-%dT%H:%M')
+        try:
+            state = _json_for_ip.loads(model.TextContent(IP_THROTTLE_KEY) or '{}')
+        except:
+            state = {}
+        calls = _to_int(state.get('calls')) if state.get('window') == window else 0
         try:
-            ts_dt = datetime.strptime(ts[:19], '%Y-%m-%dT%H:%M:%S')
-            if (datetime.now() - ts_dt).days < IP_CACHE_TTL_DAYS:
-                return cache_entry
+            model.WriteContentText(IP_THROTTLE_KEY,
+                                   _json_encode({'window': window, 'calls': calls + 1}), "")
         except:
             pass
-    # Cache miss / stale -- look it up
-    info = {'country': '', 'countryCode': '', 'region': '', 'city': '',
-            'isp': '', 'org': '', 'as': '', 'abuse_label': '', 'abuse_severity': ''}
-    try:
-        url = ("http://ip-api.com/json/" + str(ip)
-               + "?fields=status,country,countryCode,regionName,city,isp,org,as")
-        resp = model.RestGet(url, {})
-        if resp:
-            data = _json_for_ip.loads(resp)
-            if data.get('status') == 'success':
+
+    def lookup(self, ips, max_calls):
+        """Resolve up to max_calls batches. Every IP sent gets an entry
+        (blank when ip-api can't place it) so it isn't retried for a TTL."""
+        found = {}
+        calls = min(max_calls, self.calls_left())
+        for start in range(0, len(ips), IP_API_BATCH_SIZE):
+            if calls <= 0:
+                break
+            batch = ips[start:start + IP_API_BATCH_SIZE]
+            calls -= 1
+            self._count_call()
+            try:
+                resp = model.RestPost(self.url, {'Content-Type': 'application/json'},
+                                      _json_encode(batch))
+                results = _json_for_ip.loads(resp) if resp else []
+            except:
+                continue   # leave the batch unresolved; it stays queued
+            for ip in batch:
+                found[ip] = _blank_geo()
+            for data in results:
+                ip = data.get('query')
+                if ip not in found or data.get('status') != 'success':
+                    continue
+                info = found[ip]
                 info['country'] = data.get('country', '') or ''
                 info['countryCode'] = data.get('countryCode', '') or ''
                 info['region'] = data.get('regionName', '') or ''
@@ -6037,29 +6292,143 @@ def _lookup_ip_geo(ip, cache):
                 info['isp'] = data.get('isp', '') or ''
                 info['org'] = data.get('org', '') or ''
                 info['as'] = data.get('as', '') or ''
-                # Cross-reference against known abuse networks
-                as_field = info['as'] or ''
-                asn = ''
-                m = _re_for_ip.match(r'^(AS\d+)', as_field)
-                if m:
-                    asn = m.group(1)
-                abuse = KNOWN_ABUSE_NETWORKS.get(asn)
-                if abuse:
-                    info['abuse_label'] = abuse[0]
-                    info['abuse_severity'] = abuse[1]
-                else:
-                    # Heuristic flag: ANY hosting/datacenter signature
-                    lower = (info['isp'] + ' ' + info['org']).lower()
-                    if any(k in lower for k in ('hosting', 'datacenter', 'data center',
-                                                  'cloud', 'colocation', 'colo', 'vps',
-                                                  'server hosting', 'dedicated')):
-                        info['abuse_label'] = 'Hosting provider'
-                        info['abuse_severity'] = 'med'
+        return found
+
+
+class CidrFileGeoProvider:
+    """Local CIDR database kept in Special Content (IP_GEO_CIDR_CONTENT).
+    No network and no rate limit; IPs outside every range fall through
+    to the next provider."""
+    name = 'cidr-file'
+
+    def __init__(self):
+        self.starts = []
+        self.ranges = []
+        try:
+            text = model.TextContent(IP_GEO_CIDR_CONTENT) or ''
+        except:
+            text = ''
+        rows = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            cols = [c.strip() for c in line.split(',')]
+            net, _, bits = cols[0].partition('/')
+            octets = _ipv4_parts(net)
+            try:
+                bits = int(bits or 32)
+            except ValueError:
+                continue
+            if not octets or bits < 0 or bits > 32:
+                continue
+            start = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+            start &= (0xFFFFFFFF << (32 - bits)) & 0xFFFFFFFF
+            end = start + (1 << (32 - bits)) - 1
+            info = _blank_geo()
+            for field, value in zip(IP_GEO_FIELDS, cols[1:]):
+                info[field] = value
+            rows.append((start, end, info))
+        rows.sort(key=lambda r: r[0])
+        self.starts = [r[0] for r in rows]
+        self.ranges = rows
+
+    def available(self):
+        return bool(self.ranges)
+
+    def lookup(self, ips, max_calls):
+        found = {}
+        for ip in ips:
+            o = _ipv4_parts(ip)
+            value = (o[0] << 24) | (o[1] << 16) | (o[2] << 8) | o[3]
+            i = _bisect_for_ip.bisect_right(self.starts, value) - 1
+            if i >= 0 and self.ranges[i][1] >= value:
+                found[ip] = dict(self.ranges[i][2])
+        return found
+
+
+IP_GEO_PROVIDER_TYPES = {
+    'ip-api': IpApiBatchProvider,
+    'cidr-file': CidrFileGeoProvider,
+}
+
+
+def _geo_providers():
+    providers = []
+    for name in IP_GEO_PROVIDERS:
+        provider_type = IP_GEO_PROVIDER_TYPES.get(name)
+        if not provider_type:
+            continue
+        provider = provider_type()
+        if getattr(provider, 'available', lambda: True)():
+            providers.append(provider)
+    return providers
+
+
+def _load_ip_pending():
+    try:
+        return list(_json_for_ip.loads(model.TextContent(IP_PENDING_KEY) or '[]'))
+    except:
+        return []
+
+
+def _save_ip_pending(ips):
+    try:
+        model.WriteContentText(IP_PENDING_KEY, _json_encode(ips[:IP_PENDING_MAX]), "")
     except:
         pass
-    info['_t'] = datetime.now().isoformat()
-    cache[ip] = info
-    return info
+
+
+def resolve_ip_geo(ips, cache, max_calls=IP_GEO_INLINE_CALLS, queue=True):
+    """Resolve every uncached IPv4 address in `ips` (order = priority)
+    through the configured providers, spending at most max_calls
+    network calls. Unresolved IPs are added to the background queue
+    when `queue` is set. Returns the IPs still unresolved."""
+    pending = []
+    seen = set()
+    for ip in ips:
+        ip = _safe_str(ip).strip()
+        if ip and ip not in seen and _ipv4_parts(ip) and cache.get(ip) is None:
+            seen.add(ip)
+            pending.append(ip)
+    for provider in (_geo_providers() if pending else []):
+        found = provider.lookup(pending, max_calls)
+        for ip, info in found.items():
+            cache[ip] = info
+        pending = [ip for ip in pending if ip not in found]
+        if not pending:
+            break
+    if queue and pending:
+        queued = _load_ip_pending()
+        known = set(queued)
+        _save_ip_pending(queued + [ip for ip in pending if ip not in known])
+    return pending
+
+
+def resolve_pending_ip_geo():
+    """Background step (action=resolve_ips): resolve as much of the
+    queue as the rate limit allows right now. Returns a status dict
+    for the page's poller."""
+    queued = _load_ip_pending()
+    cache = _load_ip_cache()
+    remaining = resolve_ip_geo(queued, cache, max_calls=IP_API_BATCH_PER_MIN, queue=False)
+    cache.save()
+    _save_ip_pending(remaining)
+    wait = 0
+    if remaining:
+        wait = 61 - datetime.now().second   # next rate-limit window
+    return {'resolved': len(queued) - len(remaining),
+            'pending': len(remaining), 'wait_seconds': wait}
+
+
+def _lookup_ip_geo(ip, cache):
+    """Return a dict {country, countryCode, region, city, isp, org, as,
+    abuse_label, abuse_severity} for `ip` from the cache. Never calls
+    out -- run resolve_ip_geo() over the report's IPs first. Unresolved
+    IPs return empty placeholder values."""
+    if not ip or ':' in str(ip):   # skip IPv6
+        return {}
+    return cache.get(ip) or _blank_geo()
 
 
 # Manual JSON encoder. IronPython's stdlib json.dumps fails at the
@@ -6139,6 +6508,505 @@ def _safe_str(val):
         return ''
 
 
+# ============================================================
+# ActivityLog rollup (incremental hourly aggregates)
+# ============================================================
+# ActivityLog is the largest table in the database and every panel
+# used to re-aggregate months of it on each refresh. The rollup keeps
+# hourly buckets keyed by (hour, activity flags, UserId, ClientIp) in
+# one Special Content shard per day. A page load only reads the
+# ActivityLog rows past the stored Id watermark and merges them in,
+# so the KPI, IP and pattern panels work from a few thousand bucket
+# rows instead of the raw log. Windows are aligned to the hour, and a
+# window only loads the day shards it covers. The first build fills in
+# days newest first, a few days per page load; until it reaches a
+# panel's lookback that panel keeps using its live query.
+# Add &rebuild_rollup=1 to the URL to rebuild it from scratch.
+ROLLUP_KEY = "TPxi_AccountSecurityMonitor_Rollup"
+ROLLUP_VERSION = 1
+ROLLUP_RETENTION_DAYS = 180   # matches the longest lookback option
+ROLLUP_BUILD_CHUNK_DAYS = 7   # days aggregated per query while building
+ROLLUP_BUILD_SECONDS = 10     # build time spent per page load
+
+# Activity flags -- one bit per LIKE pattern the panels filter on.
+AF_FAILED = 1             # '%failed%'
+AF_LOCKED = 2             # '%locked%'
+AF_FORGOT = 4             # '%ForgotPassword%'
+AF_FPW = 8                # 'ForgotPassword%'
+AF_WEB_ENUM = 16          # 'attempt to login by non-user%'
+AF_MOBILE_ENUM = 32       # 'Mobile: Attempt to login by unknown user%'
+AF_FPW_U0P0 = 64          # 'ForgotPassword%u0p0%'
+AF_FPW_U0P0N0 = 128       # 'ForgotPassword%u0p0n0%'
+AF_FPW_U0PPLUS = 256      # 'ForgotPassword%u0p+%'
+AF_HAS_N0 = 512           # '%n0%'
+AF_HAS_UPLUS = 1024       # '%u+%'
+AF_LOGIN_OK = 2048        # '%logged in%' / '%login%' without '%failed%'
+
+ROLLUP_FLAG_SQL = [
+    (AF_FAILED, "al.Activity LIKE '%failed%'"),
+    (AF_LOCKED, "al.Activity LIKE '%locked%'"),
+    (AF_FORGOT, "al.Activity LIKE '%ForgotPassword%'"),
+    (AF_FPW, "al.Activity LIKE 'ForgotPassword%'"),
+    (AF_WEB_ENUM, "al.Activity LIKE 'attempt to login by non-user%'"),
+    (AF_MOBILE_ENUM, "al.Activity LIKE 'Mobile: Attempt to login by unknown user%'"),
+    (AF_FPW_U0P0, "al.Activity LIKE 'ForgotPassword%u0p0%'"),
+    (AF_FPW_U0P0N0, "al.Activity LIKE 'ForgotPassword%u0p0n0%'"),
+    (AF_FPW_U0PPLUS, "al.Activity LIKE 'ForgotPassword%u0p+%'"),
+    (AF_HAS_N0, "al.Activity LIKE '%n0%'"),
+    (AF_HAS_UPLUS, "al.Activity LIKE '%u+%'"),
+    (AF_LOGIN_OK, "(al.Activity LIKE '%logged in%' OR al.Activity LIKE '%login%')"
+                  " AND al.Activity NOT LIKE '%failed%'"),
+]
+
+# Rows no panel counts are never stored
+ROLLUP_KEEP = (AF_FAILED | AF_WEB_ENUM | AF_MOBILE_ENUM | AF_FPW_U0P0
+               | AF_FPW_U0PPLUS | AF_LOGIN_OK)
+
+ENUM_SIGNAL_LABELS = [
+    (AF_WEB_ENUM, 'Web login -- unknown email'),
+    (AF_MOBILE_ENUM, 'Mobile login -- unknown email'),
+    (AF_FPW_U0P0N0, 'Forgot password -- valid email, NO match (combo-list probe)'),
+    (AF_FPW_U0P0, 'Forgot password -- invalid email format'),
+    (AF_FPW_U0PPLUS, 'Forgot password -- person exists, no account (matched)'),
+]
+
+
+def _is_enum_probe(flags):
+    """Web/mobile unknown-user login, or a u0p0 ForgotPassword that
+    did not resolve to a user (the KPI / top-IP enumeration filter)."""
+    if flags & (AF_WEB_ENUM | AF_MOBILE_ENUM):
+        return True
+    return bool(flags & AF_FPW_U0P0) and not flags & AF_HAS_UPLUS
+
+
+def _is_fpw_no_match(flags):
+    return bool(flags & AF_FPW_U0P0) and not flags & AF_HAS_N0
+
+
+class RollupRow(object):
+    """Aggregate computed from the rollup; the dashboard sections read its
+    values as attributes, the same as they did the old SQL results."""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class ActivityRollup:
+    """Hourly ActivityLog aggregates persisted in Special Content.
+
+    Storage layout:
+      ROLLUP_KEY                 {"v", "watermark": last Id merged, "days": [...],
+                                  "build": {"next": day} while the first
+                                  build is still filling in older days}
+      ROLLUP_KEY + "_YYYY-MM-DD" {"v", "through": Id, "rows": [[hour, flags,
+                                  UserId, ClientIp, hits, firstSec, lastSec]]}
+
+    hour is 'YYYY-MM-DD HH'; firstSec/lastSec are seconds into the hour,
+    so first/last-seen timestamps stay exact while counts are hourly."""
+
+    def __init__(self):
+        self.days = set()
+        self.shards = {}           # day -> shard, loaded on first use
+        self.built_from = None
+        self.now = None
+        self._hours = {}
+
+    # ::STEP:: Storage
+    def _load(self, key):
+        try:
+            raw = model.TextContent(key)
+            if raw:
+                data = _json_for_ip.loads(raw)
+                if data.get('v') == ROLLUP_VERSION:
+                    return data
+        except:
+            pass
+        return None
+
+    def _save(self, key, data):
+        """Write data under key; None clears the content. Returns False
+        if the write failed."""
+        text = ""
+        if data is not None:
+            data['v'] = ROLLUP_VERSION
+            text = _json_encode(data)
+        try:
+            model.WriteContentText(key, text, "")
+            return True
+        except:
+            return False
+
+    def _query(self, after_id, through_id, day_from, day_to=None):
+        """Aggregate ActivityLog rows with after_id < Id <= through_id into
+        hourly buckets. Days are 'YYYY-MM-DD'; day_to is exclusive."""
+        flags_sql = " + ".join(
+            "CASE WHEN {0} THEN {1} ELSE 0 END".format(cond, bit)
+            for bit, cond in ROLLUP_FLAG_SQL)
+        date_sql = "al.ActivityDate >= '{0}'".format(day_from.replace('-', ''))
+        if day_to:
+            date_sql += " AND al.ActivityDate < '{0}'".format(day_to.replace('-', ''))
+        sql = """
+            SELECT
+                CONVERT(varchar(13), al.ActivityDate, 120) AS HourKey,
+                f.Flags,
+                al.UserId,
+                al.ClientIp,
+                COUNT(*) AS Hits,
+                MIN(DATEPART(MINUTE, al.ActivityDate) * 60 + DATEPART(SECOND, al.ActivityDate)) AS FirstSec,
+                MAX(DATEPART(MINUTE, al.ActivityDate) * 60 + DATEPART(SECOND, al.ActivityDate)) AS LastSec
+            FROM ActivityLog al WITH (NOLOCK)
+            CROSS APPLY (SELECT {0} AS Flags) f
+            WHERE al.Id > {1} AND al.Id <= {2}
+              AND {3}
+              AND (f.Flags & {4}) <> 0
+            GROUP BY CONVERT(varchar(13), al.ActivityDate, 120), f.Flags, al.UserId, al.ClientIp
+        """.format(flags_sql, int(after_id), int(through_id), date_sql, ROLLUP_KEEP)
+        rows = []
+        for r in q.QuerySql(sql):
+            uid = getattr(r, 'UserId', None)
+            ip = _safe_str(getattr(r, 'ClientIp', None)).strip()
+            rows.append([_safe_str(r.HourKey), _to_int(r.Flags),
+                         _to_int(uid) if uid is not None else None,
+                         ip or None, _to_int(r.Hits),
+                         _to_int(r.FirstSec), _to_int(r.LastSec)])
+        return rows
+
+    @staticmethod
+    def _merge(existing, new_rows):
+        merged = {}
+        for row in existing + new_rows:
+            key = (row[0], row[1], row[2], row[3])
+            cur = merged.get(key)
+            if cur is None:
+                merged[key] = list(row)
+            else:
+                cur[4] += row[4]
+                cur[5] = min(cur[5], row[5])
+                cur[6] = max(cur[6], row[6])
+        return sorted(merged.values())
+
+    # ::STEP:: Incremental refresh
+    def refresh(self, rebuild=False):
+        head = q.QuerySqlTop1("""
+            SELECT ISNULL(MAX(Id), 0) AS MaxId,
+                   CONVERT(varchar(19), GETDATE(), 120) AS Now
+            FROM ActivityLog WITH (NOLOCK)
+        """)
+        max_id = _to_int(head.MaxId)
+        self.now = datetime.strptime(_safe_str(head.Now)[:19], '%Y-%m-%d %H:%M:%S')
+        oldest = (self.now - timedelta(days=ROLLUP_RETENTION_DAYS)).strftime('%Y-%m-%d')
+
+        meta = None if rebuild else self._load(ROLLUP_KEY)
+        if meta:
+            watermark = _to_int(meta.get('watermark'))
+            build = meta.get('build')
+            stored_days = list(meta.get('days', []))
+        else:
+            # First build: new rows are merged from max_id on, while the
+            # days up to it are filled in newest first by _build_days
+            watermark = max_id
+            build = {'next': self.now.strftime('%Y-%m-%d')}
+            stored_days = []
+        days = set(d for d in stored_days if d >= oldest)
+        dirty = meta is None or len(days) != len(stored_days)
+        for d in stored_days:
+            if d < oldest:
+                self._save(ROLLUP_KEY + '_' + d, None)
+
+        if max_id > watermark:
+            fresh = {}
+            for row in self._query(watermark, max_id, oldest):
+                fresh.setdefault(row[0][:10], []).append(row)
+            saved_all = True
+            for d in sorted(fresh):
+                key = ROLLUP_KEY + '_' + d
+                shard = self._load(key)
+                through = _to_int(shard.get('through')) if shard else 0
+                if shard and through >= max_id:
+                    # Another request already merged this range
+                    self.shards[d] = shard
+                    continue
+                if shard and through > watermark:
+                    # A concurrent refresh (or one whose other shards failed
+                    # to save) merged part of this range; rather than double
+                    # count, recount the whole day
+                    rows = self._query(0, max_id, d, self._next_day(d))
+                else:
+                    rows = self._merge(shard['rows'] if shard else [], fresh[d])
+                self.shards[d] = {'through': max_id, 'rows': rows}
+                if self._save(key, self.shards[d]):
+                    days.add(d)
+                else:
+                    saved_all = False
+            # A shard that didn't save is merged again next time
+            if saved_all:
+                watermark = max_id
+                dirty = True
+
+        if build:
+            build = self._build_days(build, watermark, oldest, days)
+            dirty = True
+
+        if dirty:
+            meta = {'watermark': watermark, 'days': sorted(days)}
+            if build:
+                meta['build'] = build
+            self._save(ROLLUP_KEY, meta)
+
+        self.days = days
+        # Days before this one are not built yet, so windows reaching past
+        # it are not covered
+        self.built_from = self._next_day(build['next']) if build else oldest
+        return self
+
+    @staticmethod
+    def _next_day(day, days=1):
+        return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+    def _build_days(self, build, through_id, oldest, days):
+        """Fill in day shards from build['next'] backwards in
+        ROLLUP_BUILD_CHUNK_DAYS chunks (at least one) until
+        ROLLUP_BUILD_SECONDS is used, saving each shard and the build
+        position as it goes (built days are added to days). Returns the
+        build state, None once oldest is reached."""
+        started = datetime.now()
+        while build['next'] >= oldest:
+            last = build['next']
+            first = max(oldest, self._next_day(last, 1 - ROLLUP_BUILD_CHUNK_DAYS))
+            by_day = {}
+            for row in self._query(0, through_id, first, self._next_day(last)):
+                by_day.setdefault(row[0][:10], []).append(row)
+            d = last
+            while d >= first:
+                shard = {'through': through_id, 'rows': by_day.get(d, [])}
+                if shard['rows'] or self.shards.get(d):
+                    if not self._save(ROLLUP_KEY + '_' + d, shard):
+                        # Resume from this day next time
+                        return build
+                    days.add(d)
+                self.shards[d] = shard
+                d = self._next_day(d, -1)
+                build = {'next': d}
+            # Progress survives a timed-out request
+            self._save(ROLLUP_KEY, {'watermark': through_id, 'build': build,
+                                    'days': sorted(days)})
+            if (datetime.now() - started).total_seconds() >= ROLLUP_BUILD_SECONDS:
+                break
+        if build['next'] < oldest:
+            return None
+        return build
+
+    # ::STEP:: Window helpers
+    def covers(self, lookback_days):
+        if self.now is None or int(lookback_days) > ROLLUP_RETENTION_DAYS:
+            return False
+        return (self.now - timedelta(days=int(lookback_days))).strftime('%Y-%m-%d') >= self.built_from
+
+    def window(self, lookback_days, mask=0):
+        """Bucket rows inside the last lookback_days, optionally limited to
+        rows carrying any of the flags in mask. Only the day shards inside
+        the window are loaded."""
+        cutoff = (self.now - timedelta(days=int(lookback_days))).strftime('%Y-%m-%d %H')
+        rows = []
+        for d in sorted(self.days):
+            if d < cutoff[:10]:
+                continue
+            if d not in self.shards:
+                self.shards[d] = self._load(ROLLUP_KEY + '_' + d)
+            if self.shards[d]:
+                rows.extend(r for r in self.shards[d]['rows']
+                            if r[0] >= cutoff and (not mask or r[1] & mask))
+        return rows
+
+    def first_seen(self, row):
+        return self._hour(row[0]) + timedelta(seconds=row[5])
+
+    def last_seen(self, row):
+        return self._hour(row[0]) + timedelta(seconds=row[6])
+
+    def _hour(self, hour_key):
+        dt = self._hours.get(hour_key)
+        if dt is None:
+            dt = datetime.strptime(hour_key, '%Y-%m-%d %H')
+            self._hours[hour_key] = dt
+        return dt
+
+    def _group(self, rows, keyfunc):
+        """Collapse bucket rows into per-key totals: hits, distinct users,
+        IPs, days and hours of day, and first/last seen."""
+        groups = {}
+        for r in rows:
+            key = keyfunc(r)
+            g = groups.get(key)
+            if g is None:
+                g = groups[key] = {'hits': 0, 'users': set(), 'ips': set(),
+                                   'days': set(), 'hours': set(),
+                                   'first': None, 'last': None, 'rows': []}
+            g['rows'].append(r)
+            g['hits'] += r[4]
+            if r[2] is not None:
+                g['users'].add(r[2])
+            if r[3]:
+                g['ips'].add(r[3])
+            g['days'].add(r[0][:10])
+            g['hours'].add(r[0][11:13])
+            first = self.first_seen(r)
+            last = self.last_seen(r)
+            if g['first'] is None or first < g['first']:
+                g['first'] = first
+            if g['last'] is None or last > g['last']:
+                g['last'] = last
+        return groups
+
+    def _totals(self, rows):
+        """_group over all rows as one key (zeroes when rows is empty)."""
+        return self._group(rows, lambda r: 0).get(0) or {
+            'hits': 0, 'users': set(), 'ips': set(), 'days': set(),
+            'hours': set(), 'first': None, 'last': None, 'rows': []}
+
+    # ::STEP:: Panel aggregates
+    def kpi_overview(self, lookback_days, critical_threshold, high_risk_threshold):
+        """(kpi rows, critical IP rows, enumeration rows) for the hub."""
+        failed = self.window(lookback_days, AF_FAILED)
+        total = self._totals(failed)
+        by_ip = self._group([r for r in failed if r[3]], lambda r: r[3])
+        by_user = self._group([r for r in failed if r[2] is not None], lambda r: r[2])
+        critical = [(ip, g) for ip, g in by_ip.items() if g['hits'] >= critical_threshold]
+        critical.sort(key=lambda item: -item[1]['hits'])
+        kpi = RollupRow(
+            TotalFailedAttempts=total['hits'],
+            UniqueThreats=len(total['ips']),
+            UsersAffected=len(total['users']),
+            DaysWithActivity=len(total['days']),
+            CriticalThreats=len(critical),
+            AccountLockouts=sum(r[4] for r in failed if r[1] & AF_LOCKED),
+            PasswordResets=sum(r[4] for r in failed if r[1] & AF_FORGOT),
+            LatestActivity=total['last'],
+            HighRiskUsers=len([u for u, g in by_user.items() if g['hits'] >= high_risk_threshold]))
+        critical_ips = [RollupRow(ClientIp=ip, Attempts=g['hits'],
+                                  UsersTargeted=len(g['users']), LastSeen=g['last'])
+                        for ip, g in critical[:5]]
+
+        probes = [r for r in self.window(lookback_days) if _is_enum_probe(r[1])]
+        enum = RollupRow(
+            WebLoginEnum=sum(r[4] for r in probes if r[1] & AF_WEB_ENUM),
+            MobileLoginEnum=sum(r[4] for r in probes if r[1] & AF_MOBILE_ENUM),
+            FpwNoMatch=sum(r[4] for r in probes if _is_fpw_no_match(r[1])),
+            FpwInvalidFormat=sum(r[4] for r in probes
+                                 if r[1] & AF_FPW and r[1] & AF_HAS_N0),
+            UniqueEnumIps=len(set(r[3] for r in probes if r[3])))
+        return [kpi], critical_ips, [enum]
+
+    def login_patterns(self, lookback_days, users):
+        """Failed-login patterns per monitored user. users maps UserId to a
+        row with Username, PeopleId and Roles."""
+        failed = [r for r in self.window(lookback_days, AF_FAILED) if r[2] in users]
+        result = []
+        for uid, g in self._group(failed, lambda r: r[2]).items():
+            if len(g['ips']) >= 5:
+                pattern = 'Multiple IP Pattern'
+            elif len(g['hours']) >= 12:
+                pattern = 'Extended Time Pattern'
+            elif g['hits'] >= 10:
+                pattern = 'High Frequency Pattern'
+            else:
+                pattern = 'Standard Pattern'
+            user = users[uid]
+            result.append(RollupRow(
+                Username=user.Username, PeopleId=user.PeopleId, Roles=user.Roles,
+                TotalEvents=g['hits'], DaysActive=len(g['days']),
+                UniqueHours=len(g['hours']), UniqueIPs=len(g['ips']),
+                FirstEvent=g['first'], LastEvent=g['last'], PatternType=pattern))
+        result.sort(key=lambda row: -row.TotalEvents)
+        return result
+
+    def ip_targets(self, lookback_days, users):
+        """Source IPs of failed logins against monitored users."""
+        failed = [r for r in self.window(lookback_days, AF_FAILED)
+                  if r[2] in users and r[3]]
+        result = []
+        for ip, g in self._group(failed, lambda r: r[3]).items():
+            targets = [users[uid] for uid in g['users']]
+            result.append(RollupRow(
+                ClientIp=ip, TotalAttempts=g['hits'],
+                HighRiskUsersTargeted=len(targets), DaysActive=len(g['days']),
+                FirstSeen=g['first'], LastSeen=g['last'],
+                CurrentlyLockedTargets=len([u for u in targets if u.IsLockedOut]),
+                RecentlyLockedTargets=len([u for u in targets if u.RecentlyLocked]),
+                TargetedUsers=', '.join(sorted(
+                    '{0}[{1}]'.format(u.Username, u.RoleLabel) for u in targets))))
+        result.sort(key=lambda row: (-row.TotalAttempts, -row.HighRiskUsersTargeted))
+        return result
+
+    def enumeration_summary(self, lookback_days):
+        """Hits per enumeration signal, same buckets as the SQL CASE."""
+        def signal(flags):
+            if not flags & (AF_WEB_ENUM | AF_MOBILE_ENUM):
+                if flags & AF_HAS_UPLUS:
+                    return None
+                if not (flags & (AF_FPW_U0P0N0 | AF_FPW_U0PPLUS) or _is_fpw_no_match(flags)):
+                    return None
+            for bit, label in ENUM_SIGNAL_LABELS:
+                if flags & bit and (bit != AF_FPW_U0P0 or not flags & AF_HAS_N0):
+                    return label
+            return 'Other'
+        rows = [r for r in self.window(lookback_days) if signal(r[1])]
+        result = [RollupRow(Signal=label, Hits=g['hits'], UniqueIps=len(g['ips']),
+                            LastSeen=g['last'])
+                  for label, g in self._group(rows, lambda r: signal(r[1])).items()]
+        result.sort(key=lambda row: -row.Hits)
+        return result
+
+    def enumeration_ips(self, lookback_days, limit=20, min_hits=3):
+        """Top enumeration source IPs with per-signal counts."""
+        probes = [r for r in self.window(lookback_days)
+                  if r[3] and _is_enum_probe(r[1])]
+        result = []
+        for ip, g in self._group(probes, lambda r: r[3]).items():
+            if g['hits'] < min_hits:
+                continue
+            mine = g['rows']
+            result.append(RollupRow(
+                ClientIp=ip, Attempts=g['hits'],
+                InvalidFormat=sum(r[4] for r in mine if r[1] & AF_FPW and r[1] & AF_HAS_N0),
+                WebLogin=sum(r[4] for r in mine if r[1] & AF_WEB_ENUM),
+                MobileLogin=sum(r[4] for r in mine if r[1] & AF_MOBILE_ENUM),
+                FpwNoMatch=sum(r[4] for r in mine if _is_fpw_no_match(r[1])),
+                FirstSeen=g['first'], LastSeen=g['last']))
+        result.sort(key=lambda row: -row.Attempts)
+        return result[:limit]
+
+    def login_comparison(self, lookback_days):
+        """Failed vs successful login totals."""
+        result = []
+        for label, mask in (('Failed Logins', AF_FAILED), ('Successful Logins', AF_LOGIN_OK)):
+            g = self._totals(self.window(lookback_days, mask))
+            result.append(RollupRow(LoginType=label, TotalAttempts=g['hits'],
+                                    UniqueIPs=len(g['ips']), UniqueUsers=len(g['users']),
+                                    ActiveDays=len(g['days'])))
+        return result
+
+
+_rollup_state = {}
+
+
+def get_activity_rollup():
+    """Refresh the ActivityLog rollup once per request and return it.
+    Returns None if it could not be built; callers then run their
+    original live queries."""
+    if 'rollup' not in _rollup_state:
+        rebuild = False
+        try:
+            rebuild = str(getattr(model.Data, 'rebuild_rollup', '')) == '1'
+        except:
+            pass
+        try:
+            _rollup_state['rollup'] = ActivityRollup().refresh(rebuild)
+        except:
+            _rollup_state['rollup'] = None
+    return _rollup_state['rollup']
+
+
 # ::START:: Account Enumeration Monitor
 class EnumerationMonitor:
     """Detect account-enumeration probing.
@@ -6465,8 +7333,13 @@ class EnumerationMonitor:
                 ORDER BY ActivityDate DESC
             """.format(start)
 
-            summary = list(q.QuerySql(sql_summary))
-            ips = list(q.QuerySql(sql_ips))
+            rollup = get_activity_rollup()
+            if rollup and rollup.covers(lookback_days):
+                summary = rollup.enumeration_summary(lookback_days)
+                ips = rollup.enumeration_ips(lookback_days)
+            else:
+                summary = list(q.QuerySql(sql_summary))
+                ips = list(q.QuerySql(sql_ips))
             recent = list(q.QuerySql(sql_recent))
             cidr_attempt_rows = list(q.QuerySql(sql_cidr_attempts))
             match_typed_rows = list(q.QuerySql(sql_match_typed))
@@ -6481,6 +7354,15 @@ class EnumerationMonitor:
             # IPs learned along the way persist.
             ip_cache = _load_ip_cache()
 
+            # Resolve every IP this report shows up front, in batches:
+            # the top-IP table first, then the targeted-people and
+            # correlation passes. Anything past the inline budget is
+            # queued and filled in by the background poller below.
+            report_ips = ([getattr(r, 'ClientIp', '') for r in ips]
+                          + [getattr(r, 'ClientIp', '') for r in targeted_ip_rows]
+                          + [getattr(r, 'ClientIp', '') for r in email_corr_rows])
+            geo_pending = resolve_ip_geo(report_ips, ip_cache)
+
             # Build People -> [countries] map for the modal.
             targeted_countries = {}
             for r in targeted_ip_rows:
@@ -6524,9 +7406,8 @@ class EnumerationMonitor:
             else:
                 match_pct = 0.0
 
-            # Enrich top IPs with geo + abuse-network info. ip_cache was
-            # already loaded above for the targeted-countries pass; we
-            # just keep adding to it here, then save once.
+            # Enrich top IPs with geo + abuse-network info from the
+            # cache resolved above.
             ip_enrichment = {}
             for r in ips:
                 ip_addr = _safe_str(getattr(r, 'ClientIp', ''))
@@ -6551,9 +7432,7 @@ class EnumerationMonitor:
                                'first': first, 'last': last})
 
             # Build correlation rows -- only emails with 2+ distinct IPs.
-            # Country/CIDR enrichment uses the already-warm ip_cache where
-            # possible; new IPs trigger a lookup (and cache write) but only
-            # for the small set of correlated emails (cheap).
+            # Country/CIDR enrichment reads the ip_cache resolved above.
             correlated_emails = []
             for email, ip_list in email_to_ips.items():
                 if len(ip_list) < 2:
@@ -6601,7 +7480,7 @@ class EnumerationMonitor:
                     'last': last,
                 })
 
-            # Persist any new geo lookups from the correlation pass too
+            # Persist the geo lookups made for this report
             _save_ip_cache(ip_cache)
 
             # Sort: most-distributed first (IP count), then by total hits.
@@ -6754,6 +7633,46 @@ class EnumerationMonitor:
                 </form>
             """
 
+            # IPs the inline batch didn't cover resolve in the background,
+            # paced by the server-side rate limit; the page never waits.
+            if geo_pending:
+                print """
+                <div id="ipGeoPending" style="background:#ebf8ff;border-left:4px solid #3182ce;
+                            color:#2a4365;padding:10px 14px;border-radius:6px;
+                            margin-bottom:14px;font-size:13px;">
+                    Looking up locations for {0} IP address(es) in the background&hellip;
+                </div>
+                <script>
+                (function() {{
+                    var path = window.location.pathname.replace('/PyScript/', '/PyScriptForm/');
+                    var box = document.getElementById('ipGeoPending');
+                    function step() {{
+                        var xhr = new XMLHttpRequest();
+                        xhr.open('POST', path, true);
+                        xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+                        xhr.onreadystatechange = function() {{
+                            if (xhr.readyState !== 4) return;
+                            var d = null;
+                            try {{ d = JSON.parse(xhr.responseText); }} catch (e) {{}}
+                            if (!d) {{
+                                box.innerHTML = 'Background IP lookup stopped; locations will fill in on a later visit.';
+                            }} else if (d.pending > 0) {{
+                                box.innerHTML = 'Looking up locations&hellip; ' + d.pending
+                                    + ' IP address(es) left (rate limited, next batch in '
+                                    + d.wait_seconds + 's).';
+                                setTimeout(step, Math.max(1, d.wait_seconds) * 1000);
+                            }} else {{
+                                box.innerHTML = 'IP locations resolved. '
+                                    + '<a href="javascript:location.reload()">Reload</a> to show them.';
+                            }}
+                        }};
+                        xhr.send('view=enumeration&action=resolve_ips');
+                    }}
+                    step();
+                }})();
+                </script>
+                """.format(len(geo_pending))
+
             # ::STEP:: Breakthrough card -- topmost signal. Green when
             # the perimeter holds; bright red when an attacker network
             # has produced a successful login (presume compromise).
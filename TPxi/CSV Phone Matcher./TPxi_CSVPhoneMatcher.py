@@ -28,7 +28,21 @@
 # ----------------------------------------------------------------
 # Architecture:
 #   Single .py file SPA - Python AJAX handlers for POST, HTML SPA for GET.
-#   No persistent state - all data lives in browser session only.
+#   The CSV itself stays in the browser (kept in localStorage so a job can
+#   be resumed); the server only receives the phone column. Matching uses a
+#   digits-only phone index (last 7 / last 10 digits -> PeopleId, field)
+#   that is kept in Special Content and rebuilt once a day (by the nightly
+#   task, or when a job is started after the TTL).
+#   Matching runs as a job: the phones are posted once, the server matches
+#   them in fixed-size chunks across polling requests and saves each chunk's
+#   results in Special Content, so a timed-out or closed page can resume the
+#   job. The phone list is deleted as soon as the job completes (the browser
+#   drops its copy of the CSV then too); only the match results are kept
+#   until the job is discarded or expires.
+#
+# Nightly rebuild (optional, add to ScheduledTasks or MorningBatch):
+#   model.Data.rebuild_index = 1
+#   print(model.CallScript("TPxi_CSVPhoneMatcher"))  # Update to your script name
 #
 # CSS Prefix: cm-
 # Root Class: .cm-root
@@ -36,9 +50,21 @@
 
 import json
 import re
+import time
 
 model.Header = 'CSV Phone Matcher'
 
+# =====================================================================
+# CONFIGURATION
+# =====================================================================
+PHONE_INDEX_PERSIST = True              # Keep the phone index in Special Content between requests
+PHONE_INDEX_TTL_SECONDS = 86400         # Rebuild the stored index when it is older than this
+PHONE_INDEX_CONTENT_NAME = 'TPxi_CSVPhoneMatcher_Index'
+PHONE_JOB_CHUNK_SIZE = 500              # Phones matched and saved together within a job
+PHONE_JOB_TIME_BUDGET_SECONDS = 20      # Matching done per polling request before it returns
+PHONE_JOB_TTL_SECONDS = 259200          # Jobs are removed 3 days after they were started
+PHONE_JOB_CONTENT_PREFIX = 'TPxi_CSVPhoneMatcher_Job_'
+
 # =====================================================================
 # HELPER FUNCTIONS
 # =====================================================================
@@ -63,10 +89,383 @@ def normalize_phone(phone):
         digits = digits[1:]
     return digits
 
+# =====================================================================
+# PHONE INDEX
+# =====================================================================
+# Every Cell/Home/Work number is keyed by its last 7 and last 10 digits, so
+# matching a CSV row is a dictionary lookup instead of a LIKE scan of People.
+# The stored copy is sharded by the last two digits; a batch only reads the
+# shards its phones fall in. People edited since the build are read once
+# when a job starts and saved with the job, so the ModifiedDate/CreatedDate
+# scan doesn't run for every chunk; the rebuild also happens at job start,
+# never inside a matching request.
+
+PHONE_FIELDS = (('CellPhone', 'Cell'), ('HomePhone', 'Home'), ('WorkPhone', 'Work'))
+
+PHONE_INDEX_SQL = """
+    SELECT p.PeopleId, p.CellPhone, p.HomePhone, p.WorkPhone
+    FROM People p
+    WHERE (p.CellPhone > '' OR p.HomePhone > '' OR p.WorkPhone > '')
+    AND p.DeceasedDate IS NULL
+    AND ISNULL(p.IsDeceased, 0) = 0
+    {0}
+"""
+
+MATCH_PEOPLE_SQL = """
+    SELECT p.PeopleId, p.Name2, p.EmailAddress, p.Age,
+        p.CellPhone, p.HomePhone, p.WorkPhone,
+        p.MemberStatusId, ms.Description AS MemberStatus
+    FROM People p
+    LEFT JOIN lookup.MemberStatus ms ON p.MemberStatusId = ms.Id
+    WHERE p.PeopleId IN ({0})
+    AND p.DeceasedDate IS NULL
+    AND ISNULL(p.IsDeceased, 0) = 0
+"""
+
+def phone_lookup_key(digits):
+    """Index key for a normalized CSV phone: last 10 digits, or last 7 for local numbers."""
+    if len(digits) >= 10:
+        return digits[-10:]
+    if len(digits) >= 7:
+        return digits[-7:]
+    return ''
+
+def _add_phone_keys(index, people_id, field, phone):
+    digits = normalize_phone(phone)
+    if len(digits) < 7:
+        return
+    keys = [digits[-7:]]
+    if len(digits) >= 10:
+        keys.append(digits[-10:])
+    for key in keys:
+        entries = index.setdefault(key, [])
+        if [people_id, field] not in entries:
+            entries.append([people_id, field])
+
+def _phone_shard_name(suffix):
+    return PHONE_INDEX_CONTENT_NAME + '_' + suffix
+
+def load_people_phone_index(since=None):
+    """Build {key: [[PeopleId, field], ...]} from People, optionally only rows changed since a SQL datetime."""
+    where = ''
+    if since:
+        where = "AND (p.ModifiedDate >= '{0}' OR p.CreatedDate >= '{0}')".format(since)
+    index = {}
+    for row in q.QuerySql(PHONE_INDEX_SQL.format(where)):
+        for column, field in PHONE_FIELDS:
+            _add_phone_keys(index, row.PeopleId, field, getattr(row, column))
+    return index
+
+def read_json_content(name, default=None):
+    try:
+        raw = model.TextContent(name)
+        if raw and raw.strip():
+            return json.loads(raw)
+    except:
+        pass
+    return default
+
+def write_json_content(name, value):
+    model.WriteContentText(name, json.dumps(value, separators=(',', ':')), '')
+
+def load_phone_index_manifest():
+    return read_json_content(PHONE_INDEX_CONTENT_NAME)
+
+def build_phone_index():
+    """Rebuild every stored shard from People and return (manifest, index)."""
+    built_at = str(q.QuerySqlTop1("SELECT CONVERT(varchar(19), GETDATE(), 120) AS Now").Now)
+    index = load_people_phone_index()
+    shards = {}
+    for key, entries in index.items():
+        shards.setdefault(key[-2:], {})[key] = entries
+    for i in range(100):
+        suffix = '%02d' % i
+        write_json_content(_phone_shard_name(suffix), shards.get(suffix, {}))
+    manifest = {'builtAt': time.time(), 'builtAtSql': built_at, 'keys': len(index)}
+    write_json_content(PHONE_INDEX_CONTENT_NAME, manifest)
+    return manifest, index
+
+def ensure_phone_index():
+    """Return the stored index manifest, rebuilding the shards first when
+    they are missing or past PHONE_INDEX_TTL_SECONDS. Called when a job is
+    started, not from the matching requests. Returns None if persistence is
+    off or the rebuild failed."""
+    if not PHONE_INDEX_PERSIST:
+        return None
+    manifest = load_phone_index_manifest()
+    if not manifest or time.time() - manifest.get('builtAt', 0) > PHONE_INDEX_TTL_SECONDS:
+        try:
+            manifest = build_phone_index()[0]
+        except:
+            return None
+    return manifest
+
+def load_phone_index_delta(manifest):
+    """Index entries for people added or edited since the manifest's build."""
+    if not manifest:
+        return {}
+    return load_people_phone_index(manifest.get('builtAtSql'))
+
+def get_phone_index(keys, delta=None):
+    """Return the part of the phone index covering keys.
+
+    Reads the stored shards and merges delta, the entries for people edited
+    since the build (queried here when the caller doesn't pass one). The
+    shards are never rebuilt here: stale shards plus the delta are still
+    complete. Falls back to a one-query in-memory index when persistence is
+    off, the index hasn't been built, or a shard can't be read.
+    """
+    if not PHONE_INDEX_PERSIST:
+        return load_people_phone_index()
+
+    manifest = load_phone_index_manifest()
+    if not manifest:
+        return load_people_phone_index()
+
+    index = {}
+    for suffix in set(k[-2:] for k in keys):
+        try:
+            shard = json.loads(model.TextContent(_phone_shard_name(suffix)) or '{}')
+        except:
+            return load_people_phone_index()
+        for key in keys:
+            if key in shard:
+                index[key] = shard[key]
+
+    # Pick up people added or edited since the stored index was built
+    if delta is None:
+        delta = load_phone_index_delta(manifest)
+    for key, entries in delta.items():
+        if key in keys:
+            merged = index.setdefault(key, [])
+            for entry in entries:
+                if entry not in merged:
+                    merged.append(entry)
+    return index
+
+def load_match_people(people_ids):
+    """Display details and per-field phone digits for the matched people, keyed by PeopleId."""
+    people = {}
+    ids = sorted(people_ids)
+    for i in range(0, len(ids), 1000):
+        id_list = ','.join(str(int(pid)) for pid in ids[i:i + 1000])
+        for row in q.QuerySql(MATCH_PEOPLE_SQL.format(id_list)):
+            people[row.PeopleId] = {
+                'digits': dict((field, re.sub(r'[^0-9]', '', str(getattr(row, column) or '')))
+                               for column, field in PHONE_FIELDS),
+                'match': {
+                    'peopleId': row.PeopleId,
+                    'name': str(row.Name2 or ''),
+                    'email': str(row.EmailAddress or ''),
+                    'age': str(row.Age or ''),
+                    'memberStatus': str(row.MemberStatus or ''),
+                    'cellPhone': model.FmtPhone(row.CellPhone, '') if row.CellPhone else '',
+                    'homePhone': model.FmtPhone(row.HomePhone, '') if row.HomePhone else '',
+                    'workPhone': model.FmtPhone(row.WorkPhone, '') if row.WorkPhone else ''
+                }
+            }
+    return people
+
+def match_phone_list(phones, delta=None):
+    """Match a list of raw CSV phone values, returning one result per phone in order.
+
+    delta is passed through to get_phone_index (a job passes the one it
+    saved at start)."""
+    lookups = []
+    for phone_raw in phones:
+        digits = normalize_phone(phone_raw)
+        lookups.append((phone_raw, digits, phone_lookup_key(digits)))
+
+    keys = set(l[2] for l in lookups if l[2])
+    index = get_phone_index(keys, delta) if keys else {}
+    people = load_match_people(set(e[0] for k in keys for e in index.get(k, [])))
+
+    results = []
+    for phone_raw, digits, key in lookups:
+        if not key:
+            results.append({'phone': phone_raw, 'matches': [], 'error': 'Too few digits'})
+            continue
+
+        matches = []
+        seen = set()
+        for people_id, field in index.get(key, []):
+            if people_id in seen or people_id not in people:
+                continue
+            seen.add(people_id)
+            person = people[people_id]
+            # Re-check against the current numbers so stale index entries drop out
+            matched_fields = [f for c, f in PHONE_FIELDS if digits in person['digits'][f]]
+            if not matched_fields:
+                continue
+            match = dict(person['match'])
+            match['matchedFields'] = matched_fields
+            matches.append(match)
+
+        results.append({'phone': phone_raw, 'matches': matches})
+    return results
+
+# =====================================================================
+# MATCH JOBS
+# =====================================================================
+# A job is a header (progress), an input entry (the phones to match), the
+# phone index delta read when it started, and per chunk a small state entry
+# plus a results entry. The input and delta are deleted when the job
+# completes. Each user keeps one job; starting a new one discards the
+# previous, and jobs past PHONE_JOB_TTL_SECONDS are swept whenever a job
+# is started.
+#
+# Polling requests claim chunks one index at a time and skip chunks that
+# are done or recently claimed. Content writes aren't atomic, so two
+# requests can still end up matching the same chunk; both then write the
+# same results, and the header's progress is recounted from the chunk
+# states rather than incremented.
+
+PHONE_JOB_REGISTRY_NAME = PHONE_JOB_CONTENT_PREFIX + 'Registry'
+
+def _job_name(job_id, part=''):
+    return PHONE_JOB_CONTENT_PREFIX + job_id + part
+
+def delete_job_input(job_id):
+    """Drop the phone list and index delta once they are no longer needed."""
+    model.WriteContentText(_job_name(job_id, '_input'), '', '')
+    model.WriteContentText(_job_name(job_id, '_delta'), '', '')
+
+def delete_job(job_id):
+    header = read_json_content(_job_name(job_id), {})
+    for n in range(header.get('chunks', 0)):
+        model.WriteContentText(_job_name(job_id, '_r%d' % n), '', '')
+        model.WriteContentText(_job_name(job_id, '_c%d' % n), '', '')
+    delete_job_input(job_id)
+    model.WriteContentText(_job_name(job_id), '', '')
+
+def create_job(phone_column, phones):
+    """Save a new job for the current user and return its header."""
+    now = time.time()
+    user_id = model.UserPeopleId
+    registry = read_json_content(PHONE_JOB_REGISTRY_NAME, {})
+    for job_id, info in list(registry.items()):
+        if info.get('userId') == user_id or now - info.get('created', 0) > PHONE_JOB_TTL_SECONDS:
+            delete_job(job_id)
+            del registry[job_id]
+
+    job_id = '{0}_{1}'.format(user_id, int(now * 1000))
+    header = {
+        'id': job_id,
+        'userId': user_id,
+        'status': 'running',
+        'total': len(phones),
+        'processed': 0,
+        'chunkSize': PHONE_JOB_CHUNK_SIZE,
+        'chunks': (len(phones) + PHONE_JOB_CHUNK_SIZE - 1) // PHONE_JOB_CHUNK_SIZE,
+        'chunksDone': 0,
+        'phoneColumn': phone_column,
+        'created': now,
+        'updated': now
+    }
+    if header['chunks'] == 0:
+        header['status'] = 'complete'
+    else:
+        # Rebuild a stale index and read the edits since its build once,
+        # here, rather than in every matching request
+        manifest = ensure_phone_index()
+        if manifest:
+            write_json_content(_job_name(job_id, '_delta'), load_phone_index_delta(manifest))
+        write_json_content(_job_name(job_id, '_input'), {'phones': phones})
+    write_json_content(_job_name(job_id), header)
+    registry[job_id] = {'userId': user_id, 'created': now}
+    write_json_content(PHONE_JOB_REGISTRY_NAME, registry)
+    return header
+
+def load_job(job_id):
+    """Job header, or None if it doesn't exist or belongs to another user."""
+    header = read_json_content(_job_name(job_id))
+    if not header or header.get('userId') != model.UserPeopleId:
+        return None
+    return header
+
+def _chunk_name(job_id, n):
+    return _job_name(job_id, '_c%d' % n)
+
+def claim_chunk(job_id, n, now):
+    """Claim chunk n unless it is done or another request claimed it recently."""
+    state = read_json_content(_chunk_name(job_id, n), {}) or {}
+    if state.get('done') or now - state.get('claimedAt', 0) < PHONE_JOB_TIME_BUDGET_SECONDS + 10:
+        return False
+    write_json_content(_chunk_name(job_id, n), {'claimedAt': now})
+    return True
+
+def process_job(job_id):
+    """Match unclaimed chunks of the job until the time budget is used.
+
+    Returns (header, [{'index': n, 'results': [...]}, ...]) for the chunks
+    finished by this call. A call that finds every remaining chunk claimed
+    by other requests returns no chunks.
+    """
+    header = load_job(job_id)
+    if header is None:
+        return None, []
+    if header['status'] == 'complete':
+        return header, []
+    started = time.time()
+    size = header['chunkSize']
+    phones = delta = None
+    done = []
+    n = header['chunksDone']
+    while n < header['chunks'] and time.time() - started < PHONE_JOB_TIME_BUDGET_SECONDS:
+        if claim_chunk(job_id, n, time.time()):
+            if phones is None:
+                phones = read_json_content(_job_name(job_id, '_input'), {}).get('phones', [])
+                # None (no saved delta) makes each chunk query its own
+                delta = read_json_content(_job_name(job_id, '_delta'))
+            chunk = phones[n * size:(n + 1) * size]
+            if not chunk:
+                # Input already deleted: another request completed the job
+                break
+            results = match_phone_list(chunk, delta)
+            write_json_content(_job_name(job_id, '_r%d' % n), results)
+            write_json_content(_chunk_name(job_id, n), {'done': True})
+            done.append({'index': n, 'results': results})
+        n += 1
+
+    # Progress is the run of finished chunks from the start, recounted from
+    # the chunk states so concurrent requests can't overwrite each other's
+    header = load_job(job_id) or header
+    finished = set(d['index'] for d in done)
+    n = header['chunksDone']
+    while n < header['chunks'] and (n in finished or
+                                    (read_json_content(_chunk_name(job_id, n), {}) or {}).get('done')):
+        n += 1
+    if n > header['chunksDone']:
+        header['chunksDone'] = n
+        header['processed'] = min(header['total'], n * size)
+        header['updated'] = time.time()
+        if n >= header['chunks']:
+            header['status'] = 'complete'
+        write_json_content(_job_name(job_id), header)
+        if header['status'] == 'complete':
+            delete_job_input(job_id)
+    return header, done
+
+def load_job_chunk(job_id, index):
+    """Saved results for one finished chunk, or None."""
+    header = load_job(job_id)
+    if header is None or index < 0 or index >= header['chunksDone']:
+        return None
+    return read_json_content(_job_name(job_id, '_r%d' % index), [])
+
+# =====================================================================
+# INDEX REBUILD (scheduled task or ?rebuild_index=1)
+# =====================================================================
+if hasattr(Data, 'rebuild_index') and str(Data.rebuild_index) == '1':
+    started = time.time()
+    manifest = build_phone_index()[0]
+    print "CSV Phone Matcher index rebuilt: {0} phone keys in {1}s".format(
+        manifest['keys'], round(time.time() - started, 2))
+
 # =====================================================================
 # AJAX HANDLERS (POST)
 # =====================================================================
-if model.HttpMethod == "post":
+elif model.HttpMethod == "post":
     action = str(Data.action) if hasattr(Data, 'action') and Data.action else ''
 
     # -----------------------------------------------------------------
@@ -77,55 +476,44 @@ if model.HttpMethod == "post":
             phones_json = str(Data.phones_json) if hasattr(Data, 'phones_json') else '[]'
             phones = json.loads(phones_json)
 
-            results = []
-            for phone_raw in phones:
-                digits = normalize_phone(phone_raw)
-
-                if len(digits) < 7:
-                    results.append({'phone': phone_raw, 'matches': [], 'error': 'Too few digits'})
-                    continue
-
-                sql = """
-                    SELECT p.PeopleId, p.Name2, p.EmailAddress, p.Age,
-                        p.CellPhone, p.HomePhone, p.WorkPhone,
-                        p.MemberStatusId, ms.Description AS MemberStatus
-                    FROM People p
-                    LEFT JOIN lookup.MemberStatus ms ON p.MemberStatusId = ms.Id
-                    WHERE (p.CellPhone LIKE '%{0}%'
-                        OR p.HomePhone LIKE '%{0}%'
-                        OR p.WorkPhone LIKE '%{0}%')
-                    AND p.DeceasedDate IS NULL
-                    AND ISNULL(p.IsDeceased, 0) = 0
-                """.format(digits)
-
-                matches = []
-                for row in q.QuerySql(sql):
-                    matched_fields = []
-                    if row.CellPhone and digits in re.sub(r'[^0-9]', '', str(row.CellPhone)):
-                        matched_fields.append('Cell')
-                    if row.HomePhone and digits in re.sub(r'[^0-9]', '', str(row.HomePhone)):
-                        matched_fields.append('Home')
-                    if row.WorkPhone and digits in re.sub(r'[^0-9]', '', str(row.WorkPhone)):
-                        matched_fields.append('Work')
-
-                    matches.append({
-                        'peopleId': row.PeopleId,
-                        'name': str(row.Name2 or ''),
-                        'email': str(row.EmailAddress or ''),
-                        'age': str(row.Age or ''),
-                        'memberStatus': str(row.MemberStatus or ''),
-                        'cellPhone': model.FmtPhone(row.CellPhone, '') if row.CellPhone else '',
-                        'homePhone': model.FmtPhone(row.HomePhone, '') if row.HomePhone else '',
-                        'workPhone': model.FmtPhone(row.WorkPhone, '') if row.WorkPhone else '',
-                        'matchedFields': matched_fields
-                    })
-
-                results.append({'phone': phone_raw, 'matches': matches})
+            results = match_phone_list(phones)
 
             print json.dumps({'success': True, 'results': results})
         except Exception as e:
             print json.dumps({'success': False, 'message': str(e)})
 
+    # -----------------------------------------------------------------
+    # Match jobs - post the CSV once, then poll process_job until complete
+    # -----------------------------------------------------------------
+    elif action == 'start_job':
+        try:
+            phones = json.loads(str(Data.phones_json) if hasattr(Data, 'phones_json') else '[]')
+            phone_column = str(Data.phone_column) if hasattr(Data, 'phone_column') else ''
+            header = create_job(phone_column, phones)
+            print json.dumps({'success': True, 'job': header})
+        except Exception as e:
+            print json.dumps({'success': False, 'message': str(e)})
+
+    elif action in ('process_job', 'job_status', 'job_results', 'discard_job'):
+        try:
+            job_id = str(Data.job_id) if hasattr(Data, 'job_id') else ''
+            header = load_job(job_id) if job_id else None
+            if header is None:
+                print json.dumps({'success': False, 'message': 'Job not found'})
+            elif action == 'process_job':
+                header, chunks = process_job(job_id)
+                print json.dumps({'success': True, 'job': header, 'chunks': chunks})
+            elif action == 'job_status':
+                print json.dumps({'success': True, 'job': header})
+            elif action == 'job_results':
+                index = int(str(Data.chunk)) if hasattr(Data, 'chunk') else 0
+                print json.dumps({'success': True, 'index': index, 'results': load_job_chunk(job_id, index) or []})
+            else:
+                delete_job(job_id)
+                print json.dumps({'success': True})
+        except Exception as e:
+            print json.dumps({'success': False, 'message': str(e)})
+
     else:
         print json.dumps({'success': False, 'message': 'Unknown action: ' + action})
 
@@ -334,9 +722,16 @@ else:
         batchProgress: 0,
         batchTotal: 0,
         matching: false,
-        filter: 'all'
+        filter: 'all',
+        job: null,
+        jobChunks: [],
+        resumeJob: null,
+        resumeCsv: ''
     };
 
+    var JOB_STORAGE_KEY = 'cmPhoneMatcherJob';
+    var JOB_CSV_STORAGE_KEY = 'cmPhoneMatcherJobCsv';
+
     var scriptPath = (function() {
         var p = window.location.pathname;
         if (p.indexOf('/PyScriptForm/') > -1) return p;
@@ -396,6 +791,34 @@ else:
         xhr.send(data);
     }
 
+    function saveJobId(jobId, csvText) {
+        try {
+            if (jobId) {
+                localStorage.setItem(JOB_STORAGE_KEY, jobId);
+                // The CSV is never sent to the server; keep it here for resuming
+                localStorage.setItem(JOB_CSV_STORAGE_KEY, csvText || '');
+            } else {
+                localStorage.removeItem(JOB_STORAGE_KEY);
+                localStorage.removeItem(JOB_CSV_STORAGE_KEY);
+            }
+        } catch (e) {
+            // Storage full: resume still works, showing only the phone column
+            try { localStorage.removeItem(JOB_CSV_STORAGE_KEY); } catch (e2) {}
+        }
+    }
+
+    function clearJobCsv() {
+        try { localStorage.removeItem(JOB_CSV_STORAGE_KEY); } catch (e) {}
+    }
+
+    function loadJobId() {
+        try { return localStorage.getItem(JOB_STORAGE_KEY); } catch (e) { return null; }
+    }
+
+    function loadJobCsv() {
+        try { return localStorage.getItem(JOB_CSV_STORAGE_KEY) || ''; } catch (e) { return ''; }
+    }
+
     function showToast(msg, type) {
         type = type || 'info';
         var container = document.getElementById('cmToastContainer');
@@ -501,6 +924,20 @@ else:
         h += '<h2>Step 1: Paste Your CSV Data</h2>';
         h += '<p class="cm-text-muted">Paste CSV data below. The first row should contain column headers.</p>';
         h += '</div>';
+        if (state.resumeJob) {
+            var rj = state.resumeJob;
+            h += '<div class="cm-panel">';
+            h += '<div class="cm-panel-header">' + (rj.status === 'complete' ? 'Previous Match Results' : 'Unfinished Match') + '</div>';
+            h += '<div class="cm-panel-body">';
+            h += '<p class="cm-text-muted cm-text-sm">' + rj.processed + ' of ' + rj.total + ' phones matched';
+            h += ' (column: ' + escHtml(rj.phoneColumn) + ', started ' + escHtml(new Date(rj.created * 1000).toLocaleString()) + ')</p>';
+            h += '<div style="display:flex;gap:12px;">';
+            h += '<button class="cm-btn cm-btn-primary cm-btn-sm" onclick="CMApp.resumeJob()">' + (rj.status === 'complete' ? 'View Results' : 'Resume') + '</button>';
+            h += '<button class="cm-btn cm-btn-outline cm-btn-sm" onclick="CMApp.discardJob()">Discard</button>';
+            h += '</div>';
+            h += '</div>';
+            h += '</div>';
+        }
         h += '<div class="cm-panel">';
         h += '<div class="cm-panel-body">';
         h += '<textarea class="cm-textarea" id="cmCsvInput" rows="12" placeholder="Paste CSV data here...&#10;&#10;Example:&#10;Name,Phone,Email&#10;John Doe,615-555-1234,john@example.com">';
@@ -595,6 +1032,11 @@ else:
             h += '<div class="cm-progress-label">Matching phones... ' + state.batchProgress + ' / ' + state.batchTotal + ' (' + pct + '%)</div>';
             h += '<div class="cm-progress-bar"><div class="cm-progress-fill" style="width:' + pct + '%"></div></div>';
             h += '</div></div>';
+        } else if (state.job && state.job.status !== 'complete') {
+            h += '<div class="cm-panel"><div class="cm-panel-body" style="display:flex;align-items:center;gap:12px;">';
+            h += '<div class="cm-progress-label" style="margin:0;">Matching paused at ' + state.batchProgress + ' / ' + state.batchTotal + '</div>';
+            h += '<button class="cm-btn cm-btn-primary cm-btn-sm" onclick="CMApp.continueJob()">Resume</button>';
+            h += '</div></div>';
         }
 
         // Summary
@@ -681,18 +1123,10 @@ else:
     // =====================================================================
     // ACTIONS
     // =====================================================================
-    function doParse() {
-        var textarea = document.getElementById('cmCsvInput');
-        state.csvText = textarea.value;
-        if (!state.csvText.trim()) {
-            showToast('Please paste CSV data first', 'danger');
-            return;
-        }
-
-        var result = parseCSV(state.csvText);
+    function loadCsv(text) {
+        var result = parseCSV(text);
         if (result.headers.length === 0) {
-            showToast('Could not parse CSV headers', 'danger');
-            return;
+            return 'Could not parse CSV headers';
         }
         if (result.rows.length === 0) {
             // Check if first row looks like data (no header row)
@@ -714,13 +1148,29 @@ else:
                 result.headers = genHeaders;
                 result.rows = [singleRow];
             } else {
-                showToast('No data rows found. Make sure your CSV has a header row and at least one data row.', 'danger');
-                return;
+                return 'No data rows found. Make sure your CSV has a header row and at least one data row.';
             }
         }
 
+        state.csvText = text;
         state.headers = result.headers;
         state.rows = result.rows;
+        return '';
+    }
+
+    function doParse() {
+        var textarea = document.getElementById('cmCsvInput');
+        state.csvText = textarea.value;
+        if (!state.csvText.trim()) {
+            showToast('Please paste CSV data first', 'danger');
+            return;
+        }
+
+        var error = loadCsv(state.csvText);
+        if (error) {
+            showToast(error, 'danger');
+            return;
+        }
 
         // Auto-detect phone column
         state.phoneColIndex = 0;
@@ -738,6 +1188,9 @@ else:
 
     function startMatching() {
         state.matchedRows = [];
+        state.jobChunks = [];
+        state.job = null;
+        state.resumeJob = null;
         state.batchProgress = 0;
         state.batchTotal = state.rows.length;
         state.matching = true;
@@ -745,58 +1198,168 @@ else:
         state.filter = 'all';
         render();
 
-        var batchSize = 10;
-        var batches = [];
-        for (var i = 0; i < state.rows.length; i += batchSize) {
-            var batch = [];
-            for (var j = i; j < Math.min(i + batchSize, state.rows.length); j++) {
-                batch.push({
-                    index: j,
-                    phone: state.rows[j][state.headers[state.phoneColIndex]] || '',
-                    csvRow: state.rows[j]
+        var phones = [];
+        for (var i = 0; i < state.rows.length; i++) {
+            phones.push(state.rows[i][state.headers[state.phoneColIndex]] || '');
+        }
+
+        ajax('start_job', {
+            phone_column: state.headers[state.phoneColIndex],
+            phones_json: JSON.stringify(phones)
+        }, function(err, data) {
+            if (err || !data || !data.success) {
+                showToast('Error starting match: ' + (data ? data.message : err), 'danger');
+                state.matching = false;
+                render();
+                return;
+            }
+            state.job = data.job;
+            saveJobId(data.job.id, state.csvText);
+            pollJob();
+        });
+    }
+
+    function applyJobProgress() {
+        // Rebuild the result list from the contiguous chunks received so far
+        state.matchedRows = [];
+        var size = state.job.chunkSize;
+        for (var n = 0; n < state.jobChunks.length && state.jobChunks[n]; n++) {
+            var results = state.jobChunks[n];
+            for (var i = 0; i < results.length; i++) {
+                var csvRow = state.rows[n * size + i];
+                if (!csvRow) {
+                    // Resumed without the stored CSV: show just the phone
+                    csvRow = {};
+                    csvRow[state.job.phoneColumn] = results[i].phone;
+                }
+                state.matchedRows.push({
+                    csvRow: csvRow,
+                    phone: results[i].phone,
+                    matches: results[i].matches || []
                 });
             }
-            batches.push(batch);
         }
-
-        processBatch(batches, 0);
+        state.batchProgress = state.matchedRows.length;
+        state.batchTotal = state.job.total;
     }
 
-    function processBatch(batches, batchIndex) {
-        if (batchIndex >= batches.length) {
-            state.matching = false;
-            state.batchProgress = state.batchTotal;
+    function pollJob() {
+        ajax('process_job', { job_id: state.job.id }, function(err, data) {
+            if (err || !data || !data.success) {
+                showToast('Matching paused: ' + (data ? data.message : err), 'danger');
+                state.matching = false;
+                render();
+                return;
+            }
+
+            state.job = data.job;
+            for (var c = 0; c < data.chunks.length; c++) {
+                state.jobChunks[data.chunks[c].index] = data.chunks[c].results;
+            }
+            applyJobProgress();
+
+            if (data.job.status === 'complete') {
+                // The phones are gone from the server now; drop the CSV copy too
+                clearJobCsv();
+                // Chunks matched by another request weren't in our responses
+                fetchJobChunks(0, function() {
+                    state.matching = false;
+                    render();
+                    showToast('Matching complete!', 'success');
+                });
+                return;
+            }
+
             render();
-            showToast('Matching complete!', 'success');
+            // No chunks means another request is still working the job, so back off
+            setTimeout(pollJob, data.chunks.length ? 50 : 3000);
+        });
+    }
+
+    function fetchJobChunks(index, done) {
+        if (index >= state.job.chunksDone) {
+            done();
             return;
         }
-
-        var batch = batches[batchIndex];
-        var phones = [];
-        for (var i = 0; i < batch.length; i++) {
-            phones.push(batch[i].phone);
+        if (state.jobChunks[index]) {
+            fetchJobChunks(index + 1, done);
+            return;
         }
-
-        ajax('match_phones', { phones_json: JSON.stringify(phones) }, function(err, data) {
+        ajax('job_results', { job_id: state.job.id, chunk: index }, function(err, data) {
             if (err || !data || !data.success) {
-                showToast('Error matching batch: ' + (data ? data.message : err), 'danger');
+                showToast('Error loading saved results: ' + (data ? data.message : err), 'danger');
                 state.matching = false;
                 render();
                 return;
             }
+            state.jobChunks[index] = data.results;
+            applyJobProgress();
+            render();
+            fetchJobChunks(index + 1, done);
+        });
+    }
 
-            for (var i = 0; i < data.results.length; i++) {
-                state.matchedRows.push({
-                    csvRow: batch[i].csvRow,
-                    phone: batch[i].phone,
-                    matches: data.results[i].matches || []
-                });
+    function resumeJob() {
+        var job = state.resumeJob;
+        if (state.resumeCsv) {
+            var error = loadCsv(state.resumeCsv);
+            if (error) {
+                showToast(error, 'danger');
+                return;
             }
+        } else {
+            state.headers = [job.phoneColumn];
+            state.rows = [];
+        }
+        state.phoneColIndex = Math.max(0, state.headers.indexOf(job.phoneColumn));
+        state.job = job;
+        state.jobChunks = [];
+        state.matchedRows = [];
+        state.resumeJob = null;
+        state.resumeCsv = '';
+        state.step = 3;
+        state.filter = 'all';
+        state.matching = true;
+        applyJobProgress();
+        render();
 
-            state.batchProgress += batch.length;
-            render();
+        fetchJobChunks(0, function() {
+            if (state.job.status === 'complete') {
+                clearJobCsv();
+                state.matching = false;
+                render();
+            } else {
+                pollJob();
+            }
+        });
+    }
+
+    function continueJob() {
+        state.matching = true;
+        render();
+        pollJob();
+    }
+
+    function discardJob() {
+        var jobId = state.resumeJob ? state.resumeJob.id : loadJobId();
+        state.resumeJob = null;
+        state.resumeCsv = '';
+        saveJobId(null);
+        render();
+        if (jobId) ajax('discard_job', { job_id: jobId }, function() {});
+    }
 
-            setTimeout(function() { processBatch(batches, batchIndex + 1); }, 50);
+    function checkSavedJob() {
+        var jobId = loadJobId();
+        if (!jobId) return;
+        ajax('job_status', { job_id: jobId }, function(err, data) {
+            if (err || !data || !data.success) {
+                saveJobId(null);
+                return;
+            }
+            state.resumeJob = data.job;
+            state.resumeCsv = loadJobCsv();
+            if (state.step === 1) render();
         });
     }
 
@@ -848,6 +1411,9 @@ else:
             render();
         },
         startMatching: startMatching,
+        resumeJob: resumeJob,
+        continueJob: continueJob,
+        discardJob: discardJob,
         setFilter: function(f) { state.filter = f; render(); },
         exportCSV: exportCSV
     };
@@ -856,6 +1422,7 @@ else:
     // INIT
     // =====================================================================
     render();
+    checkSavedJob();
 
 })();
 </script>
@@ -67,6 +67,8 @@ To upload code to Touchpoint, use the following steps:
 import json
 import re
 import datetime
+import hashlib
+import time
 
 # ============================================================================
 # CONFIGURATION & CONSTANTS
@@ -83,6 +85,16 @@ CONTENT_CATALOG = 'ReportBuilder_Catalog'
 CONTENT_USER_PREFIX = 'ReportBuilder_User_'
 CONTENT_BT_PREFIX = 'ReportBuilder_BT_'
 CONTENT_SETTINGS = 'ReportBuilder_Settings'
+CONTENT_RESULT_CACHE = 'ReportBuilder_ResultCache'   # Index of cached report results
+CONTENT_RESULT_PREFIX = 'ReportBuilder_Result_'      # One entry per cached result
+RESULT_CACHE_DEFAULT_TTL = 900          # Seconds; a report can override with 'cache_ttl' (0 = never cache)
+RESULT_CACHE_MAX_BYTES = 10000000       # Evict least recently used results past this total
+RESULT_CACHE_MAX_ENTRY_BYTES = 4000000  # Results larger than this are not cached
+RESULT_CACHE_SKIP_CATEGORIES = ('financial',)  # Never written to Special Content (giving amounts)
+RESULT_CACHE_CHUNK_ROWS = 5000          # Rows per stored chunk, read back one chunk at a time
+GRID_PAGED_THRESHOLD = 2000             # Tables with more rows than this page from SQL (OFFSET/FETCH)
+GRID_PAGE_SIZE = 500                    # Rows per grid window request
+CSV_PRINT_CHUNK_ROWS = 1000             # Rows joined per print() while writing a CSV export
 
 # Default settings (overridden by admin via Settings panel)
 DEFAULT_SETTINGS = {
@@ -162,7 +174,9 @@ def load_settings():
 
 def save_settings(settings):
     """Save settings to content storage."""
-    return save_content_json(CONTENT_SETTINGS, settings)
+    ok = save_content_json(CONTENT_SETTINGS, settings)
+    clear_result_cache()  # fiscal month, weights etc. feed into report SQL
+    return ok
 
 def user_has_category_access(category, settings):
     """Check if current user can access a category based on role settings."""
@@ -2744,6 +2758,7 @@ def get_default_reports():
         'parameters': [],
         'display': {'types': ['table'], 'default': 'table'},
         'bluetoolbar': {'supported': False},
+        'cache_ttl': 0,  # diagnostic view of the live queue
         'is_builtin': True
     })
 
@@ -7374,12 +7389,144 @@ def get_default_reports():
 # REPORT EXECUTION ENGINE
 # ============================================================================
 
-def execute_report(report_def, filter_values, bt_people_ids=None, settings=None,
-                   current_org_id=None):
-    """Execute a report SQL with filters applied. Returns dict with rows, columns, error."""
+# ============================================================================
+# REPORT RESULT CACHE
+# ============================================================================
+# Results are cached in Special Content keyed by an md5 of the fully
+# expanded SQL plus the user who ran it, so a user re-running the same
+# filter combination reuses their last run instead of re-executing heavy
+# CTEs; one user's cached rows are never served to another, whose role
+# checks may differ. Financial reports are never cached, and neither are
+# paged tables, whose windows come straight from SQL. Rows are stored in
+# chunks of RESULT_CACHE_CHUNK_ROWS so the CSV export can write one chunk
+# at a time. The index entry records when each result was saved and
+# last used; expired entries are dropped and the least recently used are
+# evicted once the cache grows past RESULT_CACHE_MAX_BYTES. Saving settings
+# or a custom report clears it.
+
+def _result_cache_key(sql, scope):
+    raw = scope + '\n' + sql
+    try:
+        raw = raw.encode('utf-8')
+    except:
+        pass
+    return hashlib.md5(raw).hexdigest()
+
+def _report_cache_ttl(report_def):
+    """Seconds to keep this report's results: 'cache_ttl' on the definition, else the default.
+
+    Reports in RESULT_CACHE_SKIP_CATEGORIES always get 0 (not cached)."""
+    if report_def.get('category') in RESULT_CACHE_SKIP_CATEGORIES:
+        return 0
+    return safe_int(report_def.get('cache_ttl', RESULT_CACHE_DEFAULT_TTL), RESULT_CACHE_DEFAULT_TTL)
+
+def _evict_cached_result(entries, key):
+    entry = entries.pop(key, None) or {}
+    try:
+        model.WriteContentText(CONTENT_RESULT_PREFIX + key, '', '')
+        for i in range(entry.get('chunks', 0)):
+            model.WriteContentText(CONTENT_RESULT_PREFIX + key + '_' + str(i), '', '')
+    except:
+        pass
+
+def _cached_entry(key):
+    """Return (index, entry, header) for a live cache entry, or (index, None, None)."""
+    index = load_content_json(CONTENT_RESULT_CACHE, {})
+    entry = index.get('entries', {}).get(key)
+    if not entry or time.time() - entry.get('saved', 0) >= entry.get('ttl', 0):
+        return index, None, None
+    header = load_content_json(CONTENT_RESULT_PREFIX + key, None)
+    if not header or 'columns' not in header:
+        return index, None, None
+    return index, entry, header
+
+def _touch_cached_entry(index, entry):
+    # Only rewrite the index for LRU bookkeeping once a minute per entry
+    now = time.time()
+    if now - entry.get('used', 0) > 60:
+        entry['used'] = now
+        save_content_json(CONTENT_RESULT_CACHE, index)
+
+def _load_cached_chunks(key, first, last):
+    """Yield the value lists stored in chunks first..last (inclusive)."""
+    for i in range(first, last + 1):
+        for values in load_content_json(CONTENT_RESULT_PREFIX + key + '_' + str(i), []):
+            yield values
+
+def load_cached_result(key):
+    """Return a cached {'rows','columns'} result if it is still within its TTL, else None."""
+    index, entry, header = _cached_entry(key)
+    if not entry:
+        return None
+    columns = header['columns']
+    rows = [dict(zip(columns, values))
+            for values in _load_cached_chunks(key, 0, header.get('chunks', 0) - 1)]
+    _touch_cached_entry(index, entry)
+    return {'rows': rows, 'columns': columns, 'error': None, 'row_count': len(rows),
+            'cached': True, 'cached_at': entry.get('saved', 0), 'cache_key': key}
+
+def save_cached_result(key, ttl, result):
+    """Store a result and evict expired / least recently used entries over the size cap."""
+    columns = result.get('columns', [])
+    rows = result.get('rows', [])
+    chunks = []
+    size = 0
+    try:
+        for i in range(0, len(rows), RESULT_CACHE_CHUNK_ROWS):
+            chunk = json.dumps([[row.get(c, '') for c in columns] for row in rows[i:i + RESULT_CACHE_CHUNK_ROWS]],
+                               separators=(',', ':'))
+            size += len(chunk)
+            if size > RESULT_CACHE_MAX_ENTRY_BYTES:
+                return False
+            chunks.append(chunk)
+    except:
+        return False
+
+    index = load_content_json(CONTENT_RESULT_CACHE, {})
+    entries = index.setdefault('entries', {})
+    if key in entries:
+        _evict_cached_result(entries, key)
+    try:
+        for i, chunk in enumerate(chunks):
+            model.WriteContentText(CONTENT_RESULT_PREFIX + key + '_' + str(i), chunk, '')
+        model.WriteContentText(CONTENT_RESULT_PREFIX + key, json.dumps(
+            {'columns': columns, 'row_count': len(rows), 'chunks': len(chunks)}), '')
+    except:
+        return False
+
+    now = time.time()
+    for k, e in list(entries.items()):
+        if now - e.get('saved', 0) >= e.get('ttl', 0):
+            _evict_cached_result(entries, k)
+    entries[key] = {'saved': now, 'used': now, 'ttl': ttl, 'bytes': size, 'chunks': len(chunks)}
+    total = sum(e.get('bytes', 0) for e in entries.values())
+    while total > RESULT_CACHE_MAX_BYTES and len(entries) > 1:
+        oldest = min((k for k in entries if k != key), key=lambda k: entries[k].get('used', 0))
+        total -= entries[oldest].get('bytes', 0)
+        _evict_cached_result(entries, oldest)
+    return save_content_json(CONTENT_RESULT_CACHE, index)
+
+def clear_result_cache():
+    """Drop every cached result (called when settings or report definitions change)."""
+    index = load_content_json(CONTENT_RESULT_CACHE, {})
+    entries = index.get('entries', {})
+    for k in list(entries.keys()):
+        _evict_cached_result(entries, k)
+    save_content_json(CONTENT_RESULT_CACHE, {'entries': {}})
+
+# ============================================================================
+# REPORT EXECUTION
+# ============================================================================
+
+_ROW_SKIP_ATTRS = ('Count', 'Keys', 'Values', 'Items',
+                   'GetType', 'ToString', 'Equals', 'GetHashCode', 'ReferenceEquals')
+
+def build_report_sql(report_def, filter_values, bt_people_ids=None, settings=None,
+                     current_org_id=None):
+    """Expand a report's SQL template with filters and settings placeholders."""
     sql = report_def.get('sql_template', '')
     if not sql:
-        return {'error': 'No SQL template defined', 'rows': [], 'columns': []}
+        return ''
 
     params = report_def.get('parameters', [])
     where_clauses = build_where_clauses(params, filter_values, bt_people_ids, settings)
@@ -7411,11 +7558,14 @@ def execute_report(report_def, filter_values, bt_people_ids=None, settings=None,
         year_type = filter_values.get('year_type', 'calendar')
         year_start = fiscal_month if year_type == 'fiscal' else '1'
         sql = sql.replace('{year_start}', year_start)
+    return sql
 
-    rows = []
-    columns = []
+def report_cache_key(sql):
+    # Cached rows are only ever read back by the user who produced them
+    return _result_cache_key(sql, 'user:' + safe_str(model.UserPeopleId))
 
-    # Try to extract column order from SQL SELECT clause (preserves intended order)
+def _sql_select_columns(sql):
+    """Column aliases from the outermost SELECT, in the order the SQL lists them."""
     sql_columns = []
     try:
         # For CTE queries (WITH ... AS ...), find the outermost SELECT after all CTEs
@@ -7452,51 +7602,184 @@ def execute_report(report_def, filter_values, bt_people_ids=None, settings=None,
                         sql_columns.append(word_match.group(1))
     except:
         pass
+    return sql_columns
+
+def _row_columns(r, sql_columns):
+    """Resolve the result columns from the first row, ordered like the SQL SELECT."""
+    # Get available attributes from the result object
+    available = set()
+    for attr in dir(r):
+        if not attr.startswith('_') and attr not in _ROW_SKIP_ATTRS:
+            try:
+                getattr(r, attr)
+                available.add(attr)
+            except:
+                pass
+    # Use SQL order if we parsed it, matching against available attrs (case-insensitive)
+    if not sql_columns:
+        return sorted(list(available))
+    columns = []
+    avail_lower = {a.lower(): a for a in available}
+    for sc in sql_columns:
+        actual = avail_lower.get(sc.lower())
+        if actual and actual not in columns:
+            columns.append(actual)
+    # Add any remaining attrs not in our parsed list
+    for a in sorted(available):
+        if a not in columns:
+            columns.append(a)
+    return columns
+
+def _row_values(r, columns):
+    values = []
+    for col in columns:
+        try:
+            val = getattr(r, col)
+            values.append('' if val is None else safe_str(val))
+        except:
+            values.append('')
+    return values
+
+def iter_report_rows(sql):
+    """Yield (columns, values) for each result row straight from q.QuerySql, without building dicts."""
+    sql_columns = _sql_select_columns(sql)
+    columns = None
+    for r in q.QuerySql(sql):
+        if columns is None:
+            columns = _row_columns(r, sql_columns)
+        yield columns, _row_values(r, columns)
+
+def _sql_top_level(sql):
+    """sql with string literals, comments, bracketed names and everything
+    inside parentheses blanked out (same length), so keywords found in it
+    belong to the outermost statement."""
+    out = []
+    depth = 0
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == "'":
+            j = i + 1
+            while j < n:
+                if sql[j] == "'":
+                    if j + 1 < n and sql[j + 1] == "'":
+                        j += 2
+                        continue
+                    break
+                j += 1
+            out.append(' ' * (min(j, n - 1) - i + 1))
+            i = j + 1
+            continue
+        if sql.startswith('--', i):
+            j = sql.find('\n', i)
+            j = n if j < 0 else j
+            out.append(' ' * (j - i))
+            i = j
+            continue
+        if sql.startswith('/*', i):
+            j = sql.find('*/', i + 2)
+            j = n if j < 0 else j + 2
+            out.append(' ' * (j - i))
+            i = j
+            continue
+        if ch == '[':
+            j = sql.find(']', i)
+            j = n if j < 0 else j + 1
+            out.append(' ' * (j - i))
+            i = j
+            continue
+        if ch == '(':
+            depth += 1
+        out.append(ch if depth == 0 else ' ')
+        if ch == ')':
+            depth = max(depth - 1, 0)
+        i += 1
+    return ''.join(out)
+
+def report_pager(sql):
+    """Split a report query so it can be paged with OFFSET/FETCH.
+
+    Returns {'prefix': the CTE list or '', 'select': the final SELECT
+    without its ORDER BY, 'order': the ORDER BY items}, or None when the
+    query can't be paged: more than one statement, no top-level ORDER BY
+    (pages would have no stable order), TOP, an existing OFFSET, INTO or
+    FOR XML/JSON."""
+    body = sql.strip().rstrip(';').rstrip()
+    top = _sql_top_level(body).upper()
+    if ';' in top or re.search(r'\b(TOP|OFFSET|INTO|FOR\s+(XML|JSON|BROWSE)|OPTION)\b', top):
+        return None
+    if re.search(r'\b(DECLARE|SET|INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|EXEC|EXECUTE|IF|WHILE|BEGIN|USE)\b', top):
+        return None
+    select = re.search(r'\bSELECT\b', top)
+    orders = list(re.finditer(r'\bORDER\s+BY\b', top))
+    if not select or not orders or not re.match(r'\s*(WITH\b|SELECT\b)', top):
+        return None
+    order = orders[-1]
+    return {
+        'prefix': body[:select.start()],
+        'select': body[select.start():order.start()].rstrip(),
+        'order': body[order.end():].strip()
+    }
 
+def report_page_sql(pager, start, count, sort_col='', descending=False):
+    """One window of a paged report; sort_col (a result column name) sorts
+    first, with the report's own ORDER BY breaking ties."""
+    order = pager['order']
+    if sort_col:
+        order = '[{0}] {1}, {2}'.format(sort_col, 'DESC' if descending else 'ASC', order)
+    return '{0}{1}\nORDER BY {2}\nOFFSET {3} ROWS FETCH NEXT {4} ROWS ONLY'.format(
+        pager['prefix'], pager['select'], order, int(start), int(count))
+
+def report_count_sql(pager):
+    return '{0}SELECT COUNT(*) AS TotalRows FROM (\n{1}\n) AS rb_count'.format(
+        pager['prefix'], pager['select'])
+
+def execute_report(report_def, filter_values, bt_people_ids=None, settings=None,
+                   current_org_id=None, use_cache=True, paged_over=0):
+    """Execute a report SQL with filters applied. Returns dict with rows, columns, error.
+
+    Results are served from the result cache when the same expanded SQL was
+    run for the same scope within the report's cache TTL.
+
+    With paged_over set, a query report_pager can split only fetches its
+    first paged_over + 1 rows. If that many come back the result is marked
+    'paged' and holds just the first GRID_PAGE_SIZE rows, 'row_count' is
+    the COUNT(*) total (None if the count query fails) and nothing is cached.
+    """
+    sql = build_report_sql(report_def, filter_values, bt_people_ids, settings, current_org_id)
+    if not sql:
+        return {'error': 'No SQL template defined', 'rows': [], 'columns': []}
+
+    cache_ttl = _report_cache_ttl(report_def) if use_cache else 0
+    cache_key = report_cache_key(sql)
+    if cache_ttl > 0:
+        cached = load_cached_result(cache_key)
+        if cached:
+            return cached
+
+    pager = report_pager(sql) if paged_over else None
+    rows = []
+    columns = []
     try:
-        results = q.QuerySql(sql)
-        first = True
-        for r in results:
-            if first:
-                # Get available attributes from the result object
-                available = set()
-                for attr in dir(r):
-                    if not attr.startswith('_') and attr not in ('Count', 'Keys', 'Values', 'Items',
-                        'GetType', 'ToString', 'Equals', 'GetHashCode', 'ReferenceEquals'):
-                        try:
-                            getattr(r, attr)
-                            available.add(attr)
-                        except:
-                            pass
-                # Use SQL order if we parsed it, matching against available attrs (case-insensitive)
-                if sql_columns:
-                    avail_lower = {a.lower(): a for a in available}
-                    for sc in sql_columns:
-                        actual = avail_lower.get(sc.lower())
-                        if actual and actual not in columns:
-                            columns.append(actual)
-                    # Add any remaining attrs not in our parsed list
-                    for a in sorted(available):
-                        if a not in columns:
-                            columns.append(a)
-                else:
-                    columns = sorted(list(available))
-                first = False
-            row = {}
-            for col in columns:
-                try:
-                    val = getattr(r, col)
-                    if val is None:
-                        row[col] = ''
-                    else:
-                        row[col] = safe_str(val)
-                except:
-                    row[col] = ''
-            rows.append(row)
+        source = report_page_sql(pager, 0, paged_over + 1) if pager else sql
+        for columns, values in iter_report_rows(source):
+            rows.append(dict(zip(columns, values)))
     except Exception as e:
         return {'error': safe_str(e), 'rows': [], 'columns': []}
 
-    return {'rows': rows, 'columns': columns, 'error': None, 'row_count': len(rows)}
+    if pager and len(rows) > paged_over:
+        try:
+            total = safe_int(q.QuerySqlTop1(report_count_sql(pager)).TotalRows, 0)
+        except:
+            # e.g. duplicate column names can't go in a derived table
+            total = None
+        return {'rows': rows[:GRID_PAGE_SIZE], 'columns': columns, 'error': None,
+                'row_count': total, 'paged': True}
+
+    result = {'rows': rows, 'columns': columns, 'error': None, 'row_count': len(rows)}
+    if cache_ttl > 0 and save_cached_result(cache_key, cache_ttl, result):
+        result['cache_key'] = cache_key
+    return result
 
 # ============================================================================
 # REPORT RENDERERS
@@ -7512,10 +7795,30 @@ def render_table_html(result, report_def):
 
     return '<div id="rb-grid" class="ag-theme-alpine" style="width:100%;height:500px;"></div>'
 
-def render_grid_data(result, report_def):
-    """Return AG Grid columnDefs and rowData as JSON for client-side rendering."""
+def _grid_value(val):
+    """Convert numeric strings to numbers so the grid sorts them properly."""
+    try:
+        fval = float(val)
+        return int(fval) if fval == int(fval) else fval
+    except:
+        return val
+
+def _format_grid_rows(rows, columns):
+    return [dict((col, _grid_value(row.get(col, ''))) for col in columns) for row in rows]
+
+def render_grid_data(result, report_def, paged=False):
+    """Return AG Grid columnDefs and rowData as JSON for client-side rendering.
+
+    With paged=True only the first GRID_PAGE_SIZE rows are included and the
+    grid fetches further windows through the grid_page action; column
+    filters are turned off because they would only see the loaded window.
+    A None rowCount means the total isn't known; the grid finds the end as
+    it pages.
+    """
     rows = result.get('rows', [])
     columns = result.get('columns', [])
+    if paged:
+        rows = rows[:GRID_PAGE_SIZE]
     display = report_def.get('display', {})
     formats = display.get('formats', {})
 
@@ -7547,7 +7850,7 @@ def render_grid_data(result, report_def):
             'field': col,
             'headerName': label,
             'sortable': True,
-            'filter': True,
+            'filter': not paged,
             'resizable': True
         }
         if col in default_hidden:
@@ -7574,24 +7877,44 @@ def render_grid_data(result, report_def):
                     pass
         col_defs.append(cdef)
 
-    # Format row values - convert numeric strings to actual numbers for sorting
-    formatted_rows = []
-    for row in rows:
-        frow = {}
-        for col in columns:
-            val = row.get(col, '')
-            # Try to convert to number for proper sorting
-            try:
-                fval = float(val)
-                frow[col] = int(fval) if fval == int(fval) else fval
-            except:
-                frow[col] = val
-        formatted_rows.append(frow)
-
-    return sanitize_for_json({
+    grid = {
         'columnDefs': col_defs,
-        'rowData': formatted_rows
-    })
+        'rowData': _format_grid_rows(rows, columns)
+    }
+    if paged:
+        grid['paged'] = True
+        grid['pageSize'] = GRID_PAGE_SIZE
+        grid['rowCount'] = result.get('row_count')
+        grid['pagedOver'] = GRID_PAGED_THRESHOLD
+    return sanitize_for_json(grid)
+
+def render_grid_page(report_def, filter_values, bt_people_ids, settings, current_org_id,
+                     start, end, sort_col='', sort_dir=''):
+    """Return one window of grid rows for the paged grid, fetched and sorted
+    by SQL with OFFSET/FETCH so no request holds more than the window.
+
+    'lastRow' is set once the window runs past the end of the result.
+    """
+    sql = build_report_sql(report_def, filter_values, bt_people_ids, settings, current_org_id)
+    if not sql:
+        return {'error': 'No SQL template defined'}
+    pager = report_pager(sql)
+    if not pager:
+        return {'error': 'This report can not be paged; run it again.'}
+    if not re.match(r'^\w+$', sort_col or ''):
+        sort_col = ''
+    rows = []
+    columns = []
+    try:
+        page_sql = report_page_sql(pager, start, end - start, sort_col, sort_dir == 'desc')
+        for columns, values in iter_report_rows(page_sql):
+            rows.append(dict(zip(columns, values)))
+    except Exception as e:
+        return {'error': safe_str(e)}
+    page = {'rowData': _format_grid_rows(rows, columns)}
+    if len(rows) < end - start:
+        page['lastRow'] = start + len(rows)
+    return sanitize_for_json(page)
 
 def render_kpi_html(result, report_def):
     """Render report results as KPI cards.
@@ -7881,6 +8204,58 @@ def render_csv(result):
         lines.append(','.join(vals))
     return '\n'.join(lines)
 
+def _csv_line(values):
+    return ','.join('"' + v.replace('"', '""') + '"' for v in values)
+
+def print_report_csv(report_def, filter_values, bt_people_ids=None, settings=None,
+                     current_org_id=None):
+    """Print a report as CSV text, CSV_PRINT_CHUNK_ROWS lines per print().
+
+    This is a buffered export: TouchPoint sends the script's output when the
+    script finishes, so nothing reaches the browser early. What it saves is
+    memory - rows go straight from the cache chunks or q.QuerySql to the
+    output without the row dicts render_csv needs or one JSON-escaped copy
+    of the whole file. Errors before the header is written are reported as
+    JSON so the page can show them.
+    """
+    sql = build_report_sql(report_def, filter_values, bt_people_ids, settings, current_org_id)
+    if not sql:
+        print json.dumps({'success': False, 'error': 'No SQL template defined'})
+        return
+
+    cache_key = report_cache_key(sql)
+    header = None
+    if _report_cache_ttl(report_def) > 0:
+        index, entry, header = _cached_entry(cache_key)
+    if header:
+        columns = header['columns']
+        rows = ((columns, values) for values in
+                _load_cached_chunks(cache_key, 0, header.get('chunks', 0) - 1))
+    else:
+        columns = None
+        rows = iter_report_rows(sql)
+
+    lines = []
+    started = False
+    try:
+        for columns, values in rows:
+            if not started:
+                lines.append(_csv_line(columns))
+                started = True
+            lines.append(_csv_line(values))
+            if len(lines) >= CSV_PRINT_CHUNK_ROWS:
+                print '\n'.join(lines)
+                lines = []
+    except Exception as e:
+        if not started:
+            print json.dumps({'success': False, 'error': safe_str(e)})
+            return
+        lines.append(_csv_line(['Export stopped: ' + safe_str(e)]))
+    if not started and columns:
+        lines.append(_csv_line(columns))
+    if lines:
+        print '\n'.join(lines)
+
 # ============================================================================
 # FILTER PANEL RENDERER
 # ============================================================================
@@ -7998,7 +8373,9 @@ def save_custom_report(user_id, report_def, shared=False):
             catalog['reports'][existing[0]] = report_def
         else:
             catalog['reports'].append(report_def)
-        return save_content_json(CONTENT_CATALOG, catalog)
+        ok = save_content_json(CONTENT_CATALOG, catalog)
+        clear_result_cache()
+        return ok
     else:
         key = CONTENT_USER_PREFIX + str(user_id)
         user_data = load_content_json(key, {'reports': []})
@@ -8007,19 +8384,25 @@ def save_custom_report(user_id, report_def, shared=False):
             user_data['reports'][existing[0]] = report_def
         else:
             user_data['reports'].append(report_def)
-        return save_content_json(key, user_data)
+        ok = save_content_json(key, user_data)
+        clear_result_cache()
+        return ok
 
 def delete_custom_report(user_id, report_id, shared=False):
     """Delete a custom report."""
     if shared:
         catalog = load_content_json(CONTENT_CATALOG, {'reports': []})
         catalog['reports'] = [r for r in catalog['reports'] if r.get('id') != report_id]
-        return save_content_json(CONTENT_CATALOG, catalog)
+        ok = save_content_json(CONTENT_CATALOG, catalog)
+        clear_result_cache()
+        return ok
     else:
         key = CONTENT_USER_PREFIX + str(user_id)
         user_data = load_content_json(key, {'reports': []})
         user_data['reports'] = [r for r in user_data['reports'] if r.get('id') != report_id]
-        return save_content_json(key, user_data)
+        ok = save_content_json(key, user_data)
+        clear_result_cache()
+        return ok
 
 # ============================================================================
 # REPORT LOOKUP HELPERS
@@ -8051,6 +8434,20 @@ def find_report(report_id, user_id):
 # AJAX HANDLER
 # ============================================================================
 
+def read_filter_values(report_def):
+    """Read the report's filter_* request parameters into a {name: value} dict."""
+    filter_values = {}
+    for p in report_def.get('parameters', []):
+        pname = p['name']
+        ptype = p.get('type', '')
+        val = get_param('filter_' + pname, '')
+        if ptype == 'daterange' and val == 'custom':
+            start = get_param('filter_' + pname + '_start', '')
+            end = get_param('filter_' + pname + '_end', '')
+            val = (start + '|' + end) if start and end else ''
+        filter_values[pname] = val
+    return filter_values
+
 def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
     """Handle AJAX requests. Returns JSON response string."""
     settings = load_settings()
@@ -8067,30 +8464,25 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
         if not user_has_category_access(cat, settings):
             return json.dumps({'success': False, 'error': 'Access denied: you do not have permission for ' + cat + ' reports'})
 
-        filter_values = {}
-        for p in report_def.get('parameters', []):
-            pname = p['name']
-            ptype = p.get('type', '')
-            val = get_param('filter_' + pname, '')
-            if ptype == 'daterange' and val == 'custom':
-                start = get_param('filter_' + pname + '_start', '')
-                end = get_param('filter_' + pname + '_end', '')
-                val = (start + '|' + end) if start and end else ''
-            filter_values[pname] = val
+        filter_values = read_filter_values(report_def)
 
         use_bt = bt_people_ids if report_def.get('bluetoolbar', {}).get('supported', False) else None
         # current_org_id is only honored when BT is supported AND active.
         # Without BT, the user is browsing reports normally and shouldn't
         # be silently scoped to an org they may have visited days ago.
         use_org = current_org_id if (use_bt and current_org_id) else None
+        # Tables over GRID_PAGED_THRESHOLD rows are never loaded in full; charts
+        # and KPIs aggregate every row, so they still need the whole result
         result = execute_report(report_def, filter_values, use_bt, settings,
-                                current_org_id=use_org)
+                                current_org_id=use_org,
+                                paged_over=GRID_PAGED_THRESHOLD if display_type == 'table' else 0)
 
         if result.get('error'):
             return json.dumps(sanitize_for_json({'success': False, 'error': result['error']}))
 
-        # Always include grid data for AG Grid rendering
-        grid_data = render_grid_data(result, report_def)
+        # Always include grid data for AG Grid rendering. Paged results send
+        # only the first window; the grid fetches the rest through grid_page.
+        grid_data = render_grid_data(result, report_def, paged=result.get('paged', False))
 
         if display_type == 'chart':
             chart_json = render_chart_data_json(result, report_def)
@@ -8098,6 +8490,7 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
                 'success': True, 'display': 'chart',
                 'chart_data': json.loads(chart_json),
                 'row_count': result.get('row_count', 0),
+                'cached': result.get('cached', False),
                 'grid_html': render_table_html(result, report_def),
                 'grid_data': grid_data
             }))
@@ -8106,6 +8499,7 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
                 'success': True, 'display': 'kpi',
                 'html': render_kpi_html(result, report_def),
                 'row_count': result.get('row_count', 0),
+                'cached': result.get('cached', False),
                 'grid_html': render_table_html(result, report_def),
                 'grid_data': grid_data
             }))
@@ -8114,9 +8508,29 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
                 'success': True, 'display': 'table',
                 'grid_html': render_table_html(result, report_def),
                 'grid_data': grid_data,
-                'row_count': result.get('row_count', 0)
+                'row_count': result.get('row_count', 0),
+                'cached': result.get('cached', False)
             }))
 
+    elif action == 'grid_page':
+        report_id = get_param('report_id')
+        report_def = find_report(report_id, user_id)
+        if not report_def:
+            return json.dumps({'success': False, 'error': 'Report not found: ' + report_id})
+        if not user_has_category_access(report_def.get('category', ''), settings):
+            return json.dumps({'success': False, 'error': 'Access denied'})
+        filter_values = read_filter_values(report_def)
+        use_bt = bt_people_ids if report_def.get('bluetoolbar', {}).get('supported', False) else None
+        use_org = current_org_id if (use_bt and current_org_id) else None
+        start = max(safe_int(get_param('start_row', '0')), 0)
+        end = max(safe_int(get_param('end_row', str(start + GRID_PAGE_SIZE))), start)
+        page = render_grid_page(report_def, filter_values, use_bt, settings, use_org,
+                                start, end, get_param('sort_col', ''), get_param('sort_dir', ''))
+        if page.get('error'):
+            return json.dumps(sanitize_for_json({'success': False, 'error': page['error']}))
+        page['success'] = True
+        return json.dumps(page)
+
     elif action == 'load_filters':
         report_id = get_param('report_id')
         report_def = find_report(report_id, user_id)
@@ -8140,16 +8554,7 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
         if not report_def:
             return json.dumps({'success': False, 'error': 'Report not found'})
 
-        filter_values = {}
-        for p in report_def.get('parameters', []):
-            pname = p['name']
-            ptype = p.get('type', '')
-            val = get_param('filter_' + pname, '')
-            if ptype == 'daterange' and val == 'custom':
-                start = get_param('filter_' + pname + '_start', '')
-                end = get_param('filter_' + pname + '_end', '')
-                val = (start + '|' + end) if start and end else ''
-            filter_values[pname] = val
+        filter_values = read_filter_values(report_def)
 
         use_bt = bt_people_ids if report_def.get('bluetoolbar', {}).get('supported', False) else None
         use_org = current_org_id if (use_bt and current_org_id) else None
@@ -8744,6 +9149,22 @@ def handle_ajax(action, user_id, bt_people_ids, current_org_id=None):
 
     return json.dumps({'success': False, 'error': 'Unknown action: ' + action})
 
+def print_export_csv(user_id, bt_people_ids, current_org_id=None):
+    """Handle the export_csv_text action: print the report as CSV text."""
+    settings = load_settings()
+    report_id = get_param('report_id')
+    report_def = find_report(report_id, user_id)
+    if not report_def:
+        print json.dumps({'success': False, 'error': 'Report not found'})
+        return
+    if not user_has_category_access(report_def.get('category', ''), settings):
+        print json.dumps({'success': False, 'error': 'Access denied'})
+        return
+    filter_values = read_filter_values(report_def)
+    use_bt = bt_people_ids if report_def.get('bluetoolbar', {}).get('supported', False) else None
+    use_org = current_org_id if (use_bt and current_org_id) else None
+    print_report_csv(report_def, filter_values, use_bt, settings, current_org_id=use_org)
+
 # ============================================================================
 # UI BUILDER - CSS
 # ============================================================================
@@ -8962,7 +9383,7 @@ var isAdmin=''' + ('true' if is_admin else 'false') + ''';
 var btPeopleIds=''' + bt_json + ''',btCount=''' + str(bt_count) + ''';
 var currentOrgIdFromUrl=null;  /* hydrated from sessionStorage after BT redirect */
 var selectedOrg=null;var selectedOrgName="";var orgPeopleIds=[];var searchTimer=null;
-var lastGridData=null;
+var lastGridData=null,lastRunParams=null,currentReportName="";
 var ctEnabled=''' + ('true' if ct_enabled else 'false') + ''';
 var ctLookbackDays=''' + str(ct_days) + ''';
 var ctContactMap=null;
@@ -8995,6 +9416,7 @@ function selectReport(id){
             var helpIcon=r.help_text?'<span class="rb-help-toggle" onclick="RB.toggleHelp()" title="Report help"><i class="fas fa-question"></i></span>':'';
             bc.innerHTML='<span>Reports</span><i class="fas fa-chevron-right" style="font-size:10px"></i><span class="rb-bc-active">'+esc(r.report_name)+helpIcon+'</span>';
         }
+        currentReportName=r.report_name||"";
         var hp=document.getElementById("rb-help-panel");
         if(hp){if(r.help_text){hp.innerHTML=r.help_text;hp.classList.remove("open")}else{hp.innerHTML="";hp.classList.remove("open")}}
         var fp=document.getElementById("rb-filter-panel");
@@ -9024,6 +9446,7 @@ function runReport(){
     if(currentOrgIdFromUrl) p.current_org_id=currentOrgIdFromUrl;
     var ins=document.querySelectorAll("#rb-filter-panel .rb-filter-input");
     for(var i=0;i<ins.length;i++){var el=ins[i];var pn=el.getAttribute("data-param");if(pn){if(el.multiple){var sv=[];for(var j=0;j<el.options.length;j++){if(el.options[j].selected)sv.push(el.options[j].value)}p["filter_"+pn]=sv.join(",")}else{p["filter_"+pn]=el.value||""}}}
+    lastRunParams=Object.assign({},p);
     ajax(p,function(r){
         if(!r.success){res.innerHTML='<div class="rb-empty"><i class="fas fa-exclamation-circle"></i><p>'+esc(r.error||"Error")+'</p></div>';return}
         renderRes(r);
@@ -9034,7 +9457,8 @@ function renderRes(r){
     var res=document.getElementById("rb-results");
     var n=r.row_count||0;
     lastGridData=r.grid_data||null;
-    var h='<div class="rb-results-header"><div class="rb-results-info">'+n+" row"+(n!==1?"s":"")+" returned</div>";
+    var info=r.row_count==null&&lastGridData&&lastGridData.paged?"More than "+lastGridData.pagedOver+" rows returned":n+" row"+(n!==1?"s":"")+" returned";
+    var h='<div class="rb-results-header"><div class="rb-results-info">'+info+"</div>";
     h+='<div class="rb-results-actions"><div class="rb-cols-dd"><button class="rb-btn rb-btn-secondary rb-btn-sm" id="rb-cols-btn" onclick="RB.toggleColsPanel()" title="Show or hide columns"><i class="fas fa-columns"></i> Columns</button><div id="rb-cols-panel" class="rb-cols-panel" style="display:none;"></div></div>';
     h+='<button class="rb-btn rb-btn-secondary rb-btn-sm" onclick="RB.exportCsv()"><i class="fas fa-download"></i> CSV</button>';
     h+='<button class="rb-btn rb-btn-secondary rb-btn-sm" onclick="RB.printReport()"><i class="fas fa-print"></i> Print</button>';
@@ -9058,7 +9482,7 @@ function renderRes(r){
         if(r.grid_data){
             buildGrid(r.grid_data);
             // Auto-load contact efforts if enabled and report has PeopleId
-            if(ctEnabled&&window._rbHasPeopleId&&r.grid_data.rowData&&r.grid_data.rowData.length>0){
+            if(ctEnabled&&window._rbHasPeopleId&&!r.grid_data.paged&&r.grid_data.rowData&&r.grid_data.rowData.length>0){
                 loadContactEfforts(r.grid_data);
             }
         }
@@ -9197,7 +9621,7 @@ function buildGrid(gd){
     }
     window._rbHasPeopleId=hasPeopleId;
     if(hasPeopleId){
-        colDefs.unshift({headerName:"",checkboxSelection:true,headerCheckboxSelection:true,width:50,pinned:"left",sortable:false,filter:false,resizable:false});
+        colDefs.unshift({headerName:"",checkboxSelection:true,headerCheckboxSelection:!gd.paged,width:50,pinned:"left",sortable:false,filter:false,resizable:false});
         // Add clickable name renderer: only link name columns that have
         // a matching PeopleId column in the same row data.
         // Rules:
@@ -9247,7 +9671,7 @@ function buildGrid(gd){
         ];
         function _addRenderer(col,pf){
             col.cellRenderer=function(params){
-                if(!params.value) return "";
+                if(!params.value||!params.data) return params.value||"";
                 var pid=params.data[pf];
                 if(!pid) return params.value;
                 var a=document.createElement("a");
@@ -9303,6 +9727,31 @@ function buildGrid(gd){
         }:undefined
     };
 
+    // Large results page from the server: the grid asks for each window
+    // (with its sort) through grid_page instead of holding every row.
+    if(gd.paged){
+        delete gridOptions.rowData;
+        gridOptions.rowModelType="infinite";
+        gridOptions.cacheBlockSize=gd.pageSize||500;
+        gridOptions.paginationPageSizeSelector=false;
+        gridOptions.datasource={getRows:function(params){
+            var sm=params.sortModel||[];
+            // rowCount is null when the total couldn't be counted; -1 lets
+            // the grid keep paging until a window comes back short
+            var total=gd.rowCount!=null?gd.rowCount:-1;
+            if(params.startRow===0&&!sm.length&&gd.rowData){
+                var first=gd.rowData.slice(0,params.endRow);
+                params.successCallback(first,total);return;
+            }
+            var p=Object.assign({},lastRunParams||{},{action:"grid_page",start_row:params.startRow,end_row:params.endRow});
+            if(sm.length){p.sort_col=sm[0].colId;p.sort_dir=sm[0].sort}
+            ajax(p,function(r){
+                if(r.success) params.successCallback(r.rowData||[],r.lastRow!=null?r.lastRow:total);
+                else params.failCallback();
+            });
+        }};
+    }
+
     // Enterprise features (only if license is active)
     if(agEnterprise){
         gridOptions.enableRangeSelection=true;
@@ -9357,21 +9806,35 @@ function setupDR(){
 
 function exportCsv(){
     if(!currentReport) return;
-    var p={action:"export_csv",report_id:currentReport};
+    var p={action:"export_csv_text",report_id:currentReport};
     if(btPeopleIds&&btPeopleIds.length>0) p.people_ids=btPeopleIds.join(",");
     if(currentOrgIdFromUrl) p.current_org_id=currentOrgIdFromUrl;
     var ins=document.querySelectorAll("#rb-filter-panel .rb-filter-input");
     for(var i=0;i<ins.length;i++){var el=ins[i];var pn=el.getAttribute("data-param");if(pn){if(el.multiple){var sv=[];for(var j=0;j<el.options.length;j++){if(el.options[j].selected)sv.push(el.options[j].value)}p["filter_"+pn]=sv.join(",")}else{p["filter_"+pn]=el.value||""}}}
-    ajax(p,function(r){
-        if(!r.success||!r.csv){alert(r.error||"Export failed");return}
-        var blob=new Blob([r.csv],{type:"text/csv;charset=utf-8;"});
+    // export_csv_text answers with CSV text (or a JSON error), not a JSON envelope
+    var data="ajax=true";
+    for(var k in p) if(p.hasOwnProperty(k)) data+="&"+encodeURIComponent(k)+"="+encodeURIComponent(p[k]);
+    var xhr=new XMLHttpRequest();
+    xhr.open("POST",scriptUrl,true);
+    xhr.setRequestHeader("Content-Type","application/x-www-form-urlencoded");
+    xhr.onreadystatechange=function(){
+        if(xhr.readyState!==4) return;
+        var txt=xhr.responseText||"";
+        if(xhr.status!==200){alert("Export failed ("+xhr.status+")");return}
+        if(txt.charAt(0)==="{"){var err={};try{err=JSON.parse(txt)}catch(e){}alert(err.error||"Export failed");return}
+        if(!txt.replace(/\s+/g,"")){alert("No data found for the selected filters.");return}
+        var blob=new Blob([txt],{type:"text/csv;charset=utf-8;"});
         var url=URL.createObjectURL(blob);
-        var a=document.createElement("a");a.href=url;a.download=r.filename||"report.csv";
+        var a=document.createElement("a");a.href=url;a.download=(currentReportName||"report").replace(/ /g,"_")+".csv";
         document.body.appendChild(a);a.click();document.body.removeChild(a);URL.revokeObjectURL(url);
-    });
+    };
+    xhr.send(data);
 }
 
 function printReport(){
+    if(lastGridData&&lastGridData.paged){
+        alert("This report has "+(lastGridData.rowCount!=null?lastGridData.rowCount+" rows,":"more rows than")+" too many to print. Use CSV export instead.");return;
+    }
     // Try AG Grid first - build a print-friendly HTML table from grid data
     if(lastGridData&&lastGridData.rowData&&lastGridData.rowData.length>0){
         var cols=lastGridData.columnDefs||[];
@@ -10638,9 +11101,14 @@ if model.HttpMethod == 'post' and get_param('ajax') == 'true':
         except:
             pass
 
-    response = handle_ajax(action, current_user_id, ajax_people_ids,
-                           current_org_id=ajax_current_org_id)
-    print response
+    if action == 'export_csv_text':
+        # CSV is printed as plain text rather than returned as one JSON string
+        print_export_csv(current_user_id, ajax_people_ids,
+                          current_org_id=ajax_current_org_id)
+    else:
+        response = handle_ajax(action, current_user_id, ajax_people_ids,
+                               current_org_id=ajax_current_org_id)
+        print response
 
 else:
     # Page load — two modes:
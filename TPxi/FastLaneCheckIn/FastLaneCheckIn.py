@@ -51,6 +51,8 @@ Configuration Options:
 - PARENT_EMAIL_DELAY: Queue emails for batch processing
 - DEFAULT_EMAIL_TEMPLATE: Default template for notifications
 - PAGE_SIZE: Number of people to show per page
+- ROSTER_CACHE_ENABLED: Serve the not-checked-in list from a cached roster snapshot
+- ROSTER_CACHE_TTL_SECONDS: How long a roster snapshot lives before a full reload
 
 Enhanced with CSS fixes and improved workflow structure
 """
@@ -59,6 +61,7 @@ import traceback
 import json
 import datetime
 import re
+import time
 from System import DateTime
 from System.Collections.Generic import List
 
@@ -89,6 +92,15 @@ ENABLE_BALANCE_DISPLAY = True     # Set to False to disable balance features
 BALANCE_WARNING_THRESHOLD = 0.01  # Minimum balance to show warning
 SUBGROUP_DISPLAY_LIMIT = 3        # Maximum subgroups to show in person card
 
+# Roster Snapshot Cache
+# The eligible roster (members, ages, subgroups, balances) for each involvement is
+# loaded once into Special Content and reused by every page view, alpha block,
+# search and page change. Each view still re-reads the member ids and today's
+# check-ins, so removals and attendance changes from any kiosk show up at once.
+ROSTER_CACHE_ENABLED = True        # Set to False to query the database on every page view
+ROSTER_CACHE_TTL_SECONDS = 300     # Full reload after this many seconds (picks up subgroup and balance changes)
+ROSTER_CACHE_CONTENT_PREFIX = "FastLaneCheckIn_Roster_"  # Suffixed with the OrganizationId
+
 # Email Configuration
 PARENT_EMAIL_DELAY = False  # Set to True to queue emails for batch processing
 DEFAULT_EMAIL_TEMPLATE = "CheckInParentNotification"  # Default email template name
@@ -1291,6 +1303,9 @@ class CheckInManager:
             # Return empty result instead of proceeding with empty IN clause
             return [], 0
             
+        if ROSTER_CACHE_ENABLED:
+            return self.get_people_from_roster(org_ids, alpha_filter, search_term, page, page_size)
+        
         org_ids_str = ",".join(org_ids)
         
         # Count query
@@ -1369,26 +1384,35 @@ class CheckInManager:
         """.format((page - 1) * page_size, page_size)
         
         try:
-            results = self.q.QuerySql(sql)
+            results = list(self.q.QuerySql(sql))
         except Exception as e:
             print "<!-- DEBUG: Error in main query: {0} -->".format(str(e))
             return [], total_count
         
+        # ::STEP:: Load memberships, subgroups and balances for the whole page
+        page_people_ids = [result.PeopleId for result in results]
+        org_ids_by_person = self.get_people_org_ids(page_people_ids, org_ids)
+        subgroups_by_person = {}
+        if ENABLE_SUBGROUP_FILTERING:
+            subgroups_by_person = self.get_people_subgroups(page_people_ids, org_ids)
+        balances_by_person = {}
+        if ENABLE_BALANCE_DISPLAY:
+            balances_by_person = self.get_people_balances(page_people_ids, org_ids_by_person)
+        
         people = []
         for result in results:
             try:
-                person_org_ids = self.get_person_org_ids(result.PeopleId, org_ids)
+                person_org_ids = org_ids_by_person.get(result.PeopleId, [])
                 age = result.Age if hasattr(result, 'Age') and result.Age is not None else 99
                 
                 # Get person's MemberTags for display (not filtering)
                 person_subgroups = {}
                 if ENABLE_SUBGROUP_FILTERING:
+                    person_tags = subgroups_by_person.get(result.PeopleId, {})
                     for org_id in person_org_ids:
-                        person_subgroups[org_id] = self.get_person_subgroups(result.PeopleId, org_id)
+                        person_subgroups[org_id] = person_tags.get(org_id, [])
                 
-                person_balance = 0.0
-                if ENABLE_BALANCE_DISPLAY:
-                    person_balance = self.get_person_balance(result.PeopleId, person_org_ids)
+                person_balance = balances_by_person.get(result.PeopleId, 0.0)
                 
                 person = PersonInfo(
                     result.PeopleId,
@@ -1406,6 +1430,247 @@ class CheckInManager:
                 
         return people, total_count
             
+    # ::START:: Roster Snapshot Cache
+    # One snapshot per involvement, stored as Special Content text:
+    #   {ts, date, people: {pid: [name, family_id, last, first, age]},
+    #    subgroups: {pid: [names]}, balance: {pid: amount}}
+    # Snapshots are only ever written whole, straight from a rebuild, so
+    # kiosks never read-modify-write each other's copy. Attendance isn't
+    # stored at all: every view re-reads today's check-ins, and the live
+    # member list, so removals and flag changes from other kiosks show
+    # up immediately. Subgroups and balances refresh on the TTL reload.
+    def _roster_cache_name(self, org_id):
+        return ROSTER_CACHE_CONTENT_PREFIX + str(org_id)
+    
+    def _load_roster_snapshot(self, org_id):
+        """Return the stored snapshot for an org, or None. Never prints (AJAX-safe)"""
+        try:
+            raw = self.model.TextContent(self._roster_cache_name(org_id))
+            if raw:
+                return json.loads(raw)
+        except Exception:
+            pass
+        return None
+    
+    def _save_roster_snapshot(self, org_id, snapshot):
+        """Persist a snapshot. Failures are silent - the next view just reloads"""
+        try:
+            self.model.WriteContentText(self._roster_cache_name(org_id), json.dumps(snapshot), "")
+        except Exception:
+            pass
+    
+    def _roster_snapshot_is_fresh(self, snapshot):
+        if not snapshot or 'people' not in snapshot:
+            return False
+        if snapshot.get('date') != self.today.ToString("yyyy-MM-dd"):
+            return False
+        return time.time() - snapshot.get('ts', 0) <= ROSTER_CACHE_TTL_SECONDS
+    
+    def build_roster_snapshots(self, org_ids):
+        """Load the full eligible roster for several orgs in three set-based queries"""
+        # ::STEP:: Query members, subgroups and balances for the orgs
+        org_ids_str = ",".join([str(oid) for oid in org_ids])
+        snapshots = {}
+        for org_id in org_ids:
+            snapshots[str(org_id)] = {
+                'ts': time.time(),
+                'date': self.today.ToString("yyyy-MM-dd"),
+                'people': {},
+                'subgroups': {},
+                'balance': {}
+            }
+        
+        members_sql = """
+            SELECT om.OrganizationId, p.PeopleId, p.Name, p.FamilyId, p.LastName, p.FirstName, p.Age
+            FROM People p
+            JOIN OrganizationMembers om ON p.PeopleId = om.PeopleId
+            WHERE om.OrganizationId IN ({0})
+            AND (p.IsDeceased IS NULL OR p.IsDeceased = 0)
+            AND (om.InactiveDate IS NULL OR om.InactiveDate > GETDATE())
+        """.format(org_ids_str)
+        for result in self.q.QuerySql(members_sql):
+            snapshot = snapshots.get(str(result.OrganizationId))
+            if snapshot is None:
+                continue
+            snapshot['people'][str(result.PeopleId)] = [
+                result.Name,
+                result.FamilyId,
+                result.LastName or "",
+                result.FirstName or "",
+                result.Age
+            ]
+        
+        if ENABLE_SUBGROUP_FILTERING:
+            subgroups_sql = """
+                SELECT ommt.PeopleId, ommt.OrgId, mt.Name, ommt.IsLeader
+                FROM OrgMemMemTags ommt
+                JOIN MemberTags mt ON ommt.MemberTagId = mt.Id
+                WHERE ommt.OrgId IN ({0})
+                ORDER BY mt.Name
+            """.format(org_ids_str)
+            for result in self.q.QuerySql(subgroups_sql):
+                snapshot = snapshots.get(str(result.OrgId))
+                if snapshot is None:
+                    continue
+                subgroup_name = result.Name
+                if hasattr(result, 'IsLeader') and result.IsLeader:
+                    subgroup_name += " (Leader)"
+                snapshot['subgroups'].setdefault(str(result.PeopleId), []).append(subgroup_name)
+        
+        if ENABLE_BALANCE_DISPLAY:
+            balance_sql = """
+                SELECT ts.PeopleId, ts.OrganizationId, ISNULL(SUM(ts.IndDue), 0) AS Balance
+                FROM TransactionSummary ts
+                WHERE ts.OrganizationId IN ({0})
+                AND ts.IndDue <> 0
+                AND ts.IsLatestTransaction = 1
+                GROUP BY ts.PeopleId, ts.OrganizationId
+            """.format(org_ids_str)
+            for result in self.q.QuerySql(balance_sql):
+                snapshot = snapshots.get(str(result.OrganizationId))
+                if snapshot is None or str(result.PeopleId) not in snapshot['people']:
+                    continue
+                snapshot['balance'][str(result.PeopleId)] = float(result.Balance) if result.Balance else 0.0
+        
+        return snapshots
+    
+    def sync_roster_members(self, snapshots):
+        """Check cached snapshots against the live member list (ids only).
+        Drops removed members in memory and returns the org ids that gained
+        members, which need a rebuild to pick up names, subgroups and balances"""
+        # ::STEP:: Compare current eligible member ids with each snapshot
+        if not snapshots:
+            return []
+        sql = """
+            SELECT om.OrganizationId, om.PeopleId
+            FROM OrganizationMembers om
+            JOIN People p ON p.PeopleId = om.PeopleId
+            WHERE om.OrganizationId IN ({0})
+            AND (p.IsDeceased IS NULL OR p.IsDeceased = 0)
+            AND (om.InactiveDate IS NULL OR om.InactiveDate > GETDATE())
+        """.format(",".join(snapshots.keys()))
+        current = {}
+        for result in self.q.QuerySql(sql):
+            current.setdefault(str(result.OrganizationId), set()).add(str(result.PeopleId))
+        
+        gained = []
+        for org_key, snapshot in snapshots.items():
+            members = current.get(org_key, set())
+            for pid_key in list(snapshot['people'].keys()):
+                if pid_key not in members:
+                    del snapshot['people'][pid_key]
+            if members - set(snapshot['people'].keys()):
+                gained.append(org_key)
+        return gained
+    
+    def load_checked_in_today(self, org_ids):
+        """Every PeopleId with AttendanceFlag = 1 today in any of the orgs"""
+        # ::STEP:: Read today's check-ins (small: one day, a few orgs)
+        sql = """
+            SELECT DISTINCT a.PeopleId
+            FROM Attend a
+            WHERE a.OrganizationId IN ({0})
+            AND a.MeetingDate >= CONVERT(date, GETDATE())
+            AND a.MeetingDate < DATEADD(day, 1, CONVERT(date, GETDATE()))
+            AND a.AttendanceFlag = 1
+        """.format(",".join([str(oid) for oid in org_ids]))
+        return set([int(result.PeopleId) for result in self.q.QuerySql(sql)])
+    
+    def get_roster_snapshots(self, org_ids):
+        """Current snapshot per org plus today's checked-in PeopleIds.
+        Reloads stale/missing snapshots and any whose roster gained people"""
+        # ::STEP:: Load cached snapshots, sync membership, rebuild the rest
+        snapshots = {}
+        stale_org_ids = []
+        for org_id in org_ids:
+            snapshot = self._load_roster_snapshot(org_id)
+            if self._roster_snapshot_is_fresh(snapshot):
+                snapshots[str(org_id)] = snapshot
+            else:
+                stale_org_ids.append(str(org_id))
+        
+        for org_key in self.sync_roster_members(snapshots):
+            del snapshots[org_key]
+            stale_org_ids.append(org_key)
+        
+        if stale_org_ids:
+            built = self.build_roster_snapshots(stale_org_ids)
+            for org_key, snapshot in built.items():
+                self._save_roster_snapshot(org_key, snapshot)
+                snapshots[org_key] = snapshot
+        
+        return snapshots, self.load_checked_in_today(org_ids)
+    
+    def get_people_from_roster(self, org_ids, alpha_filter, search_term="", page=1, page_size=PAGE_SIZE):
+        """In-memory equivalent of the get_people_by_filter SQL, served from roster snapshots"""
+        # ::STEP:: Merge org snapshots, drop checked-in people, filter, sort and page
+        # org_ids has one entry per selected meeting; two meetings of the same
+        # org must not list the org (or add its balance) twice
+        unique_org_ids = []
+        for org_id in org_ids:
+            if str(org_id) not in unique_org_ids:
+                unique_org_ids.append(str(org_id))
+        org_ids = unique_org_ids
+        try:
+            snapshots, checked_in = self.get_roster_snapshots(org_ids)
+        except Exception as e:
+            print "<!-- DEBUG: Error loading roster snapshot: {0} -->".format(str(e))
+            return [], 0
+        
+        low_letter = high_letter = None
+        if alpha_filter and alpha_filter != "All" and len(alpha_filter) >= 3:
+            # Same bounds as LastName >= 'A' AND LastName <= 'Hz' (case-insensitive)
+            low_letter = alpha_filter[0].upper()
+            high_letter = (alpha_filter[2] + 'z').upper()
+        term = (search_term or "").lower()
+        
+        roster = {}
+        for org_id in org_ids:
+            snapshot = snapshots.get(str(org_id))
+            if not snapshot:
+                continue
+            for pid_key, row in snapshot['people'].items():
+                people_id = int(pid_key)
+                if people_id in checked_in:
+                    continue
+                name, family_id, last_name, first_name, age = row
+                if low_letter is not None:
+                    last_upper = last_name.upper()
+                    if last_upper < low_letter or last_upper > high_letter:
+                        continue
+                if term and not (term in (name or "").lower()
+                                 or term in first_name.lower()
+                                 or term in last_name.lower()):
+                    continue
+                entry = roster.get(people_id)
+                if entry is None:
+                    entry = {'row': row, 'org_ids': [], 'subgroups': {}, 'balance': 0.0}
+                    roster[people_id] = entry
+                entry['org_ids'].append(str(org_id))
+                if ENABLE_SUBGROUP_FILTERING:
+                    entry['subgroups'][str(org_id)] = snapshot['subgroups'].get(pid_key, [])
+                if ENABLE_BALANCE_DISPLAY:
+                    entry['balance'] += snapshot['balance'].get(pid_key, 0.0)
+        
+        ordered = sorted(roster.items(), key=lambda item: (item[1]['row'][2].lower(), item[1]['row'][3].lower()))
+        total_count = len(ordered)
+        start = (page - 1) * page_size
+        
+        people = []
+        for people_id, entry in ordered[start:start + page_size]:
+            name, family_id, last_name, first_name, age = entry['row']
+            people.append(PersonInfo(
+                people_id,
+                name,
+                family_id,
+                entry['org_ids'],
+                False,
+                age if age is not None else 99,
+                entry['subgroups'],
+                entry['balance']
+            ))
+        return people, total_count
+    
     def get_people_by_meeting_ids(self, meeting_ids, alpha_filter="All", search_term="", page=1, page_size=PAGE_SIZE):
         """Alternative method to get people directly by meeting IDs when org mapping fails"""
         # ::STEP:: Get people by meeting IDs
@@ -1491,7 +1756,7 @@ class CheckInManager:
         """.format((page - 1) * page_size, page_size)
         
         try:
-            results = self.q.QuerySql(sql)
+            results = list(self.q.QuerySql(sql))
         except Exception as e:
             print "<!-- DEBUG: Error in people query: {0} -->".format(str(e))
             return [], total_count
@@ -1512,11 +1777,13 @@ class CheckInManager:
             except Exception as e:
                 print "<!-- DEBUG: Error getting org IDs: {0} -->".format(str(e))
         
+        org_ids_by_person = self.get_people_org_ids(
+            [result.PeopleId for result in results], org_ids_by_meeting.values())
+        
         people = []
         for result in results:
             try:
-                all_org_ids = org_ids_by_meeting.values()
-                person_org_ids = self.get_person_org_ids(result.PeopleId, all_org_ids)
+                person_org_ids = org_ids_by_person.get(result.PeopleId, [])
                 age = result.Age if hasattr(result, 'Age') and result.Age is not None else 99
                 
                 if person_org_ids:
@@ -1557,6 +1824,118 @@ class CheckInManager:
             print "<!-- DEBUG: Error getting person org IDs: {0} -->".format(str(e))
             return []
     
+    # ::START:: Page-level batch lookups
+    # One query per page instead of one (or more) per person row. Each
+    # returns a dict keyed by PeopleId; people with no rows are absent.
+    def get_people_org_ids(self, people_ids, org_ids):
+        """Organization IDs each person is an active member of, for a page of people"""
+        # ::STEP:: Query memberships for the whole page
+        if not people_ids or not org_ids:
+            return {}
+        
+        sql = """
+            SELECT PeopleId, OrganizationId
+            FROM OrganizationMembers
+            WHERE PeopleId IN ({0})
+            AND OrganizationId IN ({1})
+            AND (InactiveDate IS NULL OR InactiveDate > GETDATE())
+        """.format(",".join([str(int(pid)) for pid in people_ids]),
+                   ",".join([str(oid) for oid in org_ids]))
+        
+        org_ids_by_person = {}
+        try:
+            for result in self.q.QuerySql(sql):
+                org_ids_by_person.setdefault(result.PeopleId, []).append(str(result.OrganizationId))
+        except Exception as e:
+            print "<!-- DEBUG: Error getting page org IDs: {0} -->".format(str(e))
+        return org_ids_by_person
+    
+    def get_people_attended_org_ids(self, people_ids, org_ids):
+        """Organization IDs each person has attended today, for a page of people"""
+        # ::STEP:: Query today's attendance for the whole page
+        if not people_ids or not org_ids:
+            return {}
+        
+        sql = """
+            SELECT PeopleId, OrganizationId
+            FROM Attend
+            WHERE PeopleId IN ({0})
+            AND OrganizationId IN ({1})
+            AND CONVERT(date, MeetingDate) = CONVERT(date, GETDATE())
+            AND AttendanceFlag = 1
+        """.format(",".join([str(int(pid)) for pid in people_ids]),
+                   ",".join([str(oid) for oid in org_ids]))
+        
+        attended_by_person = {}
+        try:
+            for result in self.q.QuerySql(sql):
+                attended_by_person.setdefault(result.PeopleId, []).append(str(result.OrganizationId))
+        except Exception as e:
+            print "<!-- DEBUG: Error getting page attended org IDs: {0} -->".format(str(e))
+        return attended_by_person
+    
+    def get_people_subgroups(self, people_ids, org_ids):
+        """Subgroups (MemberTags) per person per organization, for a page of people.
+        Returns {PeopleId: {org_id_str: [subgroup names]}}"""
+        # ::STEP:: Query OrgMemMemTags for the whole page
+        if not people_ids or not org_ids:
+            return {}
+        
+        sql = """
+            SELECT ommt.PeopleId, ommt.OrgId, mt.Name, ommt.IsLeader
+            FROM OrgMemMemTags ommt
+            JOIN MemberTags mt ON ommt.MemberTagId = mt.Id
+            WHERE ommt.PeopleId IN ({0})
+            AND ommt.OrgId IN ({1})
+            ORDER BY mt.Name
+        """.format(",".join([str(int(pid)) for pid in people_ids]),
+                   ",".join([str(oid) for oid in org_ids]))
+        
+        subgroups_by_person = {}
+        try:
+            for result in self.q.QuerySql(sql):
+                subgroup_name = result.Name
+                if hasattr(result, 'IsLeader') and result.IsLeader:
+                    subgroup_name += " (Leader)"
+                person_tags = subgroups_by_person.setdefault(result.PeopleId, {})
+                person_tags.setdefault(str(result.OrgId), []).append(subgroup_name)
+        except Exception as e:
+            print "<!-- DEBUG: Error getting page MemberTags: {0} -->".format(str(e))
+        return subgroups_by_person
+    
+    def get_people_balances(self, people_ids, org_ids_by_person):
+        """Outstanding balance per person across the organizations they are active in.
+        org_ids_by_person is the result of get_people_org_ids for the same page."""
+        # ::STEP:: Query TransactionSummary for the whole page
+        all_org_ids = set()
+        for person_org_ids in org_ids_by_person.values():
+            all_org_ids.update(person_org_ids)
+        if not people_ids or not all_org_ids:
+            return {}
+        
+        sql = """
+            SELECT ts.PeopleId, ts.OrganizationId, ISNULL(SUM(ts.IndDue), 0) AS Balance
+            FROM TransactionSummary ts
+            WHERE ts.PeopleId IN ({0})
+            AND ts.OrganizationId IN ({1})
+            AND ts.IndDue <> 0
+            AND ts.IsLatestTransaction = 1
+            GROUP BY ts.PeopleId, ts.OrganizationId
+        """.format(",".join([str(int(pid)) for pid in people_ids]),
+                   ",".join(sorted(all_org_ids)))
+        
+        balances_by_person = {}
+        try:
+            for result in self.q.QuerySql(sql):
+                # Only count orgs the person is an active member of, same as get_person_balance
+                if str(result.OrganizationId) not in org_ids_by_person.get(result.PeopleId, []):
+                    continue
+                amount = float(result.Balance) if result.Balance else 0.0
+                balances_by_person[result.PeopleId] = balances_by_person.get(result.PeopleId, 0.0) + amount
+        except Exception as e:
+            print "<!-- DEBUG: Error getting page balances: {0} -->".format(str(e))
+        return balances_by_person
+    
     def check_in_person(self, people_id, meeting_id):
         """Simplified direct check-in using just people_id and meeting_id"""
         # ::STEP:: Perform check-in
@@ -1595,6 +1974,76 @@ class CheckInManager:
             print "<!-- DEBUG: Error in check_in_person: {0} -->".format(str(e))
             return False
     
+    def _checked_in_pairs(self, pairs):
+        """Set of (people_id, meeting_id) from pairs that are marked present, in one query"""
+        if not pairs:
+            return set()
+        sql = """
+            SELECT PeopleId, MeetingId
+            FROM Attend 
+            WHERE PeopleId IN ({0}) AND MeetingId IN ({1})
+            AND AttendanceFlag = 1
+        """.format(",".join(set([str(p) for p, m in pairs])),
+                   ",".join(set([str(m) for p, m in pairs])))
+        wanted = set(pairs)
+        found = set()
+        for result in self.q.QuerySql(sql):
+            pair = (int(result.PeopleId), int(result.MeetingId))
+            if pair in wanted:
+                found.add(pair)
+        return found
+    
+    def check_in_people(self, pairs):
+        """Check in several (people_id, meeting_id) pairs with one bulk pre-read and one bulk verify.
+        Returns a list of {"people_id", "meeting_id", "status"} in input order. Status is
+        "checked_in", "already_checked_in", "failed" or "invalid"."""
+        # ::STEP:: Validate pairs
+        results = []
+        clean_pairs = []
+        for people_id, meeting_id in pairs:
+            try:
+                pair = (int(people_id), int(meeting_id))
+            except (ValueError, TypeError):
+                results.append({"people_id": people_id, "meeting_id": meeting_id, "status": "invalid"})
+                continue
+            results.append({"people_id": pair[0], "meeting_id": pair[1], "status": None})
+            if pair not in clean_pairs:
+                clean_pairs.append(pair)
+        
+        # ::STEP:: Bulk pre-read, writes, bulk verify
+        try:
+            already = self._checked_in_pairs(clean_pairs)
+        except Exception as e:
+            print "<!-- DEBUG: Error in batch pre-check: {0} -->".format(str(e))
+            already = set()
+        
+        for people_id, meeting_id in clean_pairs:
+            if (people_id, meeting_id) in already:
+                continue
+            try:
+                self.model.EditPersonAttendance(meeting_id, people_id, True)
+            except Exception as e:
+                print "<!-- DEBUG: Error checking in {0} for meeting {1}: {2} -->".format(people_id, meeting_id, str(e))
+        
+        try:
+            verified = self._checked_in_pairs(clean_pairs)
+        except Exception as e:
+            print "<!-- DEBUG: Error in batch verify: {0} -->".format(str(e))
+            verified = set()
+        
+        for result in results:
+            if result["status"] == "invalid":
+                continue
+            pair = (result["people_id"], result["meeting_id"])
+            if pair in already:
+                result["status"] = "already_checked_in"
+            elif pair in verified:
+                result["status"] = "checked_in"
+            else:
+                result["status"] = "failed"
+        
+        return results
+    
     def check_in_person_with_email(self, people_id, meeting_id, person_name, email_template):
         """Check in a person and send appropriate email notification"""
         # ::STEP:: Check-in with notification
@@ -1604,9 +2053,20 @@ class CheckInManager:
             
             if not success:
                 return False
-                
+            
+            self.send_check_in_email(people_id, meeting_id, person_name, email_template)
+            return success
+            
+        except Exception as e:
+            print "<!-- DEBUG: Error in check_in_person_with_email: {0} -->".format(str(e))
+            return False
+    
+    def send_check_in_email(self, people_id, meeting_id, person_name, email_template):
+        """Send the check-in notification (parents for minors, the person for adults)"""
+        # ::STEP:: Notify after a successful check-in
+        try:
             if not email_template or email_template == 'none':
-                return success
+                return
                 
             # Get person details for email
             sql = """
@@ -1624,7 +2084,7 @@ class CheckInManager:
             person_result = self.q.QuerySqlTop1(sql)
             
             if not person_result:
-                return success
+                return
                 
             age = 99
             if hasattr(person_result, 'Age') and person_result.Age is not None:
@@ -1663,11 +2123,8 @@ class CheckInManager:
                         email_template
                     )
             
-            return success
-            
         except Exception as e:
-            print "<!-- DEBUG: Error in check_in_person_with_email: {0} -->".format(str(e))
-            return False
+            print "<!-- DEBUG: Error in send_check_in_email: {0} -->".format(str(e))
     
     def get_check_in_stats(self, meeting_ids):
         """Get check-in statistics for selected meetings with forced refresh"""
@@ -1777,7 +2234,7 @@ class CheckInManager:
         """.format(meeting_ids_str, (page - 1) * page_size, page_size)
         
         try:
-            results = self.q.QuerySql(sql)
+            results = list(self.q.QuerySql(sql))
         except Exception as e:
             print "<!-- DEBUG: Error getting checked in people: {0} -->".format(str(e))
             return [], total_count
@@ -1796,10 +2253,13 @@ class CheckInManager:
             print "<!-- DEBUG: Error getting org IDs: {0} -->".format(str(e))
             org_ids = []
         
+        attended_by_person = self.get_people_attended_org_ids(
+            [result.PeopleId for result in results], org_ids)
+        
         people = []
         for result in results:
             try:
-                person_org_ids = self.get_person_attended_org_ids(result.PeopleId, org_ids)
+                person_org_ids = attended_by_person.get(result.PeopleId, [])
                 age = result.Age if hasattr(result, 'Age') and result.Age is not None else 99
                 
                 person = PersonInfo(
@@ -2527,6 +2987,106 @@ def create_pagination(page, total_pages, script_name, meeting_ids, view_mode, al
     return "\n".join(pagination)
 
 # ::START:: AJAX Processing
+def get_person_meeting_ids(check_in_manager, person, meeting_ids):
+    """Selected meeting IDs this person can be checked into (falls back to the first selected meeting)"""
+    person_meeting_ids = []
+    
+    for org_id in person.org_ids:
+        for meeting in check_in_manager.all_meetings_today:
+            if (str(meeting.org_id) == str(org_id) and 
+                str(meeting.meeting_id) in meeting_ids):
+                person_meeting_ids.append(str(meeting.meeting_id))
+    
+    if not person_meeting_ids and meeting_ids:
+        person_meeting_ids = [meeting_ids[0]]
+    return person_meeting_ids
+
+def get_family_check_in_script(family_check_ins, email_template):
+    """Script for the Family button: posts every family member on the page to ajax_batch_check_in"""
+    return """
+    <script type="text/javascript">
+        var {0}Families = {1};
+        function {0}FamilyCheckIn(familyId) {{
+            var members = {0}Families[familyId] || [];
+            if (!members.length) {{
+                return false;
+            }}
+            members.forEach(function(m) {{
+                var card = document.getElementById('person-' + m.person_id);
+                if (card) {{
+                    card.classList.add('{0}-processing');
+                }}
+            }});
+            
+            var miniFlash = document.createElement('div');
+            miniFlash.className = '{0}-mini-flash';
+            miniFlash.innerHTML = '<span>Checking in ' + members.length + ' people...</span>';
+            document.body.appendChild(miniFlash);
+            
+            var formData = new FormData();
+            formData.append('step', 'check_in');
+            formData.append('action', 'ajax_batch_check_in');
+            formData.append('check_ins', JSON.stringify(members));
+            formData.append('email_template', {2});
+            
+            var xhr = new XMLHttpRequest();
+            xhr.open('POST', window.location.pathname.replace("/PyScript/", "/PyScriptForm/"), true);
+            xhr.onload = function() {{
+                var data = null;
+                try {{
+                    var text = xhr.responseText;
+                    data = JSON.parse(text.substring(text.indexOf('{{'), text.lastIndexOf('}}') + 1));
+                }} catch (e) {{}}
+                var results = (data && data.results) || [];
+                var done = 0;
+                var failedNames = [];
+                members.forEach(function(m) {{
+                    var card = document.getElementById('person-' + m.person_id);
+                    var ok = results.some(function(r) {{
+                        return String(r.people_id) === String(m.person_id) &&
+                               (r.status === 'checked_in' || r.status === 'already_checked_in');
+                    }});
+                    if (ok) {{
+                        done++;
+                        if (card) {{
+                            card.style.display = 'none';
+                        }}
+                    }} else {{
+                        failedNames.push(m.person_name);
+                        if (card) {{
+                            card.classList.remove('{0}-processing');
+                        }}
+                    }}
+                }});
+                
+                var checkedInEl = document.getElementById('stat-checked-in');
+                var notCheckedInEl = document.getElementById('stat-not-checked-in');
+                if (checkedInEl && notCheckedInEl) {{
+                    checkedInEl.innerText = (parseInt(checkedInEl.innerText || '0') + done).toString();
+                    notCheckedInEl.innerText = Math.max(0, parseInt(notCheckedInEl.innerText || '0') - done).toString();
+                }}
+                
+                if (failedNames.length) {{
+                    miniFlash.style.backgroundColor = 'rgba(220,53,69,0.9)';
+                    miniFlash.innerHTML = '<span>Error checking in ' + failedNames.join(', ') + '</span>';
+                }} else {{
+                    miniFlash.innerHTML = '<span>' + done + ' checked in!</span>';
+                }}
+                setTimeout(function() {{
+                    miniFlash.style.opacity = '0';
+                    setTimeout(function() {{
+                        if (document.body.contains(miniFlash)) {{
+                            document.body.removeChild(miniFlash);
+                        }}
+                    }}, 300);
+                }}, 1500);
+            }};
+            xhr.send(formData);
+            return false;
+        }}
+    </script>
+    """.format(CSS_PREFIX, json.dumps(family_check_ins).replace("</", "<\\/"), json.dumps(email_template))
+
 def process_ajax_check_in(check_in_manager):
     """Process AJAX check-in requests without full page reload"""
     # ::STEP:: Handle AJAX check-in request
@@ -2580,6 +3140,54 @@ def process_ajax_check_in(check_in_manager):
         print '{{"success":false,"reason":"general_error"}}'
         return True
 
+def process_ajax_batch_check_in(check_in_manager):
+    """Check in several people in one request (e.g. a whole family).
+    Expects check_ins = JSON list of {person_id, meeting_id, person_name}."""
+    # ::STEP:: Handle AJAX batch check-in request
+    try:
+        raw = getattr(check_in_manager.model.Data, 'check_ins', '') or ''
+        email_template = getattr(check_in_manager.model.Data, 'email_template', 'none')
+        
+        try:
+            items = json.loads(str(raw))
+        except ValueError:
+            items = None
+        if not isinstance(items, list) or not items:
+            print '{"success":false,"reason":"missing_parameters"}'
+            return True
+        
+        pairs = []
+        names = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            pairs.append((item.get('person_id'), item.get('meeting_id')))
+            names[str(item.get('person_id'))] = item.get('person_name', '')
+        
+        results = check_in_manager.check_in_people(pairs)
+        check_in_manager.last_check_in_time = check_in_manager.model.DateTime
+        
+        for result in results:
+            if result["status"] == "checked_in":
+                check_in_manager.send_check_in_email(
+                    result["people_id"],
+                    result["meeting_id"],
+                    names.get(str(result["people_id"]), ''),
+                    email_template
+                )
+        
+        if PARENT_EMAIL_DELAY:
+            check_in_manager.email_manager.send_queued_emails()
+        
+        success = all(r["status"] in ("checked_in", "already_checked_in") for r in results)
+        print json.dumps({"success": success, "results": results})
+        return True
+        
+    except Exception as e:
+        print "<!-- ERROR AJAX: {0} -->".format(str(e))
+        print '{"success":false,"reason":"general_error"}'
+        return True
+
 def render_fastlane_check_in(check_in_manager):
     """Render the FastLane check-in page with enhanced features and scoped CSS"""
     # ::STEP:: Display check-in UI with subgroup and balance support
@@ -2760,6 +3368,23 @@ def render_fastlane_check_in(check_in_manager):
     <div class="{0}-people-grid">
     """.format(CSS_PREFIX))
     
+    # Group not-checked-in people on this page by family for one-click family check-in
+    family_check_ins = {}
+    if view_mode != "checked_in":
+        for person in people:
+            if not person.family_id:
+                continue
+            person_meeting_ids = get_person_meeting_ids(check_in_manager, person, meeting_ids)
+            if person_meeting_ids:
+                family_check_ins.setdefault(str(person.family_id), []).append({
+                    "person_id": str(person.people_id),
+                    "meeting_id": person_meeting_ids[0],
+                    "person_name": person.name
+                })
+        family_check_ins = dict((fid, members) for fid, members in family_check_ins.items() if len(members) > 1)
+        if family_check_ins:
+            people_list_html.append(get_family_check_in_script(family_check_ins, email_template))
+    
     for person in people:
         # Get the organizations this person is a member of
         person_org_names = []
@@ -2923,16 +3548,7 @@ def render_fastlane_check_in(check_in_manager):
                 subgroup_display        # {8}
             )
         
-            person_meeting_ids = []
-            
-            for org_id in person.org_ids:
-                for meeting in check_in_manager.all_meetings_today:
-                    if (str(meeting.org_id) == str(org_id) and 
-                        str(meeting.meeting_id) in meeting_ids):
-                        person_meeting_ids.append(str(meeting.meeting_id))
-            
-            if not person_meeting_ids and meeting_ids:
-                person_meeting_ids = [meeting_ids[0]]
+            person_meeting_ids = get_person_meeting_ids(check_in_manager, person, meeting_ids)
             
             for meeting_id in person_meeting_ids:
                 meeting_name = "Check In"
@@ -3033,6 +3649,12 @@ def render_fastlane_check_in(check_in_manager):
                     email_template     # {10}
                 )
             
+            family_members = family_check_ins.get(str(person.family_id)) if person.family_id else None
+            if family_members:
+                item_html += """
+                <button onclick="return {0}FamilyCheckIn('{1}');" class="{0}-btn {0}-btn-sm {0}-btn-primary" title="Check in everyone in this family shown on this page">Family ({2})</button>
+                """.format(CSS_PREFIX, person.family_id, len(family_members))
+            
             item_html += """
                     </div>
                 </div>
@@ -3275,6 +3897,11 @@ def main():
             if ajax_handled:
                 return
         
+        if clean_action == 'ajax_batch_check_in':
+            ajax_handled = process_ajax_batch_check_in(check_in_manager)
+            if ajax_handled:
+                return
+        
         # ::STEP:: Process other form actions
         if clean_action == 'single_direct_check_in':
             if clean_person_id and clean_meeting_id:
@@ -35,6 +35,11 @@
 # UPDATES 1.1 (20251111)
 # - Added ability to add more than 1 FundId
 # - Added ability to use fundsets
+#
+# UPDATES 1.2 (20261017)
+# - Giving totals are sliced from a daily giving cube (date x fund x type x status)
+#   instead of one Contribution scan per card. Closed months are kept in Special Content
+#   (GivingDashboard_Cube_*); add &rebuild_cube=1 to rebuild them after back-dated edits.
 
 # PREREQUISITES
 #  - Both scripts installed
@@ -73,6 +78,14 @@ PRIOR_YEAR_ANNUAL_BUDGET = 13015364  # Total annual budget for previous fiscal y
 DEFAULT_WEEKLY_BUDGET = 285467  # Default weekly budget amount for current year
 PRIOR_YEAR_WEEKLY_BUDGET = 250295  # Weekly budget for last year (13015364 / 52)
 
+# Giving Cube Settings
+GIVING_CUBE_PERSIST = True  # Save closed months of daily giving totals to Special Content (False = rebuild every load)
+GIVING_CUBE_SETTLE_DAYS = 45  # Months/weeks that ended more than this many days ago are stored as closed
+GIVING_CUBE_CONTENT_PREFIX = 'GivingDashboard_Cube_'  # Special Content name prefix for stored cube data
+GIVING_CUBE_MIN_CELL_GIFTS = 3  # Stored cells must cover at least this many gifts; smaller ones are re-read live
+GIVING_CUBE_RECHECK_DAYS = 90  # Stored months closed within this many days are stamp-checked on every load
+GIVING_CUBE_FULL_CHECK_DAYS = 7  # Older stored months are stamp-checked for edits/deletions this often
+
 # Contribution Week Report Settings
 ENABLE_WEEK_REPORT = True  # Enable clickable weekly reports
 REPORT_NOTE_NAME = 'ContributionNote'  # TouchPoint HTML content name for pastor's note
@@ -224,6 +237,598 @@ def get_fund_ids():
 
     return fund_ids, fund_clause
 
+# ==========================================
+# DAILY GIVING CUBE
+# ==========================================
+# Nearly every card, the week report and the weekly email are SUM(ContributionAmount)
+# over some date window with a fund, status and ContributionTypeId filter. Rather
+# than scan Contribution for each of them, one grouped query builds a daily cube
+# (day x fund x type x status -> amount, gifts, large gifts) and every total is
+# sliced from it in memory. Months that ended more than GIVING_CUBE_SETTLE_DAYS ago
+# are saved to Special Content, so a normal load only reads the open months.
+#
+# Stored months are checked against Contribution in two ways:
+#  - Every load reads the gifts added since the last load (ContributionId above a
+#    saved watermark, one index seek) and bumps the generation of each month they
+#    landed in; a stored month built at an older generation is rebuilt, so
+#    back-dated gifts show up on the next load.
+#  - Edits and deletions don't move the watermark, so stored months are also
+#    compared against a stamp (count, sum, max ContributionId, checksum). Months
+#    that closed within GIVING_CUBE_RECHECK_DAYS are stamped on every load; older
+#    months only once every GIVING_CUBE_FULL_CHECK_DAYS.
+# Cells covering fewer than GIVING_CUBE_MIN_CELL_GIFTS gifts are never stored
+# with their amounts, so Special Content doesn't reveal individual gifts.
+#
+# Date windows cover whole days: an end date includes every gift on that day.
+# (The per-card queries this replaced used ContributionDate <= 'YYYY-MM-DD',
+# which left out gifts timestamped after midnight on the last day.)
+#
+# Distinct givers do not add up across days or cells, so weekly giver counts are
+# kept in their own store (closed weeks saved the same way, with the generations
+# of the months they fall in), and any other window is counted with its own query.
+# Add &rebuild_cube=1 to the URL to rebuild every stored month it touches.
+
+GIVING_CUBE_VERSION = 3
+
+
+class CubeWeek(object):
+    """One week of cube totals in place of a row from the old weekly query
+    (WeekStart plus the CY or PY total columns)."""
+    def __init__(self, monday, **totals):
+        self.WeekStart = datetime.datetime.strptime(monday, '%Y-%m-%d')
+        for column, value in totals.items():
+            setattr(self, column, value)
+
+
+class GivingCube(object):
+    """Daily contribution aggregates for the current request."""
+
+    def __init__(self):
+        self.months = {}          # 'YYYY-MM' -> list of cells
+        self.week_givers = None   # stored weekly giver counts, loaded on first use
+        self.giver_counts = {}    # live distinct giver counts for this request
+        self.stamps = {}          # 'YYYY-MM' -> current month stamp, probed once per request
+        self.meta = None          # watermark, month generations and stamp check dates
+        self.meta_changed = False
+        self.mondays = {}         # day string -> Monday string
+        self.force_rebuild = False
+
+    # ---------- dates ----------
+
+    @staticmethod
+    def as_date(value):
+        """Accept date/datetime values or 'YYYY-MM-DD', 'MM/DD/YYYY', 'YYYYMMDD' strings."""
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        text = str(value).strip().split(' ')[0]
+        for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%Y%m%d'):
+            try:
+                return datetime.datetime.strptime(text, fmt).date()
+            except ValueError:
+                pass
+        raise ValueError("Unrecognized date: {}".format(value))
+
+    @staticmethod
+    def years_back(value, years=1):
+        """Same day N years earlier (Feb 29 -> Feb 28, like SQL DATEADD)."""
+        day = GivingCube.as_date(value)
+        try:
+            return day.replace(year=day.year - years)
+        except ValueError:
+            return day.replace(year=day.year - years, day=28)
+
+    @staticmethod
+    def month_bounds(key):
+        """First day of the month and first day of the next month for 'YYYY-MM'."""
+        year, month = int(key[:4]), int(key[5:7])
+        first = datetime.date(year, month, 1)
+        if month == 12:
+            return first, datetime.date(year + 1, 1, 1)
+        return first, datetime.date(year, month + 1, 1)
+
+    @staticmethod
+    def month_keys(start, end):
+        keys = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            keys.append('%04d-%02d' % (year, month))
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+        return keys
+
+    def monday_of(self, day):
+        """Monday (as 'YYYY-MM-DD') of the week holding a 'YYYY-MM-DD' day."""
+        monday = self.mondays.get(day)
+        if monday is None:
+            date = datetime.datetime.strptime(day, '%Y-%m-%d').date()
+            monday = (date - datetime.timedelta(days=date.weekday())).isoformat()
+            self.mondays[day] = monday
+        return monday
+
+    @staticmethod
+    def settled_before():
+        """Anything before this date is treated as closed."""
+        return datetime.date.today() - datetime.timedelta(days=GIVING_CUBE_SETTLE_DAYS)
+
+    @staticmethod
+    def runs(keys, next_key):
+        """Group sorted keys into contiguous runs using next_key(k) -> following key."""
+        grouped = []
+        for key in keys:
+            if grouped and next_key(grouped[-1][-1]) == key:
+                grouped[-1].append(key)
+            else:
+                grouped.append([key])
+        return grouped
+
+    # ---------- loading ----------
+
+    def month_stamps(self, keys):
+        """Current [gifts, cents, max ContributionId, checksum] per 'YYYY-MM'.
+
+        One grouped query covers every month not probed yet in this request.
+        A stored month (or week of givers) whose stamp no longer matches was
+        changed after it closed - a back-dated gift, an edit or a deletion -
+        and is rebuilt.
+        """
+        wanted = [key for key in keys if key not in self.stamps]
+        if wanted:
+            for key in wanted:
+                self.stamps[key] = [0, 0, 0, 0]
+            sql = '''
+                SELECT
+                    CONVERT(varchar(7), c.ContributionDate, 120) AS Month,
+                    COUNT(*) AS Gifts,
+                    SUM(c.ContributionAmount) AS Amount,
+                    MAX(c.ContributionId) AS MaxId,
+                    CHECKSUM_AGG(CHECKSUM(c.ContributionId, c.ContributionAmount, c.ContributionDate,
+                        c.FundId, c.ContributionTypeId, c.ContributionStatusId)) AS Stamp
+                FROM Contribution c WITH (NOLOCK)
+                WHERE c.ContributionDate >= '{}'
+                    AND c.ContributionDate < '{}'
+                GROUP BY CONVERT(varchar(7), c.ContributionDate, 120)
+            '''.format(self.month_bounds(min(wanted))[0].strftime('%Y-%m-%d'),
+                       self.month_bounds(max(wanted))[1].strftime('%Y-%m-%d'))
+            wanted = set(wanted)
+            for row in q.QuerySql(sql):
+                key = str(row.Month)
+                if key in wanted:
+                    self.stamps[key] = [int(row.Gifts or 0), int(round(float(row.Amount or 0) * 100)),
+                                        int(row.MaxId or 0), int(row.Stamp or 0)]
+        return [self.stamps[key] for key in keys]
+
+    def load_meta(self):
+        """Cube bookkeeping, shared by every stored month and week.
+
+        {'created', 'maxId', 'gen': {'YYYY-MM': n}, 'checked': {'YYYY-MM': 'YYYY-MM-DD'}}.
+        The first call in a request reads the gifts above maxId and bumps the
+        generation of every month they fall in. 'created' changes when the meta
+        is lost, which retires everything stored against the old generations.
+        """
+        if self.meta is not None:
+            return self.meta
+        meta = None
+        if GIVING_CUBE_PERSIST:
+            try:
+                raw = model.TextContent(GIVING_CUBE_CONTENT_PREFIX + 'Meta')
+                if raw and raw.strip():
+                    data = json.loads(raw)
+                    if data.get('v') == GIVING_CUBE_VERSION:
+                        meta = data
+            except:
+                meta = None
+        if meta is None:
+            meta = {'v': GIVING_CUBE_VERSION,
+                    'created': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'maxId': None, 'gen': {}, 'checked': {}}
+            self.meta_changed = True
+
+        if meta['maxId'] is None:
+            row = q.QuerySqlTop1("SELECT MAX(ContributionId) AS MaxId FROM Contribution WITH (NOLOCK)")
+            meta['maxId'] = int(row.MaxId or 0) if row else 0
+        else:
+            sql = '''
+                SELECT
+                    CONVERT(varchar(7), c.ContributionDate, 120) AS Month,
+                    COUNT(*) AS Gifts,
+                    MAX(c.ContributionId) AS MaxId
+                FROM Contribution c WITH (NOLOCK)
+                WHERE c.ContributionId > {}
+                GROUP BY CONVERT(varchar(7), c.ContributionDate, 120)
+            '''.format(int(meta['maxId']))
+            for row in q.QuerySql(sql):
+                if not row.Gifts or row.Month is None:
+                    continue
+                key = str(row.Month)
+                meta['gen'][key] = meta['gen'].get(key, 0) + 1
+                meta['maxId'] = max(meta['maxId'], int(row.MaxId or 0))
+                self.meta_changed = True
+        self.meta = meta
+        return meta
+
+    def save_meta(self):
+        if not (GIVING_CUBE_PERSIST and self.meta_changed):
+            return
+        try:
+            model.WriteContentText(GIVING_CUBE_CONTENT_PREFIX + 'Meta', json.dumps(self.meta), '')
+            self.meta_changed = False
+        except Exception as e:
+            print "<!-- Error saving giving cube meta: {} -->".format(str(e))
+
+    def month_gen(self, key):
+        """[meta created, generation] a stored month or week must match."""
+        meta = self.load_meta()
+        return [meta['created'], meta['gen'].get(key, 0)]
+
+    def stamp_due(self, key, today):
+        """Recently closed months are stamped on every load, older ones on a schedule."""
+        if self.month_bounds(key)[1] > self.settled_before() - datetime.timedelta(days=GIVING_CUBE_RECHECK_DAYS):
+            return True
+        checked = self.load_meta()['checked'].get(key)
+        if not checked:
+            return True
+        last = datetime.datetime.strptime(checked, '%Y-%m-%d').date()
+        return (today - last).days >= GIVING_CUBE_FULL_CHECK_DAYS
+
+    def load_stored_month(self, key):
+        try:
+            raw = model.TextContent(GIVING_CUBE_CONTENT_PREFIX + key)
+            if raw and raw.strip():
+                data = json.loads(raw)
+                if data.get('v') == GIVING_CUBE_VERSION:
+                    return data
+        except:
+            pass
+        return None
+
+    def save_month(self, key, cells, stamp, gen):
+        """Store a closed month. Cells with fewer than GIVING_CUBE_MIN_CELL_GIFTS
+        gifts would give away single gift amounts, so only their keys are
+        kept; their amounts are re-read on load by query_cells_by_key."""
+        stored, live = [], []
+        for cell in cells:
+            if cell[5] >= GIVING_CUBE_MIN_CELL_GIFTS:
+                stored.append(list(cell))
+            else:
+                live.append(list(cell[:4]))
+        try:
+            model.WriteContentText(GIVING_CUBE_CONTENT_PREFIX + key, json.dumps({
+                'v': GIVING_CUBE_VERSION,
+                'built': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'stamp': stamp,
+                'gen': gen,
+                'cells': stored,
+                'live': live
+            }), '')
+            self.meta['checked'][key] = datetime.date.today().isoformat()
+            self.meta_changed = True
+        except Exception as e:
+            print "<!-- Error saving giving cube month {}: {} -->".format(key, str(e))
+
+    CELL_SQL = '''
+            SELECT
+                CONVERT(varchar(10), c.ContributionDate, 120) AS Day,
+                c.FundId,
+                c.ContributionTypeId AS TypeId,
+                c.ContributionStatusId AS StatusId,
+                SUM(c.ContributionAmount) AS Amount,
+                COUNT(*) AS Gifts,
+                SUM(CASE WHEN c.ContributionAmount >= 10000 AND c.ContributionAmount < 100000 THEN 1 ELSE 0 END) AS Gifts10k,
+                SUM(CASE WHEN c.ContributionAmount >= 100000 THEN 1 ELSE 0 END) AS Gifts100k
+            FROM Contribution c WITH (NOLOCK)
+            {}
+            GROUP BY CONVERT(varchar(10), c.ContributionDate, 120), c.FundId,
+                c.ContributionTypeId, c.ContributionStatusId
+    '''
+
+    @staticmethod
+    def read_cells(sql):
+        cells = []
+        for row in q.QuerySql(sql):
+            cells.append((
+                str(row.Day),
+                row.FundId,
+                row.TypeId,
+                row.StatusId,
+                round(float(row.Amount or 0), 2),
+                int(row.Gifts or 0),
+                int(row.Gifts10k or 0),
+                int(row.Gifts100k or 0)
+            ))
+        return cells
+
+    def query_cells(self, start, end_exclusive):
+        """Read cells for [start, end_exclusive) from Contribution."""
+        where = """WHERE c.ContributionDate >= '{}'
+                AND c.ContributionDate < '{}'""".format(start.strftime('%Y-%m-%d'),
+                                                       end_exclusive.strftime('%Y-%m-%d'))
+        return self.read_cells(self.CELL_SQL.format(where))
+
+    def query_cells_by_key(self, keys):
+        """Read the cells for [day, fund, type, status] keys (the small cells
+        of stored months), seeking just those days instead of whole months."""
+        def sql_value(value):
+            return str(int(value)) if value is not None else '-1'
+
+        cells = []
+        for i in range(0, len(keys), 500):
+            values = ',\n                '.join(
+                "('{}', {}, {}, {})".format(key[0], sql_value(key[1]), sql_value(key[2]), sql_value(key[3]))
+                for key in keys[i:i + 500])
+            cells.extend(self.read_cells(self.CELL_SQL.format('''JOIN (VALUES
+                {}
+            ) k (Day, FundId, TypeId, StatusId)
+                ON c.ContributionDate >= CAST(k.Day AS datetime)
+                AND c.ContributionDate < DATEADD(day, 1, CAST(k.Day AS datetime))
+                AND ISNULL(c.FundId, -1) = k.FundId
+                AND ISNULL(c.ContributionTypeId, -1) = k.TypeId
+                AND ISNULL(c.ContributionStatusId, -1) = k.StatusId'''.format(values))))
+        return cells
+
+    def ensure(self, start, end):
+        """Make sure every month touching [start, end] is loaded."""
+        start, end = self.as_date(start), self.as_date(end)
+        missing = []
+        stored_months = {}
+        for key in self.month_keys(start, end):
+            if key in self.months:
+                continue
+            stored = None
+            if GIVING_CUBE_PERSIST and not self.force_rebuild:
+                stored = self.load_stored_month(key)
+            if stored is not None:
+                stored_months[key] = stored
+            else:
+                missing.append(key)
+
+        # Stored months are used while no new gift has landed in them since
+        # they were built and, when a stamp check is due, the stamp still matches
+        live_keys = []
+        if stored_months:
+            today = datetime.date.today()
+            current = []
+            for key in sorted(stored_months):
+                if stored_months[key].get('gen') == self.month_gen(key):
+                    current.append(key)
+                else:
+                    missing.append(key)
+            due = [key for key in current if self.stamp_due(key, today)]
+            for key, stamp in zip(due, self.month_stamps(due)):
+                if stored_months[key].get('stamp') != stamp:
+                    # Edited or deleted after it closed: retire the stored weeks too
+                    self.meta['gen'][key] = self.meta['gen'].get(key, 0) + 1
+                    current.remove(key)
+                    missing.append(key)
+                else:
+                    self.meta['checked'][key] = today.isoformat()
+                self.meta_changed = True
+            for key in current:
+                stored = stored_months[key]
+                self.months[key] = [tuple(cell) for cell in stored.get('cells', [])]
+                live_keys.extend(stored.get('live', []))
+        if live_keys:
+            for cell in self.query_cells_by_key(live_keys):
+                self.months[cell[0][:7]].append(cell)
+        if not missing:
+            self.save_meta()
+            return
+
+        # One query per contiguous run of missing months
+        missing.sort()
+        settled = self.settled_before()
+        next_month = lambda key: self.month_bounds(key)[1].strftime('%Y-%m')
+        for run in self.runs(missing, next_month):
+            run_start = self.month_bounds(run[0])[0]
+            run_end = self.month_bounds(run[-1])[1]
+            by_month = dict((key, []) for key in run)
+            for cell in self.query_cells(run_start, run_end):
+                by_month[cell[0][:7]].append(cell)
+            closed = [key for key in run if self.month_bounds(key)[1] <= settled]
+            stamps = dict(zip(closed, self.month_stamps(closed))) if GIVING_CUBE_PERSIST else {}
+            for key in run:
+                self.months[key] = by_month[key]
+                if key in stamps:
+                    self.save_month(key, by_month[key], stamps[key], self.month_gen(key))
+        self.save_meta()
+        print "<!-- Giving cube: {} month(s) read from Contribution -->".format(len(missing))
+
+    # ---------- slicing ----------
+
+    def iter_cells(self, start, end, fund_ids=None, status=None, exclude_types=None):
+        """Cells in [start, end] matching the filters.
+
+        fund_ids None means every fund and status None means any status.
+        exclude_types works like SQL NOT IN, so NULL types are excluded too.
+        """
+        start, end = self.as_date(start), self.as_date(end)
+        self.ensure(start, end)
+        low, high = start.isoformat(), end.isoformat()
+        funds = set(int(f) for f in fund_ids) if fund_ids is not None else None
+        excluded = set(exclude_types) if exclude_types else None
+        for key in self.month_keys(start, end):
+            for cell in self.months.get(key, ()):
+                day, fund, type_id, status_id = cell[0], cell[1], cell[2], cell[3]
+                if day < low or day > high:
+                    continue
+                if funds is not None and fund not in funds:
+                    continue
+                if status is not None and status_id != status:
+                    continue
+                if excluded is not None and (type_id is None or type_id in excluded):
+                    continue
+                yield cell
+
+    def total(self, start, end, **filters):
+        """Amount, gift count and large-gift counts for [start, end]."""
+        result = {'amount': 0.0, 'gifts': 0, 'gifts_10k': 0, 'gifts_100k': 0}
+        for cell in self.iter_cells(start, end, **filters):
+            result['amount'] += cell[4]
+            result['gifts'] += cell[5]
+            result['gifts_10k'] += cell[6]
+            result['gifts_100k'] += cell[7]
+        return result
+
+    def by_week(self, start, end, **filters):
+        """Totals for [start, end] grouped by Monday ('YYYY-MM-DD')."""
+        weeks = {}
+        for cell in self.iter_cells(start, end, **filters):
+            week = weeks.setdefault(self.monday_of(cell[0]),
+                                    {'amount': 0.0, 'gifts': 0, 'gifts_10k': 0, 'gifts_100k': 0})
+            week['amount'] += cell[4]
+            week['gifts'] += cell[5]
+            week['gifts_10k'] += cell[6]
+            week['gifts_100k'] += cell[7]
+        return weeks
+
+    def by_day(self, start, end, **filters):
+        """Amount and gifts per day. There are no givers here: they don't add
+        up across cells or days, use distinct_givers for a window."""
+        days = {}
+        for cell in self.iter_cells(start, end, **filters):
+            day = days.setdefault(cell[0], {'amount': 0.0, 'gifts': 0})
+            day['amount'] += cell[4]
+            day['gifts'] += cell[5]
+        return days
+
+    # ---------- distinct givers ----------
+
+    @staticmethod
+    def filter_sql(fund_ids=None, status=None, exclude_types=None):
+        clauses = []
+        if fund_ids is not None:
+            clauses.append("AND c.FundId IN ({})".format(','.join(str(int(f)) for f in fund_ids)))
+        if status is not None:
+            clauses.append("AND c.ContributionStatusId = {}".format(int(status)))
+        if exclude_types:
+            clauses.append("AND c.ContributionTypeId NOT IN ({})".format(','.join(str(int(t)) for t in exclude_types)))
+        return '\n                '.join(clauses)
+
+    @staticmethod
+    def filter_key(fund_ids=None, status=None, exclude_types=None):
+        return 'funds={}|status={}|exclude={}'.format(
+            ','.join(str(int(f)) for f in sorted(fund_ids)) if fund_ids is not None else '*',
+            status if status is not None else '*',
+            ','.join(str(int(t)) for t in sorted(exclude_types)) if exclude_types else '')
+
+    def load_week_givers(self):
+        if self.week_givers is None:
+            self.week_givers = {}
+            if GIVING_CUBE_PERSIST and not self.force_rebuild:
+                try:
+                    raw = model.TextContent(GIVING_CUBE_CONTENT_PREFIX + 'WeekGivers')
+                    if raw and raw.strip():
+                        data = json.loads(raw)
+                        if data.get('v') == GIVING_CUBE_VERSION:
+                            self.week_givers = data.get('filters', {})
+                except:
+                    self.week_givers = {}
+        return self.week_givers
+
+    def givers_by_week(self, start, end, fund_ids=None, status=None, exclude_types=None):
+        """Distinct givers per Monday for [start, end].
+
+        Weeks cut by the range edges are counted only inside the range, like a
+        grouped query over the same dates. Whole closed weeks are stored with
+        the generations of their months and recounted once those move.
+        """
+        start, end = self.as_date(start), self.as_date(end)
+        stored = self.load_week_givers().setdefault(
+            self.filter_key(fund_ids, status, exclude_types), {})
+        settled = self.settled_before()
+
+        mondays = []
+        monday = start - datetime.timedelta(days=start.weekday())
+        while monday <= end:
+            mondays.append(monday)
+            monday += datetime.timedelta(days=7)
+
+        def week_gens(monday):
+            return [self.month_gen(key) for key in self.month_keys(monday, monday + datetime.timedelta(days=6))]
+
+        result = {}
+        missing = []
+        for monday in mondays:
+            key = monday.isoformat()
+            whole = monday >= start and monday + datetime.timedelta(days=6) <= end
+            if whole and key in stored and stored[key][1] == week_gens(monday):
+                result[key] = stored[key][0]
+            else:
+                missing.append(monday)
+
+        changed = False
+        for run in self.runs(missing, lambda m: m + datetime.timedelta(days=7)):
+            run_start = max(run[0], start)
+            run_end = min(run[-1] + datetime.timedelta(days=6), end) + datetime.timedelta(days=1)
+            sql = '''
+                SELECT
+                    CONVERT(varchar(10), DATEADD(day,
+                        CASE
+                            WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6
+                            ELSE 2-DATEPART(weekday, c.ContributionDate)
+                        END,
+                        c.ContributionDate), 120) AS WeekStart,
+                    COUNT(DISTINCT c.PeopleId) AS Givers
+                FROM Contribution c WITH (NOLOCK)
+                WHERE c.ContributionDate >= '{}'
+                AND c.ContributionDate < '{}'
+                {}
+                GROUP BY CONVERT(varchar(10), DATEADD(day,
+                        CASE
+                            WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6
+                            ELSE 2-DATEPART(weekday, c.ContributionDate)
+                        END,
+                        c.ContributionDate), 120)
+            '''.format(run_start.strftime('%Y-%m-%d'), run_end.strftime('%Y-%m-%d'),
+                       self.filter_sql(fund_ids, status, exclude_types))
+            counts = dict((str(row.WeekStart), int(row.Givers or 0)) for row in q.QuerySql(sql))
+            for monday in run:
+                key = monday.isoformat()
+                result[key] = counts.get(key, 0)
+                sunday = monday + datetime.timedelta(days=6)
+                if GIVING_CUBE_PERSIST and monday >= start and sunday <= end and sunday < settled:
+                    stored[key] = [result[key], week_gens(monday)]
+                    changed = True
+
+        if changed and GIVING_CUBE_PERSIST:
+            try:
+                model.WriteContentText(GIVING_CUBE_CONTENT_PREFIX + 'WeekGivers', json.dumps({
+                    'v': GIVING_CUBE_VERSION,
+                    'filters': self.week_givers
+                }), '')
+            except Exception as e:
+                print "<!-- Error saving weekly giver counts: {} -->".format(str(e))
+        self.save_meta()
+
+        # Weeks without gifts are left out, as a grouped query would
+        return dict((k, v) for k, v in result.items() if v)
+
+    def distinct_givers(self, start, end, fund_ids=None, status=None, exclude_types=None):
+        """Distinct givers for [start, end]; Monday-Sunday windows use the weekly store."""
+        start, end = self.as_date(start), self.as_date(end)
+        if start.weekday() == 0 and end == start + datetime.timedelta(days=6):
+            return self.givers_by_week(start, end, fund_ids, status, exclude_types).get(start.isoformat(), 0)
+
+        key = (start, end, self.filter_key(fund_ids, status, exclude_types))
+        if key not in self.giver_counts:
+            sql = '''
+                SELECT COUNT(DISTINCT c.PeopleId) AS Givers
+                FROM Contribution c WITH (NOLOCK)
+                WHERE c.ContributionDate >= '{}'
+                AND c.ContributionDate < '{}'
+                {}
+            '''.format(start.strftime('%Y-%m-%d'),
+                       (end + datetime.timedelta(days=1)).strftime('%Y-%m-%d'),
+                       self.filter_sql(fund_ids, status, exclude_types))
+            row = q.QuerySqlTop1(sql)
+            self.giver_counts[key] = int(row.Givers or 0) if row else 0
+        return self.giver_counts[key]
+
+
+giving_cube = GivingCube()
+
 # Debug output at the very start
 print "<!-- Dashboard script starting -->"
 print "<!-- Has action: %s -->" % (hasattr(model.Data, 'action') if hasattr(model, 'Data') else 'No Data')
@@ -235,6 +840,10 @@ ACTIVE_FUND_IDS, FUND_SQL_CLAUSE = get_fund_ids()
 print "<!-- Active Fund IDs: {} -->".format(ACTIVE_FUND_IDS)
 print "<!-- Fund SQL Clause: {} -->".format(FUND_SQL_CLAUSE)
 
+# &rebuild_cube=1 re-reads stored giving cube months from Contribution
+if hasattr(model, 'Data') and hasattr(model.Data, 'rebuild_cube') and str(model.Data.rebuild_cube) in ('1', 'true', 'yes'):
+    giving_cube.force_rebuild = True
+
 # Handle attendance fetch request for modal (MUST BE FIRST)
 # Check both Data (POST) and QueryString (GET) for parameters
 fetch_attendance = False
@@ -529,21 +1138,7 @@ if fetch_attendance:
                 week_end = sunday_dt
                 
                 # Get total contributions for all funds except non-contributions
-                total_sql = '''
-                SELECT ISNULL(SUM(c.ContributionAmount), 0) as Total
-                FROM Contribution c
-                WHERE c.ContributionDate >= '{}'
-                AND c.ContributionDate <= '{}'
-                AND c.ContributionTypeId NOT IN (99)
-                '''.format(week_start.strftime('%Y-%m-%d'), week_end.strftime('%Y-%m-%d'))
-                
-                total_result = q.QuerySql(total_sql)
-                total_with_restricted = 0
-                if total_result and len(total_result) > 0:
-                    for row in total_result:
-                        if hasattr(row, 'Total') and row.Total is not None:
-                            total_with_restricted = float(row.Total)
-                            break
+                total_with_restricted = giving_cube.total(week_start, week_end, exclude_types=(99,))['amount']
                 
                 print "<!-- Total Including Restricted: %s -->" % int(total_with_restricted)
                 print "<div id='totalRestricted' style='display:none;'>%s</div>" % int(total_with_restricted)
@@ -748,22 +1343,10 @@ if not attendance_fetched and not note_saved:
             
             date_range = '{}/{} - {}/{}/{}'.format(start_parts[0], start_parts[1], end_parts[0], end_parts[1], end_year)
             
-            # Query for actual contribution data for this week
-            week_sql = '''
-                SELECT 
-                    COUNT(DISTINCT c.PeopleId) as GiverCount,
-                    COUNT(c.ContributionId) as GiftCount,
-                    ISNULL(SUM(c.ContributionAmount), 0) as TotalAmount,
-                    ISNULL(AVG(c.ContributionAmount), 0) as AvgGift
-                FROM Contribution c
-                WHERE c.ContributionDate >= '{}'
-                AND c.ContributionDate <= '{}'
-                AND c.FundId {}
-                AND c.ContributionStatusId = 0
-                AND c.ContributionTypeId NOT IN (6,7,8)
-            '''.format(start_date_corrected, end_date_corrected, FUND_SQL_CLAUSE)
+            # Week filters: posted gifts to the dashboard funds, excluding types 6, 7 and 8
+            week_filters = {'fund_ids': ACTIVE_FUND_IDS, 'status': 0, 'exclude_types': (6, 7, 8)}
 
-            print "<p>Executing week data query...</p>"
+            print "<p>Slicing week data from giving cube...</p>"
             print "<p>Query dates: %s to %s</p>" % (start_date_corrected, end_date_corrected)
             print "<p>Fund IDs: %s</p>" % (ACTIVE_FUND_IDS)
             
@@ -809,25 +1392,24 @@ if not attendance_fetched and not note_saved:
                 print "<p>Debug: q is None: %s</p>" % (q is None)
                 print "<p>Debug: hasattr(q, 'QuerySql'): %s</p>" % (hasattr(q, 'QuerySql'))
                 
-                # Execute week data query
+                # Slice week data from the giving cube
                 try:
                     # Check if q is actually available
                     if q is None:
                         raise Exception("Query object (q) is None")
                     if not hasattr(q, 'QuerySql'):
                         raise Exception("q object does not have QuerySql method")
-                    week_data = q.QuerySql(week_sql)
-                    print "<p>Week data query executed successfully</p>"
-                    if week_data and len(week_data) > 0:
-                        week_total = week_data[0].TotalAmount if hasattr(week_data[0], 'TotalAmount') and week_data[0].TotalAmount else 0
-                        giver_count = week_data[0].GiverCount if hasattr(week_data[0], 'GiverCount') and week_data[0].GiverCount else 0
-                        avg_gift = week_data[0].AvgGift if hasattr(week_data[0], 'AvgGift') and week_data[0].AvgGift else 0
+                    week_data = giving_cube.total(start_date_corrected, end_date_corrected, **week_filters)
+                    print "<p>Week data loaded successfully</p>"
+                    if week_data['gifts'] > 0:
+                        week_total = week_data['amount']
+                        giver_count = giving_cube.distinct_givers(start_date_corrected, end_date_corrected, **week_filters)
+                        avg_gift = week_total / week_data['gifts']
                         print "<p>Found data - Total: $%.2f, Givers: %s</p>" % (week_total, giver_count)
                     else:
                         print "<p style='color:orange;'>Warning: No week data returned</p>"
                 except Exception as e:
-                    print "<p style='color:red;'>Error executing week query: %s</p>" % (str(e))
-                    print "<p style='color:red;'>Query was: %s</p>" % (week_sql.replace('\n', ' ')[:200])
+                    print "<p style='color:red;'>Error loading week data: %s</p>" % (str(e))
                     week_data = None
             
             # Add debug info about the query
@@ -856,32 +1438,19 @@ if not attendance_fetched and not note_saved:
             else:  # Jan-Sep
                 fiscal_start = '{}-10-01'.format(start_year - 1)
                 
-            # Get fiscal year data from the dashboard 
+            # Get fiscal year data from the dashboard
             # We need to pull budget, YTD, and comparison data
-            fiscal_ytd_sql = '''
-                SELECT 
-                    SUM(c.ContributionAmount) as YTDTotal
-                FROM Contribution c
-                WHERE c.ContributionDate >= '{}'
-                AND c.ContributionDate <= '{}'
-                AND c.FundId {}
-                AND c.ContributionTypeId NOT IN (99)
-            '''.format(fiscal_start, end_date_corrected, FUND_SQL_CLAUSE)
-            
-            # Skip YTD query if we already have the value
+            # Skip YTD if we already have the value
             if ytdTotal is None:
-                print "<p>Executing YTD query...</p>"
+                print "<p>Slicing YTD from giving cube...</p>"
                 try:
-                    ytd_data = q.QuerySql(fiscal_ytd_sql)
-                    print "<p>YTD query executed successfully</p>"
-                    if ytd_data and len(ytd_data) > 0:
-                        ytd_total = ytd_data[0].YTDTotal if hasattr(ytd_data[0], 'YTDTotal') and ytd_data[0].YTDTotal else 0
-                        print "<p>YTD Total: $%.2f</p>" % (ytd_total)
-                    else:
-                        ytd_total = 0
+                    ytd_total = giving_cube.total(fiscal_start, end_date_corrected,
+                                                  fund_ids=ACTIVE_FUND_IDS, exclude_types=(99,))['amount']
+                    print "<p>YTD Total: $%.2f</p>" % (ytd_total)
+                    if ytd_total == 0:
                         print "<p style='color:orange;'>Warning: No YTD data found</p>"
                 except Exception as e:
-                    print "<p style='color:red;'>Error executing YTD query: %s</p>" % (str(e))
+                    print "<p style='color:red;'>Error loading YTD data: %s</p>" % (str(e))
                     ytd_total = 0
             
             # Calculate weeks elapsed in fiscal year
@@ -1034,15 +1603,6 @@ if not attendance_fetched and not note_saved:
                 AND BundleHeaderTypeId = 7
                 """.format(start_date_sql, end_date_sql)
                 
-                # Get total contributions for all funds (including restricted) but exclude non-contributions
-                total_sql = '''
-                SELECT ISNULL(SUM(c.ContributionAmount), 0) as Total
-                FROM Contribution c
-                WHERE c.ContributionDate >= '{}'
-                AND c.ContributionDate <= '{}'
-                AND c.ContributionTypeId NOT IN (99)
-                '''.format(start_date_sql, end_date_sql)
-                
                 print "<p>Executing online giving query for dates %s to %s</p>" % (start_date_sql, end_date_sql)
                 print "<p>Online SQL: %s</p>" % (online_sql.replace('\n', ' '))
                 
@@ -1070,21 +1630,10 @@ if not attendance_fetched and not note_saved:
                             
                     print "<p>Final Online Total: $%.2f</p>" % (online_amount)
                     
-                    # Get total contributions
-                    total_data = q.QuerySql(total_sql)
-                    if total_data and len(total_data) > 0:
-                        total_with_restricted = 0.0
-                        try:
-                            for row in total_data:
-                                if hasattr(row, 'Total') and row.Total is not None:
-                                    total_with_restricted = float(row.Total)
-                                    print "<p>Total Including Restricted: $%.2f</p>" % (total_with_restricted)
-                                    break  # Only need the first row
-                        except Exception as e:
-                            print "<p style='color:red;'>Error accessing total data: %s</p>" % (str(e))
-                            total_with_restricted = 0.0
-                    else:
-                        total_with_restricted = 0.0
+                    # Get total contributions for all funds (including restricted) but exclude non-contributions
+                    total_with_restricted = giving_cube.total(start_date_corrected, end_date_corrected,
+                                                              exclude_types=(99,))['amount']
+                    print "<p>Total Including Restricted: $%.2f</p>" % (total_with_restricted)
                         
                 except Exception as e:
                     print "<p style='color:red;'>Error executing online query: %s</p>" % (str(e))
@@ -1103,48 +1652,24 @@ if not attendance_fetched and not note_saved:
             # Calculate previous year comparison data
             # If sending email and we don't have PY data, query for it
             if send_email and (pyContrib is None or pyContrib == 0 or pyYTD is None or pyYTD == 0):
-                # Get prior year week data
-                py_week_sql = '''
-                    SELECT ISNULL(SUM(c.ContributionAmount), 0) as TotalAmount
-                    FROM Contribution c
-                    WHERE c.ContributionDate >= DATEADD(YEAR, -1, '{}')
-                    AND c.ContributionDate <= DATEADD(YEAR, -1, '{}')
-                    AND c.FundId {}
-                    AND c.ContributionStatusId = 0
-                    AND c.ContributionTypeId NOT IN (6,7,8)
-                '''.format(start_date_corrected, end_date_corrected, FUND_SQL_CLAUSE)
-                
-                print "<p>Executing prior year week query...</p>"
+                # Get prior year week data (same dates one year back)
+                print "<p>Slicing prior year week from giving cube...</p>"
                 try:
-                    py_week_data = q.QuerySql(py_week_sql)
-                    if py_week_data and len(py_week_data) > 0:
-                        pyContrib = float(py_week_data[0].TotalAmount) if py_week_data[0].TotalAmount else 0.0
-                        print "<p>Prior Year Week Total: $%.2f</p>" % (pyContrib)
-                    else:
-                        pyContrib = 0.0
+                    pyContrib = giving_cube.total(GivingCube.years_back(start_date_corrected),
+                                                  GivingCube.years_back(end_date_corrected),
+                                                  **week_filters)['amount']
+                    print "<p>Prior Year Week Total: $%.2f</p>" % (pyContrib)
                 except Exception as e:
                     print "<p style='color:red;'>Error getting prior year week data: %s</p>" % (str(e))
                     pyContrib = 0.0
                 
                 # Get prior year YTD
-                py_ytd_sql = '''
-                    SELECT ISNULL(SUM(c.ContributionAmount), 0) as YTDTotal
-                    FROM Contribution c
-                    WHERE c.ContributionDate >= DATEADD(YEAR, -1, '{}')
-                    AND c.ContributionDate <= DATEADD(YEAR, -1, '{}')
-                    AND c.FundId {}
-                    AND c.ContributionStatusId = 0
-                    AND c.ContributionTypeId NOT IN (6,7,8)
-                '''.format(fiscal_start, end_date_corrected, FUND_SQL_CLAUSE)
-                
-                print "<p>Executing prior year YTD query...</p>"
+                print "<p>Slicing prior year YTD from giving cube...</p>"
                 try:
-                    py_ytd_data = q.QuerySql(py_ytd_sql)
-                    if py_ytd_data and len(py_ytd_data) > 0:
-                        pyYTD = float(py_ytd_data[0].YTDTotal) if py_ytd_data[0].YTDTotal else 0.0
-                        print "<p>Prior Year YTD Total: $%.2f</p>" % (pyYTD)
-                    else:
-                        pyYTD = 0.0
+                    pyYTD = giving_cube.total(GivingCube.years_back(fiscal_start),
+                                              GivingCube.years_back(end_date_corrected),
+                                              **week_filters)['amount']
+                    print "<p>Prior Year YTD Total: $%.2f</p>" % (pyYTD)
                 except Exception as e:
                     print "<p style='color:red;'>Error getting prior year YTD data: %s</p>" % (str(e))
                     pyYTD = 0.0
@@ -2782,48 +3307,10 @@ if not attendance_fetched and not note_saved:
                         trend_weeks = max(1, int(weeks_since_start))
                     
                     # Get contributions for trend analysis
-                    total_sql = '''
-                    SELECT ISNULL(SUM(ContributionAmount), 0) AS Total12Weeks
-                    FROM Contribution
-                    WHERE FundId {}
-                        AND ContributionStatusId = 0
-                        AND ContributionDate >= '{}'
-                        AND ContributionDate <= '{}'
-                    '''.format(FUND_SQL_CLAUSE, trend_start_date, trend_end_date)
-                    
-                    error_location = 'executing query for dates {} to {}'.format(trend_start_date, trend_end_date)
-                    total_result = q.QuerySql(total_sql)
-                    error_location = 'after query'
-                    
-                    # Default values
-                    total_12_weeks = 0
-                    avg_weekly = 0
-                    
-                    error_location = 'processing result'
-                    
-                    # Process total for trend period
-                    if total_result and len(total_result) > 0:
-                        try:
-                            row = total_result[0]
-                            
-                            # Try to access using the alias we defined
-                            if hasattr(row, 'Total12Weeks'):
-                                total_12_weeks = float(row.Total12Weeks) if row.Total12Weeks else 0
-                                avg_weekly = total_12_weeks / trend_weeks if total_12_weeks > 0 else 0
-                            else:
-                                # Fallback: try accessing by index
-                                try:
-                                    val = row[0] if hasattr(row, '__getitem__') else row
-                                    total_12_weeks = float(val) if val is not None else 0
-                                    avg_weekly = total_12_weeks / trend_weeks if total_12_weeks > 0 else 0
-                                except:
-                                    total_12_weeks = 0
-                                    avg_weekly = 0
-                                        
-                        except Exception as inner_e:
-                            # Silently handle error, already have default values
-                            total_12_weeks = 0
-                            avg_weekly = 0
+                    error_location = 'slicing giving cube for dates {} to {}'.format(trend_start_date, trend_end_date)
+                    total_12_weeks = giving_cube.total(trend_start_date, trend_end_date,
+                                                       fund_ids=ACTIVE_FUND_IDS, status=0)['amount']
+                    avg_weekly = total_12_weeks / trend_weeks if total_12_weeks > 0 else 0
                     
                     error_location = 'checking data availability'
                     # Lower threshold - just need some data to make a forecast
@@ -2845,66 +3332,15 @@ if not attendance_fetched and not note_saved:
                         # Step 2: Get YTD total - use the known working query from weekly contributions
                         today_str = today.strftime('%Y-%m-%d')
                         
-                        # This is the exact query that works in the weekly contributions tab
-                        ytd_sql = '''
-                        WITH WeeklyContributions AS (
-                            SELECT SUM(ContributionAmount) as Total
-                            FROM Contribution WITH (NOLOCK)
-                            WHERE FundId {}
-                                AND ContributionStatusId = 0
-                                AND ContributionDate >= '{}'
-                                AND ContributionDate < DATEADD(day, 1, GETDATE())
-                        )
-                        SELECT COALESCE(Total, 0) AS YTDTotal FROM WeeklyContributions
-                        '''.format(FUND_SQL_CLAUSE, FISCAL_YEAR_START)
-                        
-                        error_location = 'executing YTD query from {} to {}'.format(FISCAL_YEAR_START, today_str)
+                        # Same slice the weekly contributions tab uses
+                        error_location = 'slicing YTD from {} to {}'.format(FISCAL_YEAR_START, today_str)
                         ytd_total = 0
                         try:
-                            ytd_result = q.QuerySql(ytd_sql)
-                            error_location = 'processing YTD result'
-                            if ytd_result and len(ytd_result) > 0:
-                                row = ytd_result[0]
-                                # Try to access using the alias we defined
-                                if hasattr(row, 'YTDTotal'):
-                                    ytd_total = float(row.YTDTotal) if row.YTDTotal else 0
-                                else:
-                                    # Fallback: try accessing by index
-                                    if hasattr(row, '__getitem__'):
-                                        val = row[0]
-                                    else:
-                                        val = row
-                                    if val is not None:
-                                        ytd_total = float(val)
+                            ytd_total = giving_cube.total(FISCAL_YEAR_START, today_str,
+                                                          fund_ids=ACTIVE_FUND_IDS, status=0)['amount']
                         except Exception as e:
-                            error_location = 'YTD query error: {}'.format(str(e))
-                        
-                        # If YTD is 0, try alternative approaches
-                        if ytd_total == 0:
-                            # Try getting YTD from the main dashboard data if available
-                            try:
-                                # Look for YTD in the weekly contributions tab data
-                                weekly_sql = '''
-                                SELECT SUM(Contributed) as YTDTotal
-                                FROM (
-                                    SELECT COALESCE(SUM(c.ContributionAmount), 0) as Contributed
-                                    FROM Contribution c
-                                    WHERE c.FundId {}
-                                        AND c.ContributionStatusId = 0
-                                        AND c.ContributionDate >= '{}'
-                                ) t
-                                '''.format(FUND_SQL_CLAUSE, FISCAL_YEAR_START)
-                                
-                                weekly_result = q.QuerySql(weekly_sql)
-                                if weekly_result and len(weekly_result) > 0:
-                                    row = weekly_result[0]
-                                    if hasattr(row, 'YTDTotal'):
-                                        ytd_total = float(row.YTDTotal) if row.YTDTotal else 0
-                                    elif hasattr(row, '__getitem__'):
-                                        ytd_total = float(row[0]) if row[0] else 0
-                            except:
-                                pass
-                        
+                            error_location = 'YTD slice error: {}'.format(str(e))
+
                         # If YTD is still 0 but we have trend data, calculate YTD from trend
                         if ytd_total == 0 and total_12_weeks > 0:
                             # Estimate YTD based on weeks elapsed * weekly average
@@ -4776,132 +5212,49 @@ if not attendance_fetched and not note_saved:
         if special_periods:
             print('<!-- Special periods: {} -->'.format(', '.join([p['week_key'] for p in special_periods[:5]])))
         
-        # STEP 2: Execute simple grouped queries for ALL weeks - use Sunday-based grouping
-        # Execute 2 optimized SQL queries - Current Fiscal Year
-        # SQL grouping: Monday as week start (weekday = 2 in SQL Server)
-        # DATEPART(weekday) returns 1=Sunday, 2=Monday, etc.
-        # To get Monday as start: DATEADD(day, 2-DATEPART(weekday, date), date)
-        sql_current = '''
-        SELECT 
-            -- Group by the Monday BEFORE or same day (not Monday after)
-            -- If Sunday (weekday=1), subtract 6 to get previous Monday
-            -- If Monday (weekday=2), subtract 0 to stay on Monday
-            -- If other days, subtract (weekday-2) to get to Monday
-            DATEADD(day, 
-                CASE 
-                    WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6  -- Sunday -> previous Monday
-                    ELSE 2-DATEPART(weekday, c.ContributionDate)  -- Other days -> Monday of same week
-                END, 
-                c.ContributionDate) AS WeekStart,
-            SUM(c.ContributionAmount) AS Contributed,
-            COUNT(DISTINCT c.PeopleId) AS UniqueGivers,
-            COUNT(*) AS NumGifts,
-            AVG(c.ContributionAmount) AS AvgGift,
-            SUM(CASE WHEN c.ContributionAmount >= 10000 AND c.ContributionAmount < 100000 THEN 1 ELSE 0 END) AS Gifts10kto99k,
-            SUM(CASE WHEN c.ContributionAmount >= 100000 THEN 1 ELSE 0 END) AS Gifts100kPlus
-        FROM Contribution c WITH (NOLOCK)
-        WHERE c.FundId {}
-            AND c.ContributionStatusId = 0
-            AND c.ContributionDate >= '{}'
-            AND c.ContributionDate <= '{}'
-        GROUP BY DATEADD(day, 
-                CASE 
-                    WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6
-                    ELSE 2-DATEPART(weekday, c.ContributionDate)
-                END, 
-                c.ContributionDate)
-        ORDER BY WeekStart
-        '''.format(FUND_SQL_CLAUSE, fy_start.strftime('%Y-%m-%d'), fy_end.strftime('%Y-%m-%d'))
-        
-        # Execute 2 optimized SQL queries - Prior Fiscal Year  
-        sql_prior = '''
-        SELECT 
-            -- Same week grouping logic as current year
-            DATEADD(day, 
-                CASE 
-                    WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6  -- Sunday -> previous Monday
-                    ELSE 2-DATEPART(weekday, c.ContributionDate)  -- Other days -> Monday of same week
-                END, 
-                c.ContributionDate) AS WeekStart,
-            SUM(c.ContributionAmount) AS PYContributed,
-            COUNT(DISTINCT c.PeopleId) AS PYUniqueGivers,
-            SUM(c.ContributionAmount) AS PYTotalGiving
-        FROM Contribution c WITH (NOLOCK)
-        WHERE c.FundId {}
-            AND c.ContributionStatusId = 0
-            AND c.ContributionDate >= '{}'
-            AND c.ContributionDate <= '{}'
-        GROUP BY DATEADD(day, 
-                CASE 
-                    WHEN DATEPART(weekday, c.ContributionDate) = 1 THEN -6
-                    ELSE 2-DATEPART(weekday, c.ContributionDate)
-                END, 
-                c.ContributionDate)
-        ORDER BY WeekStart
-        '''.format(FUND_SQL_CLAUSE, py_fiscal_start.strftime('%Y-%m-%d'), py_fiscal_end.strftime('%Y-%m-%d'))
-        
+        # STEP 2: Slice weekly totals for both fiscal years from the giving cube
+        # Weeks are grouped on their Monday, as the weekly report always has been
         contributions_raw = []
         py_contributions_raw = []
-        
+
         try:
-            print('<!-- Executing SQL queries for all weeks -->')
+            print('<!-- Slicing weekly totals from giving cube -->')
             print('<!-- FY Start: {}, FY End: {} -->'.format(fy_start.strftime('%Y-%m-%d'), fy_end.strftime('%Y-%m-%d')))
             print('<!-- FUND_SQL_CLAUSE: {} -->'.format(FUND_SQL_CLAUSE))
-            
-            # First, let's check if there's ANY data in the database
-            test_sql = '''
-            SELECT TOP 10
-                c.ContributionDate, 
-                c.ContributionAmount,
-                c.FundId
-            FROM Contribution c WITH (NOLOCK)
-            WHERE c.ContributionStatusId = 0
-            ORDER BY c.ContributionDate DESC
-            '''
-            try:
-                test_results = q.QuerySql(test_sql)
-                if test_results and len(test_results) > 0:
-                    print('<!-- Test query found {} recent contributions -->'.format(len(test_results)))
-                    # Don't try to display individual results - just count
-            except Exception as e:
-                print('<!-- Error running test query: {} -->'.format(str(e)))
-                
-                # Also check what funds are in use
-                fund_sql = '''
-                SELECT DISTINCT TOP 10 c.FundId, COUNT(*) as cnt
-                FROM Contribution c WITH (NOLOCK)
-                WHERE c.ContributionStatusId = 0
-                    AND c.ContributionDate >= DATEADD(day, -90, GETDATE())
-                GROUP BY c.FundId
-                ORDER BY cnt DESC
-                '''
-                try:
-                    fund_results = q.QuerySql(fund_sql)
-                    if fund_results:
-                        print('<!-- Found {} active funds -->'.format(len(fund_results)))
-                except Exception as e:
-                    print('<!-- Error checking funds: {} -->'.format(str(e)))
-            else:
-                print('<!-- WARNING: No contribution data found in database! -->')
-            
-            contributions_raw = q.QuerySql(sql_current)
-            py_contributions_raw = q.QuerySql(sql_prior)
-            print('<!-- Query results: CY {} rows, PY {} rows -->'.format(len(contributions_raw) if contributions_raw else 0, len(py_contributions_raw) if py_contributions_raw else 0))
-            
-            # Debug first few results
-            if contributions_raw and len(contributions_raw) > 0:
-                try:
-                    first_row = contributions_raw[0]
-                    print('<!-- First CY row has WeekStart: {} -->'.format(hasattr(first_row, 'WeekStart')))
-                    if hasattr(first_row, 'WeekStart'):
-                        print('<!-- WeekStart type: {} -->'.format(type(first_row.WeekStart).__name__))
-                except Exception as debug_e:
-                    print('<!-- Error accessing first row: {} -->'.format(str(debug_e)))
+
+            # Load both fiscal years together (only open or missing months read Contribution)
+            giving_cube.ensure(py_fiscal_start, fy_end)
+
+            cy_weeks = giving_cube.by_week(fy_start, fy_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+            cy_givers = giving_cube.givers_by_week(fy_start, fy_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+            for monday in sorted(cy_weeks.keys()):
+                week = cy_weeks[monday]
+                contributions_raw.append(CubeWeek(
+                    monday,
+                    Contributed=week['amount'],
+                    UniqueGivers=cy_givers.get(monday, 0),
+                    NumGifts=week['gifts'],
+                    AvgGift=week['amount'] / week['gifts'] if week['gifts'] else 0,
+                    Gifts10kto99k=week['gifts_10k'],
+                    Gifts100kPlus=week['gifts_100k']
+                ))
+
+            py_weeks = giving_cube.by_week(py_fiscal_start, py_fiscal_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+            py_givers = giving_cube.givers_by_week(py_fiscal_start, py_fiscal_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+            for monday in sorted(py_weeks.keys()):
+                week = py_weeks[monday]
+                py_contributions_raw.append(CubeWeek(
+                    monday,
+                    PYContributed=week['amount'],
+                    PYUniqueGivers=py_givers.get(monday, 0),
+                    PYTotalGiving=week['amount']
+                ))
+            print('<!-- Cube results: CY {} weeks, PY {} weeks -->'.format(len(contributions_raw), len(py_contributions_raw)))
         except Exception as e:
-            print('<!-- Error executing queries: {} -->'.format(str(e)))
+            print('<!-- Error slicing giving cube: {} -->'.format(str(e)))
             contributions_raw = []
             py_contributions_raw = []
-        
+
         # STEP 3: Handle special periods differently - include them in the main query
         # Instead of separate queries, we'll extract special period data from the daily results
         special_contributions = {}
@@ -4917,66 +5270,10 @@ if not attendance_fetched and not note_saved:
             except NameError:
                 print('<!-- ERROR: q object is not available! -->'.format())
             
-            # Get all daily contributions for the fiscal year
-            daily_sql = '''
-            SELECT 
-                c.ContributionDate AS Date,
-                SUM(c.ContributionAmount) AS Amount,
-                COUNT(DISTINCT c.PeopleId) AS Givers,
-                COUNT(*) AS Gifts
-            FROM Contribution c WITH (NOLOCK)
-            WHERE c.FundId {}
-                AND c.ContributionStatusId = 0
-                AND c.ContributionDate >= '{}'
-                AND c.ContributionDate <= '{}'
-            GROUP BY c.ContributionDate
-            ORDER BY c.ContributionDate
-            '''.format(FUND_SQL_CLAUSE, fy_start.strftime('%Y-%m-%d'), fy_end.strftime('%Y-%m-%d'))
-            
+            # Daily totals for the fiscal year come from the giving cube
             try:
-                print('<!-- About to execute daily SQL query for special periods -->')
-                print('<!-- SQL Query: {} -->'.format(daily_sql[:200]))  # Show first 200 chars of query
-                daily_results = q.QuerySql(daily_sql)
-                print('<!-- Got {} days of contribution data -->'.format(len(daily_results) if daily_results else 0))
-                
-                # Build a lookup of daily data
-                daily_data = {}
-                if daily_results:
-                    for day_row in daily_results:
-                        try:
-                            if hasattr(day_row, 'Date'):
-                                # Debug the raw date value
-                                raw_date = str(day_row.Date)
-                                date_part = raw_date.split(' ')[0]
-                                
-                                # Convert MM/DD/YYYY to YYYY-MM-DD format
-                                # TouchPoint returns dates in MM/DD/YYYY format
-                                if '/' in date_part:
-                                    # Parse MM/DD/YYYY
-                                    parts = date_part.split('/')
-                                    if len(parts) == 3:
-                                        month = parts[0].zfill(2)
-                                        day = parts[1].zfill(2)
-                                        year = parts[2]
-                                        date_key = '%s-%s-%s' % (year, month, day)  # Use Python 2.7 string formatting
-                                    else:
-                                        date_key = date_part
-                                else:
-                                    date_key = date_part
-                                
-                                daily_data[date_key] = {
-                                    'amount': float(day_row.Amount) if hasattr(day_row, 'Amount') and day_row.Amount else 0,
-                                    'givers': int(day_row.Givers) if hasattr(day_row, 'Givers') and day_row.Givers else 0,
-                                    'gifts': int(day_row.Gifts) if hasattr(day_row, 'Gifts') and day_row.Gifts else 0
-                                }
-                                # Debug output for first few records
-                                if len(daily_data) <= 3:
-                                    print('<!-- Daily data added: raw_date={}, converted_key={}, amount={} -->'.format(
-                                        date_part, date_key, daily_data[date_key]['amount']
-                                    ))
-                        except Exception as parse_error:
-                            print('<!-- Error parsing daily row: {} -->'.format(str(parse_error)))
-                
+                daily_data = giving_cube.by_day(fy_start, fy_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+
                 print('<!-- Built daily lookup with {} days -->'.format(len(daily_data)))
                 if daily_data:
                     # Show first few dates for debugging
@@ -5013,9 +5310,11 @@ if not attendance_fetched and not note_saved:
                             day = daily_data[date_str]
                             contributed_value += day['amount']
                             num_gifts += day['gifts']
-                            # For unique givers, we'll sum them (approximation since we can't track unique across days)
-                            unique_givers_count += day['givers']
                         current_date += datetime.timedelta(days=1)
+
+                    # Givers don't add up across days, so count them for the whole period
+                    unique_givers_count = giving_cube.distinct_givers(
+                        period['period_start'], period['period_end'], fund_ids=ACTIVE_FUND_IDS, status=0)
                     
                     # Debug output
                     print('<!-- Special period {}: checked dates {}, found data on {} -->'.format(
@@ -5047,62 +5346,11 @@ if not attendance_fetched and not note_saved:
                 
                 # Also handle previous year special periods
                 if special_periods and py_fiscal_start and py_fiscal_end:
-                    # Get daily data for previous year
-                    # Include actual contribution dates, not week-grouped dates
-                    # This ensures we get all contributions for special periods
-                    py_daily_sql = '''
-                    SELECT 
-                        c.ContributionDate AS Date,
-                        SUM(c.ContributionAmount) AS Amount,
-                        COUNT(DISTINCT c.PeopleId) AS Givers,
-                        COUNT(*) AS Gifts
-                    FROM Contribution c WITH (NOLOCK)
-                    WHERE c.FundId {}
-                        AND c.ContributionStatusId = 0
-                        AND c.ContributionDate >= '{}'
-                        AND c.ContributionDate <= '{}'
-                    GROUP BY c.ContributionDate
-                    ORDER BY c.ContributionDate
-                    '''.format(FUND_SQL_CLAUSE, py_fiscal_start.strftime('%Y-%m-%d'), py_fiscal_end.strftime('%Y-%m-%d'))
-                    
+                    # Daily totals for the previous year come from the giving cube
                     try:
                         print('<!-- Getting PY daily data for special periods -->')
-                        py_daily_results = q.QuerySql(py_daily_sql)
-                        py_daily_data = {}
-                        if py_daily_results:
-                            print('<!-- Got {} PY daily results -->'.format(len(py_daily_results)))
-                            for day_row in py_daily_results:
-                                try:
-                                    if hasattr(day_row, 'Date'):
-                                        raw_date = str(day_row.Date)
-                                        date_part = raw_date.split(' ')[0]
-                                        
-                                        # Convert MM/DD/YYYY to YYYY-MM-DD format
-                                        if '/' in date_part:
-                                            parts = date_part.split('/')
-                                            if len(parts) == 3:
-                                                month = parts[0].zfill(2)
-                                                day = parts[1].zfill(2)
-                                                year = parts[2]
-                                                date_key = '%s-%s-%s' % (year, month, day)  # Use Python 2.7 string formatting
-                                            else:
-                                                date_key = date_part
-                                        else:
-                                            date_key = date_part
-                                        
-                                        py_daily_data[date_key] = {
-                                            'amount': float(day_row.Amount) if hasattr(day_row, 'Amount') and day_row.Amount else 0,
-                                            'givers': int(day_row.Givers) if hasattr(day_row, 'Givers') and day_row.Givers else 0,
-                                            'gifts': int(day_row.Gifts) if hasattr(day_row, 'Gifts') and day_row.Gifts else 0
-                                        }
-                                        # Debug output for first few PY records
-                                        if len(py_daily_data) <= 3:
-                                            print('<!-- PY data added: raw={}, key={}, amt=${} -->'.format(
-                                                date_part, date_key, py_daily_data[date_key]['amount']
-                                            ))
-                                except:
-                                    pass
-                        
+                        py_daily_data = giving_cube.by_day(py_fiscal_start, py_fiscal_end, fund_ids=ACTIVE_FUND_IDS, status=0)
+
                         # Show what PY dates we have
                         if py_daily_data:
                             py_dates_sample = sorted(py_daily_data.keys())[:5]
@@ -5126,9 +5374,10 @@ if not attendance_fetched and not note_saved:
                                         dates_found.append(date_str)
                                         day_amount = py_daily_data[date_str]['amount']
                                         py_contributed += day_amount
-                                        py_givers += py_daily_data[date_str]['givers']
                                         py_gifts += py_daily_data[date_str]['gifts']
                                     py_current_date += datetime.timedelta(days=1)
+                                py_givers = giving_cube.distinct_givers(
+                                    period['py_start'], period['py_end'], fund_ids=ACTIVE_FUND_IDS, status=0)
                                 
                                 # Debug output for key special periods
                                 if period['week_key'] in ['2024-10-01', '2024-12-23', '2025-01-01']:
@@ -6060,22 +6309,9 @@ if not attendance_fetched and not note_saved:
                 # This will be passed to the modal instead of fetching via AJAX
                 week_total_with_restricted = 0
                 if not is_future_week:
-                    # Query for total including all funds except ContributionTypeId 99
+                    # Total including all funds except ContributionTypeId 99
                     try:
-                        total_restricted_sql = '''
-                        SELECT ISNULL(SUM(c.ContributionAmount), 0) as Total
-                        FROM Contribution c
-                        WHERE c.ContributionDate >= '{}'
-                        AND c.ContributionDate <= '{}'
-                        AND c.ContributionTypeId NOT IN (99)
-                        '''.format(dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
-                        
-                        total_result = q.QuerySql(total_restricted_sql)
-                        if total_result and len(total_result) > 0:
-                            for row in total_result:
-                                if hasattr(row, 'Total') and row.Total is not None:
-                                    week_total_with_restricted = float(row.Total)
-                                    break
+                        week_total_with_restricted = giving_cube.total(dt, end_dt, exclude_types=(99,))['amount']
                     except:
                         # Fall back to general fund if query fails
                         week_total_with_restricted = contrib.Contributed if hasattr(contrib, 'Contributed') else 0
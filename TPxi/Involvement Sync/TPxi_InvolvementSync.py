@@ -26,6 +26,9 @@
 # - Manual and automatic sync options
 # - Full subgroup/member tag synchronization
 # - Detailed sync reporting
+# - Diff-based sync: only real adds, drops, member type and subgroup changes are written
+# - Dry-run preview of the planned changes before syncing
+# - Sync All runs every pair from one membership query with per-pair timing
 # - Error handling and logging
 #
 # USE CASES:
@@ -67,10 +70,12 @@
 #        print(model.CallScript("InvolvementSync"))  # Update to your script name
 #
 # 3. Adjust the schedule and script name as needed
+# 4. Optionally set model.Data.DryRun = 1 to log the planned changes without applying them
 #--Upload Instructions End--
 
 import traceback
 import re
+import time
 
 ########################################################
 ### User Config Area
@@ -319,166 +324,311 @@ class InvolvementSyncManager:
             print "<p style='color:red;'>Error creating duplicate involvement: " + str(e) + "</p>"
             return None
     
-    def get_members_with_subgroups(self, org_id):
-        """Get all members of an involvement with their subgroup assignments"""
+    def get_membership_snapshots(self, org_ids):
+        """Load members, member types and subgroups for several involvements in one query.
+
+        Returns {org_id: {people_id: {'name', 'member_type', 'subgroups'}}} with
+        an entry (possibly empty) for every org id passed in.
+        """
+        org_ids = [int(o) for o in org_ids if o]
+        snapshots = dict((org_id, {}) for org_id in org_ids)
+        if not org_ids:
+            return snapshots
+        sql = '''
+        SELECT om.OrganizationId, om.PeopleId, p.Name, mt.Description AS OrgMemType,
+               tag.Name AS SubGroup
+        FROM OrganizationMembers om
+        INNER JOIN People p ON om.PeopleId = p.PeopleId
+        LEFT JOIN lookup.MemberType mt ON mt.Id = om.MemberTypeId
+        LEFT JOIN OrgMemMemTags ommt ON ommt.OrgId = om.OrganizationId AND ommt.PeopleId = om.PeopleId
+        LEFT JOIN MemberTags tag ON tag.Id = ommt.MemberTagId
+        WHERE om.OrganizationId IN (''' + ','.join(str(o) for o in set(org_ids)) + ''')
+        AND om.InactiveDate IS NULL
+        '''
+        for row in q.QuerySql(sql):
+            members = snapshots.setdefault(row.OrganizationId, {})
+            member = members.get(row.PeopleId)
+            if member is None:
+                member = {'name': row.Name, 'member_type': row.OrgMemType, 'subgroups': set()}
+                members[row.PeopleId] = member
+            if row.SubGroup and row.SubGroup.strip():
+                member['subgroups'].add(row.SubGroup.strip())
+        return snapshots
+
+    def compute_sync_plan(self, source, target, exclusion=None):
+        """Work out the minimal set of changes that makes target mirror source.
+
+        source, target and exclusion are membership snapshots for one org
+        ({people_id: member}). People in the exclusion involvement are not
+        added and their subgroups are left alone, as before.
+        """
+        exclusion = exclusion or {}
+        plan = {
+            'add': [],
+            'drop': [],
+            'type_change': [],
+            'subgroup_add': [],
+            'subgroup_remove': [],
+            'excluded': [],
+            'unchanged': 0
+        }
+
+        for people_id, member in source.items():
+            current = target.get(people_id)
+            changed = False
+            if current is None:
+                if people_id in exclusion:
+                    plan['excluded'].append((people_id, member['name']))
+                    continue
+                plan['add'].append((people_id, member['name'], member['member_type']))
+                current = {'member_type': None, 'subgroups': set()}
+                changed = True
+            elif SyncOrgMemType and member['member_type'] and member['member_type'] != current['member_type']:
+                plan['type_change'].append((people_id, member['name'], current['member_type'], member['member_type']))
+                changed = True
+
+            if people_id not in exclusion:
+                for subgroup_name in sorted(member['subgroups'] - current['subgroups']):
+                    plan['subgroup_add'].append((people_id, member['name'], subgroup_name))
+                    changed = True
+                for subgroup_name in sorted(current['subgroups'] - member['subgroups']):
+                    plan['subgroup_remove'].append((people_id, member['name'], subgroup_name))
+                    changed = True
+            if not changed:
+                plan['unchanged'] += 1
+
+        for people_id, member in target.items():
+            if people_id not in source:
+                plan['drop'].append((people_id, member['name']))
+
+        return plan
+
+    def apply_sync_plan(self, target_org_id, plan):
+        """Apply a plan from compute_sync_plan and return the usual results dict"""
+        results = self.plan_counts(plan)
+        results['errors'] = []
+
+        for people_id, name, member_type in plan['add']:
+            try:
+                model.AddMemberToOrg(people_id, target_org_id)
+                if SyncOrgMemType and member_type:
+                    model.SetMemberType(people_id, target_org_id, member_type)
+            except Exception as e:
+                results['members_added'] -= 1
+                results['errors'].append("Error adding member {0}: {1}".format(name, str(e)))
+
+        for people_id, name, old_type, new_type in plan['type_change']:
+            try:
+                model.SetMemberType(people_id, target_org_id, new_type)
+            except Exception as e:
+                results['members_updated'] -= 1
+                results['errors'].append("Error updating member type for {0}: {1}".format(name, str(e)))
+
+        for people_id, name in plan['drop']:
+            try:
+                model.DropOrgMember(people_id, target_org_id)
+            except Exception as e:
+                results['members_removed'] -= 1
+                results['errors'].append("Error removing member {0}: {1}".format(name, str(e)))
+
+        for people_id, name, subgroup_name in plan['subgroup_add']:
+            try:
+                model.AddSubGroup(people_id, target_org_id, subgroup_name)
+            except Exception as e:
+                results['subgroups_synced'] -= 1
+                results['errors'].append("Error adding subgroup '{0}' for {1}: {2}".format(subgroup_name, name, str(e)))
+
+        for people_id, name, subgroup_name in plan['subgroup_remove']:
+            try:
+                model.RemoveSubGroup(people_id, target_org_id, subgroup_name)
+            except Exception as e:
+                results['subgroups_removed'] -= 1
+                results['errors'].append("Error removing subgroup '{0}' for {1}: {2}".format(subgroup_name, name, str(e)))
+
+        return results
+
+    def plan_counts(self, plan):
+        """Summarise a plan with the same keys the sync results have always used"""
+        return {
+            'members_added': len(plan['add']),
+            'members_updated': len(plan['type_change']),
+            'members_removed': len(plan['drop']),
+            'members_excluded': len(plan['excluded']),
+            'members_unchanged': plan['unchanged'],
+            'subgroups_synced': len(plan['subgroup_add']),
+            'subgroups_removed': len(plan['subgroup_remove']),
+            'errors': []
+        }
+
+    def sync_members(self, source_org_id, target_org_id, exclusion_org_id, dry_run=False):
+        """Sync members and subgroups from source to target involvement.
+
+        Only real differences are written. With dry_run the plan is returned
+        (under 'plan') without touching the target.
+        """
         try:
-            sql = '''
-            SELECT om.PeopleId, p.Name, om.OrganizationId,mt.Description AS OrgMemType,
-                   STUFF((
-                       SELECT ', ' + mt.Name
-                       FROM OrgMemMemTags ommt
-                       INNER JOIN MemberTags mt ON mt.Id = ommt.MemberTagId
-                       WHERE ommt.OrgId = om.OrganizationId 
-                       AND ommt.PeopleId = om.PeopleId
-                       FOR XML PATH('')
-                   ), 1, 2, '') as SubGroups
-            FROM OrganizationMembers om
-            LEFT JOIN lookup.MemberType mt ON mt.Id = om.MemberTypeId
-            INNER JOIN People p ON om.PeopleId = p.PeopleId
-            WHERE om.OrganizationId = ''' + str(org_id) + '''
-            AND om.InactiveDate IS NULL
-            ORDER BY p.Name
-            '''
-            return q.QuerySql(sql)
+            snapshots = self.get_membership_snapshots([source_org_id, target_org_id, exclusion_org_id])
+            plan = self.compute_sync_plan(snapshots.get(int(source_org_id), {}),
+                                          snapshots.get(int(target_org_id), {}),
+                                          snapshots.get(int(exclusion_org_id), {}) if exclusion_org_id else None)
+            if dry_run:
+                results = self.plan_counts(plan)
+                results['dry_run'] = True
+                results['plan'] = plan
+                return results
+            return self.apply_sync_plan(target_org_id, plan)
         except Exception as e:
-            print "<p style='color:red;'>Error getting members: " + str(e) + "</p>"
-            return []
+            return {'members_added': 0, 'members_updated': 0, 'members_removed': 0,
+                    'members_excluded': 0, 'members_unchanged': 0,
+                    'subgroups_synced': 0, 'subgroups_removed': 0,
+                    'errors': ["Error during sync: " + str(e)]}
     
-    def sync_members(self, source_org_id, target_org_id, exclusion_org_id):
-        """Sync members and subgroups from source to target involvement"""
-        try:
-            results = {
-                'members_added': 0,
-                'members_updated': 0,
-                'members_removed': 0,
-                'subgroups_synced': 0,
-                'subgroups_removed': 0,
-                'errors': [],
-                'members_excluded': 0
-            }
+    def get_all_sync_configs(self):
+        """Read every involvement's sync settings with one OrganizationExtra query.
 
-            # Get source members with subgroups
-            source_members = self.get_members_with_subgroups(source_org_id)
-            source_member_ids = [member.PeopleId for member in source_members]
-            
-            # Get current target members with their subgroups
-            target_members = self.get_members_with_subgroups(target_org_id)
-            target_member_ids = [member.PeopleId for member in target_members]
-            
-            # Get current target members with their subgroups
-            if exclusion_org_id:
-                exclusion_members = self.get_members_with_subgroups(exclusion_org_id)
-                exclusion_member_ids = [member.PeopleId for member in exclusion_members]
-            
-            # Create lookup dictionaries for easier processing
-            source_member_subgroups = {}
-            for member in source_members:
-                subgroups = set()
-                if member.SubGroups and member.SubGroups.strip():
-                    subgroups = set([sg.strip() for sg in member.SubGroups.split(',') if sg.strip()])
-                source_member_subgroups[member.PeopleId] = subgroups
-            
-            target_member_subgroups = {}
-            for member in target_members:
-                subgroups = set()
-                if member.SubGroups and member.SubGroups.strip():
-                    subgroups = set([sg.strip() for sg in member.SubGroups.split(',') if sg.strip()])
-                target_member_subgroups[member.PeopleId] = subgroups
-            
-            # 1. ADD NEW MEMBERS
-            for member in source_members:
-                try:
-                    people_id = member.PeopleId
-                    
-                    if people_id not in target_member_ids:
-                        if exclusion_org_id and people_id in exclusion_member_ids: 
-                            results['members_excluded'] += 1
-                        else:
-                            model.AddMemberToOrg(people_id, target_org_id)
-                            if SyncOrgMemType:
-                                model.SetMemberType(people_id, target_org_id, member.OrgMemType)
-                            results['members_added'] += 1
-                    else:
-                        if SyncOrgMemType:
-                            model.SetMemberType(people_id, target_org_id, member.OrgMemType)
-                        results['members_updated'] += 1
-                        
-                except Exception as e:
-                    error_msg = "Error adding member {0}: {1}".format(member.Name, str(e))
-                    results['errors'].append(error_msg)
-            
-            # 2. REMOVE MEMBERS NO LONGER IN SOURCE
-            for member in target_members:
-                try:
-                    people_id = member.PeopleId
-                    
-                    if people_id not in source_member_ids:
-                        model.DropOrgMember(people_id, target_org_id)
-                        results['members_removed'] += 1
-                        
-                except Exception as e:
-                    error_msg = "Error removing member {0}: {1}".format(member.Name, str(e))
-                    results['errors'].append(error_msg)
-            
-            # 3. SYNC SUBGROUPS FOR ALL CURRENT MEMBERS
-            
-            
-            if exclusion_org_id: 
-                filtered_member_ids = list(set(source_member_ids) - set(exclusion_member_ids))
-            else:
-                filtered_member_ids = source_member_ids
-            
+        Returns a list of dicts with source_org_id, source_name, enabled,
+        auto_sync, target_org_id and exclusion_org_id, using the same value
+        parsing as get_sync_settings.
+        """
+        fields = [self.sync_enabled_field, self.sync_target_field,
+                  self.sync_exclusion_field, self.sync_auto_field]
+        sql = '''
+        SELECT oe.OrganizationId, o.OrganizationName, oe.Field, oe.Data, oe.BitValue, oe.IntValue
+        FROM OrganizationExtra oe
+        INNER JOIN Organizations o ON o.OrganizationId = oe.OrganizationId
+        WHERE oe.Field IN (''' + ','.join("'" + f + "'" for f in fields) + ''')
+        '''
+        configs = {}
+        for row in q.QuerySql(sql):
+            config = configs.get(row.OrganizationId)
+            if config is None:
+                config = {'source_org_id': row.OrganizationId, 'source_name': row.OrganizationName,
+                          'enabled': False, 'auto_sync': False,
+                          'target_org_id': None, 'exclusion_org_id': None}
+                configs[row.OrganizationId] = config
+            if row.Field == self.sync_enabled_field:
+                config['enabled'] = self._extra_value_flag(row)
+            elif row.Field == self.sync_auto_field:
+                config['auto_sync'] = self._extra_value_flag(row)
+            elif row.Field == self.sync_target_field:
+                config['target_org_id'] = self._extra_value_int(row)
+            elif row.Field == self.sync_exclusion_field:
+                config['exclusion_org_id'] = self._extra_value_int(row)
+        return sorted(configs.values(), key=lambda c: c['source_name'] or '')
 
-            for people_id in filtered_member_ids:
-                try:
-                    source_subgroups = source_member_subgroups.get(people_id, set())
-                    target_subgroups = target_member_subgroups.get(people_id, set())
-                    
-                    # Add new subgroups
-                    subgroups_to_add = source_subgroups - target_subgroups
-                    for subgroup_name in subgroups_to_add:
-                        try:
-                            model.AddSubGroup(people_id, target_org_id, subgroup_name)
-                            results['subgroups_synced'] += 1
-                        except Exception as sg_error:
-                            member_name = next((m.Name for m in source_members if m.PeopleId == people_id), "Unknown")
-                            error_msg = "Error adding subgroup '{0}' for {1}: {2}".format(subgroup_name, member_name, str(sg_error))
-                            results['errors'].append(error_msg)
-                    
-                    # Remove subgroups no longer in source
-                    subgroups_to_remove = target_subgroups - source_subgroups
-                    for subgroup_name in subgroups_to_remove:
-                        try:
-                            model.RemoveSubGroup(people_id, target_org_id, subgroup_name)
-                            results['subgroups_removed'] += 1
-                        except Exception as sg_error:
-                            member_name = next((m.Name for m in source_members if m.PeopleId == people_id), "Unknown")
-                            error_msg = "Error removing subgroup '{0}' for {1}: {2}".format(subgroup_name, member_name, str(sg_error))
-                            results['errors'].append(error_msg)
-                            
-                except Exception as e:
-                    member_name = next((m.Name for m in source_members if m.PeopleId == people_id), "Unknown")
-                    error_msg = "Error syncing subgroups for {0}: {1}".format(member_name, str(e))
-                    results['errors'].append(error_msg)
-            
-            return results
-        except Exception as e:
-            return {'members_added': 0, 'members_updated': 0, 'members_removed': 0, 
-                   'subgroups_synced': 0, 'subgroups_removed': 0,
-                   'errors': ["Error during sync: " + str(e)]}
+    def _extra_value_flag(self, row):
+        data_value = str(row.Data).upper() if row.Data else ""
+        bit_value = str(row.BitValue).upper() if row.BitValue else ""
+        return (row.IntValue == 1 or
+                data_value in ['TRUE', '1', 'YES', 'ENABLED'] or
+                bit_value in ['TRUE', '1', 'YES', 'ENABLED'])
+
+    def _extra_value_int(self, row):
+        if row.IntValue and row.IntValue > 0:
+            return row.IntValue
+        if row.Data and str(row.Data).strip().isdigit():
+            return int(str(row.Data).strip()) or None
+        return None
+
+    def get_involvement_names(self, org_ids):
+        """Get {org_id: name} for several involvements in one query"""
+        org_ids = [int(o) for o in set(org_ids) if o]
+        if not org_ids:
+            return {}
+        sql = "SELECT OrganizationId, OrganizationName FROM Organizations WHERE OrganizationId IN (" + \
+              ','.join(str(o) for o in org_ids) + ")"
+        return dict((row.OrganizationId, row.OrganizationName) for row in q.QuerySql(sql))
+
+    def sync_all(self, auto_only=False, dry_run=False):
+        """Sync every enabled pair in one pass.
+
+        Memberships for all source, target and exclusion orgs come from a
+        single snapshot query; each pair's plan is computed in memory and
+        applied with its own timing. A pair whose source or exclusion org
+        was the target of an earlier pair is re-read first so chained
+        syncs see the changes just made.
+        """
+        started = time.time()
+        configs = [c for c in self.get_all_sync_configs()
+                   if c['enabled'] and c['target_org_id'] and (c['auto_sync'] or not auto_only)]
+
+        org_ids = set()
+        for c in configs:
+            org_ids.update([c['source_org_id'], c['target_org_id']])
+            if c['exclusion_org_id']:
+                org_ids.add(c['exclusion_org_id'])
+        names = self.get_involvement_names(org_ids)
+        snapshots = self.get_membership_snapshots(org_ids)
+        snapshot_queries = 1
+        modified = set()
+
+        pairs = []
+        for c in configs:
+            pair_started = time.time()
+            source_id, target_id, exclusion_id = c['source_org_id'], c['target_org_id'], c['exclusion_org_id']
+            pair = {
+                'source': names.get(source_id, c['source_name']),
+                'target': names.get(target_id, 'Unknown'),
+                'excluded': names.get(exclusion_id, 'Unknown') if exclusion_id else 'Not Set',
+                'success': True
+            }
+            try:
+                stale = [o for o in (source_id, target_id, exclusion_id) if o and o in modified]
+                if stale:
+                    snapshots.update(self.get_membership_snapshots(stale))
+                    snapshot_queries += 1
+                    modified.difference_update(stale)
+                plan = self.compute_sync_plan(snapshots.get(source_id, {}), snapshots.get(target_id, {}),
+                                              snapshots.get(exclusion_id, {}) if exclusion_id else None)
+                if dry_run:
+                    results = self.plan_counts(plan)
+                    results['dry_run'] = True
+                    results['plan'] = plan
+                else:
+                    results = self.apply_sync_plan(target_id, plan)
+                    if plan['add'] or plan['drop'] or plan['type_change'] or \
+                            plan['subgroup_add'] or plan['subgroup_remove']:
+                        modified.add(target_id)
+                pair['results'] = results
+            except Exception as e:
+                pair['success'] = False
+                pair['error'] = str(e)
+            pair['seconds'] = round(time.time() - pair_started, 2)
+            pairs.append(pair)
+
+        totals = {}
+        for pair in pairs:
+            for key, value in pair.get('results', {}).items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+        return {
+            'pairs': pairs,
+            'totals': totals,
+            'pair_count': len(pairs),
+            'failed': len([p for p in pairs if not p['success']]),
+            'errors': sum(len(p.get('results', {}).get('errors', [])) for p in pairs),
+            'snapshot_queries': snapshot_queries,
+            'seconds': round(time.time() - started, 2),
+            'dry_run': dry_run
+        }
     
     def render_sync_results(self, results):
-        """Render sync results in HTML"""
+        """Render sync results (or a dry-run preview) in HTML"""
+        dry_run = results.get('dry_run', False)
         html = "<div class='alert alert-success'>"
-        html += "<h4>Sync Complete!</h4>"
+        html += "<h4>Sync Preview - No Changes Made</h4>" if dry_run else "<h4>Sync Complete!</h4>"
         html += "<ul>"
         html += "<li>Members Added: " + str(results['members_added']) + "</li>"
         html += "<li>Members Updated: " + str(results['members_updated']) + "</li>"
         html += "<li>Members Removed: " + str(results['members_removed']) + "</li>"
         html += "<li>Members Excluded: " + str(results['members_excluded']) + "</li>"
+        html += "<li>Members Unchanged: " + str(results.get('members_unchanged', 0)) + "</li>"
         html += "<li>Subgroups Added: " + str(results['subgroups_synced']) + "</li>"
         html += "<li>Subgroups Removed: " + str(results['subgroups_removed']) + "</li>"
         html += "</ul>"
+
+        if dry_run:
+            html += self.render_sync_plan(results['plan'])
         
         if results['errors']:
             html += "<h5 style='color:orange;'>Errors:</h5><ul>"
@@ -489,6 +639,30 @@ class InvolvementSyncManager:
         html += "</div>"
         return html
 
+    def render_sync_plan(self, plan, limit=100):
+        """Render the planned operations from a dry run, up to limit rows per kind"""
+        sections = [
+            ('Add to target', [(name, member_type or '') for pid, name, member_type in plan['add']]),
+            ('Change member type', [(name, (old or 'None') + ' &rarr; ' + new) for pid, name, old, new in plan['type_change']]),
+            ('Remove from target', [(name, '') for pid, name in plan['drop']]),
+            ('Add subgroup', [(name, sg) for pid, name, sg in plan['subgroup_add']]),
+            ('Remove subgroup', [(name, sg) for pid, name, sg in plan['subgroup_remove']]),
+            ('Excluded (not added)', [(name, '') for pid, name in plan['excluded']])
+        ]
+        html = ""
+        for title, rows in sections:
+            if not rows:
+                continue
+            html += "<h5>" + title + " (" + str(len(rows)) + ")</h5><ul>"
+            for name, detail in rows[:limit]:
+                html += "<li>" + name + (" - " + detail if detail else "") + "</li>"
+            if len(rows) > limit:
+                html += "<li><em>... and " + str(len(rows) - limit) + " more</em></li>"
+            html += "</ul>"
+        if not html:
+            html = "<p>Target is already in sync. Nothing to change.</p>"
+        return html
+
 def get_common_css():
     """Get the common CSS used across all forms"""
     return '''
@@ -1017,6 +1191,9 @@ def render_manual_sync_form():
                 <button type="submit" class="sync-btn sync-btn-primary">
                     <i class="fa fa-sync"></i> Sync Selected
                 </button>
+                <button type="submit" name="dry_run" value="1" class="sync-btn sync-btn-default">
+                    <i class="fa fa-eye"></i> Preview Changes
+                </button>
                 <button type="button" onclick="history.back()" class="sync-btn sync-btn-default">
                     <i class="fa fa-arrow-left"></i> Back to Menu
                 </button>
@@ -1039,58 +1216,50 @@ except:
 
 # Handle automated sync
 if script_sync_all == "1":
-    # Perform automated sync for all auto-enabled involvements
-    sync_enabled_orgs = sync_manager.get_sync_enabled_involvements()
-    results_summary = []
-    
-    for org in sync_enabled_orgs:
-        settings = sync_manager.get_sync_settings(org.OrganizationId)
-        if settings['auto_sync'] and settings['target_org_id']:
-            try:
-                results = sync_manager.sync_members(org.OrganizationId, settings['target_org_id'], settings['exclusion_org_id'])
-                source_name = sync_manager.get_involvement_name(org.OrganizationId)
-                target_name = sync_manager.get_involvement_name(settings['target_org_id'])
-                exclusion_name = sync_manager.get_involvement_name(settings['exclusion_org_id']) if settings['exclusion_org_id'] else "Not Set"
-                
-                results_summary.append({
-                    'source': source_name,
-                    'target': target_name,
-                    'excluded': exclusion_name,
-                    'success': True,
-                    'results': results
-                })
-            except Exception as e:
-                results_summary.append({
-                    'source': org.OrganizationName,
-                    'target': 'Unknown',
-                    'excluded': 'Unknown',
-                    'success': False,
-                    'error': str(e)
-                })
-    
+    # Perform automated sync for all auto-enabled involvements in one pass
+    # (set model.Data.DryRun = 1 to report the planned changes without applying them)
+    dry_run = False
+    try:
+        dry_run = hasattr(model.Data, 'DryRun') and str(model.Data.DryRun) == "1"
+    except:
+        dry_run = False
+    batch = sync_manager.sync_all(auto_only=True, dry_run=dry_run)
+
     # Output simple results for automated process
-    print "Automated Sync Results:"
-    for result in results_summary:
+    print "Automated Sync Results:" + (" (dry run, no changes made)" if dry_run else "")
+    for result in batch['pairs']:
         if result['success']:
-            
+
             if DisplayExclusionOption:
-                exclusion_html = ''', Excluded: ''' + result['results']['members_excluded']
-            else: 
+                exclusion_html = ", Excluded: " + str(result['results']['members_excluded'])
+            else:
                 exclusion_html = ''
-                
-            print "SUCCESS: {0} -> {1} | Added: {2}, Updated: {3}, Removed: {4}{7}, Subgroups Added: {5}, Subgroups Removed: {6}".format(
-                result['source'], result['target'], 
+
+            print "SUCCESS: {0} -> {1} | Added: {2}, Updated: {3}, Removed: {4}{7}, Subgroups Added: {5}, Subgroups Removed: {6}, Unchanged: {8}, Errors: {9} ({10}s)".format(
+                result['source'], result['target'],
                 result['results']['members_added'],
                 result['results']['members_updated'],
                 result['results']['members_removed'],
                 result['results']['subgroups_synced'],
                 result['results']['subgroups_removed'],
-                exclusion_html
+                exclusion_html,
+                result['results'].get('members_unchanged', 0),
+                len(result['results']['errors']),
+                result['seconds']
             )
+            for error in result['results']['errors']:
+                print "    " + error
         else:
             print "ERROR: {0} -> {1} | {2}".format(
                 result['source'], result['target'], result['error']
             )
+    totals = batch['totals']
+    print "SUMMARY: {0} pairs in {1}s ({2} membership queries) | Added: {3}, Updated: {4}, Removed: {5}, Subgroups Added: {6}, Subgroups Removed: {7}, Failed pairs: {8}, Errors: {9}".format(
+        batch['pair_count'], batch['seconds'], batch['snapshot_queries'],
+        totals.get('members_added', 0), totals.get('members_updated', 0), totals.get('members_removed', 0),
+        totals.get('subgroups_synced', 0), totals.get('subgroups_removed', 0),
+        batch['failed'], batch['errors']
+    )
 
 else:
     # Handle interactive form submissions
@@ -1189,60 +1358,20 @@ else:
             print show_loading_script()
             
             try:
-                sync_enabled_orgs = sync_manager.get_sync_enabled_involvements()
-                results_summary = []
-                
-                for org in sync_enabled_orgs:
-                    settings = sync_manager.get_sync_settings(org.OrganizationId)
-                    if settings['enabled'] and settings['target_org_id']:
-                        try:
-                            results = sync_manager.sync_members(org.OrganizationId, settings['target_org_id'], settings['exclusion_org_id'])
-                            source_name = sync_manager.get_involvement_name(org.OrganizationId)
-                            target_name = sync_manager.get_involvement_name(settings['target_org_id'])
-                            
-                            results_summary.append({
-                                'source': source_name,
-                                'target': target_name,
-                                'success': True,
-                                'results': results
-                            })
-                        except Exception as e:
-                            results_summary.append({
-                                'source': org.OrganizationName,
-                                'target': sync_manager.get_involvement_name(settings['target_org_id']) if settings['target_org_id'] else 'Unknown',
-                                'success': False,
-                                'error': str(e)
-                            })
-                    
-                    if settings['enabled'] and settings['exclusion_org_id']:
-                        try:
-                            exclusion_name = sync_manager.get_involvement_name(settings['exclusion_org_id'])
-                            
-                            results_summary.append({
-                                'source': source_name,
-                                'target': target_name,
-                                'excluded': exclusion_name,
-                                'success': True,
-                                'results': results
-                            })
-                        except Exception as e:
-                            results_summary.append({
-                                'source': org.OrganizationName,
-                                'excluded': sync_manager.get_involvement_name(settings['exclusion_org_id']) if settings['exclusion_org_id'] else 'Unknown',
-                                'success': False,
-                                'error': str(e)
-                            })
-                
+                batch = sync_manager.sync_all(auto_only=False)
+                results_summary = batch['pairs']
+
                 print get_common_css() + '''
                 <div id="involvement-sync-container">
                     <h3>Sync All Results</h3>
+                    <p>''' + str(batch['pair_count']) + ''' pairs synced in ''' + str(batch['seconds']) + '''s using ''' + str(batch['snapshot_queries']) + ''' membership queries (''' + str(batch['failed']) + ''' failed, ''' + str(batch['errors']) + ''' errors)</p>
                 '''
                 
                 for i, result in enumerate(results_summary):
                     panel_class = "sync-alert-success" if result['success'] else "sync-alert-danger"
                     print '''
                     <div class="sync-alert ''' + panel_class + '''">
-                        <h4>''' + result['source'] + ''' → ''' + result['target'] + '''</h4>
+                        <h4>''' + result['source'] + ''' → ''' + result['target'] + ''' <small>(''' + str(result['seconds']) + '''s)</small></h4>
                     '''
                     
         
@@ -1334,15 +1463,16 @@ else:
                 if not settings['target_org_id']:
                     raise Exception("No target involvement configured for this involvement (ID: " + str(source_org_id) + ")")
                     
-                # Perform the sync
-                results = sync_manager.sync_members(source_org_id, settings['target_org_id'], settings['exclusion_org_id'])
+                # Perform the sync (or just preview it)
+                dry_run = hasattr(model.Data, 'dry_run') and str(model.Data.dry_run) == "1"
+                results = sync_manager.sync_members(source_org_id, settings['target_org_id'], settings['exclusion_org_id'], dry_run=dry_run)
 
                 source_name = sync_manager.get_involvement_name(source_org_id)
                 target_name = sync_manager.get_involvement_name(settings['target_org_id'])
                 
                 print get_common_css() + '''
                 <div id="involvement-sync-container">
-                    <h3>Sync Results: ''' + source_name + ''' → ''' + target_name + '''</h3>
+                    <h3>''' + ("Sync Preview: " if dry_run else "Sync Results: ") + source_name + ''' → ''' + target_name + '''</h3>
                     ''' + sync_manager.render_sync_results(results) + '''
                     
                     <div style="margin-top:20px;">
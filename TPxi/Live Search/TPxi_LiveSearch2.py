@@ -39,6 +39,9 @@
 
 # Version: Widget Compatible with Namespace Isolation
 
+import re
+import time
+
 # ::START:: Configuration
 MAX_RESULTS = 18  # Maximum number of results to display per category
 SEARCH_DELAY = 300  # Milliseconds to wait after typing before searching
@@ -49,6 +52,13 @@ SCRIPT_NAME = 'TPxi_LiveSearch2'  # ⭐ CHANGE THIS TO YOUR ACTUAL SCRIPT NAME
 # Giving visibility settings
 SHOW_GIVING_IN_JOURNEY = False  # Global setting to hide giving events in journey timeline
 
+# Search index settings
+SEARCH_INDEX_ENABLED = True  # Answer the type-ahead from a prefix index instead of LIKE scans
+SEARCH_INDEX_TTL_SECONDS = 3600  # Searches fall back to SQL once the index is older than this; rebuild with ?rebuild_index=1 from a scheduled task
+SEARCH_INDEX_CONTENT_NAME = 'TPxi_LiveSearch_Index'  # Special Content name of the manifest; shards use it as a prefix
+JOURNEY_CACHE_TTL_SECONDS = 120  # Reuse an assembled family journey for this long
+JOURNEY_CACHE_CONTENT_NAME = 'TPxi_LiveSearch_JourneyCache'  # Special Content name for cached journeys
+
 # ::START:: Initialize Variables
 search_term = ""
 ajax_mode = False
@@ -159,8 +169,582 @@ def send_ajax_response(response_data):
 # Variable to track if we've handled an AJAX request
 ajax_handled = False
 
+# ::START:: Search Index
+# The type-ahead resolves names, phone numbers and involvement names from a
+# prefix index kept in Special Content rather than running LIKE '%term%'
+# against People on every keystroke. Tokens are sharded by their first two
+# characters, so a lookup reads one small shard, ranks it in memory and then
+# hydrates only the top matches by primary key.
+_INDEX_SHARD_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+def _index_tokens(text):
+    """Lowercase, drop apostrophes and split on anything that isn't a letter or digit"""
+    if not text:
+        return []
+    text = text.lower().replace("'", "").replace(u"\u2019", "")
+    return [t for t in re.split(r'[\W_]+', text, flags=re.UNICODE) if t]
+
+def _index_digits(text):
+    return ''.join(c for c in (text or '') if c.isdigit())
+
+def _index_phone_tokens(phone):
+    """Full number, local seven digits and last four, so any of them prefix-match"""
+    digits = _index_digits(phone)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    if len(digits) < 4:
+        return []
+    return [digits, digits[-7:], digits[-4:]]
+
+def _index_shard_name(namespace, token):
+    key = token[:2]
+    if len(key) < 2 or key[0] not in _INDEX_SHARD_CHARS or key[1] not in _INDEX_SHARD_CHARS:
+        key = '__'
+    return SEARCH_INDEX_CONTENT_NAME + '_' + namespace + '_' + key
+
+def _unique(items):
+    seen = set()
+    out = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            out.append(item)
+    return out
+
+def load_search_index_manifest():
+    """Load the index manifest from Special Content, or None if it isn't there"""
+    try:
+        raw = model.TextContent(SEARCH_INDEX_CONTENT_NAME)
+        if raw and raw.strip():
+            return json.loads(raw)
+    except:
+        pass
+    return None
+
+def save_search_index_manifest(manifest):
+    try:
+        model.WriteContentText(SEARCH_INDEX_CONTENT_NAME, json.dumps(manifest, separators=(',', ':')), '')
+    except:
+        pass
+
+def load_search_index_shard(shard_name):
+    """Load one shard as a list of [id, name, 'token token ...'] entries"""
+    try:
+        raw = model.TextContent(shard_name)
+        if raw and raw.strip():
+            return json.loads(raw)
+        return []
+    except:
+        return None
+
+def build_search_index(previous=None):
+    """Rebuild every shard from People and Organizations and return the new manifest"""
+    shards = {}
+
+    def add_entry(namespace, entry_id, name, tokens):
+        tokens = _unique(tokens)
+        if not tokens:
+            return
+        entry = [entry_id, name, ' '.join(tokens)]
+        for shard_name in _unique([_index_shard_name(namespace, t) for t in tokens]):
+            shards.setdefault(shard_name, []).append(entry)
+
+    people_sql = """
+    SELECT p.PeopleId, p.Name, p.FirstName, p.NickName, p.LastName,
+        p.CellPhone, p.HomePhone
+    FROM People p
+    WHERE p.DeceasedDate IS NULL
+        AND p.ArchivedFlag = 0
+    """
+    people_count = 0
+    max_people_id = 0
+    for row in q.QuerySql(people_sql):
+        max_people_id = max(max_people_id, row.PeopleId)
+        name = row.Name or ''
+        name_tokens = _index_tokens(name) + _index_tokens(row.FirstName) + \
+            _index_tokens(row.NickName) + _index_tokens(row.LastName)
+        add_entry('n', row.PeopleId, name, name_tokens)
+        add_entry('d', row.PeopleId, name,
+                  _index_phone_tokens(row.CellPhone) + _index_phone_tokens(row.HomePhone))
+        people_count += 1
+
+    orgs_sql = """
+    SELECT o.OrganizationId, o.OrganizationName
+    FROM Organizations o
+    WHERE o.OrganizationStatusId = 30
+    """
+    org_count = 0
+    max_org_id = 0
+    for row in q.QuerySql(orgs_sql):
+        max_org_id = max(max_org_id, row.OrganizationId)
+        name = row.OrganizationName or ''
+        add_entry('o', row.OrganizationId, name, _index_tokens(name))
+        org_count += 1
+
+    for shard_name, entries in shards.items():
+        model.WriteContentText(shard_name, json.dumps(entries, separators=(',', ':')), '')
+
+    # Empty out shards the previous build wrote that no longer have entries
+    if previous:
+        for shard_name in previous.get('shards', []):
+            if shard_name not in shards:
+                model.WriteContentText(shard_name, '[]', '')
+
+    manifest = {
+        'builtAt': time.time(),
+        'shards': sorted(shards.keys()),
+        'people': people_count,
+        'orgs': org_count,
+        'maxPeopleId': max_people_id,
+        'maxOrgId': max_org_id
+    }
+    save_search_index_manifest(manifest)
+    return manifest
+
+def get_search_index_manifest(force=False):
+    """Return the stored manifest, or rebuild the index when force is set.
+
+    Rebuilding scans all of People and rewrites every shard, so it only
+    happens on the ?rebuild_index=1 path (e.g. a scheduled task), never
+    inside a type-ahead request."""
+    manifest = load_search_index_manifest()
+    if force:
+        return build_search_index(manifest)
+    return manifest
+
+def _index_delta_entries(namespace, manifest):
+    """Index entries for people/involvements added since the build.
+
+    Walks only ids above the build's high-water mark (a primary key seek),
+    so new records are searchable before the next scheduled rebuild."""
+    if namespace == 'o':
+        rows = q.QuerySql("""
+        SELECT o.OrganizationId, o.OrganizationName
+        FROM Organizations o
+        WHERE o.OrganizationId > {0}
+            AND o.OrganizationStatusId = 30
+        """.format(int(manifest.get('maxOrgId', 0))))
+        return [[row.OrganizationId, row.OrganizationName or '',
+                 ' '.join(_unique(_index_tokens(row.OrganizationName)))] for row in rows]
+
+    rows = q.QuerySql("""
+    SELECT p.PeopleId, p.Name, p.FirstName, p.NickName, p.LastName,
+        p.CellPhone, p.HomePhone
+    FROM People p
+    WHERE p.PeopleId > {0}
+        AND p.DeceasedDate IS NULL
+        AND p.ArchivedFlag = 0
+    """.format(int(manifest.get('maxPeopleId', 0))))
+    entries = []
+    for row in rows:
+        if namespace == 'd':
+            tokens = _index_phone_tokens(row.CellPhone) + _index_phone_tokens(row.HomePhone)
+        else:
+            tokens = _index_tokens(row.Name) + _index_tokens(row.FirstName) + \
+                _index_tokens(row.NickName) + _index_tokens(row.LastName)
+        if tokens:
+            entries.append([row.PeopleId, row.Name or '', ' '.join(_unique(tokens))])
+    return entries
+
+def search_index_ids(namespace, term, limit):
+    """Ranked ids matching term from the index.
+
+    namespace is 'n' (people by name), 'd' (people by phone digits) or 'o'
+    (involvements). Returns None when the index can't answer (disabled,
+    missing or older than SEARCH_INDEX_TTL_SECONDS), in which case the
+    caller uses SQL. Matching is by token prefix; callers only run a SQL
+    substring search when the index finds nothing at all.
+    """
+    if not SEARCH_INDEX_ENABLED:
+        return None
+    manifest = get_search_index_manifest()
+    if not manifest or 'builtAt' not in manifest or 'maxPeopleId' not in manifest:
+        return None
+    if time.time() - manifest['builtAt'] > SEARCH_INDEX_TTL_SECONDS:
+        return None
+
+    if namespace == 'd':
+        query_tokens = [_index_digits(term)]
+    else:
+        query_tokens = _index_tokens(term)
+    anchors = [t for t in query_tokens if len(t) >= 2]
+    if not anchors:
+        return None
+
+    # Every match has a token starting with the longest query token, so its shard is enough
+    shard_name = _index_shard_name(namespace, max(anchors, key=len))
+    entries = []
+    if shard_name in manifest.get('shards', []):
+        entries = load_search_index_shard(shard_name)
+        if entries is None:
+            return None
+    entries = entries + _index_delta_entries(namespace, manifest)
+
+    query_joined = ' '.join(query_tokens)
+    matches = []
+    for entry in entries:
+        tokens = entry[2].split(' ')
+        if not all(any(t.startswith(qt) for t in tokens) for qt in query_tokens):
+            continue
+        name_joined = ' '.join(_index_tokens(entry[1]))
+        if name_joined == query_joined:
+            rank = 0
+        elif name_joined.startswith(query_joined):
+            rank = 1
+        elif tokens[0].startswith(query_tokens[0]):
+            rank = 2
+        else:
+            rank = 3
+        matches.append((rank, entry[1].lower(), entry[0]))
+    matches.sort()
+    return [m[2] for m in matches[:limit]]
+
+def query_rows_by_ids(sql_template, ids, id_attr):
+    """Run sql_template with {ids} filled in and return the rows in the order of ids"""
+    if not ids:
+        return []
+    rows = q.QuerySql(sql_template.format(ids=','.join(str(int(i)) for i in ids)))
+    by_id = dict((getattr(row, id_attr), row) for row in rows)
+    return [by_id[i] for i in ids if i in by_id]
+
+# Force a rebuild, e.g. from a scheduled task: ?rebuild_index=1
+if hasattr(model.Data, "rebuild_index") and model.Data.rebuild_index == "1":
+    ajax_mode = True
+    try:
+        manifest = get_search_index_manifest(force=True)
+        ajax_handled = send_ajax_response({
+            'success': True,
+            'people': manifest.get('people', 0),
+            'orgs': manifest.get('orgs', 0),
+            'shards': len(manifest.get('shards', []))
+        })
+    except Exception as e:
+        ajax_handled = send_ajax_response({'error': str(e)})
+
+# ::START:: Journey Builder
+# The family journey used to run a CTE of TOP 1 subqueries per family member.
+# Events for the whole family now come back from one UNION ALL query keyed by
+# the PeopleId list; ROW_NUMBER() picks each person's first event of every
+# kind, and the rows are bucketed per person in Python. Only the
+# non-financial journey is cached; giving is read per request and merged in.
+_JOURNEY_EVENTS_PER_PERSON = 10
+_JOURNEY_CACHE_MAX_ENTRIES = 50
+
+def _journey_events_sql(people_ids):
+    ids = ','.join(str(int(pid)) for pid in people_ids)
+    return """
+    WITH FamilyJourney AS (
+        -- System: Person added
+        SELECT
+            p.PeopleId,
+            p.CreatedDate AS EventDate,
+            'Added to System' AS EventType,
+            'Profile created in database' AS Description,
+            'system' AS Category,
+            1 AS SortOrder,
+            1 AS Rn
+        FROM People p
+        WHERE p.PeopleId IN ({0})
+
+        UNION ALL
+
+        -- Program: First program joined
+        SELECT
+            om.PeopleId,
+            om.EnrollmentDate,
+            'Joined Program',
+            ISNULL(pr.Name, 'Unknown Program'),
+            'program',
+            2,
+            ROW_NUMBER() OVER (PARTITION BY om.PeopleId ORDER BY om.EnrollmentDate)
+        FROM OrganizationMembers om
+        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
+        LEFT JOIN Division d ON o.DivisionId = d.Id
+        LEFT JOIN Program pr ON d.ProgId = pr.Id
+        WHERE om.PeopleId IN ({0})
+        AND o.OrganizationStatusId = 30
+        AND om.EnrollmentDate IS NOT NULL
+
+        UNION ALL
+
+        -- Attendance: First attendance
+        SELECT
+            a.PeopleId,
+            a.MeetingDate,
+            'First Attendance',
+            o.OrganizationName,
+            'attendance',
+            3,
+            ROW_NUMBER() OVER (PARTITION BY a.PeopleId ORDER BY a.MeetingDate)
+        FROM Attend a
+        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
+        WHERE a.PeopleId IN ({0})
+        AND a.AttendanceFlag = 1
+
+        UNION ALL
+
+        -- Small Group: Connect Groups (program ID 1128)
+        SELECT
+            om.PeopleId,
+            om.EnrollmentDate,
+            'Joined Small Group',
+            o.OrganizationName,
+            'smallgroup',
+            4,
+            ROW_NUMBER() OVER (PARTITION BY om.PeopleId ORDER BY om.EnrollmentDate)
+        FROM OrganizationMembers om
+        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
+        LEFT JOIN Division d ON o.DivisionId = d.Id
+        WHERE om.PeopleId IN ({0})
+        AND d.ProgId = 1128
+        AND om.EnrollmentDate IS NOT NULL
+
+        UNION ALL
+
+        -- Serving: AttendType-based serving
+        SELECT
+            a.PeopleId,
+            a.MeetingDate,
+            'Started Serving',
+            o.OrganizationName + ' (' + at.Description + ')',
+            'serving',
+            6,
+            ROW_NUMBER() OVER (PARTITION BY a.PeopleId ORDER BY a.MeetingDate)
+        FROM Attend a
+        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
+        LEFT JOIN lookup.AttendType at ON a.AttendanceTypeId = at.Id
+        WHERE a.PeopleId IN ({0})
+        AND a.AttendanceFlag = 1
+        AND a.AttendanceTypeId IN (10, 20)
+
+        UNION ALL
+
+        -- Serving: Member type based serving (MemberTypeId > 100)
+        SELECT
+            om.PeopleId,
+            om.EnrollmentDate,
+            'Leadership Role',
+            o.OrganizationName + ' (' + ISNULL(mt.Description, 'Leader') + ')',
+            'serving',
+            6,
+            ROW_NUMBER() OVER (PARTITION BY om.PeopleId ORDER BY om.EnrollmentDate)
+        FROM OrganizationMembers om
+        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
+        LEFT JOIN lookup.MemberType mt ON om.MemberTypeId = mt.Id
+        WHERE om.PeopleId IN ({0})
+        AND om.MemberTypeId > 100
+        AND om.EnrollmentDate IS NOT NULL
+    )
+    SELECT PeopleId, EventDate, EventType, Description, Category, SortOrder
+    FROM FamilyJourney
+    WHERE Rn = 1
+    AND EventDate IS NOT NULL
+    ORDER BY PeopleId, EventDate ASC, SortOrder ASC
+    """.format(ids)
+
+def _journey_giving_sql(people_ids):
+    ids = ','.join(str(int(pid)) for pid in people_ids)
+    return """
+    SELECT PeopleId, EventDate, EventType, Description, Category, SortOrder
+    FROM (
+        -- First contribution (only for users with Finance permissions)
+        SELECT
+            c.PeopleId,
+            c.ContributionDate AS EventDate,
+            'Started Giving' AS EventType,
+            'First contribution of $' + CAST(c.ContributionAmount AS VARCHAR(20)) AS Description,
+            'giving' AS Category,
+            5 AS SortOrder,
+            ROW_NUMBER() OVER (PARTITION BY c.PeopleId ORDER BY c.ContributionDate) AS Rn
+        FROM Contribution c
+        WHERE c.PeopleId IN ({0})
+        AND c.ContributionTypeId != 99
+    ) g
+    WHERE Rn = 1
+    AND EventDate IS NOT NULL
+    """.format(ids)
+
+def get_journey_events(people_ids):
+    """Return {PeopleId: [event rows]} for every id in people_ids from one query.
+
+    Each person keeps their first ten events in date order, the same cut the
+    per-member queries made with SELECT TOP 10.
+    """
+    events = dict((pid, []) for pid in people_ids)
+    if not people_ids:
+        return events
+    for row in q.QuerySql(_journey_events_sql(people_ids)):
+        bucket = events.get(row.PeopleId)
+        if bucket is not None and len(bucket) < _JOURNEY_EVENTS_PER_PERSON:
+            bucket.append(row)
+    return events
+
+def get_giving_events(people_ids):
+    """Return {PeopleId: first contribution row} for people_ids (never cached)"""
+    if not people_ids:
+        return {}
+    return dict((row.PeopleId, row) for row in q.QuerySql(_journey_giving_sql(people_ids)))
+
+_JOURNEY_ICON_MAP = {
+    'system': {'icon': 'fa-user-plus', 'color': '#6c757d'},
+    'program': {'icon': 'fa-users', 'color': '#17a2b8'},
+    'attendance': {'icon': 'fa-calendar-check-o', 'color': '#007bff'},
+    'smallgroup': {'icon': 'fa-users', 'color': '#28a745'},
+    'serving': {'icon': 'fa-hands-helping', 'color': '#fd7e14'},
+    'giving': {'icon': 'fa-heart', 'color': '#dc3545'}
+}
+
+def _journey_event(event):
+    """Timeline entry for one event row"""
+    icon_info = _JOURNEY_ICON_MAP.get(event.Category, {'icon': 'fa-circle', 'color': '#6c757d'})
+    date_str = str(event.EventDate).split(' ')[0] if event.EventDate else ''
+    return {
+        'date': date_str,
+        'event': event.EventType,
+        'description': event.Description,
+        'type': event.Category,
+        'icon': icon_info['icon'],
+        'color': icon_info['color'],
+        'order': event.SortOrder
+    }
+
+def _score_journey(member):
+    """Set a member's engagement score and insights from their journey"""
+    journey_events = member['journey']
+
+    # Calculate simple score
+    score = 20  # Base
+    if len(journey_events) > 1:
+        score += 30  # Has activity
+
+    member['person']['engagement_score'] = score
+    member['insights'] = {
+        'journey_length': str(len(journey_events)) + ' events',
+        'entry_point': journey_events[0]['description'] if journey_events else 'Not engaged',
+        'total_events': len(journey_events)
+    }
+
+def _score_family(response):
+    """Recalculate the family stats from the members' scores"""
+    family_members = response['family_members']
+    total_members = len(family_members)
+    engaged_members = sum(1 for m in family_members if m['person']['engagement_score'] >= 40)
+    avg_score = sum(m['person']['engagement_score'] for m in family_members) / total_members if total_members > 0 else 0
+    response['family_info']['total_members'] = total_members
+    response['family_info']['engaged_members'] = engaged_members
+    response['family_info']['avg_engagement'] = int(avg_score)
+
+def add_giving_to_journey(response, giving_by_person):
+    """Merge each member's first contribution into their (cached) journey.
+
+    The event goes in date order and the ten-event cut is re-applied, which
+    gives the same timeline the combined query used to return.
+    """
+    for member in response['family_members']:
+        event = giving_by_person.get(member['person']['people_id'])
+        if event is None:
+            continue
+        journey_events = member['journey'] + [_journey_event(event)]
+        journey_events.sort(key=lambda e: (e['date'], e.get('order', 0)))
+        member['journey'] = journey_events[:_JOURNEY_EVENTS_PER_PERSON]
+        _score_journey(member)
+    _score_family(response)
+    return response
+
+def load_cached_journey(cache_key):
+    """Return a cached journey response younger than JOURNEY_CACHE_TTL_SECONDS, or None"""
+    try:
+        raw = model.TextContent(JOURNEY_CACHE_CONTENT_NAME)
+        if raw and raw.strip():
+            entry = json.loads(raw).get(cache_key)
+            if entry and time.time() - entry.get('savedAt', 0) < JOURNEY_CACHE_TTL_SECONDS:
+                return entry.get('response')
+    except:
+        pass
+    return None
+
+def save_cached_journey(cache_key, response):
+    """Store a journey response, dropping expired entries and keeping the newest few"""
+    try:
+        raw = model.TextContent(JOURNEY_CACHE_CONTENT_NAME)
+        cache = json.loads(raw) if raw and raw.strip() else {}
+        now = time.time()
+        cache = dict((k, v) for k, v in cache.items()
+                     if now - v.get('savedAt', 0) < JOURNEY_CACHE_TTL_SECONDS)
+        cache[cache_key] = {'savedAt': now, 'response': response}
+        if len(cache) > _JOURNEY_CACHE_MAX_ENTRIES:
+            newest = sorted(cache.items(), key=lambda kv: kv[1].get('savedAt', 0), reverse=True)
+            cache = dict(newest[:_JOURNEY_CACHE_MAX_ENTRIES])
+        model.WriteContentText(JOURNEY_CACHE_CONTENT_NAME, json.dumps(cache, separators=(',', ':')), '')
+    except:
+        pass
+
+def build_family_journey(people_id, can_view_giving):
+    """Assemble the family journey response for people_id's family, or None if there is no family"""
+    family_sql = """
+    SELECT 
+        f.PeopleId,
+        f.Name2 AS Name,
+        f.Age,
+        f.PositionInFamilyId,
+        fp.Description AS FamilyPosition,
+        ms.Description AS MemberStatus,
+        p.FamilyId
+    FROM People p
+    JOIN People f ON p.FamilyId = f.FamilyId
+    LEFT JOIN lookup.FamilyPosition fp ON f.PositionInFamilyId = fp.Id
+    LEFT JOIN lookup.MemberStatus ms ON f.MemberStatusId = ms.Id
+    WHERE p.PeopleId = {0}
+    AND f.IsDeceased = 0
+    AND f.ArchivedFlag = 0
+    ORDER BY f.PositionInFamilyId, f.Age DESC
+    """.format(people_id)
+    family_members_data = list(q.QuerySql(family_sql))
+    if not family_members_data:
+        return None
+
+    include_giving = can_view_giving and SHOW_GIVING_IN_JOURNEY
+    family_id = family_members_data[0].FamilyId
+    people_ids = [m.PeopleId for m in family_members_data]
+
+    # The cache never holds giving; amounts stay in memory for this request
+    cache_key = 'family:{0}'.format(family_id)
+    response = load_cached_journey(cache_key)
+    if response is None:
+        events_by_person = get_journey_events(people_ids)
+
+        family_members = []
+        for member in family_members_data:
+            entry = {
+                'person': {
+                    'people_id': member.PeopleId,
+                    'name': member.Name,
+                    'age': member.Age or 0,
+                    'position': member.FamilyPosition or 'Family Member',
+                    'member_status': member.MemberStatus or 'Unknown'
+                },
+                'journey': [_journey_event(event) for event in events_by_person.get(member.PeopleId, [])]
+            }
+            _score_journey(entry)
+            family_members.append(entry)
+
+        response = {
+            'family_info': {
+                'family_id': family_id,
+                'timeline_start': '2023-01-01',
+                'timeline_end': str(model.DateTime).split(' ')[0]
+            },
+            'family_members': family_members
+        }
+        _score_family(response)
+        save_cached_journey(cache_key, response)
+
+    if include_giving:
+        response = add_giving_to_journey(response, get_giving_events(people_ids))
+    return response
+
 # Check if this is an AJAX request early to avoid any HTML output
-if hasattr(model.Data, "action") and model.Data.action in ["get_person_journey", "get_family_journey"]:
+if not ajax_handled and hasattr(model.Data, "action") and model.Data.action in ["get_person_journey", "get_family_journey"]:
     ajax_mode = True
     action = model.Data.action
     
@@ -511,329 +1095,12 @@ if hasattr(model.Data, "action") and model.Data.action in ["get_person_journey",
                     # User has role but not database permissions
                     can_view_giving = False
             
-            # Get family members
-            family_sql = """
-            SELECT 
-                f.PeopleId,
-                f.Name2 AS Name,
-                f.Age,
-                f.PositionInFamilyId,
-                fp.Description AS FamilyPosition,
-                ms.Description AS MemberStatus,
-                p.FamilyId
-            FROM People p
-            JOIN People f ON p.FamilyId = f.FamilyId
-            LEFT JOIN lookup.FamilyPosition fp ON f.PositionInFamilyId = fp.Id
-            LEFT JOIN lookup.MemberStatus ms ON f.MemberStatusId = ms.Id
-            WHERE p.PeopleId = {0}
-            AND f.IsDeceased = 0
-            AND f.ArchivedFlag = 0
-            ORDER BY f.PositionInFamilyId, f.Age DESC
-            """.format(people_id)
-            
+            # Get family members and their journeys (one events query for the whole family)
             if not ajax_handled:
-                family_members_data = q.QuerySql(family_sql)
-                if not family_members_data:
+                response = build_family_journey(people_id, can_view_giving)
+                if response is None:
                     ajax_handled = send_ajax_response({'error': 'Family not found'})
             
-            # Process each family member
-            family_members = []
-            family_id = 0
-            
-            for member in family_members_data:
-                family_id = member.FamilyId
-                
-                # Get comprehensive journey events for this member (matching individual timeline logic)
-                # Build the complete SQL query directly
-                if can_view_giving and SHOW_GIVING_IN_JOURNEY:
-                    member_events_sql = """
-                    WITH MemberJourney AS (
-                        -- System: Person added
-                        SELECT 
-                            p.CreatedDate AS EventDate,
-                            'Added to System' AS EventType,
-                            'Profile created in database' AS Description,
-                            'system' AS Category,
-                            1 AS SortOrder
-                        FROM People p
-                        WHERE p.PeopleId = {0}
-                        
-                        UNION ALL
-                        
-                        -- Program: First program joined
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Joined Program' AS EventType,
-                            ISNULL(p.Name, 'Unknown Program') AS Description,
-                            'program' AS Category,
-                            2 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN Division d ON o.DivisionId = d.Id
-                        LEFT JOIN Program p ON d.ProgId = p.Id
-                        WHERE om.PeopleId = {0}
-                        AND o.OrganizationStatusId = 30
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Attendance: First attendance
-                        SELECT TOP 1
-                            a.MeetingDate AS EventDate,
-                            'First Attendance' AS EventType,
-                            o.OrganizationName AS Description,
-                            'attendance' AS Category,
-                            3 AS SortOrder
-                        FROM Attend a
-                        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
-                        WHERE a.PeopleId = {0}
-                        AND a.AttendanceFlag = 1
-                        ORDER BY a.MeetingDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Small Group: Connect Groups (program ID 1128)
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Joined Small Group' AS EventType,
-                            o.OrganizationName AS Description,
-                            'smallgroup' AS Category,
-                            4 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN Division d ON o.DivisionId = d.Id
-                        WHERE om.PeopleId = {0}
-                        AND d.ProgId = 1128
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Serving: AttendType-based serving
-                        SELECT TOP 1
-                            a.MeetingDate AS EventDate,
-                            'Started Serving' AS EventType,
-                            o.OrganizationName + ' (' + at.Description + ')' AS Description,
-                            'serving' AS Category,
-                            6 AS SortOrder
-                        FROM Attend a
-                        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
-                        LEFT JOIN lookup.AttendType at ON a.AttendanceTypeId = at.Id
-                        WHERE a.PeopleId = {0}
-                        AND a.AttendanceFlag = 1
-                        AND a.AttendanceTypeId IN (10, 20)
-                        ORDER BY a.MeetingDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Serving: Member type based serving (MemberTypeId > 100)
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Leadership Role' AS EventType,
-                            o.OrganizationName + ' (' + ISNULL(mt.Description, 'Leader') + ')' AS Description,
-                            'serving' AS Category,
-                            6 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN lookup.MemberType mt ON om.MemberTypeId = mt.Id
-                        WHERE om.PeopleId = {0}
-                        AND om.MemberTypeId > 100
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                        
-                        UNION ALL
-                        
-                        -- First contribution (only for users with Finance permissions)
-                        SELECT TOP 1
-                            c.ContributionDate AS EventDate,
-                            'Started Giving' AS EventType,
-                            'First contribution of $' + CAST(c.ContributionAmount AS VARCHAR(20)) AS Description,
-                            'giving' AS Category,
-                            5 AS SortOrder
-                        FROM Contribution c
-                        WHERE c.PeopleId = {0}
-                        AND c.ContributionTypeId != 99
-                        ORDER BY c.ContributionDate ASC
-                    )
-                    SELECT TOP 10 EventDate, EventType, Description, Category, SortOrder
-                    FROM MemberJourney
-                    WHERE EventDate IS NOT NULL
-                    ORDER BY EventDate ASC, SortOrder ASC
-                    """.format(member.PeopleId)
-                else:
-                    # Query without giving section
-                    member_events_sql = """
-                    WITH MemberJourney AS (
-                        -- System: Person added
-                        SELECT 
-                            p.CreatedDate AS EventDate,
-                            'Added to System' AS EventType,
-                            'Profile created in database' AS Description,
-                            'system' AS Category,
-                            1 AS SortOrder
-                        FROM People p
-                        WHERE p.PeopleId = {0}
-                        
-                        UNION ALL
-                        
-                        -- Program: First program joined
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Joined Program' AS EventType,
-                            ISNULL(p.Name, 'Unknown Program') AS Description,
-                            'program' AS Category,
-                            2 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN Division d ON o.DivisionId = d.Id
-                        LEFT JOIN Program p ON d.ProgId = p.Id
-                        WHERE om.PeopleId = {0}
-                        AND o.OrganizationStatusId = 30
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Attendance: First attendance
-                        SELECT TOP 1
-                            a.MeetingDate AS EventDate,
-                            'First Attendance' AS EventType,
-                            o.OrganizationName AS Description,
-                            'attendance' AS Category,
-                            3 AS SortOrder
-                        FROM Attend a
-                        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
-                        WHERE a.PeopleId = {0}
-                        AND a.AttendanceFlag = 1
-                        ORDER BY a.MeetingDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Small Group: Connect Groups (program ID 1128)
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Joined Small Group' AS EventType,
-                            o.OrganizationName AS Description,
-                            'smallgroup' AS Category,
-                            4 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN Division d ON o.DivisionId = d.Id
-                        WHERE om.PeopleId = {0}
-                        AND d.ProgId = 1128
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Serving: AttendType-based serving
-                        SELECT TOP 1
-                            a.MeetingDate AS EventDate,
-                            'Started Serving' AS EventType,
-                            o.OrganizationName + ' (' + at.Description + ')' AS Description,
-                            'serving' AS Category,
-                            6 AS SortOrder
-                        FROM Attend a
-                        JOIN Organizations o ON a.OrganizationId = o.OrganizationId
-                        LEFT JOIN lookup.AttendType at ON a.AttendanceTypeId = at.Id
-                        WHERE a.PeopleId = {0}
-                        AND a.AttendanceFlag = 1
-                        AND a.AttendanceTypeId IN (10, 20)
-                        ORDER BY a.MeetingDate ASC
-                        
-                        UNION ALL
-                        
-                        -- Serving: Member type based serving (MemberTypeId > 100)
-                        SELECT TOP 1
-                            om.EnrollmentDate AS EventDate,
-                            'Leadership Role' AS EventType,
-                            o.OrganizationName + ' (' + ISNULL(mt.Description, 'Leader') + ')' AS Description,
-                            'serving' AS Category,
-                            6 AS SortOrder
-                        FROM OrganizationMembers om
-                        JOIN Organizations o ON om.OrganizationId = o.OrganizationId
-                        LEFT JOIN lookup.MemberType mt ON om.MemberTypeId = mt.Id
-                        WHERE om.PeopleId = {0}
-                        AND om.MemberTypeId > 100
-                        AND om.EnrollmentDate IS NOT NULL
-                        ORDER BY om.EnrollmentDate ASC
-                    )
-                    SELECT TOP 10 EventDate, EventType, Description, Category, SortOrder
-                    FROM MemberJourney
-                    WHERE EventDate IS NOT NULL
-                    ORDER BY EventDate ASC, SortOrder ASC
-                    """.format(member.PeopleId)
-                
-                member_events = q.QuerySql(member_events_sql)
-                
-                # Convert events with comprehensive icon mapping
-                journey_events = []
-                icon_map = {
-                    'system': {'icon': 'fa-user-plus', 'color': '#6c757d'},
-                    'program': {'icon': 'fa-users', 'color': '#17a2b8'},
-                    'attendance': {'icon': 'fa-calendar-check-o', 'color': '#007bff'},
-                    'smallgroup': {'icon': 'fa-users', 'color': '#28a745'},
-                    'serving': {'icon': 'fa-hands-helping', 'color': '#fd7e14'},
-                    'giving': {'icon': 'fa-heart', 'color': '#dc3545'}
-                }
-                
-                for event in member_events:
-                    # Skip giving events based on global setting or permissions
-                    if event.Category == 'giving' and (not SHOW_GIVING_IN_JOURNEY or not can_view_giving):
-                        continue
-                        
-                    icon_info = icon_map.get(event.Category, {'icon': 'fa-circle', 'color': '#6c757d'})
-                    date_str = str(event.EventDate).split(' ')[0] if event.EventDate else ''
-                    
-                    journey_events.append({
-                        'date': date_str,
-                        'event': event.EventType,
-                        'description': event.Description,
-                        'type': event.Category,
-                        'icon': icon_info['icon'],
-                        'color': icon_info['color']
-                    })
-                
-                # Calculate simple score
-                score = 20  # Base
-                if len(journey_events) > 1:
-                    score += 30  # Has activity
-                
-                family_members.append({
-                    'person': {
-                        'people_id': member.PeopleId,
-                        'name': member.Name,
-                        'age': member.Age or 0,
-                        'position': member.FamilyPosition or 'Family Member',
-                        'member_status': member.MemberStatus or 'Unknown',
-                        'engagement_score': score
-                    },
-                    'journey': journey_events,
-                    'insights': {
-                        'journey_length': str(len(journey_events)) + ' events',
-                        'entry_point': journey_events[0]['description'] if journey_events else 'Not engaged',
-                        'total_events': len(journey_events)
-                    }
-                })
-            
-            # Calculate family stats
-            total_members = len(family_members)
-            engaged_members = sum(1 for m in family_members if m['person']['engagement_score'] >= 40)
-            avg_score = sum(m['person']['engagement_score'] for m in family_members) / total_members if total_members > 0 else 0
-            
-            response = {
-                'family_info': {
-                    'family_id': family_id,
-                    'total_members': total_members,
-                    'engaged_members': engaged_members,
-                    'avg_engagement': int(avg_score),
-                    'timeline_start': '2023-01-01',
-                    'timeline_end': str(model.DateTime).split(' ')[0]
-                },
-                'family_members': family_members
-            }
-            
             if not ajax_handled:
                 ajax_handled = send_ajax_response(response)
             
@@ -3428,6 +3695,19 @@ else:
             # Check if this is a special people search for assignee selection
             if hasattr(model.Data, "people_search") and model.Data.people_search == "1":
                 # ::STEP:: People Search for Assignee
+                people = []
+                index_ids = search_index_ids('n', search_term, MAX_RESULTS)
+                if index_ids:
+                    people = query_rows_by_ids("""
+            SELECT
+                p.PeopleId, p.Name, p.Age,
+                p.PrimaryAddress, p.PrimaryCity, p.PrimaryState, p.PrimaryZip
+            FROM People p
+            WHERE p.PeopleId IN ({ids})
+                AND p.DeceasedDate IS NULL
+                AND p.ArchivedFlag = 0
+            """, index_ids, 'PeopleId')
+
                 people_search_sql = """
             SELECT TOP {1}
                 p.PeopleId, p.Name, p.Age, 
@@ -3441,7 +3721,9 @@ else:
                 p.Name
             """.format(search_term.replace("'", "''"), MAX_RESULTS)
                 
-                people = q.QuerySql(people_search_sql)
+                # The substring scan is only a fallback for when the index finds nothing
+                if not people:
+                    people = q.QuerySql(people_search_sql)
                 print "<div class='tpls-results-section'>"
                 print "<h3 class='tpls-section-heading'>People</h3>"
                 
@@ -3470,11 +3752,24 @@ else:
                 print "<div class='tpls-results-section'>"
                 print "<h3 class='tpls-section-heading'>People</h3>"
                 
-                # Try to use a simple query for people
+                # Try the search index first, then a simple query for people
                 people = []
                 try:
+                    index_ids = search_index_ids('d' if is_phone_number_search else 'n', search_term, MAX_RESULTS)
+                    if index_ids:
+                        people = query_rows_by_ids("""
+                    SELECT
+                        p.PeopleId, p.Name, p.EmailAddress, p.CellPhone,
+                        p.HomePhone, p.Age, ms.Description AS MemberStatus
+                    FROM People p
+                    LEFT JOIN lookup.MemberStatus ms ON p.MemberStatusId = ms.Id
+                    WHERE p.PeopleId IN ({ids})
+                        AND p.DeceasedDate IS NULL
+                        AND p.ArchivedFlag = 0
+                        """, index_ids, 'PeopleId')
+
                     # If it's a phone number search
-                    if is_phone_number_search:
+                    if not people and is_phone_number_search:
                         # Try SQL search for phone numbers
                         people_sql = """
                     SELECT TOP {1}
@@ -3488,7 +3783,7 @@ else:
                         AND p.ArchivedFlag = 0
                     ORDER BY p.Name
                         """.format(normalized_search, MAX_RESULTS)
-                    else:
+                    elif not people:
                         # First try an exact match
                         name_query = "na='{0}'".format(search_term.replace("'", "''"))
                         people = q.QueryList(name_query, "Name")
@@ -3634,6 +3929,19 @@ else:
                 # Simple query for organizations
                 orgs = []
                 try:
+                    index_ids = search_index_ids('o', search_term, MAX_RESULTS)
+                    if index_ids:
+                        orgs = query_rows_by_ids("""
+                SELECT
+                    o.OrganizationId, o.OrganizationName, o.MemberCount,
+                    p.Name AS ProgramName, d.Name AS DivisionName
+                FROM Organizations o
+                LEFT JOIN Division d ON o.DivisionId = d.Id
+                LEFT JOIN Program p ON d.ProgId = p.Id
+                WHERE o.OrganizationId IN ({ids})
+                AND o.OrganizationStatusId = 30
+                    """, index_ids, 'OrganizationId')
+
                     orgs_sql = """
                 SELECT TOP {1}
                     o.OrganizationId, o.OrganizationName, o.MemberCount,
@@ -3647,7 +3955,9 @@ else:
                     CASE WHEN o.OrganizationName LIKE '{0}%' THEN 0 ELSE 1 END,
                     o.OrganizationName
                     """.format(search_term.replace("'", "''"), MAX_RESULTS)
-                    orgs = q.QuerySql(orgs_sql)
+                    # The substring scan is only a fallback for when the index finds nothing
+                    if not orgs:
+                        orgs = q.QuerySql(orgs_sql)
                 except Exception as e:
                     orgs = []
             
@@ -35,6 +35,11 @@ Features:
 - Prominent upcoming deadlines at top
 - SQL debug output in HTML comments (when enabled)
 - Performance optimized queries (now ~1 second vs 47 seconds)
+- Trip sections read from a shared per-request trip context (a fixed handful of queries per trip page)
+- Trip money totals are kept in a stored snapshot that only recomputes trips with new
+  transactions, gifts or membership changes (?refresh_totals=1 rebuilds it from scratch)
+- CSS and JavaScript are delivered as versioned assets cached in the browser, not inlined
+  into every page (?inline_assets=1 inlines them again for troubleshooting)
 - AJAX loading for detailed data
 
 Role-Based Access:
@@ -142,6 +147,7 @@ class Config:
     # Cache Settings (in seconds)
     CACHE_DURATION = 300  # 5 minutes
     USE_CACHING = True  # Enable caching for performance
+    VERSIONED_ASSETS = True  # Serve CSS/JS via the get_asset action, cached by content hash (False = inline)
     
     # Application-specific organization IDs to exclude (adjust for your setup)
     APPLICATION_ORG_IDS = [2736, 2737, 2738, 3032, 3117, 3304, 3361]  # Organizations used for applications
@@ -529,12 +535,13 @@ def execute_query_with_debug(query, label="Query", query_type="list"):
             print "<!-- SQL ERROR in {0}: {1} -->".format(label, str(e))
         raise
 
-def get_mission_trip_totals_cte(include_closed=False):
+def get_mission_trip_totals_cte(include_closed=False, org_ids=None):
     """Generate the optimized CTE for mission trip totals that replaces custom.MissionTripTotals_Optimized
     This runs in ~1 second vs 47+ seconds for the original view
-    
+
     Args:
         include_closed: If False (default), only includes open trips (Close date > today)
+        org_ids: Optional list of OrganizationIds to limit ActiveTrips to
     """
     
     # Add closed trip filter if needed
@@ -551,6 +558,10 @@ def get_mission_trip_totals_cte(include_closed=False):
                   AND oe.DateValue <= GETDATE()
             )'''
     
+    if org_ids:
+        closed_filter += '''
+            AND o.OrganizationId IN ({0})'''.format(','.join(str(int(o)) for o in org_ids))
+
     # Build the complete CTE
     cte = '''
     WITH ActiveTrips AS (
@@ -681,9 +692,190 @@ def get_mission_trip_totals_cte(include_closed=False):
         ) combined
     )
     '''
-    
+
     return cte
 
+# ---------------------------------------------------------------------
+# Trip totals snapshot
+# ---------------------------------------------------------------------
+# Per-trip fee / raised / outstanding totals from the CTE above, stored in
+# Special Content keyed by OrganizationId. A read only re-runs the CTE for
+# trips with transactions, supporter gifts or membership changes since the
+# snapshot's stamp (plus new trips and trips whose member count moved);
+# every other trip is read back as stored. The whole snapshot is rebuilt
+# when it is older than TRIP_TOTALS_FULL_REBUILD_HOURS, or on demand with
+# ?refresh_totals=1.
+
+TRIP_TOTALS_CONTENT_NAME = 'TPxi_MissionsDashboard_TripTotals'
+TRIP_TOTALS_FULL_REBUILD_HOURS = 24
+
+_trip_totals = None
+
+TRIP_TOTALS_SELECT = '''
+    SELECT
+        InvolvementId,
+        ISNULL(SUM(TripCost), 0) AS TotalFee,
+        ISNULL(SUM(Raised), 0) AS Raised,
+        ISNULL(SUM(Due), 0) AS Due,
+        ISNULL(SUM(CASE WHEN Due > 0 AND PeopleId IS NOT NULL THEN Due ELSE 0 END), 0) AS Outstanding,
+        COUNT(PeopleId) AS Goers
+    FROM MissionTripTotals
+    WHERE SortOrder <> 'ZZZZZ'
+    GROUP BY InvolvementId
+'''
+
+TRIP_TOTALS_CHANGED_SQL = '''
+    SELECT
+        o.OrganizationId,
+        o.MemberCount,
+        CASE WHEN EXISTS (
+                SELECT 1 FROM TransactionSummary ts WITH (NOLOCK)
+                WHERE ts.OrganizationId = o.OrganizationId AND ts.TranDate >= '{2}')
+            OR EXISTS (
+                SELECT 1 FROM OrganizationMembers om WITH (NOLOCK)
+                WHERE om.OrganizationId = o.OrganizationId
+                  AND (om.EnrollmentDate >= '{2}' OR om.InactiveDate >= '{2}'))
+            OR EXISTS (
+                SELECT 1 FROM EnrollmentTransaction et WITH (NOLOCK)
+                WHERE et.OrganizationId = o.OrganizationId AND et.TransactionDate >= '{2}')
+            OR EXISTS (
+                SELECT 1 FROM GoerSenderAmounts gsa WITH (NOLOCK)
+                WHERE gsa.OrgId = o.OrganizationId AND gsa.Created >= '{2}')
+        THEN 1 ELSE 0 END AS Changed
+    FROM Organizations o WITH (NOLOCK)
+    WHERE o.IsMissionTrip = {0}
+      AND o.OrganizationStatusId = {1}
+'''
+
+
+def _load_trip_totals_snapshot():
+    try:
+        import json
+        raw = model.TextContent(TRIP_TOTALS_CONTENT_NAME)
+        if raw and raw.strip():
+            snapshot = json.loads(raw)
+            if isinstance(snapshot, dict) and isinstance(snapshot.get('trips'), dict):
+                return snapshot
+    except:
+        pass
+    return None
+
+
+def _save_trip_totals_snapshot(snapshot):
+    import json
+    model.WriteContentText(TRIP_TOTALS_CONTENT_NAME, json.dumps(snapshot, separators=(',', ':')), '')
+
+
+def _compute_trip_totals(org_ids=None):
+    """Run the totals CTE for org_ids (every trip when None) -> {str(OrgId): totals}."""
+    totals = {}
+    sql = get_mission_trip_totals_cte(include_closed=True, org_ids=org_ids) + TRIP_TOTALS_SELECT
+    for row in q.QuerySql(sql):
+        totals[str(row.InvolvementId)] = {
+            'fee': float(row.TotalFee or 0),
+            'raised': float(row.Raised or 0),
+            'due': float(row.Due or 0),
+            'outstanding': float(row.Outstanding or 0),
+            'goers': int(row.Goers or 0),
+        }
+    return totals
+
+
+def get_trip_totals(force_rebuild=False):
+    """Return {OrganizationId: totals} for every active mission trip.
+
+    Each totals dict has fee (sum of trip costs), raised (goer and
+    undesignated payments), due (net of credits), outstanding (only what goers
+    still owe) and goers. The result is memoized for the rest of the request.
+    """
+    global _trip_totals
+    if _trip_totals is not None and not force_rebuild:
+        return _trip_totals
+
+    snapshot = None if force_rebuild else _load_trip_totals_snapshot()
+    clock_sql = "SELECT CONVERT(varchar(19), GETDATE(), 120) AS Now"
+    if snapshot:
+        clock_sql += ", DATEDIFF(hour, '{0}', GETDATE()) AS AgeHours".format(
+            str(snapshot.get('builtAt', '')).replace("'", ""))
+    try:
+        clock = q.QuerySqlTop1(clock_sql)
+    except:
+        snapshot = None
+        clock = q.QuerySqlTop1("SELECT CONVERT(varchar(19), GETDATE(), 120) AS Now")
+    now = str(clock.Now)
+    full = not snapshot or (clock.AgeHours or 0) >= TRIP_TOTALS_FULL_REBUILD_HOURS
+
+    trips = {} if full else snapshot['trips']
+    stamp = now if full else str(snapshot.get('stamp', now)).replace("'", "")
+    active = {}
+    for row in q.QuerySql(TRIP_TOTALS_CHANGED_SQL.format(
+            config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, stamp)):
+        active[str(row.OrganizationId)] = row
+
+    if full:
+        refresh = list(active.keys())
+    else:
+        refresh = [oid for oid, row in active.items()
+                   if row.Changed or oid not in trips
+                   or trips[oid].get('members') != (row.MemberCount or 0)]
+    removed = [oid for oid in trips if oid not in active]
+
+    if full or refresh or removed:
+        fresh = {}
+        if refresh:
+            fresh = _compute_trip_totals(None if full else refresh)
+        for oid in removed:
+            trips.pop(oid, None)
+        for oid in refresh:
+            totals = fresh.get(oid) or {'fee': 0, 'raised': 0, 'due': 0, 'outstanding': 0, 'goers': 0}
+            totals['members'] = active[oid].MemberCount or 0
+            trips[oid] = totals
+        snapshot = {
+            'stamp': now,
+            'builtAt': now if full else snapshot.get('builtAt', now),
+            'trips': trips,
+        }
+        try:
+            _save_trip_totals_snapshot(snapshot)
+        except:
+            pass  # still usable for this request
+
+    _trip_totals = dict((int(oid), totals) for oid, totals in trips.items())
+    return _trip_totals
+
+
+def mark_trip_totals_stale(org_id):
+    """Drop one trip from the stored snapshot so the next read recomputes it.
+
+    For changes the stamp can't see, e.g. a fee adjustment or payment dated
+    before the last refresh, or a member type change.
+    """
+    global _trip_totals
+    _trip_totals = None
+    snapshot = _load_trip_totals_snapshot()
+    if snapshot and snapshot['trips'].pop(str(int(org_id)), None) is not None:
+        try:
+            _save_trip_totals_snapshot(snapshot)
+        except:
+            pass
+
+
+def trip_totals_table_sql():
+    """The snapshot as a SELECT with columns
+    InvolvementId, TotalFee, Raised, Due, Outstanding, Goers, for joining into
+    report queries in place of the totals CTE."""
+    rows = []
+    for org_id, t in sorted(get_trip_totals().items()):
+        rows.append('({0}, {1:.2f}, {2:.2f}, {3:.2f}, {4:.2f}, {5})'.format(
+            int(org_id), t.get('fee', 0), t.get('raised', 0), t.get('due', 0),
+            t.get('outstanding', 0), int(t.get('goers', 0))))
+    if not rows:
+        return ('SELECT CAST(NULL AS int) AS InvolvementId, CAST(0 AS money) AS TotalFee, '
+                'CAST(0 AS money) AS Raised, CAST(0 AS money) AS Due, '
+                'CAST(0 AS money) AS Outstanding, 0 AS Goers WHERE 1 = 0')
+    return ('SELECT * FROM (VALUES ' + ',\n            '.join(rows) +
+            ') AS tt(InvolvementId, TotalFee, Raised, Due, Outstanding, Goers)')
+
 # ::END:: Initialization
 
 #####################################################################
@@ -853,30 +1045,7 @@ def get_all_trips_for_sidebar(include_closed=False):
             WHEN oe_start.DateValue > GETDATE() THEN 'upcoming'
             WHEN oe_end.DateValue < GETDATE() THEN 'completed'
             ELSE 'active'
-        END AS TripStatus,
-        ISNULL((
-            SELECT SUM(mtt.Due)
-            FROM (
-                SELECT
-                    om2.OrganizationId,
-                    om2.PeopleId,
-                    ISNULL(ts.IndAmt, 0) - ISNULL(ts.IndPaid, 0) - ISNULL((
-                        SELECT SUM(gsa.Amount)
-                        FROM GoerSenderAmounts gsa
-                        WHERE gsa.GoerId = om2.PeopleId
-                          AND gsa.OrgId = om2.OrganizationId
-                          AND gsa.Created > om2.EnrollmentDate
-                          AND gsa.SupporterId <> om2.PeopleId
-                    ), 0) AS Due
-                FROM OrganizationMembers om2 WITH (NOLOCK)
-                INNER JOIN OrgMemMemTags omm ON omm.OrgId = om2.OrganizationId AND omm.PeopleId = om2.PeopleId
-                INNER JOIN MemberTags mt ON mt.Id = omm.MemberTagId AND mt.Name = 'Goer'
-                LEFT JOIN TransactionSummary ts ON ts.OrganizationId = om2.OrganizationId
-                    AND ts.PeopleId = om2.PeopleId AND ts.RegId = om2.TranId
-                WHERE om2.OrganizationId = o.OrganizationId
-            ) mtt
-            WHERE mtt.Due > 0
-        ), 0) AS Outstanding
+        END AS TripStatus
     FROM Organizations o WITH (NOLOCK)
     LEFT JOIN OrganizationExtra oe_start ON o.OrganizationId = oe_start.OrganizationId
         AND oe_start.Field = 'Main Event Start'
@@ -895,7 +1064,21 @@ def get_all_trips_for_sidebar(include_closed=False):
         o.OrganizationName
     '''.format(config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, closed_filter)
 
-    return list(q.QuerySql(trips_sql))
+    # Outstanding comes from the stored trip totals rather than a per-trip subquery
+    trip_totals = get_trip_totals()
+    trips = []
+    for row in q.QuerySql(trips_sql):
+        totals = trip_totals.get(row.OrganizationId) or {}
+        trips.append(_TripRow(
+            OrganizationId=row.OrganizationId,
+            OrganizationName=row.OrganizationName,
+            MemberCount=row.MemberCount,
+            StartDate=row.StartDate,
+            EndDate=row.EndDate,
+            TripStatus=row.TripStatus,
+            Outstanding=totals.get('outstanding', 0),
+        ))
+    return trips
 
 
 def print_access_denied():
@@ -1547,34 +1730,275 @@ def _render_pending_access_notice(org_id, section, status):
     '''.format(section_name, status_class, icon, status_text, message)
 
 
+# ---------------------------------------------------------------------
+# Trip context
+# ---------------------------------------------------------------------
+# The trip sections all read the same involvement, roster, money and meeting
+# data. TripContext loads each of those once per request in a single batched
+# query (the first time something asks for it) and every renderer and
+# handler reads from there. Handlers that change a trip call
+# invalidate_trip_context() so anything read later in the same request is
+# current.
+
+_trip_contexts = {}
+
+
+def get_trip_context(org_id):
+    """Return this request's TripContext for org_id, creating it on first use."""
+    org_id = int(org_id)
+    ctx = _trip_contexts.get(org_id)
+    if ctx is None:
+        ctx = TripContext(org_id)
+        _trip_contexts[org_id] = ctx
+    return ctx
+
+
+def invalidate_trip_context(org_id=None):
+    """Drop cached data for one trip, or for every trip when org_id is None."""
+    if org_id is None:
+        _trip_contexts.clear()
+    else:
+        _trip_contexts.pop(int(org_id), None)
+
+
+class _TripRow(object):
+    """Simple object for trip/member values pulled from TripContext, so the
+    sections can keep using row.Name, row.Outstanding etc."""
+    def __init__(self, **values):
+        for key, val in values.items():
+            setattr(self, key, val)
+
+
+class TripContext(object):
+    """Request-scoped data for one trip, one query per group:
+
+    org()        - involvement row with leader, fee settings and the trip
+                   date / approval-reason extra values
+    members()    - every member row with person, document, transaction and
+                   approval subgroup columns (ordered by Name2)
+    finance()    - MissionTripTotals rows for this trip, by PeopleId
+    meetings()   - meetings (newest first) with description/location overrides
+    attendance() - present PeopleIds per meeting
+    """
+
+    MEMBER_COLUMNS = ('PeopleId', 'Name2', 'FullName', 'EmailAddress', 'CellPhone', 'GenderId', 'Age',
+                      'MemberStatusId', 'BaptismDate', 'FamilyId', 'PositionInFamilyId', 'PictureId',
+                      'PictureUrl', 'MemberTypeId', 'MemberType', 'EnrollmentDate', 'InactiveDate',
+                      'IsActive', 'IndAmt', 'HasPassportNumber', 'HasPassportInfo', 'PassportExpires',
+                      'BGCheckStatus', 'PriorTripCount', 'IsApproved', 'IsDenied')
+
+    def __init__(self, org_id):
+        self.org_id = int(org_id)
+        self._cache = {}
+
+    def _get(self, key, loader):
+        if key not in self._cache:
+            self._cache[key] = loader()
+        return self._cache[key]
+
+    def org(self):
+        return self._get('org', self._load_org)
+
+    def members(self):
+        return self._get('members', self._load_members)
+
+    def active_members(self):
+        """The team: member types other than 230/311, not inactive."""
+        return [m for m in self.members() if m.IsActive]
+
+    def leaders(self):
+        """Active leader-type members (Config.LEADER_MEMBER_TYPES), by name."""
+        types = config.LEADER_MEMBER_TYPES or [140, 310, 320]
+        return [m for m in self.members() if m.MemberTypeId in types and m.InactiveDate is None]
+
+    def team_emails(self):
+        return [m.EmailAddress for m in self.active_members() if m.EmailAddress]
+
+    def approval_reasons(self):
+        """Parsed TripApprovalReasons extra value ({'denials': [...]})."""
+        import json
+        org = self.org()
+        try:
+            if org and org.ApprovalReasons:
+                return json.loads(org.ApprovalReasons)
+        except:
+            pass
+        return {'denials': []}
+
+    def finance(self):
+        return self._get('finance', self._load_finance)
+
+    def meetings(self):
+        return self._get('meetings', self._load_meetings)
+
+    def attendance(self):
+        return self._get('attendance', self._load_attendance)
+
+    def _load_org(self):
+        sql = '''
+        SELECT
+            o.OrganizationId,
+            o.OrganizationName,
+            o.LeaderId,
+            leader.Name2 as LeaderName,
+            leader_pic.MediumUrl as LeaderPictureUrl,
+            o.Location,
+            o.PendingLoc,
+            o.Description,
+            o.RegSettingXml,
+            o.RegSettingXml.value('(/Settings/Fees/Fee)[1]', 'decimal(18,2)') as StandardFee,
+            o.RegSettingXml.value('(/Settings/Fees/Deposit)[1]', 'decimal(18,2)') as Deposit,
+            ev_begin.DateValue as TripBegin,
+            ev_end.DateValue as TripEnd,
+            ev_close.DateValue as TripClose,
+            ev_reasons.Data as ApprovalReasons,
+            (SELECT COUNT(*) FROM OrganizationMembers om WITH (NOLOCK)
+             WHERE om.OrganizationId = o.OrganizationId
+               AND om.MemberTypeId NOT IN (230, 311)
+               AND om.InactiveDate IS NULL) as MemberCount
+        FROM Organizations o WITH (NOLOCK)
+        LEFT JOIN People leader WITH (NOLOCK) ON o.LeaderId = leader.PeopleId
+        LEFT JOIN Picture leader_pic WITH (NOLOCK) ON leader.PictureId = leader_pic.PictureId
+        LEFT JOIN OrganizationExtra ev_begin WITH (NOLOCK) ON ev_begin.OrganizationId = o.OrganizationId
+            AND ev_begin.Field = 'Main Event Start'
+        LEFT JOIN OrganizationExtra ev_end WITH (NOLOCK) ON ev_end.OrganizationId = o.OrganizationId
+            AND ev_end.Field = 'Main Event End'
+        LEFT JOIN OrganizationExtra ev_close WITH (NOLOCK) ON ev_close.OrganizationId = o.OrganizationId
+            AND ev_close.Field = 'Close'
+        LEFT JOIN OrganizationExtra ev_reasons WITH (NOLOCK) ON ev_reasons.OrganizationId = o.OrganizationId
+            AND ev_reasons.Field = 'TripApprovalReasons'
+        WHERE o.OrganizationId = {0}
+        '''.format(self.org_id)
+        rows = list(q.QuerySql(sql))
+        return rows[0] if rows else None
+
+    def _load_members(self):
+        sql = '''
+        WITH TripSubgroups AS (
+            SELECT
+                omt.PeopleId,
+                MAX(CASE WHEN sg.Name = 'trip-approved' THEN 1 ELSE 0 END) as IsApproved,
+                MAX(CASE WHEN sg.Name = 'trip-denied' THEN 1 ELSE 0 END) as IsDenied
+            FROM OrgMemMemTags omt WITH (NOLOCK)
+            JOIN MemberTags sg WITH (NOLOCK) ON omt.MemberTagId = sg.Id
+            WHERE sg.Name IN ('trip-approved', 'trip-denied')
+              AND omt.OrgId = {0}
+            GROUP BY omt.PeopleId
+        )
+        SELECT
+            p.PeopleId,
+            p.Name2,
+            p.Name as FullName,
+            p.EmailAddress,
+            p.CellPhone,
+            p.GenderId,
+            p.Age,
+            p.MemberStatusId,
+            p.BaptismDate,
+            p.FamilyId,
+            p.PositionInFamilyId,
+            p.PictureId,
+            pic.MediumUrl as PictureUrl,
+            om.MemberTypeId,
+            mt.Description as MemberType,
+            om.EnrollmentDate,
+            om.InactiveDate,
+            CASE WHEN om.MemberTypeId NOT IN (230, 311) AND om.InactiveDate IS NULL THEN 1 ELSE 0 END as IsActive,
+            ts.IndAmt,
+            CASE WHEN rr.passportnumber IS NOT NULL AND rr.passportnumber != '' THEN 1 ELSE 0 END as HasPassportNumber,
+            CASE WHEN rr.passportnumber IS NOT NULL AND rr.passportexpires IS NOT NULL THEN 1 ELSE 0 END as HasPassportInfo,
+            rr.passportexpires as PassportExpires,
+            vs.Description as BGCheckStatus,
+            CASE WHEN om.MemberTypeId NOT IN (230, 311) AND om.InactiveDate IS NULL THEN
+                (SELECT COUNT(*)
+                 FROM OrganizationMembers om2 WITH (NOLOCK)
+                 JOIN Organizations o2 WITH (NOLOCK) ON om2.OrganizationId = o2.OrganizationId
+                 WHERE om2.PeopleId = p.PeopleId
+                   AND o2.IsMissionTrip = 1
+                   AND o2.OrganizationId <> {0})
+            ELSE 0 END as PriorTripCount,
+            ISNULL(sg.IsApproved, 0) as IsApproved,
+            ISNULL(sg.IsDenied, 0) as IsDenied
+        FROM OrganizationMembers om WITH (NOLOCK)
+        JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
+        LEFT JOIN lookup.MemberType mt WITH (NOLOCK) ON om.MemberTypeId = mt.Id
+        LEFT JOIN Picture pic WITH (NOLOCK) ON p.PictureId = pic.PictureId
+        OUTER APPLY (
+            SELECT TOP 1 t.IndAmt
+            FROM TransactionSummary t WITH (NOLOCK)
+            WHERE t.OrganizationId = om.OrganizationId AND t.PeopleId = om.PeopleId AND t.RegId = om.TranId
+            ORDER BY t.TranDate DESC
+        ) ts
+        OUTER APPLY (
+            SELECT TOP 1 r.passportnumber, r.passportexpires
+            FROM RecReg r WITH (NOLOCK)
+            WHERE r.PeopleId = p.PeopleId
+        ) rr
+        OUTER APPLY (
+            SELECT TOP 1 vas.Description
+            FROM Volunteer v WITH (NOLOCK)
+            LEFT JOIN lookup.VolApplicationStatus vas WITH (NOLOCK) ON vas.Id = v.StatusId
+            WHERE v.PeopleId = p.PeopleId
+        ) vs
+        LEFT JOIN TripSubgroups sg ON sg.PeopleId = om.PeopleId
+        WHERE om.OrganizationId = {0}
+        ORDER BY p.Name2
+        '''.format(self.org_id)
+        members = []
+        for r in q.QuerySql(sql):
+            member = _TripRow(**dict((c, getattr(r, c)) for c in self.MEMBER_COLUMNS))
+            member.Name = member.Name2  # the section queries all aliased Name2 as Name
+            members.append(member)
+        return members
+
+    def _load_finance(self):
+        sql = get_mission_trip_totals_cte(include_closed=True, org_ids=[self.org_id]) + '''
+        SELECT mtt.PeopleId, mtt.TripCost, mtt.Raised, mtt.Due
+        FROM MissionTripTotals mtt
+        WHERE mtt.InvolvementId = {0}
+          AND mtt.PeopleId IS NOT NULL
+          AND mtt.SortOrder <> 'ZZZZZ'
+          AND mtt.Name <> 'total'
+        '''.format(self.org_id)
+        return dict((r.PeopleId, r) for r in q.QuerySql(sql))
+
+    def _load_meetings(self):
+        sql = '''
+        SELECT m.MeetingId, m.MeetingDate,
+               COALESCE(me_desc.Data, m.Description) as Description,
+               COALESCE(me_loc.Data, m.Location) as Location,
+               m.NumPresent, m.HeadCount,
+               CASE WHEN m.MeetingDate >= GETDATE() THEN 1 ELSE 0 END as IsUpcoming,
+               CASE WHEN m.MeetingDate >= CAST(GETDATE() AS DATE) THEN 'upcoming' ELSE 'past' END as Status
+        FROM Meetings m WITH (NOLOCK)
+        LEFT JOIN MeetingExtra me_desc WITH (NOLOCK) ON m.MeetingId = me_desc.MeetingId AND me_desc.Field = 'Description'
+        LEFT JOIN MeetingExtra me_loc WITH (NOLOCK) ON m.MeetingId = me_loc.MeetingId AND me_loc.Field = 'Location'
+        WHERE m.OrganizationId = {0}
+        ORDER BY m.MeetingDate DESC
+        '''.format(self.org_id)
+        return list(q.QuerySql(sql))
+
+    def _load_attendance(self):
+        sql = '''
+        SELECT a.MeetingId, a.PeopleId
+        FROM Attend a WITH (NOLOCK)
+        JOIN Meetings m WITH (NOLOCK) ON m.MeetingId = a.MeetingId
+        WHERE m.OrganizationId = {0}
+          AND a.AttendanceFlag = 1
+        '''.format(self.org_id)
+        present = {}
+        for r in q.QuerySql(sql):
+            present.setdefault(r.MeetingId, set()).add(r.PeopleId)
+        return present
+
+
 def _get_trip_info(org_id):
     """Get basic trip/organization info for headers."""
-    # Get basic org info from SQL
-    sql = '''
-    SELECT
-        o.OrganizationId,
-        o.OrganizationName,
-        o.LeaderId,
-        leader.Name2 as LeaderName,
-        o.Location,
-        o.PendingLoc,
-        o.Description,
-        o.RegSettingXml,
-        (SELECT COUNT(*) FROM OrganizationMembers om WITH (NOLOCK)
-         WHERE om.OrganizationId = o.OrganizationId
-           AND om.MemberTypeId NOT IN (230, 311)
-           AND om.InactiveDate IS NULL) as MemberCount
-    FROM Organizations o WITH (NOLOCK)
-    LEFT JOIN People leader WITH (NOLOCK) ON o.LeaderId = leader.PeopleId
-    WHERE o.OrganizationId = {0}
-    '''.format(org_id)
-
-    results = list(q.QuerySql(sql))
-    if not results:
+    ctx = get_trip_context(org_id)
+    row = ctx.org()
+    if not row:
         return None
 
-    row = results[0]
-
     # Build a simple object we can add attributes to
     class TripInfo:
         pass
@@ -1590,10 +2014,9 @@ def _get_trip_info(org_id):
     trip.RegSettingXml = row.RegSettingXml
     trip.MemberCount = row.MemberCount
 
-    # Use model.ExtraValueDateOrg for dates
-    # The method may return a .NET DateTime, Python datetime, string, or None
+    # Extra value dates may come back as a .NET DateTime, Python datetime, string, or None
     def parse_extra_value_date(date_val):
-        """Parse date from ExtraValueDateOrg which may be datetime or string"""
+        """Parse an extra value date which may be datetime or string"""
         if date_val is None:
             return None
 
@@ -1641,21 +2064,19 @@ def _get_trip_info(org_id):
 
         return None
 
+    # Trip dates come from the Main Event Start/End and Close extra values
     try:
-        raw_begin = model.ExtraValueDateOrg(int(org_id), "Main Event Start")
-        trip.TripBegin = parse_extra_value_date(raw_begin)
+        trip.TripBegin = parse_extra_value_date(row.TripBegin)
     except Exception as e:
         trip.TripBegin = None
 
     try:
-        raw_end = model.ExtraValueDateOrg(int(org_id), "Main Event End")
-        trip.TripEnd = parse_extra_value_date(raw_end)
+        trip.TripEnd = parse_extra_value_date(row.TripEnd)
     except Exception as e:
         trip.TripEnd = None
 
     try:
-        raw_close = model.ExtraValueDateOrg(int(org_id), "Close")
-        trip.TripClose = parse_extra_value_date(raw_close)
+        trip.TripClose = parse_extra_value_date(row.TripClose)
     except Exception as e:
         trip.TripClose = None
 
@@ -1669,20 +2090,10 @@ def render_trip_overview(org_id, user_role):
         return '<div class="alert alert-danger">Trip not found.</div>'
 
     html = []
+    ctx = get_trip_context(org_id)
 
     # Get team emails for email popup
-    team_emails_sql = '''
-    SELECT p.EmailAddress
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-      AND p.EmailAddress IS NOT NULL
-      AND p.EmailAddress != ''
-    '''.format(org_id)
-    team_emails_result = list(q.QuerySql(team_emails_sql))
-    team_emails = [r.EmailAddress for r in team_emails_result]
+    team_emails = ctx.team_emails()
     team_emails_js = ','.join(team_emails) if team_emails else ''
 
     # Prepare date strings for Edit Dates modal (ISO format for date inputs)
@@ -2202,19 +2613,10 @@ def render_trip_overview(org_id, user_role):
 
             # Get TouchPoint's built-in trip cost for comparison
             builtin_trip_cost = 0
-            try:
-                cost_sql = '''
-                SELECT TOP 1 ts.IndAmt
-                FROM TransactionSummary ts WITH (NOLOCK)
-                JOIN OrganizationMembers om WITH (NOLOCK) ON ts.OrganizationId = om.OrganizationId
-                    AND ts.PeopleId = om.PeopleId AND ts.RegId = om.TranId
-                WHERE ts.OrganizationId = {0} AND ts.IndAmt > 0
-                '''.format(org_id)
-                cost_result = list(q.QuerySql(cost_sql))
-                if cost_result and cost_result[0].IndAmt:
-                    builtin_trip_cost = int(cost_result[0].IndAmt)
-            except:
-                pass
+            for member in ctx.members():
+                if member.IndAmt and float(member.IndAmt) > 0:
+                    builtin_trip_cost = int(member.IndAmt)
+                    break
 
             # Display effective trip cost (override or builtin)
             effective_cost = trip_cost_override if trip_cost_override > 0 else builtin_trip_cost
@@ -2531,30 +2933,10 @@ def render_trip_overview(org_id, user_role):
 
     try:
         # Get all meetings for this trip with attendance counts
-        # Use COALESCE to prefer extra values (set via API) over column values
-        all_meetings_sql = '''
-        SELECT m.MeetingId, m.MeetingDate,
-               COALESCE(me_desc.Data, m.Description) as Description,
-               COALESCE(me_loc.Data, m.Location) as Location,
-               m.NumPresent, m.HeadCount,
-               CASE WHEN m.MeetingDate >= GETDATE() THEN 1 ELSE 0 END as IsUpcoming
-        FROM Meetings m WITH (NOLOCK)
-        LEFT JOIN MeetingExtra me_desc WITH (NOLOCK) ON m.MeetingId = me_desc.MeetingId AND me_desc.Field = 'Description'
-        LEFT JOIN MeetingExtra me_loc WITH (NOLOCK) ON m.MeetingId = me_loc.MeetingId AND me_loc.Field = 'Location'
-        WHERE m.OrganizationId = {0}
-        ORDER BY m.MeetingDate DESC
-        '''.format(org_id)
-        all_meetings_list = list(q.QuerySql(all_meetings_sql))
+        all_meetings_list = ctx.meetings()
 
         # Get all org members for attendance comparison
-        org_members_sql = '''
-        SELECT om.PeopleId, p.Name2 as Name
-        FROM OrganizationMembers om WITH (NOLOCK)
-        JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-        WHERE om.OrganizationId = {0}
-        ORDER BY p.Name2
-        '''.format(org_id)
-        org_members = list(q.QuerySql(org_members_sql))
+        org_members = ctx.members()
         org_member_ids = set([m.PeopleId for m in org_members])
         org_member_names = dict([(m.PeopleId, m.Name) for m in org_members])
 
@@ -2650,16 +3032,8 @@ def render_trip_overview(org_id, user_role):
 
                     # Expandable attendance list (for non-headcount meetings)
                     if not is_headcount_only:
-                        # Get attendance for this meeting
-                        attendance_sql = '''
-                        SELECT a.PeopleId, a.AttendanceFlag, p.Name2 as Name
-                        FROM Attend a WITH (NOLOCK)
-                        JOIN People p WITH (NOLOCK) ON a.PeopleId = p.PeopleId
-                        WHERE a.MeetingId = {0}
-                        '''.format(meeting_id)
-                        attendance_records = list(q.QuerySql(attendance_sql))
-
-                        present_ids = set([a.PeopleId for a in attendance_records if a.AttendanceFlag == 1 or a.AttendanceFlag == True])
+                        # Attendance for this meeting (loaded once for the whole trip)
+                        present_ids = ctx.attendance().get(meeting_id, set())
                         present_names = [org_member_names.get(pid, 'Unknown') for pid in present_ids if pid in org_member_ids]
                         absent_names = [org_member_names.get(pid, 'Unknown') for pid in org_member_ids if pid not in present_ids]
 
@@ -2768,38 +3142,11 @@ def render_trip_overview(org_id, user_role):
     html.append('</div>')
     html.append('<div class="overview-card-body" style="padding: 0;">')
 
-    signups_sql = '''
-    WITH TripSubgroups AS (
-        SELECT
-            omt.OrgId,
-            omt.PeopleId,
-            MAX(CASE WHEN sg.Name = 'trip-approved' THEN 1 ELSE 0 END) as IsApproved,
-            MAX(CASE WHEN sg.Name = 'trip-denied' THEN 1 ELSE 0 END) as IsDenied
-        FROM OrgMemMemTags omt WITH (NOLOCK)
-        JOIN MemberTags sg WITH (NOLOCK) ON omt.MemberTagId = sg.Id
-        WHERE sg.Name IN ('trip-approved', 'trip-denied')
-          AND omt.OrgId = {0}
-        GROUP BY omt.OrgId, omt.PeopleId
-    )
-    SELECT TOP 8
-        p.PeopleId,
-        p.Name,
-        om.EnrollmentDate,
-        mt.Description as MemberType,
-        COALESCE(ts.IsApproved, 0) as IsApproved,
-        COALESCE(ts.IsDenied, 0) as IsDenied
-    FROM OrganizationMembers om WITH (NOLOCK)
-    INNER JOIN People p WITH (NOLOCK) ON p.PeopleId = om.PeopleId
-    LEFT JOIN lookup.MemberType mt ON om.MemberTypeId = mt.Id
-    LEFT JOIN TripSubgroups ts ON om.OrganizationId = ts.OrgId AND om.PeopleId = ts.PeopleId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-    ORDER BY om.EnrollmentDate DESC
-    '''.format(org_id)
-
     try:
-        signups = list(q.QuerySql(signups_sql))
+        # Eight most recent sign-ups from the trip roster (no enrollment date sorts last)
+        signups = sorted(ctx.active_members(),
+                         key=lambda m: (1, m.EnrollmentDate) if m.EnrollmentDate else (0, None),
+                         reverse=True)[:8]
         # Check if approvals are enabled for this trip
         show_approval_status = are_approvals_enabled_for_trip(org_id)
         if signups:
@@ -2841,7 +3188,7 @@ def render_trip_overview(org_id, user_role):
                 else:
                     action_html = '<button class="signup-review-btn" onclick="ApprovalWorkflow.showModal({0}, \'{1}\', {2}, {3})">Review</button>'.format(
                         signup.PeopleId,
-                        _escape_html(signup.Name or '').replace("'", "\\'"),
+                        _escape_html(signup.FullName or '').replace("'", "\\'"),
                         org_id,
                         'true' if show_approval_status else 'false'
                     )
@@ -2855,7 +3202,7 @@ def render_trip_overview(org_id, user_role):
                     </tr>
                 '''.format(
                     signup.PeopleId,
-                    _escape_html(signup.Name or ''),
+                    _escape_html(signup.FullName or ''),
                     enrollment_date,
                     status_html,
                     action_html,
@@ -2890,122 +3237,35 @@ def _get_trip_stats(org_id):
         'no_charge_value': 0
     }
 
-    # Member count
-    member_sql = '''
-    SELECT COUNT(*) as cnt
-    FROM OrganizationMembers
-    WHERE OrganizationId = {0}
-      AND MemberTypeId NOT IN (230, 311)
-      AND InactiveDate IS NULL
-    '''.format(org_id)
-    result = list(q.QuerySql(member_sql))
-    if result:
-        stats['member_count'] = result[0].cnt
-
-    # Upcoming meetings
-    meeting_sql = '''
-    SELECT COUNT(*) as cnt
-    FROM Meetings
-    WHERE OrganizationId = {0}
-      AND MeetingDate >= GETDATE()
-    '''.format(org_id)
-    result = list(q.QuerySql(meeting_sql))
-    if result:
-        stats['upcoming_meetings'] = result[0].cnt
+    ctx = get_trip_context(org_id)
+    team = ctx.active_members()
 
-    # Financial stats using MissionTripTotals CTE
-    try:
-        mission_trip_cte = get_mission_trip_totals_cte(include_closed=True)
-        finance_sql = mission_trip_cte + '''
-        SELECT
-            ISNULL(SUM(mtt.Raised), 0) as TotalRaised,
-            ISNULL(SUM(mtt.Due), 0) as TotalOutstanding,
-            ISNULL(SUM(mtt.TripCost), 0) as TotalCost
-        FROM MissionTripTotals mtt
-        WHERE mtt.InvolvementId = {0}
-          AND mtt.PeopleId IS NOT NULL
-          AND mtt.SortOrder <> 'ZZZZZ'
-          AND mtt.Name <> 'total'
-        '''.format(org_id)
-        result = list(q.QuerySql(finance_sql))
-        if result:
-            stats['total_raised'] = float(result[0].TotalRaised or 0)
-            stats['total_outstanding'] = float(result[0].TotalOutstanding or 0)
-            stats['total_cost'] = float(result[0].TotalCost or 0)
-    except:
-        pass
+    # Member count and upcoming meetings
+    stats['member_count'] = len(team)
+    stats['upcoming_meetings'] = len([m for m in ctx.meetings() if m.IsUpcoming == 1])
 
-    # Document status - missing passports, background checks, and photos
-    # Use subqueries to avoid duplicate counts from multiple volunteer/recrg records
+    # Financial stats from this trip's MissionTripTotals rows
     try:
-        doc_status_sql = '''
-        SELECT
-            (SELECT COUNT(DISTINCT p2.PeopleId)
-             FROM OrganizationMembers om2 WITH (NOLOCK)
-             JOIN People p2 WITH (NOLOCK) ON om2.PeopleId = p2.PeopleId
-             LEFT JOIN RecReg rr WITH (NOLOCK) ON rr.PeopleId = p2.PeopleId
-             WHERE om2.OrganizationId = {0}
-               AND om2.MemberTypeId NOT IN (230, 311)
-               AND om2.InactiveDate IS NULL
-               AND (rr.passportnumber IS NULL OR rr.passportnumber = '')) as MissingPassport,
-            (SELECT COUNT(DISTINCT p3.PeopleId)
-             FROM OrganizationMembers om3 WITH (NOLOCK)
-             JOIN People p3 WITH (NOLOCK) ON om3.PeopleId = p3.PeopleId
-             LEFT JOIN Volunteer v WITH (NOLOCK) ON v.PeopleId = p3.PeopleId
-             LEFT JOIN lookup.VolApplicationStatus vs WITH (NOLOCK) ON vs.Id = v.StatusId
-             WHERE om3.OrganizationId = {0}
-               AND om3.MemberTypeId NOT IN (230, 311)
-               AND om3.InactiveDate IS NULL
-               AND (vs.Description IS NULL OR vs.Description <> 'Complete')) as MissingBGCheck,
-            (SELECT COUNT(DISTINCT p4.PeopleId)
-             FROM OrganizationMembers om4 WITH (NOLOCK)
-             JOIN People p4 WITH (NOLOCK) ON om4.PeopleId = p4.PeopleId
-             WHERE om4.OrganizationId = {0}
-               AND om4.MemberTypeId NOT IN (230, 311)
-               AND om4.InactiveDate IS NULL
-               AND p4.PictureId IS NULL) as MissingPhoto
-        '''.format(org_id)
-        result = list(q.QuerySql(doc_status_sql))
-        if result:
-            stats['missing_passport'] = int(result[0].MissingPassport or 0)
-            stats['missing_bgcheck'] = int(result[0].MissingBGCheck or 0)
-            stats['missing_photo'] = int(result[0].MissingPhoto or 0)
+        totals = ctx.finance().values()
+        stats['total_raised'] = sum(float(r.Raised or 0) for r in totals)
+        stats['total_outstanding'] = sum(float(r.Due or 0) for r in totals)
+        stats['total_cost'] = sum(float(r.TripCost or 0) for r in totals)
     except:
         pass
 
-    # Get standard fee, deposit, and no-charge member info
-    try:
-        fee_sql = '''
-        WITH OrgSettings AS (
-            SELECT
-                OrganizationId,
-                RegSettingXml.value('(/Settings/Fees/Fee)[1]', 'decimal(18,2)') as StandardFee,
-                RegSettingXml.value('(/Settings/Fees/Deposit)[1]', 'decimal(18,2)') as Deposit
-            FROM Organizations WITH (NOLOCK)
-            WHERE OrganizationId = {0}
-        )
-        SELECT
-            os.StandardFee,
-            os.Deposit,
-            COUNT(CASE WHEN ISNULL(ts.IndAmt, 0) = 0 THEN 1 END) as NoChargeCount
-        FROM OrgSettings os
-        LEFT JOIN OrganizationMembers om WITH (NOLOCK) ON os.OrganizationId = om.OrganizationId
-            AND om.MemberTypeId NOT IN (230, 311)
-            AND om.InactiveDate IS NULL
-        LEFT JOIN TransactionSummary ts WITH (NOLOCK) ON ts.OrganizationId = om.OrganizationId
-            AND ts.PeopleId = om.PeopleId
-            AND ts.RegId = om.TranId
-        GROUP BY os.StandardFee, os.Deposit
-        '''.format(org_id)
-        result = list(q.QuerySql(fee_sql))
-        if result:
-            stats['standard_fee'] = float(result[0].StandardFee or 0)
-            stats['deposit'] = float(result[0].Deposit or 0)
-            stats['no_charge_count'] = int(result[0].NoChargeCount or 0)
-            # Calculate no-charge value (what those members would have cost at standard fee)
-            stats['no_charge_value'] = stats['no_charge_count'] * stats['standard_fee']
-    except:
-        pass
+    # Document status - missing passports, background checks, and photos
+    stats['missing_passport'] = len([m for m in team if not m.HasPassportNumber])
+    stats['missing_bgcheck'] = len([m for m in team if m.BGCheckStatus != 'Complete'])
+    stats['missing_photo'] = len([m for m in team if m.PictureId is None])
+
+    # Standard fee, deposit, and no-charge member info
+    org = ctx.org()
+    if org:
+        stats['standard_fee'] = float(org.StandardFee or 0)
+        stats['deposit'] = float(org.Deposit or 0)
+    stats['no_charge_count'] = len([m for m in team if float(m.IndAmt or 0) == 0])
+    # Calculate no-charge value (what those members would have cost at standard fee)
+    stats['no_charge_value'] = stats['no_charge_count'] * stats['standard_fee']
 
     return stats
 
@@ -3024,37 +3284,10 @@ def _get_team_demographics(org_id):
     }
 
     try:
-        # Get comprehensive member data with picture from Picture table
-        demo_sql = '''
-        SELECT
-            p.PeopleId,
-            p.Name2,
-            p.GenderId,
-            p.Age,
-            p.MemberStatusId,
-            p.BaptismDate,
-            om.MemberTypeId,
-            mt.Description as MemberType,
-            pic.MediumUrl as PictureUrl,
-            (SELECT COUNT(*)
-             FROM OrganizationMembers om2 WITH (NOLOCK)
-             JOIN Organizations o2 WITH (NOLOCK) ON om2.OrganizationId = o2.OrganizationId
-             WHERE om2.PeopleId = p.PeopleId
-               AND o2.IsMissionTrip = 1
-               AND o2.OrganizationId <> {0}) as PriorTripCount
-        FROM OrganizationMembers om WITH (NOLOCK)
-        JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-        LEFT JOIN lookup.MemberType mt WITH (NOLOCK) ON om.MemberTypeId = mt.Id
-        LEFT JOIN Picture pic WITH (NOLOCK) ON p.PictureId = pic.PictureId
-        WHERE om.OrganizationId = {0}
-          AND om.MemberTypeId NOT IN (230, 311)
-          AND om.InactiveDate IS NULL
-        ORDER BY
-            CASE WHEN om.MemberTypeId IN (140, 310, 320) THEN 0 ELSE 1 END,
-            p.Name2
-        '''.format(org_id)
-
-        members = list(q.QuerySql(demo_sql))
+        # Team members from the trip context, leaders first
+        ctx = get_trip_context(org_id)
+        members = sorted(ctx.active_members(),
+                         key=lambda m: (0 if m.MemberTypeId in [140, 310, 320] else 1, m.Name2))
         demographics['total'] = len(members)
 
         for member in members:
@@ -3116,21 +3349,11 @@ def _get_team_demographics(org_id):
                 })
 
         # Also check for org's LeaderId (may not have leader member type)
-        # Get picture from Picture table via People.PictureId
-        org_leader_sql = '''
-        SELECT p.PeopleId, p.Name2, pic.MediumUrl as PictureUrl
-        FROM Organizations o WITH (NOLOCK)
-        INNER JOIN People p WITH (NOLOCK) ON o.LeaderId = p.PeopleId
-        LEFT JOIN Picture pic WITH (NOLOCK) ON p.PictureId = pic.PictureId
-        WHERE o.OrganizationId = {0}
-          AND o.LeaderId IS NOT NULL
-        '''.format(org_id)
-        org_leader_result = list(q.QuerySql(org_leader_sql))
-
-        if org_leader_result and org_leader_result[0].PeopleId:
-            leader_id = org_leader_result[0].PeopleId
-            leader_name = org_leader_result[0].Name2 or 'Unknown'
-            leader_picture = org_leader_result[0].PictureUrl or ''
+        org = ctx.org()
+        if org and org.LeaderId:
+            leader_id = org.LeaderId
+            leader_name = org.LeaderName or 'Unknown'
+            leader_picture = org.LeaderPictureUrl or ''
 
             # Check if already in leaders list
             existing_ids = [l['id'] for l in demographics['leaders']]
@@ -3187,25 +3410,21 @@ def _get_all_approval_statuses(org_id):
     statuses = {}
 
     try:
-        org_id = int(org_id)
+        ctx = get_trip_context(org_id)
 
-        # Get all org members
-        members_sql = '''
-        SELECT om.PeopleId
-        FROM OrganizationMembers om WITH (NOLOCK)
-        WHERE om.OrganizationId = {0}
-          AND om.MemberTypeId NOT IN (230, 311)
-          AND om.InactiveDate IS NULL
-        '''.format(org_id)
-
-        members = list(q.QuerySql(members_sql))
-
-        # Get denial reasons
-        denial_reasons = _get_denial_reasons(org_id)
+        # Denial reasons by person
+        denials = {}
+        for denial in ctx.approval_reasons().get('denials', []):
+            denials.setdefault(denial.get('people_id'), denial)
 
-        for member in members:
+        for member in ctx.active_members():
             pid = member.PeopleId
-            status = _get_approval_status(org_id, pid)
+            if member.IsApproved:
+                status = 'approved'
+            elif member.IsDenied:
+                status = 'denied'
+            else:
+                status = 'pending'
 
             statuses[pid] = {
                 'status': status,
@@ -3213,13 +3432,11 @@ def _get_all_approval_statuses(org_id):
             }
 
             # Add denial reason if denied
-            if status == 'denied':
-                for denial in denial_reasons.get('denials', []):
-                    if denial.get('people_id') == pid:
-                        statuses[pid]['denial_reason'] = denial.get('reason', '')
-                        statuses[pid]['denied_by_name'] = denial.get('denied_by_name', '')
-                        statuses[pid]['denied_date'] = denial.get('denied_date', '')
-                        break
+            if status == 'denied' and pid in denials:
+                denial = denials[pid]
+                statuses[pid]['denial_reason'] = denial.get('reason', '')
+                statuses[pid]['denied_by_name'] = denial.get('denied_by_name', '')
+                statuses[pid]['denied_date'] = denial.get('denied_date', '')
 
     except Exception as e:
         pass
@@ -3278,6 +3495,7 @@ def _add_denial_reason(org_id, people_id, name, reason, denied_by, denied_by_nam
 
         # Save back to org extra value
         model.AddExtraValueTextOrg(org_id, 'TripApprovalReasons', json.dumps(data))
+        invalidate_trip_context(org_id)
         return True
     except Exception as e:
         return False
@@ -3302,6 +3520,7 @@ def _remove_denial_reason(org_id, people_id):
 
         # Save back to org extra value
         model.AddExtraValueTextOrg(org_id, 'TripApprovalReasons', json.dumps(data))
+        invalidate_trip_context(org_id)
         return True
     except:
         return False
@@ -4004,41 +4223,10 @@ def render_trip_team(org_id, user_role):
         </div>
     '''.format(org_id, _escape_html(trip.OrganizationName)))
 
-    # Get team members - passport info is in RecReg table, background check in Volunteer table
-    # Picture URL from Picture table via People.PictureId
-    members_sql = '''
-    SELECT
-        p.PeopleId,
-        p.Name2 as Name,
-        p.EmailAddress,
-        p.CellPhone,
-        mt.Description as MemberType,
-        om.MemberTypeId,
-        om.EnrollmentDate,
-        CASE WHEN rr.passportnumber IS NOT NULL AND rr.passportexpires IS NOT NULL THEN 1 ELSE 0 END as HasPassportInfo,
-        vs.Description as BGCheckStatus,
-        p.PictureId,
-        pic.MediumUrl as PictureUrl,
-        p.Age,
-        p.FamilyId
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    LEFT JOIN lookup.MemberType mt ON om.MemberTypeId = mt.Id
-    LEFT JOIN RecReg rr WITH (NOLOCK) ON rr.PeopleId = p.PeopleId
-    LEFT JOIN Volunteer v WITH (NOLOCK) ON v.PeopleId = p.PeopleId
-    LEFT JOIN lookup.VolApplicationStatus vs WITH (NOLOCK) ON vs.Id = v.StatusId
-    LEFT JOIN Picture pic WITH (NOLOCK) ON p.PictureId = pic.PictureId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-    ORDER BY
-        CASE WHEN om.MemberTypeId IN (140, 310, 320) THEN 0 ELSE 1 END,
-        p.FamilyId,
-        p.PositionInFamilyId,
-        p.Name2
-    '''.format(org_id)
-
-    members = list(q.QuerySql(members_sql))
+    # Team members from the trip context: leaders first, then by family
+    members = sorted(get_trip_context(org_id).active_members(),
+                     key=lambda m: (0 if m.MemberTypeId in [140, 310, 320] else 1,
+                                    m.FamilyId, m.PositionInFamilyId, m.Name2))
 
     # Collect team emails for the email popup
     team_emails = [m.EmailAddress for m in members if m.EmailAddress]
@@ -4552,32 +4740,14 @@ def render_trip_meetings(org_id, user_role):
         </div>
     '''.format(org_id, _escape_html(trip.OrganizationName)))
 
+    ctx = get_trip_context(org_id)
+
     # Get team emails for meeting reminders
-    team_emails_sql = '''
-    SELECT p.EmailAddress
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-      AND p.EmailAddress IS NOT NULL
-      AND p.EmailAddress != ''
-    '''.format(org_id)
-    team_emails_result = list(q.QuerySql(team_emails_sql))
-    team_emails = [r.EmailAddress for r in team_emails_result]
+    team_emails = ctx.team_emails()
     team_emails_js = ','.join(team_emails) if team_emails else ''
 
     # Get all org members for attendance comparison
-    org_members_sql = '''
-    SELECT om.PeopleId, p.Name2 as Name
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-    ORDER BY p.Name2
-    '''.format(org_id)
-    org_members = list(q.QuerySql(org_members_sql))
+    org_members = ctx.active_members()
     org_member_ids = set([m.PeopleId for m in org_members])
     org_member_names = dict([(m.PeopleId, m.Name) for m in org_members])
 
@@ -4595,25 +4765,8 @@ def render_trip_meetings(org_id, user_role):
             </div>
         '''.format(org_id, escaped_trip_name))
 
-    # Get meetings - use COALESCE to prefer extra values over column values
-    meetings_sql = '''
-    SELECT
-        m.MeetingId,
-        m.MeetingDate,
-        COALESCE(me_desc.Data, m.Description) as Description,
-        COALESCE(me_loc.Data, m.Location) as Location,
-        m.NumPresent,
-        m.HeadCount,
-        CASE WHEN m.MeetingDate >= CAST(GETDATE() AS DATE) THEN 'upcoming' ELSE 'past' END as Status
-    FROM Meetings m WITH (NOLOCK)
-    LEFT JOIN MeetingExtra me_desc WITH (NOLOCK) ON m.MeetingId = me_desc.MeetingId AND me_desc.Field = 'Description'
-    LEFT JOIN MeetingExtra me_loc WITH (NOLOCK) ON m.MeetingId = me_loc.MeetingId AND me_loc.Field = 'Location'
-    WHERE m.OrganizationId = {0}
-      AND m.MeetingDate IS NOT NULL
-    ORDER BY m.MeetingDate DESC
-    '''.format(org_id)
-
-    meetings = list(q.QuerySql(meetings_sql))
+    # Get meetings (description/location extra values win over the columns)
+    meetings = [m for m in ctx.meetings() if m.MeetingDate is not None]
 
     # Separate upcoming and past meetings
     upcoming = [m for m in meetings if m.Status == 'upcoming']
@@ -4776,16 +4929,8 @@ def render_trip_meetings(org_id, user_role):
 
             # Expandable attendance list (for non-headcount meetings)
             if not is_headcount_only:
-                # Get attendance for this meeting
-                attendance_sql = '''
-                SELECT a.PeopleId, a.AttendanceFlag, p.Name2 as Name
-                FROM Attend a WITH (NOLOCK)
-                JOIN People p WITH (NOLOCK) ON a.PeopleId = p.PeopleId
-                WHERE a.MeetingId = {0}
-                '''.format(meeting_id)
-                attendance_records = list(q.QuerySql(attendance_sql))
-
-                present_ids = set([a.PeopleId for a in attendance_records if a.AttendanceFlag == 1 or a.AttendanceFlag == True])
+                # Attendance for this meeting (loaded once for the whole trip)
+                present_ids = ctx.attendance().get(meeting_id, set())
                 present_names = [org_member_names.get(pid, 'Unknown') for pid in present_ids if pid in org_member_ids]
                 absent_names = [org_member_names.get(pid, 'Unknown') for pid in org_member_ids if pid not in present_ids]
 
@@ -4856,19 +5001,10 @@ def render_trip_budget(org_id, user_role):
         </div>
     '''.format(org_id, _escape_html(trip.OrganizationName)))
 
+    ctx = get_trip_context(org_id)
+
     # Get team emails for reminder
-    team_emails_sql = '''
-    SELECT p.EmailAddress
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-      AND p.EmailAddress IS NOT NULL
-      AND p.EmailAddress != ''
-    '''.format(org_id)
-    team_emails_result = list(q.QuerySql(team_emails_sql))
-    team_emails = [r.EmailAddress for r in team_emails_result]
+    team_emails = ctx.team_emails()
     team_emails_js = ','.join(team_emails) if team_emails else ''
 
     # Quick action bar for budget
@@ -4884,36 +5020,24 @@ def render_trip_budget(org_id, user_role):
     '''.format(org_id, team_emails_js.replace("'", "\\'"), _escape_html(trip.OrganizationName).replace("'", "\\'")))
 
     # Get member payment data - include ALL organization members (even those not charged yet)
-    # Uses MissionTripTotals CTE for payment data, but LEFT JOINs to OrganizationMembers
-    # to ensure we show everyone on the team
-    mission_trip_cte = get_mission_trip_totals_cte(include_closed=True)
-
-    budget_sql = mission_trip_cte + '''
-    SELECT
-        om.PeopleId,
-        p.Name2 as Name,
-        p.EmailAddress,
-        p.CellPhone,
-        ISNULL(mtt.TripCost, 0) as TripCost,
-        ISNULL(mtt.Raised, 0) as TotalPaid,
-        ISNULL(mtt.Due, 0) as Outstanding,
-        -- "Not Charged" must mean no charge on record, NOT "missing from the totals".
-        -- It used to be mtt.PeopleId IS NULL, which quietly doubled as "isn't tagged
-        -- Goer" and mislabelled charged members as Not Charged.
-        CASE WHEN mtt.PeopleId IS NULL OR mtt.TripCost IS NULL THEN 1 ELSE 0 END as NotCharged
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    LEFT JOIN MissionTripTotals mtt ON mtt.InvolvementId = om.OrganizationId
-        AND mtt.PeopleId = om.PeopleId
-        AND mtt.SortOrder <> 'ZZZZZ'
-        AND mtt.Name <> 'total'
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-    ORDER BY p.Name2
-    '''.format(org_id)
-
-    members = list(q.QuerySql(budget_sql))
+    # by pairing the team roster with this trip's MissionTripTotals rows
+    finance = ctx.finance()
+    members = []
+    for m in ctx.active_members():
+        mtt = finance.get(m.PeopleId)
+        members.append(_TripRow(
+            PeopleId=m.PeopleId,
+            Name=m.Name2,
+            EmailAddress=m.EmailAddress,
+            CellPhone=m.CellPhone,
+            TripCost=(mtt.TripCost if mtt else None) or 0,
+            TotalPaid=(mtt.Raised if mtt else None) or 0,
+            Outstanding=(mtt.Due if mtt else None) or 0,
+            # "Not Charged" must mean no charge on record, NOT "missing from the totals".
+            # It used to be mtt.PeopleId IS NULL, which quietly doubled as "isn't tagged
+            # Goer" and mislabelled charged members as Not Charged.
+            NotCharged=1 if mtt is None or mtt.TripCost is None else 0
+        ))
 
     # Calculate totals
     total_cost = sum(float(m.TripCost or 0) for m in members)
@@ -5181,26 +5305,8 @@ def render_trip_documents(org_id, user_role):
         </div>
     '''.format(org_id, _escape_html(trip.OrganizationName)))
 
-    # Get document status for members - passport info is in RecReg table, background check in Volunteer table
-    docs_sql = '''
-    SELECT
-        p.PeopleId,
-        p.Name2 as Name,
-        CASE WHEN rr.passportnumber IS NOT NULL AND rr.passportnumber != '' THEN 1 ELSE 0 END as HasPassportNumber,
-        rr.passportexpires as PassportExpires,
-        vs.Description as BGCheckStatus
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON om.PeopleId = p.PeopleId
-    LEFT JOIN RecReg rr WITH (NOLOCK) ON rr.PeopleId = p.PeopleId
-    LEFT JOIN Volunteer v WITH (NOLOCK) ON v.PeopleId = p.PeopleId
-    LEFT JOIN lookup.VolApplicationStatus vs WITH (NOLOCK) ON vs.Id = v.StatusId
-    WHERE om.OrganizationId = {0}
-      AND om.MemberTypeId NOT IN (230, 311)
-      AND om.InactiveDate IS NULL
-    ORDER BY p.Name2
-    '''.format(org_id)
-
-    members = list(q.QuerySql(docs_sql))
+    # Document status for members (passport from RecReg, background check from Volunteer)
+    members = get_trip_context(org_id).active_members()
 
     html.append('<div class="card">')
     html.append('<div class="card-header"><h4>Document Checklist</h4></div>')
@@ -7577,37 +7683,14 @@ def end_timer(start_time, label="Query"):
 
 # ::START:: Database Queries
 def get_total_stats_query():
-    """Get overall mission statistics - using optimized CTE that runs in ~1 second"""
+    """Get overall mission statistics - outstanding totals come from the stored trip totals snapshot"""
     # Build the exclusion list for application orgs
     app_org_list = ','.join(str(x) for x in config.APPLICATION_ORG_IDS)
-    
-    # Get the mission trip totals CTE for ALL trips (including closed)
-    mission_trip_cte_all = get_mission_trip_totals_cte(include_closed=True).replace('WITH ', '').strip()
-    
-    # Extract just the CTE definitions from the mission trip CTE (before the final SELECT)
-    # Find where MissionTripTotals AS ends
-    cte_end_pos = mission_trip_cte_all.rfind('MissionTripTotals AS')
-    if cte_end_pos > 0:
-        # Find the closing parenthesis after MissionTripTotals definition
-        paren_count = 0
-        found_start = False
-        for i in range(cte_end_pos, len(mission_trip_cte_all)):
-            if mission_trip_cte_all[i] == '(':
-                paren_count += 1
-                found_start = True
-            elif mission_trip_cte_all[i] == ')' and found_start:
-                paren_count -= 1
-                if paren_count == 0:
-                    # Include everything up to and including this closing paren
-                    mission_trip_cte_defs = mission_trip_cte_all[:i+1]
-                    break
-    else:
-        # Fallback - use the whole thing
-        mission_trip_cte_defs = mission_trip_cte_all
-    
-    # Build the complete query with all CTEs merged
+
     query = '''
-    WITH ''' + mission_trip_cte_defs + ''',
+    WITH TripTotals AS (
+        {3}
+    ),
     ActiveMissions AS (
         SELECT o.OrganizationId, o.MemberCount
         FROM Organizations o WITH (NOLOCK)
@@ -7629,14 +7712,11 @@ def get_total_stats_query():
     ),
     OutstandingPaymentsOpen AS (
         SELECT
-            SUM(mtt.Due) AS TotalDue
-        FROM MissionTripTotals mtt
-        INNER JOIN Organizations o WITH (NOLOCK) ON mtt.InvolvementId = o.OrganizationId
+            SUM(tt.Outstanding) AS TotalDue
+        FROM TripTotals tt
+        INNER JOIN Organizations o WITH (NOLOCK) ON tt.InvolvementId = o.OrganizationId
         WHERE o.IsMissionTrip = {0}
           AND o.OrganizationStatusId = {1}
-          AND mtt.Due > 0
-          AND mtt.Name <> 'total'
-          AND mtt.SortOrder <> 'ZZZZZ'
           AND NOT EXISTS (
               SELECT 1 FROM OrganizationExtra oe WITH (NOLOCK)
               WHERE oe.OrganizationId = o.OrganizationId
@@ -7646,32 +7726,26 @@ def get_total_stats_query():
           )
     ),
     OutstandingPaymentsClosed AS (
-        SELECT 
-            SUM(mtt.Due) AS TotalDue
-        FROM MissionTripTotals mtt
-        INNER JOIN Organizations o WITH (NOLOCK) ON mtt.InvolvementId = o.OrganizationId
-        WHERE o.IsMissionTrip = {0} 
-          AND o.OrganizationStatusId = {1} 
-          AND mtt.Due > 0
-          AND mtt.Name <> 'total'
-          AND mtt.SortOrder <> 'ZZZZZ'
+        SELECT
+            SUM(tt.Outstanding) AS TotalDue
+        FROM TripTotals tt
+        INNER JOIN Organizations o WITH (NOLOCK) ON tt.InvolvementId = o.OrganizationId
+        WHERE o.IsMissionTrip = {0}
+          AND o.OrganizationStatusId = {1}
           AND EXISTS (
               SELECT 1 FROM OrganizationExtra oe WITH (NOLOCK)
-              WHERE oe.OrganizationId = o.OrganizationId 
+              WHERE oe.OrganizationId = o.OrganizationId
                 AND oe.Field = 'Close'
                 AND oe.DateValue <= GETDATE()
           )
     ),
     OutstandingPaymentsAll AS (
-        SELECT 
-            SUM(mtt.Due) AS TotalDue
-        FROM MissionTripTotals mtt
-        INNER JOIN Organizations o WITH (NOLOCK) ON mtt.InvolvementId = o.OrganizationId
-        WHERE o.IsMissionTrip = {0} 
-          AND o.OrganizationStatusId = {1} 
-          AND mtt.Due > 0
-          AND mtt.Name <> 'total'
-          AND mtt.SortOrder <> 'ZZZZZ'
+        SELECT
+            SUM(tt.Outstanding) AS TotalDue
+        FROM TripTotals tt
+        INNER JOIN Organizations o WITH (NOLOCK) ON tt.InvolvementId = o.OrganizationId
+        WHERE o.IsMissionTrip = {0}
+          AND o.OrganizationStatusId = {1}
     )
     SELECT 
         ISNULL(SUM(am.MemberCount), 0) AS TotalMembers,
@@ -7680,7 +7754,8 @@ def get_total_stats_query():
         ISNULL((SELECT TotalDue FROM OutstandingPaymentsClosed), 0) AS TotalOutstandingClosed,
         ISNULL((SELECT TotalDue FROM OutstandingPaymentsAll), 0) AS TotalOutstandingAll
     FROM ActiveMissions am
-    '''.format(config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, app_org_list)
+    '''.format(config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, app_org_list,
+               trip_totals_table_sql())
     
     return query
 
@@ -7693,33 +7768,9 @@ def get_active_missions_query_optimized(show_closed=False):
     if not show_closed:
         closed_filter = "AND EventStatus <> 'Closed'"
     
-    # Get the mission trip totals CTE without the WITH keyword
-    mission_trip_cte = get_mission_trip_totals_cte(include_closed=show_closed).replace('WITH ', '').strip()
-    
-    # Extract just the CTE definitions (everything before the final MissionTripTotals result)
-    cte_end_pos = mission_trip_cte.rfind('MissionTripTotals AS')
-    if cte_end_pos > 0:
-        # Find the closing parenthesis after MissionTripTotals definition
-        paren_count = 0
-        found_start = False
-        for i in range(cte_end_pos, len(mission_trip_cte)):
-            if mission_trip_cte[i] == '(':
-                paren_count += 1
-                found_start = True
-            elif mission_trip_cte[i] == ')' and found_start:
-                paren_count -= 1
-                if paren_count == 0:
-                    # Include everything up to and including this closing paren
-                    mission_trip_cte_defs = mission_trip_cte[:i+1]
-                    break
-    else:
-        # Fallback - use the whole thing
-        mission_trip_cte_defs = mission_trip_cte
-    
-    # Use single CTE for better performance
+    # Financial totals come from the stored trip totals snapshot
     return '''
-    WITH ''' + mission_trip_cte_defs + ''',
-    MissionSummary AS (
+    WITH MissionSummary AS (
         SELECT 
             o.OrganizationId,
             o.OrganizationName,
@@ -7765,16 +7816,14 @@ def get_active_missions_query_optimized(show_closed=False):
             
         FROM Organizations o WITH (NOLOCK)
         
-        -- Get financial totals from our CTE
+        -- Get financial totals from the trip totals snapshot
         LEFT JOIN (
-            SELECT 
+            SELECT
                 InvolvementId,
-                SUM(Due) AS Outstanding,
-                SUM(Raised) AS TotalDue,
-                SUM(TripCost) AS TotalFee
-            FROM MissionTripTotals
-            WHERE SortOrder <> 'ZZZZZ'
-            GROUP BY InvolvementId
+                Due AS Outstanding,
+                Raised AS TotalDue,
+                TotalFee
+            FROM ({4}) tt
         ) mtt ON mtt.InvolvementId = o.OrganizationId
         
         -- Get event dates
@@ -7843,7 +7892,8 @@ def get_active_missions_query_optimized(show_closed=False):
         END,
         StartDate,
         OrganizationName
-    '''.format(config.MEMBER_TYPE_LEADER, config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, closed_filter)
+    '''.format(config.MEMBER_TYPE_LEADER, config.MISSION_TRIP_FLAG, config.ACTIVE_ORG_STATUS_ID, closed_filter,
+               trip_totals_table_sql())
 
 def get_active_missions_query(show_closed=False):
     """Get active missions - use optimized version"""
@@ -12146,6 +12196,139 @@ def get_approval_workflow_javascript():
     '''
 
 
+# ---------------------------------------------------------------------
+# Versioned static assets
+# ---------------------------------------------------------------------
+# The style sheet and the page scripts above are constant per release, so
+# instead of inlining them into every page we emit a small loader tagged
+# with the bundle's content hash. The loader writes the bundle from
+# localStorage when the hash matches and otherwise fetches it once from the
+# get_asset action. TouchPoint cannot serve text/css or JavaScript content
+# types, so the bundles are HTML fragments written in place with
+# document.write, which keeps the same ordering as inline tags.
+#
+# Hashes are kept in Special Content per APP_VERSION and re-checked after
+# ASSET_MANIFEST_TTL_MINUTES, so a normal page never builds the bundles.
+
+ASSET_MANIFEST_CONTENT_NAME = 'TPxi_MissionsDashboard_Assets'
+ASSET_MANIFEST_TTL_MINUTES = 60
+ASSET_BUNDLES = ('styles', 'app', 'app_admin')
+
+ASSET_LOADER_TEMPLATE = '''
+    <script>
+    (function (name, hash) {
+        var key = 'MissionsDashboard.asset.' + name, text = null;
+        try {
+            var cached = JSON.parse(localStorage.getItem(key) || 'null');
+            if (cached && cached.h === hash) { text = cached.t; }
+        } catch (e) {}
+        if (text === null) {
+            try {
+                var xhr = new XMLHttpRequest();
+                xhr.open('POST', window.location.pathname.replace('/PyScript/', '/PyScriptForm/'), false);
+                xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+                xhr.send('action=get_asset&name=' + name + '&v=' + hash);
+                if (xhr.status === 200 && xhr.responseText) {
+                    text = xhr.responseText;
+                    try { localStorage.setItem(key, JSON.stringify({h: hash, t: text})); } catch (e) {}
+                }
+            } catch (e) {}
+        }
+        if (text !== null) {
+            document.write(text);
+        } else {
+            // Couldn't load the bundle - fall back to inline assets
+            window.location.search += (window.location.search ? '&' : '?') + 'inline_assets=1';
+        }
+    })('%s', '%s');
+    </script>
+'''
+
+
+def build_asset_bundle(name):
+    """Return the HTML fragment for one asset bundle."""
+    if name == 'styles':
+        return get_modern_styles()
+
+    admin = name == 'app_admin'
+    # Sidebar, then email (the admin flag controls which templates are visible)
+    parts = [get_sidebar_javascript(), get_email_javascript(admin)]
+    if admin:
+        parts.append(get_fee_adjustment_javascript())
+    # Payment actions are not admin-gated: leaders can send their own team their
+    # payment links. The buttons are chosen per row and every handler re-checks.
+    parts.append(get_payment_actions_javascript())
+    if admin:
+        parts.append(get_dates_javascript())
+    parts.append(get_meeting_javascript())
+    parts.append(get_popup_script())
+    parts.append(get_person_details_javascript())
+    if admin:
+        parts.append(get_approval_workflow_javascript())
+    return '\n'.join(parts)
+
+
+def get_asset_hash(name):
+    """Content hash for an asset bundle, from the stored manifest when it is current."""
+    import json
+    import hashlib
+    now = datetime.datetime.now()
+    manifest = {}
+    try:
+        raw = model.TextContent(ASSET_MANIFEST_CONTENT_NAME)
+        if raw and raw.strip():
+            manifest = json.loads(raw)
+    except:
+        manifest = {}
+    if manifest.get('version') != APP_VERSION:
+        manifest = {'version': APP_VERSION}
+
+    entry = manifest.get(name)
+    if entry:
+        try:
+            checked = datetime.datetime.strptime(entry['checked'], '%Y-%m-%d %H:%M:%S')
+            if now - checked < datetime.timedelta(minutes=ASSET_MANIFEST_TTL_MINUTES):
+                return entry['hash']
+        except:
+            pass
+
+    text = build_asset_bundle(name)
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    manifest[name] = {
+        'hash': hashlib.md5(text).hexdigest()[:12],
+        'checked': now.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    try:
+        model.WriteContentText(ASSET_MANIFEST_CONTENT_NAME, json.dumps(manifest), '')
+    except:
+        pass
+    return manifest[name]['hash']
+
+
+def render_asset(name):
+    """Loader tag for an asset bundle, or the bundle itself when inlining."""
+    inline = str(getattr(model.Data, 'inline_assets', '') or '') == '1'
+    if inline or not config.VERSIONED_ASSETS:
+        return build_asset_bundle(name)
+    try:
+        return ASSET_LOADER_TEMPLATE % (name, get_asset_hash(name))
+    except:
+        return build_asset_bundle(name)
+
+
+def handle_get_asset():
+    """Serve an asset bundle's text for the loader (admin bundle to admins only)."""
+    name = str(getattr(model.Data, 'name', '') or '')
+    if name not in ASSET_BUNDLES:
+        print ''
+        return True
+    if name == 'app_admin' and not any(model.UserIsInRole(r) for r in config.ADMIN_ROLES):
+        name = 'app'
+    print build_asset_bundle(name)
+    return True
+
+
 def create_visualization_diagram():
     """Create Mermaid diagram for code structure visualization"""
     if not config.ENABLE_DEVELOPER_VISUALIZATION or not model.UserIsInRole("SuperAdmin"):
@@ -12944,19 +13127,11 @@ def _lg_trip_dates(org_id):
 
 def _lg_trip_leaders(org_id):
     # team leader(s) come from the involvement's leader-type members
-    types = ','.join(str(x) for x in config.LEADER_MEMBER_TYPES)
-    sql = '''
-    SELECT p.Name2 AS Name, ISNULL(p.CellPhone, '') AS Cell
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON p.PeopleId = om.PeopleId
-    WHERE om.OrganizationId = {0} AND om.MemberTypeId IN ({1}) AND om.InactiveDate IS NULL
-    ORDER BY p.Name2
-    '''.format(int(org_id), types or '140,310,320')
     out = []
     try:
-        for r in q.QuerySql(sql):
-            out.append({'name': _u(r.Name) if '_u' in globals() else (r.Name or ''),
-                        'cell': r.Cell or ''})
+        for m in get_trip_context(org_id).leaders():
+            out.append({'name': _u(m.Name2) if '_u' in globals() else (m.Name2 or ''),
+                        'cell': m.CellPhone or ''})
     except:
         pass
     return out
@@ -14048,18 +14223,10 @@ def load_trip_tasks(org_id):
 
 def _resolve_trip_leaders(org_id):
     """Trip leader(s): active leader-type members (PeopleId + Name2)."""
-    types = ','.join(str(x) for x in config.LEADER_MEMBER_TYPES) or '140,310,320'
-    sql = '''
-    SELECT p.PeopleId, p.Name2 AS Name
-    FROM OrganizationMembers om WITH (NOLOCK)
-    JOIN People p WITH (NOLOCK) ON p.PeopleId = om.PeopleId
-    WHERE om.OrganizationId = {0} AND om.MemberTypeId IN ({1}) AND om.InactiveDate IS NULL
-    ORDER BY p.Name2
-    '''.format(int(org_id), types)
     out = []
     try:
-        for r in q.QuerySql(sql):
-            out.append({'peopleId': int(r.PeopleId), 'name': (_u(r.Name) if '_u' in globals() else (r.Name or ''))})
+        for m in get_trip_context(org_id).leaders():
+            out.append({'peopleId': int(m.PeopleId), 'name': (_u(m.Name2) if '_u' in globals() else (m.Name2 or ''))})
     except:
         pass
     return out
@@ -16555,6 +16722,10 @@ def handle_ajax_request():
         # AJAX request to load a trip section
         return handle_ajax_section_load()
 
+    elif action == 'get_asset':
+        # Versioned CSS/JS bundle for the page loader
+        return handle_get_asset()
+
     elif action == 'adjust_fee':
         # AJAX request to adjust member fee (admin only)
         return handle_fee_adjustment()
@@ -17568,6 +17739,8 @@ def handle_record_payment():
 
         # AddTransaction takes a POSITIVE amount for a payment (it reduces what is owed).
         model.AddTransaction(people_id_int, org_id_int, amount, desc)
+        invalidate_trip_context(org_id_int)
+        mark_trip_totals_stale(org_id_int)
 
         new_due = _get_member_balance(people_id_int, org_id_int)
 
@@ -17614,6 +17787,8 @@ def handle_fee_adjustment():
         # Use TouchPoint's AdjustFee method
         # This adjusts the member's balance in the organization
         model.AdjustFee(int(people_id), int(org_id), amount_float, description)
+        invalidate_trip_context(org_id)
+        mark_trip_totals_stale(org_id)
 
         print json.dumps({
             'success': True,
@@ -17665,6 +17840,8 @@ def handle_date_update():
             model.AddExtraValueDateOrg(int(org_id), "Close", close_date)
             updates_made.append("Close")
 
+        invalidate_trip_context(org_id)
+
         if updates_made:
             print json.dumps({
                 'success': True,
@@ -17741,6 +17918,8 @@ def handle_create_meeting():
                 except:
                     pass  # Location may already be set or not supported as extra value
 
+            invalidate_trip_context(org_id)
+
             # Format date for display
             formatted_date = meeting_datetime.strftime('%B %d, %Y at %I:%M %p')
             print json.dumps({
@@ -17822,6 +18001,8 @@ def handle_update_meeting():
             except:
                 pass  # Location may not be supported as extra value
 
+        invalidate_trip_context()  # the meeting's trip isn't known here
+
         # Format date for display
         formatted_date = meeting_datetime.strftime('%B %d, %Y at %I:%M %p')
         print json.dumps({
@@ -19251,6 +19432,7 @@ def handle_approve_member():
 
         # Add to trip-approved subgroup
         model.AddSubGroup(people_id_int, org_id_int, 'trip-approved')
+        invalidate_trip_context(org_id_int)
 
         # Get person details for email prompt
         person = model.GetPerson(people_id_int)
@@ -19595,6 +19777,7 @@ def handle_approve_hub_request():
             model.AddSubGroup(people_id_int, trip_org_id_int, 'trip-approved')
         except:
             pass
+        invalidate_trip_context(trip_org_id_int)
 
         # Mark this specific request approved. The person stays in the hub, so the hub
         # remains a permanent intake roster.
@@ -19709,6 +19892,7 @@ def handle_revoke_hub_request():
                     model.RemoveSubGroup(int(people_id), prior_org_id, 'trip-approved')
             except:
                 pass
+            invalidate_trip_context(prior_org_id)
 
         _set_hub_request_status(int(people_id), req_key, 'pending', {
             'placed_org_id': None,
@@ -19754,6 +19938,8 @@ def handle_set_member_type():
         people_id_int = int(people_id)
 
         model.SetMemberType(people_id_int, org_id_int, member_type)
+        invalidate_trip_context(org_id_int)
+        mark_trip_totals_stale(org_id_int)
 
         print json.dumps({
             'success': True,
@@ -26043,6 +26229,11 @@ def main():
                 _batch = False
         if _batch:
             run_task_time_release_batch()
+            # Warm the trip totals snapshot so the first dashboard load is cheap
+            try:
+                get_trip_totals()
+            except:
+                pass
             return
 
         # Check if this is an AJAX request first
@@ -26087,7 +26278,7 @@ def main():
         # Access control for trip views
         if trip_id:
             if not has_trip_access(user_role, trip_id):
-                print get_modern_styles()
+                print render_asset('styles')
                 print_access_denied()
                 return
 
@@ -26096,8 +26287,12 @@ def main():
             # Non-admins trying to access admin-only views - show leader dashboard instead
             view = 'leader_home'
 
+        # ?refresh_totals=1 rebuilds the stored trip totals snapshot from scratch
+        if user_role.get('is_admin', False) and str(getattr(model.Data, 'refresh_totals', '') or '') == '1':
+            get_trip_totals(force_rebuild=True)
+
         # Output styles
-        print get_modern_styles()
+        print render_asset('styles')
 
         # Output visualization for developers (only for admins)
         if user_role.get('is_admin', False):
@@ -26363,37 +26558,9 @@ def main():
         print '</main>'
         print '</div>'
 
-        # Output sidebar JavaScript
-        print get_sidebar_javascript()
-
-        # Output email JavaScript (with admin status for template filtering)
-        print get_email_javascript(user_role.get('is_admin', False))
-
-        # Output fee adjustment JavaScript (admin only)
-        if user_role.get('is_admin', False):
-            print get_fee_adjustment_javascript()
-
-        # Output payment actions JavaScript (payment link / record payment).
-        # Not admin-gated: leaders can send their own team their payment links. The
-        # buttons themselves are chosen per row, and every handler re-checks permission.
-        print get_payment_actions_javascript()
-
-        # Output dates editing JavaScript (admin only)
-        if user_role.get('is_admin', False):
-            print get_dates_javascript()
-
-        # Output meeting creation JavaScript
-        print get_meeting_javascript()
-
-        # Output popup script for existing functionality
-        print get_popup_script()
-
-        # Output person details popup JavaScript
-        print get_person_details_javascript()
-
-        # Output approval workflow JavaScript (admin only)
-        if user_role.get('is_admin', False):
-            print get_approval_workflow_javascript()
+        # Output page JavaScript (sidebar, email, payments, meetings, popups and,
+        # for admins, fee/date editing and the approval workflow)
+        print render_asset('app_admin' if user_role.get('is_admin', False) else 'app')
 
     except Exception as e:
         # Error handling
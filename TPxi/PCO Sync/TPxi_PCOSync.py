@@ -38,6 +38,8 @@
 # Storage Keys:
 #   PCOSync_Settings        - PCO app_id, secret (PAT), last-sync stamps
 #   PCOSync_OrgMappings     - {pcoServiceTypeId: tpOrgId}
+#   PCOSync_PeopleSnapshot  - persisted PCO People directory + updated_at
+#                             watermark for incremental directory walks
 #   PCOSync_Log_<YYYYMM>    - per-month audit log of writes
 #
 # Extra Value (per TouchPoint Person):
@@ -193,6 +195,11 @@ import json
 import datetime
 import re
 import base64
+import time
+try:
+    import threading
+except ImportError:
+    threading = None  # pco_get_many degrades to serial GETs
 
 model.Header = 'PCO Sync'
 
@@ -222,6 +229,7 @@ ALL_PEOPLE_MAPPING_KEY = 'PCOSync_AllPeopleMapping'  # v2.2+: singleton PCO Peop
 ALL_PEOPLE_SKIP_KEY = 'PCOSync_AllPeopleSkip'  # v2.5+: PCO Person IDs known to have no TP equivalent
 PERSON_SYNC_RULES_KEY = 'PCOSync_PersonSyncRules'
 PERSON_PENDING_KEY = 'PCOSync_PendingPersonChanges'
+PEOPLE_SNAPSHOT_KEY = 'PCOSync_PeopleSnapshot'  # persisted PCO People directory + updated_at watermark
 LOG_KEY_PREFIX = 'PCOSync_Log_'   # suffixed with YYYYMM
 
 # v1 scope: PCO -> TP for these three. TP -> PCO and phone are v1.1 (need
@@ -829,6 +837,71 @@ def get_data(name, default=''):
 # generated under My Apps -> Personal Access Tokens in PCO. Token lives in
 # PCOSync_Settings; we don't take it from the request, so a stolen request
 # can't leak it.
+#
+# Rate limiting: PCO allows 100 requests per 20 seconds per PAT and
+# answers 429 past that. Every GET takes a token from a per-request
+# bucket sized to that limit, and a 429 stalls the whole bucket (so
+# every pool worker backs off together) before retrying. The bucket
+# only sees this request's calls -- another tab syncing at the same
+# time still shows up as 429s, which the backoff absorbs.
+
+PCO_RATE_LIMIT = 100          # requests ...
+PCO_RATE_WINDOW_SECS = 20     # ... per this many seconds
+PCO_POOL_SIZE = 6             # concurrent GETs in pco_get_many
+# model.RestGet isn't documented as thread-safe, so pco_get_many runs
+# serially unless this is turned on. A worker failure outside the normal
+# GET error handling switches the rest of the request back to serial.
+PCO_PARALLEL_GETS = False
+PCO_MAX_RETRIES = 4           # 429 retries per GET (2s, 4s, 8s, 16s)
+PCO_BACKOFF_BASE_SECS = 2
+
+class _PcoRateLimiter(object):
+    """Token bucket shared by every PCO GET in this request. Thread-safe
+    so pco_get_many workers draw from the same budget."""
+
+    def __init__(self, capacity, window_secs):
+        self.capacity = float(capacity)
+        self.rate = float(capacity) / float(window_secs)
+        self.tokens = float(capacity)
+        self.stamp = time.time()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock() if threading else None
+
+    def _take(self):
+        """Take a token if one is available. Returns seconds to wait
+        before trying again (0 = token taken)."""
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            if self.lock:
+                with self.lock:
+                    wait = self._take()
+            else:
+                wait = self._take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def back_off(self, secs):
+        """Called on a 429: drain the bucket and hold every caller off."""
+        if self.lock:
+            with self.lock:
+                self.tokens = 0.0
+                self.blocked_until = max(self.blocked_until, time.time() + secs)
+        else:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.time() + secs)
+
+_pco_limiter = _PcoRateLimiter(PCO_RATE_LIMIT, PCO_RATE_WINDOW_SECS)
 
 def _get_pco_credentials():
     """Return (app_id, secret) or (None, None) if not configured."""
@@ -854,26 +927,109 @@ def _pco_auth_header():
         encoded = base64.b64encode(raw)
     return 'Basic ' + str(encoded)
 
-def pco_get(path):
-    """GET a path from the PCO API. Returns (parsed_json, error_message).
-    error_message is None on success."""
-    auth = _pco_auth_header()
-    if not auth:
-        return None, 'PCO credentials not configured. Open Settings tab and enter your Personal Access Token.'
+PCO_NO_CREDENTIALS_MSG = 'PCO credentials not configured. Open Settings tab and enter your Personal Access Token.'
+
+def _pco_is_rate_limited(exc_text):
+    t = (exc_text or '').lower()
+    return '429' in t or 'too many requests' in t or 'rate limit' in t
+
+def _pco_request(path, auth):
+    """One rate-limited GET with 429 backoff. No Special Content reads, so
+    it is safe to call from pco_get_many worker threads."""
     if not path.startswith('/'):
         path = '/' + path
     url = PCO_BASE_URL + path
-    try:
-        headers = {'Authorization': auth, 'Accept': 'application/json'}
-        body = model.RestGet(url, headers)
+    headers = {'Authorization': auth, 'Accept': 'application/json'}
+    attempt = 0
+    while True:
+        _pco_limiter.acquire()
+        try:
+            body = model.RestGet(url, headers)
+        except Exception as e:
+            if _pco_is_rate_limited(str(e)) and attempt < PCO_MAX_RETRIES:
+                _pco_limiter.back_off(min(PCO_BACKOFF_BASE_SECS * (2 ** attempt), PCO_RATE_WINDOW_SECS))
+                attempt += 1
+                continue
+            return None, 'PCO API call failed (' + path + '): ' + str(e)
         if body is None:
             return None, 'PCO API returned no body for ' + path
         try:
             return json.loads(str(body)), None
         except Exception as je:
             return None, 'PCO API returned non-JSON for ' + path + ': ' + str(je)
-    except Exception as e:
-        return None, 'PCO API call failed (' + path + '): ' + str(e)
+
+def pco_get(path):
+    """GET a path from the PCO API. Returns (parsed_json, error_message).
+    error_message is None on success."""
+    auth = _pco_auth_header()
+    if not auth:
+        return None, PCO_NO_CREDENTIALS_MSG
+    return _pco_request(path, auth)
+
+_pco_pool_state = {'disabled': False}
+
+def pco_get_many(paths, pool_size=PCO_POOL_SIZE):
+    """GET several independent paths (in parallel when enabled). Returns a list of
+    (parsed_json, error_message) tuples in the same order as paths.
+
+    A bounded pool of worker threads pulls the next index off a shared
+    counter; all of them go through the same token bucket, so the pool
+    never outruns PCO's rate limit -- it just stops waiting on one round
+    trip at a time. Credentials are read once up front.
+
+    Serial unless PCO_PARALLEL_GETS is on. Also serial when threading
+    isn't available, and for the rest of the request once a worker thread
+    has failed -- any path the pool didn't finish is retried serially."""
+    paths = list(paths or [])
+    results = [None] * len(paths)
+    if not paths:
+        return results
+    auth = _pco_auth_header()
+    if not auth:
+        return [(None, PCO_NO_CREDENTIALS_MSG)] * len(paths)
+    workers = min(max(1, int(pool_size)), len(paths))
+    if (not PCO_PARALLEL_GETS or threading is None or workers == 1
+            or _pco_pool_state['disabled']):
+        for i, path in enumerate(paths):
+            results[i] = _pco_request(path, auth)
+        return results
+
+    cursor = {'next': 0}
+    cursor_lock = threading.Lock()
+
+    def _worker():
+        while not _pco_pool_state['disabled']:
+            with cursor_lock:
+                i = cursor['next']
+                if i >= len(paths):
+                    return
+                cursor['next'] = i + 1
+            try:
+                results[i] = _pco_request(paths[i], auth)
+            except Exception:
+                # _pco_request already turns HTTP failures into error
+                # tuples, so anything raised here is the thread itself
+                # misbehaving: stop the pool and let the serial pass
+                # below redo this path
+                _pco_pool_state['disabled'] = True
+                return
+
+    threads = []
+    try:
+        for _ in range(workers):
+            t = threading.Thread(target=_worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+    except Exception:
+        _pco_pool_state['disabled'] = True
+    for t in threads:
+        t.join()
+
+    for i, path in enumerate(paths):
+        if results[i] is None:
+            results[i] = _pco_request(path, auth)
+    return results
 
 # =====================================================================
 # AJAX HANDLERS (POST)
@@ -1997,16 +2153,24 @@ def handle_skip_person_change():
 # a single "list all my plans" endpoint -- you walk per service type. We
 # only walk MAPPED service types (no point showing plans we can't sync).
 
-def _pco_all_people_page(offset=0, per_page=100, include_inactive=False):
+def _pco_all_people_page(offset=0, per_page=100, include_inactive=False, updated_since=None):
     """Pull one page of the PCO People directory. Returns
     (list_of_people, next_offset_or_None, error_or_None).
 
     PCO stores emails as a sub-resource (Email records linked back to
     Person), so we request include=emails to get them inline in the
     response's included[] array. Without this, every Person.email is
-    blank and the matcher can't use the email-exact signal."""
+    blank and the matcher can't use the email-exact signal.
+
+    updated_since (PCO timestamp string) switches to an incremental
+    page: only people whose updated_at >= the stamp, oldest first.
+    The status filter is dropped in that mode so a person who went
+    inactive in PCO still comes back and can be pruned from the
+    snapshot by the caller."""
     path = '/people/v2/people?per_page=' + str(per_page) + '&offset=' + str(offset) + '&include=emails'
-    if not include_inactive:
+    if updated_since:
+        path += '&where[updated_at][gte]=' + str(updated_since) + '&order=updated_at'
+    elif not include_inactive:
         # PCO's "status" attribute. "active" is the normal case; archived
         # / inactive users we usually don't want flooding the TP roster.
         path += '&where[status]=active'
@@ -2054,6 +2218,7 @@ def _pco_all_people_page(offset=0, per_page=100, include_inactive=False):
             'email': email_by_pid.get(pid) or safe_str(attrs.get('email_address', '') or attrs.get('email', '')).strip().lower(),
             'birthdate': bdate_iso,
             'status': safe_str(attrs.get('status', 'active')).lower(),
+            'updatedAt': safe_str(attrs.get('updated_at', '')),
         })
     # Pagination: PCO returns meta.next.offset when more pages exist.
     next_offset = None
@@ -2065,16 +2230,19 @@ def _pco_all_people_page(offset=0, per_page=100, include_inactive=False):
         next_offset = None
     return people, next_offset, None
 
-def _pco_all_people_walk(include_inactive=False, page_cap=200):
+def _pco_all_people_walk(include_inactive=False, page_cap=200, updated_since=None):
     """Walk every page of the PCO People directory. page_cap is a safety
     net -- 200 pages * 100/page = 20K records, enough for nearly any
-    church. Returns (all_people, errors)."""
+    church. Returns (all_people, errors).
+
+    With updated_since set this walks only the people changed since that
+    stamp (see _pco_all_people_page)."""
     out = []
     errors = []
     offset = 0
     pages = 0
     while True:
-        page, next_offset, err = _pco_all_people_page(offset=offset, per_page=100, include_inactive=include_inactive)
+        page, next_offset, err = _pco_all_people_page(offset=offset, per_page=100, include_inactive=include_inactive, updated_since=updated_since)
         if err:
             errors.append('Offset ' + str(offset) + ': ' + err)
             break
@@ -2085,6 +2253,101 @@ def _pco_all_people_walk(include_inactive=False, page_cap=200):
         offset = next_offset
     return out, errors
 
+# ---------------------------------------------------------------------
+# Incremental People directory (PCOSync_PeopleSnapshot)
+# ---------------------------------------------------------------------
+# A full directory walk is 100+ serialized REST calls on a large church,
+# and almost none of those records changed since the last run. We keep
+# the last walked directory in Special Content along with the highest
+# PCO updated_at seen, and on later runs only ask PCO for people whose
+# updated_at >= that watermark, merging them into the snapshot.
+#
+# Snapshot shape:
+#   {watermark, includeInactive, lastFullAt, lastRefreshAt,
+#    people: {pcoPersonId: person dict from _pco_all_people_page}}
+#
+# PCO doesn't surface hard deletes through updated_at (merged / deleted
+# profiles just stop appearing), so a person removed from PCO lingers
+# in the snapshot until someone runs a Full refresh. Archived people DO
+# bump updated_at and are pruned on the incremental pass.
+
+def _people_snapshot_watermark(people, current=''):
+    """Highest updated_at across people (PCO ISO stamps sort lexically)."""
+    mark = current or ''
+    for p in people:
+        u = p.get('updatedAt') or ''
+        if u > mark:
+            mark = u
+    return mark
+
+def load_people_snapshot():
+    snap = load_json(PEOPLE_SNAPSHOT_KEY, {})
+    if not isinstance(snap, dict) or not isinstance(snap.get('people'), dict):
+        return {}
+    return snap
+
+def save_people_snapshot(snap):
+    """Compact separators -- the snapshot is the one storage key here that
+    grows with the size of the PCO directory."""
+    try:
+        model.WriteContentText(PEOPLE_SNAPSHOT_KEY, json.dumps(snap, separators=(',', ':')), '')
+        return True
+    except:
+        return False
+
+def _pco_people_directory(include_inactive=False, full=False):
+    """Return the PCO People directory as (people, errors, info), walking
+    incrementally off PCOSync_PeopleSnapshot when possible.
+
+    A full walk happens when full=True, when there is no usable snapshot
+    yet, or when the snapshot was built with a different includeInactive
+    setting. A walk that reported errors is never persisted, so a flaky
+    page can't poison the snapshot or advance the watermark past people
+    we never saw.
+
+    info = {mode: 'full'|'incremental', changed, watermark, lastFullAt}
+    for the UI and the audit log."""
+    snap = {} if full else load_people_snapshot()
+    usable = (snap and snap.get('watermark')
+              and bool(snap.get('includeInactive')) == bool(include_inactive))
+    if not usable:
+        people, errors = _pco_all_people_walk(include_inactive=include_inactive)
+        info = {'mode': 'full', 'changed': len(people), 'watermark': '', 'lastFullAt': ''}
+        if errors:
+            return people, errors, info
+        snap = {
+            'watermark': _people_snapshot_watermark(people),
+            'includeInactive': bool(include_inactive),
+            'lastFullAt': now_iso(),
+            'lastRefreshAt': now_iso(),
+            'people': dict((p['pcoPersonId'], p) for p in people if p.get('pcoPersonId')),
+        }
+        save_people_snapshot(snap)
+        info['watermark'] = snap['watermark']
+        info['lastFullAt'] = snap['lastFullAt']
+        return people, errors, info
+
+    changed, errors = _pco_all_people_walk(include_inactive=include_inactive, updated_since=snap['watermark'])
+    by_id = snap['people']
+    for p in changed:
+        pid = p.get('pcoPersonId')
+        if not pid:
+            continue
+        if not include_inactive and p.get('status', 'active') != 'active':
+            by_id.pop(pid, None)
+        else:
+            by_id[pid] = p
+    info = {'mode': 'incremental', 'changed': len(changed),
+            'watermark': snap['watermark'], 'lastFullAt': snap.get('lastFullAt', '')}
+    if not errors:
+        snap['watermark'] = _people_snapshot_watermark(changed, snap['watermark'])
+        snap['lastRefreshAt'] = now_iso()
+        save_people_snapshot(snap)
+        info['watermark'] = snap['watermark']
+    people = list(by_id.values())
+    people.sort(key=lambda x: ((x.get('last_name') or '').lower(), (x.get('first_name') or '').lower()))
+    return people, errors, info
+
 def _pco_teams_for_service_type(service_type_id):
     """List teams under a service type. Used by the Team Mapping picker
     (after the user picks a Service Type, show its teams). Returns
@@ -2116,14 +2379,28 @@ def _pco_team_positions(team_id):
         })
     return out, None
 
+def _pco_team_people_path(team_id):
+    return '/services/v2/teams/' + str(team_id) + '/people?per_page=100&include=person'
+
 def _pco_team_people(team_id):
     """List Person resources currently on a team. The relationship is
     'person added to team' -- distinct from 'scheduled in a plan'.
     Each result has the linked Person via include=person which gives
     name/email without a separate /people/{id} fetch."""
-    data, err = pco_get('/services/v2/teams/' + str(team_id) + '/people?per_page=100&include=person')
+    data, err = pco_get(_pco_team_people_path(team_id))
     if err:
         return [], err
+    return _parse_team_people(data), None
+
+def _pco_team_people_many(team_ids):
+    """_pco_team_people for several teams in parallel. Returns a list of
+    (people, err) in team_ids order."""
+    out = []
+    for data, err in pco_get_many([_pco_team_people_path(t) for t in team_ids]):
+        out.append(([], err) if err else (_parse_team_people(data), None))
+    return out
+
+def _parse_team_people(data):
     # Map included Person attrs by id.
     person_attrs_by_id = {}
     for inc in (data.get('included') or []):
@@ -2165,16 +2442,31 @@ def _pco_team_people(team_id):
             'pcoLastName': last,
             'email': safe_str(attrs.get('email_address', '')).strip().lower(),
         })
-    return out, None
+    return out
+
+def _pco_position_assignments_path(position_id):
+    return '/services/v2/team_positions/' + str(position_id) + '/person_team_position_assignments?per_page=100&include=person'
 
 def _pco_team_position_assignments(position_id):
     """List person assignments for a Team Position. Used to figure out
     which positions each person on the team is eligible for. Returns
     list of person ids."""
-    path = '/services/v2/team_positions/' + str(position_id) + '/person_team_position_assignments?per_page=100&include=person'
-    data, err = pco_get(path)
+    data, err = pco_get(_pco_position_assignments_path(position_id))
     if err:
         return [], err
+    return _parse_position_assignments(data), None
+
+def _pco_position_assignments_many(position_ids):
+    """Per-position fallback for a whole team in parallel. Returns
+    {positionId: (person_ids, err)}."""
+    position_ids = list(position_ids)
+    results = pco_get_many([_pco_position_assignments_path(pid) for pid in position_ids])
+    out = {}
+    for pos_id, (data, err) in zip(position_ids, results):
+        out[pos_id] = ([], err) if err else (_parse_position_assignments(data), None)
+    return out
+
+def _parse_position_assignments(data):
     out = []
     for row in (data.get('data') or []):
         rels = row.get('relationships') or {}
@@ -2182,7 +2474,7 @@ def _pco_team_position_assignments(position_id):
         pid = safe_str(person_rel.get('id', ''))
         if pid:
             out.append(pid)
-    return out, None
+    return out
 
 def _pco_team_all_position_assignments(team_id):
     """Walk every PersonTeamPositionAssignment under a team in ONE call.
@@ -2292,11 +2584,26 @@ def _pco_plans_for_service_type(service_type_id, days_back, days_forward):
     # NOT supported; use filter=past + per_page or pass after/before in
     # the query (depending on API version). Simpler: just pull the most
     # recent N and let the Python side trim by date.
-    path = ('/services/v2/service_types/' + str(service_type_id) +
-            '/plans?order=-sort_date&per_page=20')
-    data, err = pco_get(path)
+    data, err = pco_get(_pco_plans_path(service_type_id))
     if err:
         return [], err
+    return _parse_plans_window(service_type_id, data, days_back, days_forward), None
+
+def _pco_plans_path(service_type_id):
+    return ('/services/v2/service_types/' + str(service_type_id) +
+            '/plans?order=-sort_date&per_page=20')
+
+def _pco_plans_for_service_types(service_type_ids, days_back, days_forward):
+    """_pco_plans_for_service_type for several service types in parallel.
+    Returns a list of (plans, err) in service_type_ids order."""
+    service_type_ids = list(service_type_ids)
+    results = pco_get_many([_pco_plans_path(st) for st in service_type_ids])
+    out = []
+    for st_id, (data, err) in zip(service_type_ids, results):
+        out.append(([], err) if err else (_parse_plans_window(st_id, data, days_back, days_forward), None))
+    return out
+
+def _parse_plans_window(service_type_id, data, days_back, days_forward):
     plans = data.get('data') or []
     # Trim to the requested window. PCO sort_date is "YYYY-MM-DDTHH:MM:SSZ".
     today = datetime.datetime.now().date()
@@ -2332,7 +2639,7 @@ def _pco_plans_for_service_type(service_type_id, days_back, days_forward):
             'sortDate': sort_date_raw,
             'planDateIso': plan_date.strftime('%Y-%m-%d'),
         })
-    return out, None
+    return out
 
 def handle_list_recent_plans():
     """v3.0+: Aggregates dashboard data across the three mapping types
@@ -2393,13 +2700,16 @@ def handle_list_recent_plans():
         # Walk plans for any Service Type Mapping with perPlanAttendance.
         per_plan_plans = []
         api_errors = []
+        plan_mappings = []
         for pco_st_id, raw_mapping in people_map_raw.items():
             info = _parse_people_mapping(raw_mapping)
             if not info['perPlanAttendance']:
                 continue
             if info['orgId'] <= 0:
                 continue
-            plans, err = _pco_plans_for_service_type(pco_st_id, days_back, days_forward)
+            plan_mappings.append((pco_st_id, info))
+        plan_results = _pco_plans_for_service_types([m[0] for m in plan_mappings], days_back, days_forward)
+        for (pco_st_id, info), (plans, err) in zip(plan_mappings, plan_results):
             if err:
                 api_errors.append('Service type ' + str(pco_st_id) + ': ' + err)
                 continue
@@ -2645,6 +2955,68 @@ def _tp_match_by_name(name_pairs):
             pass
     return out
 
+# Past this many unmatched PCO rows, Proposed Matches loads People once
+# into an in-memory index instead of the chunked name/email queries.
+# The LOWER(...) = ... OR ... predicates can't use an index, so each
+# 100-name chunk is a full People scan; one scan that feeds hash maps
+# wins as soon as there are a few chunks' worth of names.
+MATCHER_INDEX_MIN_ROWS = 300
+
+def _tp_load_matcher_index():
+    """One People scan -> {'byName': ..., 'byEmail': ...} in exactly the
+    shapes _tp_match_by_name and _tp_match_by_email return, so
+    _score_pco_to_tp_candidates scores identically either way.
+
+      byName  -- '<first|nick lower>|<last lower>' -> [rec, ...]
+      byEmail -- email lower (EmailAddress or EmailAddress2) -> [rec, ...]
+
+    Records carry the birthdate too, so the birthdate signal stays a
+    field compare on a name/email hit rather than another lookup."""
+    by_name = {}
+    by_email = {}
+    sql = """
+        SELECT p.PeopleId, p.Name2, p.FirstName, p.NickName, p.LastName,
+               ISNULL(p.EmailAddress, '') AS EmailAddress,
+               ISNULL(p.EmailAddress2, '') AS EmailAddress2,
+               p.BirthYear, p.BirthMonth, p.BirthDay
+        FROM People p WITH (NOLOCK)
+        WHERE p.IsDeceased = 0 AND p.ArchivedFlag = 0
+    """
+    try:
+        for r in q.QuerySql(sql):
+            by = safe_int(r.BirthYear, 0)
+            bm = safe_int(r.BirthMonth, 0)
+            bd = safe_int(r.BirthDay, 0)
+            tp_bdate = ''
+            if bm > 0 and bd > 0:
+                tp_bdate = '%04d-%02d-%02d' % (by if by > 0 else 0, bm, bd)
+            base = {
+                'peopleId': int(r.PeopleId),
+                'name': safe_str(r.Name2),
+                'firstName': safe_str(r.FirstName),
+                'nickName': safe_str(r.NickName),
+                'lastName': safe_str(r.LastName),
+                'birthdate': tp_bdate,
+            }
+            email1 = safe_str(r.EmailAddress).strip().lower()
+            # Strip like SQL's trailing-blank-insensitive '=' did for the
+            # query path, so both modes key the same rows.
+            last_lower = base['lastName'].strip().lower()
+            if last_lower:
+                name_rec = dict(base)
+                name_rec['email'] = email1
+                for f in (base['firstName'].strip().lower(), base['nickName'].strip().lower()):
+                    if f:
+                        by_name.setdefault(f + '|' + last_lower, []).append(name_rec)
+            for em in (email1, safe_str(r.EmailAddress2).strip().lower()):
+                if em:
+                    rec = dict(base)
+                    rec['email'] = em
+                    by_email.setdefault(em, []).append(rec)
+    except:
+        pass
+    return {'byName': by_name, 'byEmail': by_email}
+
 def _bdate_match_score(pco_bd, tp_bd):
     """Compare two YYYY-MM-DD strings. Allows year-missing matches
     (0000-MM-DD) -- PCO sometimes has full birthdate when TP doesn't,
@@ -3056,10 +3428,11 @@ def handle_load_roster_preview():
         agg = {}
         no_pid_rows = []
         api_errors = []
-        for plan in plans:
-            tm_path = ('/services/v2/service_types/' + service_type_id +
-                       '/plans/' + plan['planId'] + '/team_members?per_page=100&include=person')
-            tm_data, tm_err = pco_get(tm_path)
+        tm_results = pco_get_many([
+            '/services/v2/service_types/' + service_type_id +
+            '/plans/' + plan['planId'] + '/team_members?per_page=100&include=person'
+            for plan in plans])
+        for plan, (tm_data, tm_err) in zip(plans, tm_results):
             if tm_err:
                 api_errors.append('Plan ' + plan['planId'] + ': ' + tm_err)
                 continue
@@ -3397,8 +3770,9 @@ def handle_load_team_sync_preview():
                 # If the team-level returned nothing but positions exist,
                 # try the per-position fallback for safety.
                 if not by_position and pos_list:
+                    per_pos = _pco_position_assignments_many([p['positionId'] for p in pos_list])
                     for p in pos_list:
-                        aids, aerr = _pco_team_position_assignments(p['positionId'])
+                        aids, aerr = per_pos[p['positionId']]
                         if aerr:
                             api_errors.append('Position ' + p['positionName'] + ': ' + aerr)
                             continue
@@ -3626,8 +4000,9 @@ def _run_team_sync_server_side(pco_team_id):
                 if terr:
                     out['warnings'].append('Team assignments: ' + terr)
                 if not by_position and pos_list:
+                    per_pos = _pco_position_assignments_many([p['positionId'] for p in pos_list])
                     for p in pos_list:
-                        aids, _aerr = _pco_team_position_assignments(p['positionId'])
+                        aids, _aerr = per_pos[p['positionId']]
                         if aids:
                             by_position[p['positionId']] = aids
         # PCO person -> list of position names (case-preserved + lower).
@@ -3808,8 +4183,8 @@ def _run_people_sync_server_side(pco_st_id):
             return out
         # Aggregate everyone across teams.
         person_data = {}  # pco_pid -> {name, email, teams:[name]}
-        for t in teams:
-            ppl, perr = _pco_team_people(t['teamId'])
+        team_people = _pco_team_people_many([t['teamId'] for t in teams])
+        for t, (ppl, perr) in zip(teams, team_people):
             if perr:
                 out['warnings'].append('Team ' + t['teamName'] + ': ' + perr)
                 continue
@@ -3960,7 +4335,7 @@ def _run_all_people_sync_server_side():
                 break
         except:
             pass
-        people, errors = _pco_all_people_walk(include_inactive=info['includeInactive'])
+        people, errors, dir_info = _pco_people_directory(include_inactive=info['includeInactive'])
         if errors:
             for e in errors: out['warnings'].append(e)
         pco_ids = [p['pcoPersonId'] for p in people if p.get('pcoPersonId')]
@@ -4027,7 +4402,8 @@ def _run_all_people_sync_server_side():
         out['success'] = True
         out['message'] = 'All People sync complete.'
         append_audit({'action': 'sync_all_people', 'tpOrgId': tp_org_id,
-                      'joined': out['joined'], 'rosterDrops': out['rosterDrops'], 'by': 'scheduler'})
+                      'joined': out['joined'], 'rosterDrops': out['rosterDrops'],
+                      'directoryMode': dir_info['mode'], 'by': 'scheduler'})
         s = load_json(SETTINGS_KEY, {})
         if not isinstance(s, dict): s = {}
         s['lastSyncAt'] = now_iso()
@@ -4298,8 +4674,9 @@ def handle_check_pco_team_positions():
         # Fallback path: per-position iteration.
         if not by_position and pos_list:
             source = 'per-position (team-level returned empty)'
+            per_pos = _pco_position_assignments_many([p['positionId'] for p in pos_list])
             for p in pos_list:
-                aids, aerr = _pco_team_position_assignments(p['positionId'])
+                aids, aerr = per_pos[p['positionId']]
                 if aids:
                     by_position[p['positionId']] = aids
 
@@ -4494,8 +4871,9 @@ def handle_sync_team():
                 by_position, _terr = _pco_team_all_position_assignments(pco_team_id)
                 if not by_position and pos_list:
                     by_position = {}
+                    per_pos = _pco_position_assignments_many([p['positionId'] for p in pos_list])
                     for p in pos_list:
-                        aids, _aerr = _pco_team_position_assignments(p['positionId'])
+                        aids, _aerr = per_pos[p['positionId']]
                         if aids:
                             by_position[p['positionId']] = aids
                 # PCO person id -> set of current PCO position names (lower).
@@ -4805,8 +5183,8 @@ def handle_load_people_sync_preview():
         # memberships in TP).
         by_pid = {}
         no_pid_rows = []
-        for team in teams:
-            people, perr = _pco_team_people(team['teamId'])
+        team_people = _pco_team_people_many([t['teamId'] for t in teams])
+        for team, (people, perr) in zip(teams, team_people):
             if perr:
                 api_errors.append('Team ' + team['teamName'] + ': ' + perr)
                 continue
@@ -5079,9 +5457,10 @@ def handle_sync_people():
             pco_in_scope = set()
             person_teams_now = {}  # pco_pid -> set(team_name_lower)
             pco_team_names_lower = set([t['teamName'].lower() for t in (teams_now or []) if t.get('teamName')])
-            for t in (teams_now or []):
+            teams_now = teams_now or []
+            team_people_now = _pco_team_people_many([t['teamId'] for t in teams_now])
+            for t, (ppl, _perr) in zip(teams_now, team_people_now):
                 tname_l = (t['teamName'] or '').lower()
-                ppl, _perr = _pco_team_people(t['teamId'])
                 for p in (ppl or []):
                     pp = p.get('pcoPersonId')
                     if not pp:
@@ -5291,7 +5670,8 @@ def handle_load_all_people_preview():
         if info['orgId'] <= 0:
             print json.dumps({'success': False, 'message': 'No All People mapping configured.'})
             return
-        people, errors = _pco_all_people_walk(include_inactive=info['includeInactive'])
+        people, errors, dir_info = _pco_people_directory(include_inactive=info['includeInactive'],
+                                                        full=_truthy(get_data('full_walk', ''), False))
         pco_ids = [p['pcoPersonId'] for p in people if p['pcoPersonId']]
         emails = [p['email'] for p in people if p['email']]
         by_pco = _tp_match_by_pco_id(pco_ids)
@@ -5335,6 +5715,7 @@ def handle_load_all_people_preview():
             'unmatchedSample': unmatched_sample,
             'mapping': info,
             'rosterDropCount': roster_drop_count_a,
+            'directory': dir_info,
         }
         if errors:
             resp['warnings'] = errors
@@ -5354,7 +5735,7 @@ def handle_sync_all_people():
         if not info['autoAddMember']:
             print json.dumps({'success': False, 'message': 'Auto-add is disabled for the All People mapping.'})
             return
-        people, errors = _pco_all_people_walk(include_inactive=info['includeInactive'])
+        people, errors, dir_info = _pco_people_directory(include_inactive=info['includeInactive'])
         pco_ids = [p['pcoPersonId'] for p in people if p['pcoPersonId']]
         emails = [p['email'] for p in people if p['email']]
         by_pco = _tp_match_by_pco_id(pco_ids)
@@ -5494,6 +5875,7 @@ def handle_sync_all_people():
             'rosterDrops': roster_drops,
             'rosterDropFailures': roster_drop_failures,
             'skipped': skipped,
+            'directoryMode': dir_info['mode'],
             'by': safe_str(model.UserName) if hasattr(model, 'UserName') else '',
         })
 
@@ -5610,7 +5992,8 @@ def handle_load_all_people_proposed_matches():
         if scope_ids is None and info['orgId'] <= 0:
             print json.dumps({'success': False, 'message': 'No All People mapping configured. Either configure one on the Sync Mappings tab, or click "Open Proposed Matches" from a specific preview to scope this to those records.'})
             return
-        people, errors = _pco_all_people_walk(include_inactive=include_inactive_default)
+        people, errors, dir_info = _pco_people_directory(include_inactive=include_inactive_default,
+                                                        full=_truthy(get_data('full_walk', ''), False))
         if scope_ids is not None:
             # Filter the walk to scoped IDs only. Anyone in the scope
             # who wasn't in the PCO walk (deleted? archived? excluded
@@ -5640,11 +6023,20 @@ def handle_load_all_people_proposed_matches():
                 continue
             unmatched_pco.append(p)
 
-        # Bulk lookups for name + email matching.
-        name_pairs = [(p.get('first_name'), p.get('last_name')) for p in unmatched_pco]
-        emails = [p['email'] for p in unmatched_pco if p['email']]
-        by_name = _tp_match_by_name(name_pairs)
-        by_email = _tp_match_by_email(emails)
+        # Bulk lookups for name + email matching. Large runs (the full-
+        # directory walk) load People once into hash maps; small scoped
+        # runs stay on the targeted queries.
+        matcher_mode = 'query'
+        if len(unmatched_pco) >= MATCHER_INDEX_MIN_ROWS:
+            matcher_mode = 'index'
+            idx = _tp_load_matcher_index()
+            by_name = idx['byName']
+            by_email = idx['byEmail']
+        else:
+            name_pairs = [(p.get('first_name'), p.get('last_name')) for p in unmatched_pco]
+            emails = [p['email'] for p in unmatched_pco if p['email']]
+            by_name = _tp_match_by_name(name_pairs)
+            by_email = _tp_match_by_email(emails)
 
         # Score each row + compute the tier. Client paginates / filters
         # / searches the whole dataset from cache after this single load.
@@ -5683,6 +6075,8 @@ def handle_load_all_people_proposed_matches():
             'counts': counts,
             'rows': rows,  # ALL rows -- client paginates/filters
             'scoped': scoped,
+            'directory': dir_info,
+            'matcherMode': matcher_mode,
         }
         if errors:
             resp['warnings'] = errors
@@ -6592,8 +6986,8 @@ def handle_list_unmatched_people():
         # 1. Walk plans across mapped service types -> list of plans.
         all_plans = []
         api_errors = []
-        for pco_st_id in mappings.keys():
-            plans, err = _pco_plans_for_service_type(pco_st_id, days_back, days_forward)
+        st_ids = list(mappings.keys())
+        for pco_st_id, (plans, err) in zip(st_ids, _pco_plans_for_service_types(st_ids, days_back, days_forward)):
             if err:
                 api_errors.append('Service type ' + str(pco_st_id) + ': ' + err)
                 continue
@@ -6604,10 +6998,11 @@ def handle_list_unmatched_people():
         # 2. For each plan, pull team_members and collect PCO Person IDs.
         # Aggregate: {pcoPersonId: {name, email, plans: [{title, dateIso}]}}
         agg = {}
-        for plan in all_plans:
-            tm_path = ('/services/v2/service_types/' + plan['serviceTypeId'] +
-                       '/plans/' + plan['planId'] + '/team_members?per_page=100')
-            tm_data, err = pco_get(tm_path)
+        tm_results = pco_get_many([
+            '/services/v2/service_types/' + plan['serviceTypeId'] +
+            '/plans/' + plan['planId'] + '/team_members?per_page=100'
+            for plan in all_plans])
+        for plan, (tm_data, err) in zip(all_plans, tm_results):
             if err:
                 api_errors.append('Plan ' + plan['planId'] + ': ' + err)
                 continue
@@ -8741,7 +9136,7 @@ else:
             + '</div>'
             + '</div>'
             + '<div id="pcoAllPeopleConfig" style="display:none;margin-top:10px;padding:10px;border:1px solid #e1e4e8;border-radius:6px;background:#fff;"></div>';
-          $('pcoAllPeoplePreviewBtn').onclick = openAllPeoplePreview;
+          $('pcoAllPeoplePreviewBtn').onclick = function(){ openAllPeoplePreview(false); };
           $('pcoAllPeopleReconfigBtn').onclick = openAllPeopleConfig;
           $('pcoAllPeopleDelBtn').onclick = function(){
             if (!confirm('Remove the All People mapping? Existing TP members will NOT be removed.')) return;
@@ -8821,9 +9216,16 @@ else:
       // All People preview is a counts-only modal. Previewing 5K+ rows in
       // a list is impractical; the user sees totals + a sample of
       // unmatched names + a Sync Now button.
-      function openAllPeoplePreview() {
-        renderPlanPreviewModal('<div class="pco-empty">Walking the entire PCO People directory (this can take 10-30 seconds for large churches)...</div>');
-        ajax('load_all_people_preview', {}, function(err, d){
+      // The server keeps a snapshot of the PCO directory and normally
+      // only pulls people changed since the last run. fullWalk forces a
+      // complete re-walk (picks up people deleted/merged in PCO).
+      function openAllPeoplePreview(fullWalk) {
+        renderPlanPreviewModal('<div class="pco-empty">'
+          + (fullWalk
+              ? 'Walking the entire PCO People directory (this can take 10-30 seconds for large churches)...'
+              : 'Refreshing the PCO People directory (changes since last run)...')
+          + '</div>');
+        ajax('load_all_people_preview', {full_walk: fullWalk ? '1' : '0'}, function(err, d){
           if (err || !d || !d.success) {
             renderPlanPreviewModal('<div class="pco-pill pco-err">Error</div><div>' + escHtml((d && d.message) || err) + '</div>');
             return;
@@ -8871,7 +9273,16 @@ else:
               + '<strong>Mirror removal:</strong> PCO is the source of truth -- <strong>' + apDropCount + ' TP member(s)</strong> will be removed from the involvement (their PCO link is no longer in the PCO directory).'
               + '</div>';
           }
+          var dir = d.directory || {};
+          var dirHtml = '<div class="pco-muted" style="margin-bottom:10px;font-size:12px;display:flex;align-items:center;gap:8px;flex-wrap:wrap;">'
+            + (dir.mode === 'incremental'
+                ? 'Directory: ' + (dir.changed || 0) + ' PCO record(s) changed since last run'
+                : 'Directory: full walk')
+            + (dir.lastFullAt ? ' &middot; last full walk ' + escHtml(dir.lastFullAt.replace('T', ' ')) : '')
+            + ' <button class="pco-btn pco-secondary" id="pcoAllPeopleFullWalkBtn" style="font-size:12px;padding:2px 8px;">Full refresh</button>'
+            + '</div>';
           body.innerHTML = ''
+            + dirHtml
             + '<div style="margin-bottom:10px;padding:8px 10px;border-radius:4px;background:#1f4e790d;border-left:3px solid #1f4e79;font-size:13px;">'
             + '  <strong style="color:#1f4e79;">Sync mode:</strong> All People. Every matched PCO person will be added to the designated TP involvement. '
             + '  Unmatched PCO records will be reported but no TP person will be created (TP is authoritative).'
@@ -8891,6 +9302,7 @@ else:
             + '<button class="pco-btn pco-secondary" onclick="window.__pcoCloseModal()">Cancel</button>'
             + '<button class="pco-btn" id="pcoAllPeopleSyncBtn">Sync ' + (d.matched || 0) + ' matched PCO people</button>';
           window.__pcoCloseModal = closePlanPreview;
+          $('pcoAllPeopleFullWalkBtn').onclick = function(){ openAllPeoplePreview(true); };
           // Wire the "Open Proposed Matches" button if it rendered.
           // The All People preview goes for full directory mode (no
           // scope) since the user has clearly opted to see everything.
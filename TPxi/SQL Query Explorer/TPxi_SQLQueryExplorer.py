@@ -29,11 +29,15 @@
 # 5. Saved queries functionality
 # 6. Collapsible schema panel
 # 7. Keyboard shortcuts (Ctrl+T, Ctrl+Tab, etc.)
+# 8. Server-side paging for SELECTs, row cap for everything else
+# 9. Cached schema catalog, refreshed only when the schema changes
+# 10. Profiling mode: timing history per query, server stats and plan
 #####################################################################
 
 
 import json
 import re
+import hashlib
 from datetime import datetime
 
 # Custom JSON encoder for Python 2.7 Unicode handling
@@ -96,6 +100,30 @@ def safe_json_dumps(obj):
 
 model.Header = "SQL Query Explorer"
 
+# Result paging: a lone SELECT is wrapped in OFFSET/FETCH so only one page
+# is ever materialized. Batches that can't be wrapped run under SET ROWCOUNT
+# so the server stops at the row cap; a batch the cap can't be placed in
+# safely only runs after the user confirms running it uncapped.
+RESULT_PAGE_SIZE = 500
+RESULT_MAX_PAGE_SIZE = 5000
+RESULT_ROW_CAP = 5000          # rows returned from a batch that can't be paged
+RESULT_COUNT_CAP = 100000      # the total-count probe stops counting here
+
+# Schema catalog: tables/columns cached in Special Content and refreshed
+# only when sys.objects shows a change, so editor load skips the big
+# INFORMATION_SCHEMA join.
+SCHEMA_CACHE_KEY = 'TPxi_SQLQueryExplorer_SchemaCatalog'
+SCHEMA_CACHE_VERSION = 1
+SCHEMA_PREFIX_LEN = 2          # autocomplete prefix index key length
+
+# Profiling: each profiled run is appended to a per-query timing history
+# in Special Content; server stats and the plan come from the plan cache.
+PROFILE_HISTORY_KEY = 'TPxi_SQLQueryExplorer_ProfileHistory'
+PROFILE_HISTORY_RUNS = 50      # runs kept per query
+PROFILE_HISTORY_QUERIES = 200  # queries kept (least recently run dropped)
+PROFILE_HISTORY_SAVE_ATTEMPTS = 3  # re-merges when a concurrent save drops a run
+PROFILE_STATS_SLACK_MS = 5000  # extra look-back for the plan cache lookup
+
 class QueryExplorer:
     def __init__(self):
         self.user_id = model.UserPeopleId
@@ -126,65 +154,193 @@ class QueryExplorer:
         return q.QuerySql(objects_sql)
     
     def get_full_schema(self):
-        """Get complete schema with all tables and their columns in one query"""
-        schema_sql = """
-        SELECT 
-            t.TABLE_SCHEMA,
-            t.TABLE_NAME,
-            t.TABLE_TYPE,
-            c.COLUMN_NAME,
-            c.DATA_TYPE,
-            c.ORDINAL_POSITION
-        FROM INFORMATION_SCHEMA.TABLES t
-        LEFT JOIN INFORMATION_SCHEMA.COLUMNS c 
-            ON t.TABLE_SCHEMA = c.TABLE_SCHEMA 
-            AND t.TABLE_NAME = c.TABLE_NAME
-        WHERE t.TABLE_TYPE IN ('BASE TABLE', 'VIEW')
-            AND t.TABLE_SCHEMA NOT IN ('sys', 'INFORMATION_SCHEMA', 'guest', 'db_owner', 'db_accessadmin', 'db_securityadmin', 'db_ddladmin', 'db_backupoperator', 'db_datareader', 'db_datawriter', 'db_denydatareader', 'db_denydatawriter')
-        ORDER BY t.TABLE_SCHEMA, t.TABLE_NAME, c.ORDINAL_POSITION
-        """
-        
-        results = q.QuerySql(schema_sql)
-        
+        """Get complete schema with all tables and their columns (served
+        from the cached schema catalog)"""
+        catalog = self.get_schema_catalog()
+
         # Organize into a structured format
         schema = {
             'tables': {},
             'views': {}
         }
-        
-        # Track some stats for debugging
-        lookup_table_count = 0
-        lookup_column_count = 0
-        
-        for row in results:
-            # Build the key for storage - use schema.table for non-dbo, just table for dbo
-            if row.TABLE_SCHEMA == 'dbo':
-                storage_key = row.TABLE_NAME
-            else:
-                storage_key = row.TABLE_SCHEMA + '.' + row.TABLE_NAME
-            
-            target = schema['tables'] if row.TABLE_TYPE == 'BASE TABLE' else schema['views']
-            
-            if storage_key not in target:
-                target[storage_key] = {
-                    'schema': row.TABLE_SCHEMA,
-                    'name': row.TABLE_NAME,
-                    'columns': []
-                }
-                if row.TABLE_SCHEMA == 'lookup':
-                    lookup_table_count += 1
-            
-            if row.COLUMN_NAME:
-                target[storage_key]['columns'].append(row.COLUMN_NAME)
-                if row.TABLE_SCHEMA == 'lookup':
-                    lookup_column_count += 1
-        
-        # Debug: Log lookup tables found
-        if lookup_table_count > 0:
-            model.DebugPrint("Found %d lookup tables with %d total columns" % (lookup_table_count, lookup_column_count))
-        
+
+        for key, obj in self.expand_catalog(catalog).items():
+            target = schema['tables'] if obj[2] == 'T' else schema['views']
+            target[key] = {
+                'schema': obj[0],
+                'name': obj[1],
+                'columns': obj[3]
+            }
+
         return schema
-    
+
+    def get_schema_stamp(self):
+        """Cheap fingerprint of the schema: user table/view count plus the
+        latest modify_date (adding or altering an object moves the date,
+        dropping one changes the count)"""
+        row = q.QuerySqlTop1("""
+        SELECT
+            COUNT(*) AS ObjectCount,
+            CONVERT(varchar(23), MAX(modify_date), 126) AS LastModified
+        FROM sys.objects
+        WHERE type IN ('U', 'V') AND is_ms_shipped = 0
+        """)
+        last_modified = row.LastModified or ''
+        return "{0}|{1}".format(int(row.ObjectCount or 0), last_modified), last_modified
+
+    def query_schema_objects(self, since=None):
+        """Read every user table/view, with columns only for objects
+        modified after `since` (all of them when since is None).
+
+        Returns ({key: [schema, name, 'T'|'V', columns or None]},
+        last_modified); columns is None for objects that haven't changed
+        since the last refresh, and last_modified is the latest modify_date
+        this listing saw, i.e. the `since` for the next refresh."""
+        if since is None:
+            changed = "1 = 1"
+        elif re.match(r'^[0-9T:.\-]+$', since):
+            changed = "o.modify_date > '{0}'".format(since)
+        else:
+            raise ValueError("Invalid schema catalog timestamp: " + since)
+
+        objects_sql = """
+        SELECT
+            s.name AS SchemaName,
+            o.name AS ObjectName,
+            o.type AS ObjectType,
+            CASE WHEN {0} THEN 1 ELSE 0 END AS Changed,
+            c.name AS ColumnName,
+            CONVERT(varchar(23), MAX(o.modify_date) OVER (), 126) AS LastModified
+        FROM sys.objects o
+        JOIN sys.schemas s ON s.schema_id = o.schema_id
+        LEFT JOIN sys.columns c
+            ON c.object_id = o.object_id
+            AND {0}
+        WHERE o.type IN ('U', 'V')
+            AND o.is_ms_shipped = 0
+            AND s.name NOT IN ('sys', 'INFORMATION_SCHEMA', 'guest', 'db_owner', 'db_accessadmin', 'db_securityadmin', 'db_ddladmin', 'db_backupoperator', 'db_datareader', 'db_datawriter', 'db_denydatareader', 'db_denydatawriter')
+        ORDER BY s.name, o.name, c.column_id
+        """.format(changed)
+
+        objects = {}
+        last_modified = ''
+        for row in q.QuerySql(objects_sql):
+            last_modified = row.LastModified or last_modified
+            # Use schema.table for non-dbo, just table for dbo
+            if row.SchemaName == 'dbo':
+                key = row.ObjectName
+            else:
+                key = row.SchemaName + '.' + row.ObjectName
+
+            if key not in objects:
+                kind = 'T' if row.ObjectType.strip() == 'U' else 'V'
+                objects[key] = [row.SchemaName, row.ObjectName, kind, [] if row.Changed else None]
+            if row.ColumnName:
+                objects[key][3].append(row.ColumnName)
+
+        return objects, last_modified
+
+    def expand_catalog(self, catalog):
+        """Compact catalog -> {key: [schema, name, 'T'|'V', [columns]]}"""
+        names = catalog['columns']
+        expanded = {}
+        for key, schema_name, name, kind, column_ids in catalog['objects']:
+            expanded[key] = [schema_name, name, kind, [names[i] for i in column_ids]]
+        return expanded
+
+    def compact_catalog(self, objects, stamp, last_modified):
+        """Build the stored/served catalog: one sorted column-name
+        dictionary, objects referencing it by index, and prefix indexes
+        mapping the first SCHEMA_PREFIX_LEN letters to a [start, end)
+        slice of the (case-insensitively sorted) names."""
+        def prefix_index(names):
+            index = {}
+            for i, name in enumerate(names):
+                prefix = name[:SCHEMA_PREFIX_LEN].lower()
+                if prefix not in index:
+                    index[prefix] = [i, i + 1]
+                else:
+                    index[prefix][1] = i + 1
+            return index
+
+        names = set()
+        for obj in objects.values():
+            names.update(obj[3])
+        names = sorted(names, key=lambda n: n.lower())
+        positions = dict((name, i) for i, name in enumerate(names))
+
+        keys = sorted(objects.keys(), key=lambda k: k.lower())
+        compact = []
+        for key in keys:
+            schema_name, name, kind, columns = objects[key]
+            compact.append([key, schema_name, name, kind, [positions[c] for c in columns]])
+
+        return {
+            'version': SCHEMA_CACHE_VERSION,
+            'stamp': stamp,
+            'lastModified': last_modified,
+            'built': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'prefixLength': SCHEMA_PREFIX_LEN,
+            'columns': names,
+            'objects': compact,
+            'tablePrefix': prefix_index(keys),
+            'columnPrefix': prefix_index(names)
+        }
+
+    def get_schema_catalog(self, stamp=None):
+        """Return the cached schema catalog, refreshing it only when the
+        schema stamp has moved. A refresh re-reads columns just for the
+        objects modified since the last one; dropped objects fall out
+        because every refresh lists all current object names. The next
+        refresh's cutoff is the latest modify_date seen by the listing
+        itself, so a change landing after the stamp was read is not
+        skipped."""
+        if stamp is None:
+            stamp = self.get_schema_stamp()[0]
+
+        catalog = None
+        try:
+            stored = model.TextContent(SCHEMA_CACHE_KEY)
+            if stored:
+                catalog = json.loads(stored)
+                if catalog.get('version') != SCHEMA_CACHE_VERSION:
+                    catalog = None
+        except Exception:
+            catalog = None
+
+        if catalog and catalog.get('stamp') == stamp:
+            return catalog
+
+        if catalog:
+            # Incremental: keep column lists for unchanged objects
+            previous = self.expand_catalog(catalog)
+            objects, last_modified = self.query_schema_objects(catalog.get('lastModified') or None)
+            for key, obj in objects.items():
+                if obj[3] is None:
+                    obj[3] = previous[key][3] if key in previous else []
+        else:
+            objects, last_modified = self.query_schema_objects()
+
+        catalog = self.compact_catalog(objects, stamp, last_modified)
+        model.WriteContentText(SCHEMA_CACHE_KEY, json.dumps(catalog, separators=(',', ':')), "")
+        return catalog
+
+    def get_schema_tree(self, catalog=None):
+        """Tables and views for the schema sidebar, with column counts"""
+        if catalog is None:
+            catalog = self.get_schema_catalog()
+
+        tree = {'tables': [], 'views': []}
+        objects = sorted(catalog['objects'], key=lambda o: (o[1].lower(), o[2].lower()))
+        for key, schema_name, name, kind, column_ids in objects:
+            target = tree['tables'] if kind == 'T' else tree['views']
+            target.append({
+                'schema': schema_name,
+                'name': name,
+                'columns': len(column_ids)
+            })
+        return tree
+
     def get_table_columns(self, schema_name, table_name):
         """Get columns for a specific table"""
         columns_sql = """
@@ -616,8 +772,289 @@ ORDER BY p.CreatedDate DESC'''
             # If anything fails, return original SQL
             return sql
     
-    def execute_query(self, sql):
-        """Execute SQL query and return results"""
+    def mask_sql(self, sql):
+        """Blank out comments, string literals and [bracketed] names (same
+        length, so positions still line up with the original SQL)."""
+        def blank(match):
+            return ' ' * len(match.group(0))
+        masked = re.sub(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\[[^\]]*\]", blank, sql, flags=re.DOTALL)
+        # Keep only top-level text: anything inside parentheses is blanked
+        top_level = []
+        depth = 0
+        for char in masked:
+            if char == '(':
+                depth += 1
+                top_level.append(' ')
+            elif char == ')':
+                depth -= 1
+                top_level.append(' ')
+            else:
+                top_level.append(char if depth == 0 else ' ')
+        return masked, ''.join(top_level)
+
+    def build_pager(self, sql, page, page_size):
+        """Wrap a lone SELECT statement in an OFFSET/FETCH pager.
+
+        Returns a dict with the page SQL (one extra row to detect a next
+        page), a capped count probe and whether the query has its own
+        ORDER BY, or None when the batch can't be paged (multiple
+        statements, SELECT INTO, CTEs, an existing OFFSET, FOR XML/JSON,
+        TOP with ORDER BY)."""
+        body = sql.strip()
+        while body.endswith(';'):
+            body = body[:-1].rstrip()
+        masked, top_level = self.mask_sql(body)
+        upper = top_level.upper()
+
+        if not re.match(r'\s*SELECT\b', upper):
+            return None
+        if ';' in masked or re.search(r'\b(INTO|OFFSET|FOR\s+(XML|JSON|BROWSE)|OPTION)\b', upper):
+            return None
+        # Any other top-level statement keyword means a multi-statement batch
+        if re.search(r'\b(DECLARE|SET|INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|EXEC|EXECUTE|IF|WHILE|BEGIN|GO|USE|PRINT|RETURN)\b', upper):
+            return None
+        for match in list(re.finditer(r'\bSELECT\b', upper))[1:]:
+            if not re.search(r'\b(UNION(\s+ALL)?|EXCEPT|INTERSECT)\s*$', upper[:match.start()]):
+                return None
+
+        offset = (page - 1) * page_size
+        fetch = "OFFSET {0} ROWS FETCH NEXT {1} ROWS ONLY".format(offset, page_size + 1)
+        has_top = re.match(r'\s*SELECT\s+(ALL\s+|DISTINCT\s+)?TOP\b', upper) is not None
+        order_matches = list(re.finditer(r'\bORDER\s+BY\b', upper))
+        ordered = bool(order_matches)
+
+        if ordered and has_top:
+            # Wrapping would lose the sort (the outer query can't repeat an
+            # ORDER BY that uses inner aliases), and TOP already bounds the
+            # result, so this runs as written under the row cap
+            return None
+        if ordered:
+            # The query's own ORDER BY drives the pages
+            page_sql = body + "\n" + fetch
+            count_inner = body[:order_matches[-1].start()]
+        else:
+            page_sql = "SELECT * FROM (\n{0}\n) AS qe_page ORDER BY (SELECT NULL) {1}".format(body, fetch)
+            count_inner = body
+        count_sql = """
+            SELECT COUNT(*) AS TotalRows
+            FROM (SELECT TOP {0} 1 AS One FROM (
+{1}
+            ) AS qe_count) AS qe_capped
+        """.format(RESULT_COUNT_CAP + 1, count_inner)
+
+        return {
+            'page_sql': page_sql,
+            'count_sql': count_sql,
+            'offset': offset,
+            'ordered': ordered
+        }
+
+    def cap_rows_sql(self, sql):
+        """Put SET ROWCOUNT (RESULT_ROW_CAP + 1, to detect truncation) in
+        front of the part of a batch that only reads, so the server stops
+        there instead of returning every row.
+
+        A read-only batch is capped from the start. Otherwise the cap goes
+        after the ';' that ends the last write (ROWCOUNT would also cut
+        INSERT/UPDATE/DELETE short), and a lone write statement needs no
+        cap. Returns None when it can't be placed safely: control flow or
+        EXEC, or a final write that isn't the only statement."""
+        masked, top_level = self.mask_sql(sql)
+        upper = masked.upper()
+        if re.search(r'\b(IF|ELSE|WHILE|BEGIN|GOTO|GO|EXEC|EXECUTE|RETURN|WAITFOR)\b', upper):
+            return None
+
+        cap = "SET ROWCOUNT {0};\n".format(RESULT_ROW_CAP + 1)
+        reset = "\nSET ROWCOUNT 0;"
+        writes = [m for m in re.finditer(r'\b(INSERT|UPDATE|DELETE|MERGE|INTO|CREATE|DROP|ALTER|TRUNCATE)\b', upper)
+                  if not (m.group(1) == 'INTO' and re.search(r'\b(INSERT|MERGE)\s*$', upper[:m.start()]))]
+        if not writes:
+            return cap + sql + reset
+
+        end = top_level.find(';', writes[-1].end())
+        if end >= 0:
+            return sql[:end + 1] + "\n" + cap + sql[end + 1:] + reset
+
+        # The batch ends in a write with no ';' to split on; that's only
+        # safe when the write is the whole batch (its own SELECT aside)
+        top_upper = top_level.upper()
+        selects = [m for m in re.finditer(r'\bSELECT\b', top_upper)
+                   if not re.search(r'\b(UNION|ALL|EXCEPT|INTERSECT)\s*$', top_upper[:m.start()])]
+        if len(writes) > 1 or len(selects) > 1:
+            return None
+        if selects:
+            write, select = writes[0], selects[0]
+            owned = ((write.group(1) == 'INSERT' and select.start() > write.start())
+                     or (write.group(1) == 'INTO' and select.start() < write.start()))
+            if not owned:
+                return None
+        return sql
+
+    def is_derived_column_error(self, error):
+        """True for the errors SQL Server raises when a SELECT can't be used
+        as a derived table: an unnamed column (Msg 8155) or the same column
+        name twice (Msg 8156)"""
+        message = str(error)
+        return ('No column name was specified' in message
+                or 'was specified multiple times' in message)
+
+    def query_fingerprint(self, sql):
+        """Stable key for a query's profiling history (whitespace and case
+        insensitive, so a reformatted saved query keeps its history)"""
+        normalized = re.sub(r'\s+', ' ', sql).strip().rstrip(';').strip().lower()
+        try:
+            normalized = normalized.encode('utf-8')
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            pass
+        return hashlib.md5(normalized).hexdigest()[:16]
+
+    def get_plan_stats(self, token, window_ms, capture_plan=False):
+        """Server-side stats for the run tagged with `token`, read back
+        from the plan cache (needs VIEW SERVER STATE). Only entries executed
+        in the last `window_ms` are searched; of the batches carrying the
+        tag, just the most recently run one is reported (the sum of its
+        statements). Returns None if the plan wasn't cached."""
+        rows = list(q.QuerySql("""
+        WITH tagged AS (
+            SELECT TOP 1 qs.sql_handle
+            FROM sys.dm_exec_query_stats qs
+            CROSS APPLY sys.dm_exec_sql_text(qs.sql_handle) st
+            WHERE qs.last_execution_time >= DATEADD(millisecond, -{0}, GETDATE())
+                AND st.text LIKE '%qe-profile:{1} */%'
+                AND st.text NOT LIKE '%dm_exec_query_stats%'
+            ORDER BY qs.last_execution_time DESC
+        )
+        SELECT
+            qs.last_elapsed_time / 1000 AS ElapsedMs,
+            qs.last_worker_time / 1000 AS CpuMs,
+            qs.last_logical_reads AS LogicalReads,
+            qs.last_physical_reads AS PhysicalReads,
+            qs.last_rows AS RowsReturned,
+            {2} AS QueryPlan
+        FROM sys.dm_exec_query_stats qs
+        JOIN tagged t ON t.sql_handle = qs.sql_handle
+        {3}
+        """.format(int(window_ms), token,
+                   "CONVERT(nvarchar(max), qp.query_plan)" if capture_plan else "NULL",
+                   "OUTER APPLY sys.dm_exec_query_plan(qs.plan_handle) qp" if capture_plan else "")))
+
+        if not rows:
+            return None
+        plan = None
+        if capture_plan:
+            plan = next((row.QueryPlan for row in rows if row.QueryPlan), None)
+        return {
+            'statements': len(rows),
+            'serverElapsedMs': sum(int(row.ElapsedMs or 0) for row in rows),
+            'cpuMs': sum(int(row.CpuMs or 0) for row in rows),
+            'logicalReads': sum(int(row.LogicalReads or 0) for row in rows),
+            'physicalReads': sum(int(row.PhysicalReads or 0) for row in rows),
+            'serverRows': sum(int(row.RowsReturned or 0) for row in rows),
+            'plan': plan
+        }
+
+    def load_profile_history(self):
+        """All profiling history: {fingerprint: {name, sql, last, runs}}"""
+        try:
+            stored = model.TextContent(PROFILE_HISTORY_KEY)
+            return json.loads(stored) if stored else {}
+        except Exception:
+            return {}
+
+    def record_profile(self, sql, query_name, run):
+        """Append a run to the query's timing history and return the
+        query's history entry.
+
+        The history is shared by everyone profiling, so after writing it is
+        read back; if a concurrent save replaced it without this run, the
+        run is merged into the newer copy and written again."""
+        key = self.query_fingerprint(sql)
+
+        for attempt in range(PROFILE_HISTORY_SAVE_ATTEMPTS):
+            history = self.load_profile_history()
+
+            item = history.get(key) or {'name': '', 'sql': sql.strip()[:200], 'runs': []}
+            if query_name:
+                item['name'] = query_name
+            runs = [r for r in item.get('runs', []) if r.get('id') != run['id']]
+            item['runs'] = (runs + [run])[-PROFILE_HISTORY_RUNS:]
+            item['last'] = max(item.get('last', ''), run['at'])
+            history[key] = item
+
+            # Drop the least recently run queries past the cap
+            if len(history) > PROFILE_HISTORY_QUERIES:
+                stale = sorted(history, key=lambda k: history[k].get('last', ''))
+                for old_key in stale[:len(history) - PROFILE_HISTORY_QUERIES]:
+                    del history[old_key]
+
+            model.WriteContentText(PROFILE_HISTORY_KEY, safe_json_dumps(history), "")
+
+            saved = self.load_profile_history().get(key) or {}
+            if any(r.get('id') == run['id'] for r in saved.get('runs', [])):
+                break
+
+        item['fingerprint'] = key
+        return item
+
+    def profile_run(self, sql, query_name, token, capture_plan, result, timings):
+        """Build the profile for one run and add it to the history"""
+        profile = {
+            'wallMs': result['executionTime'],
+            'queryMs': timings['query'],
+            'countMs': timings['count'],
+            'convertMs': timings['convert'],
+            'rows': result['rowCount'],
+            'rowsSkippedReturned': result['rowsSkippedReturned'],
+            # Size of the page as sent to the browser
+            'resultBytes': len(safe_json_dumps(result['data'])),
+            'serverStats': None,
+            'statsNote': None,
+            'plan': None
+        }
+
+        try:
+            # Look back over the whole run plus some slack for clock rounding
+            stats = self.get_plan_stats(token, profile['wallMs'] + PROFILE_STATS_SLACK_MS, capture_plan)
+            if stats:
+                profile['plan'] = stats.pop('plan')
+                profile['serverStats'] = stats
+            else:
+                profile['statsNote'] = ('Run not found in the plan cache. When the server has "optimize for ad hoc '
+                                        'workloads" on, a query is only fully cached from its second run; profile '
+                                        'the same page again to get server stats.')
+        except Exception as e:
+            profile['statsNote'] = 'Server stats unavailable (VIEW SERVER STATE permission is required): ' + str(e)[:200]
+
+        stats = profile['serverStats'] or {}
+        now = datetime.now()
+        run = {
+            'id': '{0}-{1}'.format(self.user_id, now.strftime('%Y%m%d%H%M%S%f')),
+            'at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'by': self.user_id,
+            'page': result['page'],
+            'wallMs': profile['wallMs'],
+            'queryMs': profile['queryMs'],
+            'rows': profile['rows'],
+            'bytes': profile['resultBytes'],
+            'cpuMs': stats.get('cpuMs'),
+            'logicalReads': stats.get('logicalReads')
+        }
+        try:
+            item = self.record_profile(sql, query_name, run)
+            profile['history'] = item['runs']
+            profile['fingerprint'] = item['fingerprint']
+        except Exception as e:
+            profile['history'] = [run]
+            profile['statsNote'] = (profile['statsNote'] or '') + ' History not saved: ' + str(e)[:200]
+
+        return profile
+
+    def execute_query(self, sql, page=1, page_size=RESULT_PAGE_SIZE, profile=False,
+                      capture_plan=False, query_name=None, allow_uncapped=False):
+        """Execute SQL query and return one page of results (plus a
+        profile of the run when profiling is on). A batch that can be
+        neither paged nor row capped on the server is only run with
+        allow_uncapped."""
         # Check permission first
         if not self.has_permission:
             return {
@@ -764,9 +1201,50 @@ ORDER BY p.CreatedDate DESC'''
                                 if words:
                                     column_order.append(words[-1].strip('[]'))
             
+            # Page lone SELECTs on the server; anything else runs as written
+            page = max(1, page)
+            page_size = max(1, min(page_size, RESULT_MAX_PAGE_SIZE))
+            pager = self.build_pager(sql, page, page_size)
+            capped_sql = None
+            if not pager:
+                capped_sql = self.cap_rows_sql(sql)
+                if capped_sql is None and not allow_uncapped:
+                    return {
+                        'success': False,
+                        'needsOverride': True,
+                        'error': ('This batch can not be paged or row capped on the server (it uses control flow, '
+                                  'EXEC, or ends in a write after other statements), so it may return every row. '
+                                  'Run it anyway?')
+                    }
+
+            # Profiled runs carry a comment with the query's fingerprint and
+            # page so their stats can be found in the plan cache afterwards.
+            # Each page is its own cache entry, and repeat runs of a page
+            # reuse its plan instead of leaving single-use plans behind.
+            profile_token = None
+            profile_tag = ''
+            if profile:
+                profile_token = '{0}-p{1}'.format(self.query_fingerprint(sql), page)
+                profile_tag = '\n/* qe-profile:{0} */'.format(profile_token)
+            timings = {'query': 0, 'count': 0, 'convert': 0}
+            phase_start = datetime.now()
+
             # Execute query with encoding error handling
             try:
-                results = q.QuerySql(sql)
+                results = None
+                if pager:
+                    try:
+                        results = q.QuerySql(pager['page_sql'] + profile_tag)
+                    except Exception as page_error:
+                        # A SELECT with unnamed or duplicate columns can't be
+                        # a derived table; run those row capped instead.
+                        # Any other error is the query's own, so report it.
+                        if not self.is_derived_column_error(page_error):
+                            raise
+                        pager = None
+                        capped_sql = self.cap_rows_sql(sql)
+                if not pager:
+                    results = q.QuerySql((capped_sql or sql) + profile_tag)
             except Exception as query_error:
                 # Check if it's an encoding error
                 try:
@@ -810,14 +1288,23 @@ ORDER BY p.CreatedDate DESC'''
                     # Re-raise other types of errors
                     raise
             
+            timings['query'] = int((datetime.now() - phase_start).total_seconds() * 1000)
+            phase_start = datetime.now()
+
             # Convert to list of dictionaries
             data = []
             columns = []
-            
+            row_limit = page_size if pager else RESULT_ROW_CAP
+            has_more = False
+
             if results:
                 # Get column names from first row
                 first_row = True
                 for row in results:
+                    if len(data) >= row_limit:
+                        # The pager fetched one extra row to detect a next page
+                        has_more = True
+                        break
                     if first_row:
                         # Get all available columns from the row
                         available_cols = [col for col in dir(row) if not col.startswith('_')]
@@ -900,15 +1387,52 @@ ORDER BY p.CreatedDate DESC'''
                     
                     data.append(row_dict)
             
+            timings['convert'] = int((datetime.now() - phase_start).total_seconds() * 1000)
+            phase_start = datetime.now()
+
+            # Total rows, counted once on the first page and capped so the
+            # probe can't turn into its own runaway scan
+            total_rows = None
+            total_capped = False
+            if pager and page == 1:
+                if not has_more:
+                    total_rows = len(data)
+                else:
+                    try:
+                        total_rows = int(q.QuerySqlTop1(pager['count_sql']).TotalRows)
+                        if total_rows > RESULT_COUNT_CAP:
+                            total_rows = RESULT_COUNT_CAP
+                            total_capped = True
+                    except Exception:
+                        total_rows = None
+            timings['count'] = int((datetime.now() - phase_start).total_seconds() * 1000)
+
             exec_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            return {
+
+            result = {
                 'success': True,
                 'data': data,
                 'columns': columns,
                 'rowCount': len(data),
-                'executionTime': int(exec_time)
+                'executionTime': int(exec_time),
+                'paged': pager is not None,
+                'page': page,
+                'pageSize': page_size,
+                'offset': pager['offset'] if pager else 0,
+                'ordered': pager['ordered'] if pager else True,
+                'hasMore': has_more if pager else False,
+                'truncated': has_more and not pager,
+                # OFFSET/FETCH steps over every row before the page, then
+                # returns the page (not the rows the server read to get there)
+                'rowsSkippedReturned': (pager['offset'] if pager else 0) + len(data) + (1 if has_more else 0),
+                'totalRows': total_rows,
+                'totalCapped': total_capped
             }
+
+            if profile:
+                result['profile'] = self.profile_run(sql, query_name, profile_token, capture_plan, result, timings)
+
+            return result
             
         except Exception as e:
             # Handle encoding errors in the exception message itself
@@ -1318,6 +1842,98 @@ ORDER BY p.CreatedDate DESC'''
             .results-table tr:hover {
                 background: #f9fafb;
             }
+
+            .results-pager {
+                display: flex;
+                align-items: center;
+                gap: 10px;
+                padding: 8px 10px;
+                background: #eef2ff;
+                border: 1px solid #c7d2fe;
+                border-radius: 4px;
+                margin-bottom: 8px;
+                font-size: 13px;
+                color: #374151;
+            }
+
+            .results-pager .pager-note {
+                color: #6b7280;
+                font-style: italic;
+            }
+
+            .results-pager button {
+                padding: 3px 10px;
+                border: 1px solid #9ca3af;
+                border-radius: 4px;
+                background: white;
+                cursor: pointer;
+            }
+
+            .results-pager button:disabled {
+                opacity: 0.5;
+                cursor: default;
+            }
+
+            .profile-toggle {
+                font-size: 13px;
+                margin-right: 10px;
+                color: #374151;
+                cursor: pointer;
+            }
+
+            .profile-panel {
+                padding: 8px 10px;
+                background: #fefce8;
+                border: 1px solid #fde68a;
+                border-radius: 4px;
+                margin-bottom: 8px;
+                font-size: 13px;
+                color: #374151;
+            }
+
+            .profile-stats {
+                display: flex;
+                flex-wrap: wrap;
+                gap: 16px;
+                margin-bottom: 6px;
+            }
+
+            .profile-stats strong {
+                display: block;
+                font-size: 11px;
+                font-weight: 500;
+                color: #6b7280;
+                text-transform: uppercase;
+            }
+
+            .profile-warning {
+                color: #b91c1c;
+                font-weight: 600;
+            }
+
+            .profile-note {
+                color: #6b7280;
+                font-style: italic;
+            }
+
+            .profile-history {
+                border-collapse: collapse;
+                margin-top: 6px;
+                font-size: 12px;
+            }
+
+            .profile-history td, .profile-history th {
+                padding: 2px 8px;
+                text-align: left;
+                border-bottom: 1px solid #fde68a;
+            }
+
+            .profile-bar {
+                display: inline-block;
+                height: 8px;
+                background: #f59e0b;
+                border-radius: 2px;
+            }
             
             /* Tabs */
             .tabs {
@@ -1647,6 +2263,12 @@ ORDER BY p.CreatedDate DESC'''
                     <button class="btn btn-secondary" onclick="exportResults()">
                         Export CSV
                     </button>
+                    <label class="profile-toggle" title="Record timing history and server stats for each run">
+                        <input type="checkbox" id="profile-mode"> Profile
+                    </label>
+                    <label class="profile-toggle" title="Also capture the cached XML plan (Profile mode)">
+                        <input type="checkbox" id="profile-plan"> Plan
+                    </label>
                     <span class="keyboard-shortcuts" onclick="showKeyboardShortcuts()" style="cursor: help; text-decoration: underline;">
                         Keyboard Shortcuts (click for more)
                     </span>
@@ -1712,21 +2334,89 @@ ORDER BY p.JoinDate DESC</textarea>
                 tables: {},
                 views: {},
                 loaded: false,
-                loading: false
+                loading: false,
+                // Prefix index from the schema catalog (sorted names plus
+                // prefix -> [start, end) slices into them)
+                objectKeys: [],
+                columnNames: [],
+                tablePrefix: null,
+                columnPrefix: null,
+                prefixLength: 2
             };
-            
+
+            const SCHEMA_CATALOG_STORAGE_KEY = 'sqlExplorerSchemaCatalog';
+
+            // Expand the compact schema catalog into dynamicSchema
+            function applySchemaCatalog(catalog) {
+                const names = catalog.columns || [];
+                dynamicSchema.tables = {};
+                dynamicSchema.views = {};
+                dynamicSchema.objectKeys = [];
+                (catalog.objects || []).forEach(obj => {
+                    const target = obj[3] === 'V' ? dynamicSchema.views : dynamicSchema.tables;
+                    target[obj[0]] = {
+                        schema: obj[1],
+                        name: obj[2],
+                        columns: obj[4].map(i => names[i])
+                    };
+                    dynamicSchema.objectKeys.push(obj[0]);
+                });
+                dynamicSchema.columnNames = names;
+                dynamicSchema.tablePrefix = catalog.tablePrefix || null;
+                dynamicSchema.columnPrefix = catalog.columnPrefix || null;
+                dynamicSchema.prefixLength = catalog.prefixLength || 2;
+                dynamicSchema.loaded = true;
+            }
+
+            function getStoredSchemaCatalog() {
+                try {
+                    const stored = window.localStorage && localStorage.getItem(SCHEMA_CATALOG_STORAGE_KEY);
+                    return stored ? JSON.parse(stored) : null;
+                } catch (e) {
+                    return null;
+                }
+            }
+
+            function storeSchemaCatalog(catalog) {
+                try {
+                    if (window.localStorage) {
+                        localStorage.setItem(SCHEMA_CATALOG_STORAGE_KEY, JSON.stringify(catalog));
+                    }
+                } catch (e) {
+                    // Storage full or disabled - the server cache still applies
+                    console.warn('Could not cache schema catalog locally:', e);
+                }
+            }
+
+            // Names from a case-insensitively sorted list that start with search,
+            // looked up through a prefix index instead of scanning the whole list
+            function prefixMatches(names, index, search) {
+                const term = search.toLowerCase();
+                const range = index ? index[term.substring(0, dynamicSchema.prefixLength)] : null;
+                if (!range) return [];
+                return names.slice(range[0], range[1]).filter(n => n.toLowerCase().indexOf(term) === 0);
+            }
+
             // Load complete schema on initialization
             function loadFullSchema() {
                 if (dynamicSchema.loading || dynamicSchema.loaded) return;
-                
+
                 dynamicSchema.loading = true;
-                
+
+                // Use the locally cached catalog right away; the server only
+                // sends a new one if the schema stamp has moved
+                const cachedCatalog = getStoredSchemaCatalog();
+                if (cachedCatalog) {
+                    applySchemaCatalog(cachedCatalog);
+                }
+
                 // Convert /PyScript/ to /PyScriptForm/ for AJAX requests
                 const url = window.location.pathname.replace('/PyScript/', '/PyScriptForm/');
                 console.log('Loading full schema from:', url);
-                
+
                 const formData = new FormData();
                 formData.append('action', 'get_full_schema');
+                formData.append('schema_stamp', cachedCatalog ? cachedCatalog.stamp : '');
                 
                 fetch(url, {
                     method: 'POST',
@@ -1757,6 +2447,22 @@ ORDER BY p.JoinDate DESC</textarea>
                     }
                 })
                 .then(data => {
+                    if (data.unchanged && cachedCatalog) {
+                        console.log('Schema catalog unchanged:', data.stamp);
+                        return;
+                    }
+                    if (data.catalog) {
+                        applySchemaCatalog(data.catalog);
+                        storeSchemaCatalog(data.catalog);
+                        console.log('Schema catalog loaded:', {
+                            stamp: data.catalog.stamp,
+                            built: data.catalog.built,
+                            objectCount: data.catalog.objects.length,
+                            columnNameCount: data.catalog.columns.length
+                        });
+                        return;
+                    }
+
                     // Check if we have schema data (with or without success flag)
                     const schemaData = data.schema || data;
                     if (schemaData && (schemaData.tables || schemaData.views)) {
@@ -2239,9 +2945,14 @@ ORDER BY p.JoinDate DESC</textarea>
                             }
                         });
                     } else {
-                        // Suggest regular tables
-                        for (let tableName in allTables) {
+                        // Suggest regular tables, narrowed through the prefix index
+                        // once the catalog is loaded and enough has been typed
+                        const candidates = (dynamicSchema.loaded && dynamicSchema.tablePrefix && searchStr.length >= dynamicSchema.prefixLength)
+                            ? prefixMatches(dynamicSchema.objectKeys, dynamicSchema.tablePrefix, searchStr)
+                            : Object.keys(allTables);
+                        for (const tableName of candidates) {
                             const table = allTables[tableName];
+                            if (!table) continue;
                             // tableName already includes schema prefix for non-dbo tables (e.g., "lookup.MemberStatus")
                             // Only match if search string matches the table name
                             if (tableName.toLowerCase().indexOf(searchStr.toLowerCase()) === 0 || !searchStr) {
@@ -2503,6 +3214,17 @@ ORDER BY p.JoinDate DESC</textarea>
                             result = result.slice(0, 20);
                         }
                     }
+
+                    // Column names from any table that start with the typed text
+                    if (showKeywords && string && dynamicSchema.columnPrefix && string.length >= dynamicSchema.prefixLength) {
+                        prefixMatches(dynamicSchema.columnNames, dynamicSchema.columnPrefix, string).slice(0, 20).forEach(col => {
+                            result.push({
+                                text: col,
+                                displayText: col,
+                                className: 'sql-column-hint'
+                            });
+                        });
+                    }
                 }
                 
                 return {
@@ -3087,7 +3809,7 @@ ORDER BY p.JoinDate DESC</textarea>
                 }
             }
             
-            function executeQuery(sql = null) {
+            function executeQuery(sql = null, page = 1, allowUncapped = false) {
                 const editor = getCurrentEditor();
                 if (!editor) return;
                 
@@ -3109,14 +3831,32 @@ ORDER BY p.JoinDate DESC</textarea>
                 }
                 
                 document.getElementById('results').innerHTML = '<div class="loading">Executing query...</div>';
-                
+
+                // Remember the query so later pages can be fetched on demand;
+                // the total row count only comes back with page 1
+                const prevPaging = tabs[currentTabId].paging;
+                tabs[currentTabId].paging = (page > 1 && prevPaging && prevPaging.sql === sql)
+                    ? Object.assign({}, prevPaging, {page: page})
+                    : {sql: sql, page: page, totalRows: null, totalCapped: false};
+
                 // Get PyScriptForm URL
                 var url = window.location.pathname.replace('/PyScript/', '/PyScriptForm/');
-                
+
                 // Create form data
                 var formData = new FormData();
                 formData.append('action', 'execute_query');
                 formData.append('sql_query', sql);
+                formData.append('page', page);
+                if (allowUncapped) {
+                    formData.append('allow_uncapped', '1');
+                }
+                if (document.getElementById('profile-mode').checked) {
+                    formData.append('profile', '1');
+                    formData.append('query_name', tabs[currentTabId].name);
+                    if (document.getElementById('profile-plan').checked) {
+                        formData.append('capture_plan', '1');
+                    }
+                }
                 
                 // Make AJAX request
                 fetch(url, {
@@ -3139,6 +3879,11 @@ ORDER BY p.JoinDate DESC</textarea>
                         if (jsonStart >= 0 && jsonEnd > jsonStart) {
                             const jsonStr = text.substring(jsonStart, jsonEnd);
                             const data = JSON.parse(jsonStr);
+                            // Batches the server can't row cap only run once confirmed
+                            if (data.needsOverride && confirm(data.error)) {
+                                executeQuery(sql, page, true);
+                                return;
+                            }
                             showResults(data);
                             
                             // Ensure panel stays visible after query execution
@@ -3158,6 +3903,117 @@ ORDER BY p.JoinDate DESC</textarea>
                 });
             }
             
+            function loadResultsPage(page) {
+                const paging = tabs[currentTabId].paging;
+                if (!paging || page < 1) return;
+                executeQuery(paging.sql, page);
+            }
+
+            function buildPagerHtml(result) {
+                const paging = tabs[currentTabId].paging || {};
+                if (result.paged) {
+                    if (result.page === 1) {
+                        paging.totalRows = result.totalRows;
+                        paging.totalCapped = result.totalCapped;
+                    }
+                    let html = '<div class="results-pager"><span>Rows ' + (result.offset + 1).toLocaleString()
+                        + '&ndash;' + (result.offset + result.rowCount).toLocaleString();
+                    if (paging.totalRows !== null && paging.totalRows !== undefined) {
+                        html += ' of ' + (paging.totalCapped ? 'more than ' : '') + paging.totalRows.toLocaleString();
+                    }
+                    html += ' &middot; page ' + result.page + ' &middot; ' + result.rowsSkippedReturned.toLocaleString()
+                        + ' rows skipped+returned &middot; ' + result.executionTime + ' ms</span>';
+                    if (!result.ordered) {
+                        html += '<span class="pager-note">Add ORDER BY for a stable page order</span>';
+                    }
+                    html += '<span style="margin-left: auto;">'
+                        + '<button onclick="loadResultsPage(' + (result.page - 1) + ')"' + (result.page <= 1 ? ' disabled' : '') + '>&lsaquo; Prev</button> '
+                        + '<button onclick="loadResultsPage(' + (result.page + 1) + ')"' + (result.hasMore ? '' : ' disabled') + '>Next &rsaquo;</button>'
+                        + '</span></div>';
+                    return html;
+                }
+                if (result.truncated) {
+                    return '<div class="results-pager"><span>Showing the first ' + result.rowCount.toLocaleString()
+                        + ' rows. This batch can not be paged on the server, so the rest were not returned;'
+                        + ' add TOP or narrow the WHERE clause.</span></div>';
+                }
+                return '';
+            }
+
+            function buildProfileHtml(result) {
+                const profile = result.profile;
+                if (!profile) return '';
+                tabs[currentTabId].lastPlan = profile.plan || null;
+
+                const stat = (label, value) => '<span><strong>' + label + '</strong>' + value + '</span>';
+                const server = profile.serverStats;
+                let html = '<div class="profile-panel"><div class="profile-stats">';
+                html += stat('Wall', profile.wallMs + ' ms');
+                html += stat('Query', profile.queryMs + ' ms');
+                html += stat('Convert', profile.convertMs + ' ms');
+                if (profile.countMs) html += stat('Count', profile.countMs + ' ms');
+                html += stat('Rows', profile.rows.toLocaleString());
+                html += stat('Rows skipped+returned', profile.rowsSkippedReturned.toLocaleString());
+                html += stat('Result size', (profile.resultBytes / 1024).toFixed(1) + ' KB');
+                if (server) {
+                    html += stat('Server elapsed', server.serverElapsedMs + ' ms');
+                    html += stat('CPU', server.cpuMs + ' ms');
+                    html += stat('Logical reads', server.logicalReads.toLocaleString());
+                    html += stat('Physical reads', server.physicalReads.toLocaleString());
+                    html += stat('Statements', server.statements);
+                }
+                if (profile.plan) {
+                    html += '<span><button class="btn btn-secondary" onclick="downloadPlan()">Download plan</button></span>';
+                }
+                html += '</div>';
+                if (profile.statsNote) {
+                    html += '<div class="profile-note">' + escapeHtml(profile.statsNote) + '</div>';
+                }
+
+                // Compare against earlier runs of the same query (page 1 only,
+                // later pages skip the count probe and aren't comparable)
+                const history = profile.history || [];
+                const previous = history.slice(0, -1).filter(run => run.page === 1).map(run => run.wallMs).sort((a, b) => a - b);
+                if (previous.length >= 3 && result.page === 1) {
+                    const median = previous[Math.floor(previous.length / 2)];
+                    if (profile.wallMs > median * 1.5 && profile.wallMs - median > 50) {
+                        html += '<div class="profile-warning">Slower than usual: median ' + median + ' ms over '
+                            + previous.length + ' earlier runs</div>';
+                    }
+                }
+
+                if (history.length > 1) {
+                    const recent = history.slice(-10).reverse();
+                    const slowest = Math.max.apply(null, recent.map(run => run.wallMs)) || 1;
+                    html += '<details><summary>Timing history (' + history.length + ' runs)</summary>';
+                    html += '<table class="profile-history"><tr><th>Run at</th><th>Page</th><th>Wall</th><th></th>'
+                        + '<th>Rows</th><th>CPU</th><th>Logical reads</th></tr>';
+                    recent.forEach(run => {
+                        html += '<tr><td>' + run.at + '</td><td>' + run.page + '</td><td>' + run.wallMs + ' ms</td>'
+                            + '<td><span class="profile-bar" style="width: ' + Math.max(2, Math.round(run.wallMs / slowest * 120)) + 'px;"></span></td>'
+                            + '<td>' + run.rows.toLocaleString() + '</td>'
+                            + '<td>' + (run.cpuMs !== null && run.cpuMs !== undefined ? run.cpuMs + ' ms' : '&ndash;') + '</td>'
+                            + '<td>' + (run.logicalReads !== null && run.logicalReads !== undefined ? run.logicalReads.toLocaleString() : '&ndash;') + '</td></tr>';
+                    });
+                    html += '</table></details>';
+                }
+                html += '</div>';
+                return html;
+            }
+
+            function downloadPlan() {
+                const plan = tabs[currentTabId].lastPlan;
+                if (!plan) return;
+                // .sqlplan opens as a graphical plan in SSMS / Azure Data Studio
+                const blob = new Blob([plan], { type: 'application/xml' });
+                const link = document.createElement('a');
+                link.href = URL.createObjectURL(blob);
+                link.download = (tabs[currentTabId].name || 'query').replace(/[^A-Za-z0-9_-]+/g, '_') + '.sqlplan';
+                document.body.appendChild(link);
+                link.click();
+                document.body.removeChild(link);
+            }
+
             function executeSelected() {
                 const editor = getCurrentEditor();
                 if (!editor) return;
@@ -3274,7 +4130,7 @@ ORDER BY p.JoinDate DESC</textarea>
                 }
                 
                 if (!result.data || result.data.length === 0) {
-                    resultsDiv.innerHTML = '<div style="padding: 20px; color: #6b7280;">No results returned</div>';
+                    resultsDiv.innerHTML = buildProfileHtml(result) + '<div style="padding: 20px; color: #6b7280;">No results returned</div>';
                     resultsInfo.style.display = 'none';
                     // Save results to current tab
                     tabs[currentTabId].results = resultsDiv.innerHTML;
@@ -3287,7 +4143,8 @@ ORDER BY p.JoinDate DESC</textarea>
                 }
                 
                 // Build table with wrapper for scrolling
-                let html = '<div class="results-wrapper"><table class="results-table"><thead><tr>';
+                let html = buildProfileHtml(result) + buildPagerHtml(result);
+                html += '<div class="results-wrapper"><table class="results-table"><thead><tr>';
                 
                 result.columns.forEach(col => {
                     html += `<th>${col}</th>`;
@@ -4338,26 +5195,7 @@ h2 { color: #333; margin-bottom: 10px; }
             try:
                 if action == 'load_schema':
                     # Return tables and views organized by type
-                    objects = explorer.get_database_objects()
-                    tables_list = []
-                    views_list = []
-                    
-                    for obj in objects:
-                        item = {
-                            'schema': obj.TABLE_SCHEMA,
-                            'name': obj.TABLE_NAME,
-                            'columns': int(obj.COLUMN_COUNT)
-                        }
-                        
-                        if obj.TABLE_TYPE == 'BASE TABLE':
-                            tables_list.append(item)
-                        elif obj.TABLE_TYPE == 'VIEW':
-                            views_list.append(item)
-                    
-                    print(json.dumps({
-                        'tables': tables_list,
-                        'views': views_list
-                    }))
+                    print(json.dumps(explorer.get_schema_tree()))
             
                 elif action == 'load_columns':
                     # Load columns for a specific table
@@ -4387,7 +5225,17 @@ h2 { color: #333; margin-bottom: 10px; }
                     if sql:
                         # Check if explorer has the execute_query method
                         if hasattr(explorer, 'execute_query'):
-                            result = explorer.execute_query(sql)
+                            try:
+                                page = int(getattr(model.Data, 'page', 1) or 1)
+                                page_size = int(getattr(model.Data, 'page_size', RESULT_PAGE_SIZE) or RESULT_PAGE_SIZE)
+                            except (ValueError, TypeError):
+                                page, page_size = 1, RESULT_PAGE_SIZE
+                            profile = getattr(model.Data, 'profile', '') == '1'
+                            capture_plan = getattr(model.Data, 'capture_plan', '') == '1'
+                            query_name = getattr(model.Data, 'query_name', '') or ''
+                            allow_uncapped = getattr(model.Data, 'allow_uncapped', '') == '1'
+                            result = explorer.execute_query(sql, page, page_size, profile, capture_plan, query_name,
+                                                            allow_uncapped)
                             # Try to serialize to JSON, handling encoding issues
                             try:
                                 print(safe_json_dumps(result))
@@ -4423,10 +5271,17 @@ h2 { color: #333; margin-bottom: 10px; }
                         print(json.dumps({'success': False, 'error': 'No SQL query provided'}))
                 
                 elif action == 'get_full_schema':
-                    # Get complete schema with all columns
+                    # Get complete schema with all columns as the compact
+                    # catalog; the browser sends the stamp of its copy and
+                    # only gets the catalog back when the schema changed
                     try:
-                        schema = explorer.get_full_schema()
-                        print(json.dumps({'success': True, 'schema': schema}))
+                        stamp, last_modified = explorer.get_schema_stamp()
+                        client_stamp = getattr(model.Data, 'schema_stamp', '') or ''
+                        if client_stamp == stamp:
+                            print(json.dumps({'success': True, 'unchanged': True, 'stamp': stamp}))
+                        else:
+                            catalog = explorer.get_schema_catalog(stamp)
+                            print(json.dumps({'success': True, 'catalog': catalog}, separators=(',', ':')))
                     except Exception as e:
                         print(json.dumps({'success': False, 'error': str(e)}))
                 
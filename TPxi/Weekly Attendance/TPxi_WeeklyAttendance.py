@@ -49,6 +49,15 @@
 
 # ---------------------------------------------------------------
 
+# Update Notes 10/17/2026:
+# - Attendance now reads from a weekly rollup (org, division, program, day, hour) kept in
+#   Special Content. Closed weeks are stored with a stamp (meeting count and checksum); one
+#   probe query per request compares the stamps and rebuilds any week whose meetings changed
+#   after it was stored. Recent weeks are queried live. Exceptions are applied at report time,
+#   so editing one doesn't touch the stored weeks. Add &rebuild_rollup=yes to rebuild.
+# - Repeated lookups (enrollment, week/4-week/YTD attendance, program settings) are memoized
+#   per request and shared by the web and email versions; &debug=performance shows hits/misses.
+
 # Update Notes 01/07/2026:
 # - Added a brief mode for executives only folks 
 
@@ -193,11 +202,23 @@ SHOW_EXCEPTIONS = True
 # Non-admins will still be able to VIEW exceptions if SHOW_EXCEPTIONS is True
 REQUIRE_ADMIN_FOR_EXCEPTION_MANAGEMENT = True
 
+#### WEEKLY ROLLUP CONFIG
+# Read attendance from the weekly rollup instead of scanning Meetings for every row
+USE_WEEKLY_ROLLUP = True
+# Weeks whose Sunday is more than this many days ago are treated as closed and stored;
+# newer weeks are always queried live. Stored weeks are re-checked against Meetings
+# on every report, so later corrections are still picked up
+ROLLUP_SETTLE_DAYS = 14
+# Prefix of the TextContent entries holding the rollup (one per month, e.g. _2025-09)
+ROLLUP_CONTENT_PREFIX = "WeeklyAttendance_Rollup_"
+
 #####################################################################
 #### START OF CODE - No configuration should be needed beyond this point
 #####################################################################
 
+import copy
 import datetime
+import json
 import re
 import traceback
 import time
@@ -206,7 +227,69 @@ import time
 # Before you define any classes or do any processing
 
 model.Header = REPORT_TITLE
-cache = {}
+
+class QueryCache:
+    """Request-level memoization for report lookups.
+
+    Entries are keyed by (query kind, arguments) where the arguments carry the
+    date range and the program/division/org scope, so every row that asks the
+    same question - and the email and web versions of the report - share one
+    result. Hits and misses are counted per kind for the performance report.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def normalize(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, (list, tuple)):
+            return tuple(QueryCache.normalize(v) for v in value)
+        if value is None:
+            return None
+        return str(value)
+
+    def get(self, kind, args, compute):
+        """Return the cached result for (kind, args), computing it on a miss."""
+        key = (kind,) + tuple(self.normalize(a) for a in args)
+        if key in self.entries:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            # Callers add to the dicts they get back, so hand out copies
+            return copy.deepcopy(self.entries[key])
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+        value = compute()
+        self.entries[key] = copy.deepcopy(value)
+        return value
+
+cache = QueryCache()
+
+def memoized(kind, *scope_attrs):
+    """Memoize a report method in the request cache.
+
+    The key is the kind plus every declared argument (defaults filled in, so
+    positional and keyword calls match) plus any instance attributes named in
+    scope_attrs that the method reads, e.g. report_date.
+    """
+    def decorator(method):
+        code = method.func_code
+        names = code.co_varnames[1:code.co_argcount]
+        defaults = method.func_defaults or ()
+
+        def wrapper(self, *args, **kwargs):
+            values = dict(zip(names[len(names) - len(defaults):], defaults))
+            values.update(zip(names, args))
+            values.update(kwargs)
+            key_args = [values.get(name) for name in names]
+            key_args += [getattr(self, attr, None) for attr in scope_attrs]
+            return cache.get(kind, key_args, lambda: method(self, *args, **kwargs))
+
+        wrapper.__name__ = method.__name__
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+    return decorator
 
 class PerformanceTimer:
     """Simple class to track and display execution time of code sections"""
@@ -260,7 +343,26 @@ class PerformanceTimer:
             report += "<tr><td style='padding: 4px 8px; border-bottom: 1px solid #eee;'>{}</td>".format(section)
             report += "<td style='text-align: right; padding: 4px 8px; border-bottom: 1px solid #eee;'>{:.4f}</td></tr>".format(elapsed)
         
-        report += "</table></div>"
+        report += "</table>"
+
+        # Memoization hit/miss counts by lookup kind
+        kinds = sorted(set(cache.hits.keys()) | set(cache.misses.keys()))
+        if kinds:
+            report += "<h4>Query Cache</h4>"
+            report += "<table style='width: 100%; border-collapse: collapse;'>"
+            report += "<tr><th style='text-align: left; padding: 4px 8px; border-bottom: 1px solid #ddd;'>Lookup</th>"
+            report += "<th style='text-align: right; padding: 4px 8px; border-bottom: 1px solid #ddd;'>Hits</th>"
+            report += "<th style='text-align: right; padding: 4px 8px; border-bottom: 1px solid #ddd;'>Misses</th></tr>"
+            for kind in kinds:
+                report += "<tr><td style='padding: 4px 8px; border-bottom: 1px solid #eee;'>{}</td>".format(kind)
+                report += "<td style='text-align: right; padding: 4px 8px; border-bottom: 1px solid #eee;'>{}</td>".format(cache.hits.get(kind, 0))
+                report += "<td style='text-align: right; padding: 4px 8px; border-bottom: 1px solid #eee;'>{}</td></tr>".format(cache.misses.get(kind, 0))
+            report += "<tr><td style='padding: 4px 8px;'><strong>Total</strong></td>"
+            report += "<td style='text-align: right; padding: 4px 8px;'><strong>{}</strong></td>".format(sum(cache.hits.values()))
+            report += "<td style='text-align: right; padding: 4px 8px;'><strong>{}</strong></td></tr>".format(sum(cache.misses.values()))
+            report += "</table>"
+
+        report += "</div>"
         return report
     
     def print_report(self):
@@ -708,6 +810,269 @@ class ExceptionsManager:
 2025-12-24 | Christmas Eve - Special services | W
 2025-12-28 | Combined Service - Single service only | W"""
 
+class ResultRow(object):
+    """A row built from the rollup (or copied off a query) that callers read
+    by column name, e.g. row.TotalAttendance."""
+
+    def __init__(self, **columns):
+        self.__dict__.update(columns)
+
+class WeeklyRollup:
+    """Meeting attendance rolled up per week for the whole reporting structure.
+
+    Weeks run Monday-Sunday like the report. Each week is stored as a list
+    of [OrgId, day (0=Monday), hour, attendance, meetings] rows per
+    organization; the program/division structure is joined at read time, so
+    moving an organization or changing a report line shows up at once.
+    Closed weeks are stored in TextContent, one entry per month keyed by the
+    week's Monday, together with a stamp (meeting count and a checksum of
+    the meetings' ids, dates and counts). One cheap probe per request
+    compares the stamps and rebuilds any week edited after it was stored.
+    Open weeks are queried once per request.
+    """
+
+    ROLLUP_SQL = """
+        SELECT
+            m.OrganizationId,
+            DATEDIFF(DAY, '{0}', m.MeetingDate) AS DayNo,
+            DATEPART(HOUR, m.MeetingDate) AS MeetingHour,
+            SUM(COALESCE(m.MaxCount, 0)) AS AttendCount,
+            COUNT(DISTINCT m.MeetingId) AS MeetingCount
+        FROM Meetings m
+        WHERE m.MeetingDate >= '{0}' AND m.MeetingDate < '{1}'
+        AND (m.DidNotMeet = 0 OR m.DidNotMeet IS NULL)
+        GROUP BY m.OrganizationId, DATEDIFF(DAY, '{0}', m.MeetingDate), DATEPART(HOUR, m.MeetingDate)
+    """
+
+    # Stamp per week: catches late entries, edited counts and deletions
+    PROBE_SQL = """
+        SELECT
+            DATEDIFF(DAY, '{0}', m.MeetingDate) / 7 AS WeekNo,
+            COUNT(*) AS MeetingCount,
+            CHECKSUM_AGG(CHECKSUM(m.MeetingId, m.OrganizationId, m.MeetingDate,
+                                  m.MaxCount, m.DidNotMeet)) AS Stamp
+        FROM Meetings m
+        WHERE m.MeetingDate >= '{0}' AND m.MeetingDate < '{1}'
+        GROUP BY DATEDIFF(DAY, '{0}', m.MeetingDate) / 7
+    """
+
+    STRUCTURE_SQL = """
+        SELECT DISTINCT os.OrgId, os.DivId, d.ProgId
+        FROM OrganizationStructure os
+        JOIN Division d ON os.DivId = d.Id
+        JOIN Program p ON p.Id = d.ProgId
+        WHERE p.RptGroup IS NOT NULL AND p.RptGroup <> ''
+        AND d.ReportLine IS NOT NULL AND d.ReportLine <> ''
+    """
+
+    def __init__(self):
+        self.weeks = {}            # 'YYYY-MM-DD' (Monday) -> rows
+        self.months = {}           # 'YYYY-MM' -> stored {week: {'rows', 'stamp'}}
+        self.program_names = None
+        self.structure = None      # OrgId -> [(DivId, ProgId)]
+        self.force_rebuild = False
+
+    @staticmethod
+    def as_date(date_obj):
+        if isinstance(date_obj, datetime.datetime):
+            return date_obj.date()
+        return date_obj
+
+    @staticmethod
+    def week_monday(date_obj):
+        day = WeeklyRollup.as_date(date_obj)
+        return day - datetime.timedelta(days=day.weekday())
+
+    @staticmethod
+    def is_closed(monday):
+        sunday = monday + datetime.timedelta(days=6)
+        return (datetime.date.today() - sunday).days > ROLLUP_SETTLE_DAYS
+
+    def load_month(self, month_key):
+        if month_key not in self.months:
+            stored = {}
+            try:
+                content = model.TextContent(ROLLUP_CONTENT_PREFIX + month_key)
+                if content and content.strip():
+                    stored = json.loads(content)
+            except:
+                stored = {}
+            self.months[month_key] = stored
+        return self.months[month_key]
+
+    def get_program_names(self):
+        if self.program_names is None:
+            self.program_names = {}
+            for row in q.QuerySql("SELECT Id, Name FROM Program"):
+                self.program_names[row.Id] = row.Name
+        return self.program_names
+
+    def get_structure(self):
+        """Current OrgId -> [(DivId, ProgId)] for the reporting programs."""
+        if self.structure is None:
+            self.structure = {}
+            for row in q.QuerySql(self.STRUCTURE_SQL):
+                self.structure.setdefault(row.OrgId, []).append((row.DivId, row.ProgId))
+        return self.structure
+
+    def probe_weeks(self, mondays):
+        """Current stamp of each week, keyed by Monday, from one query."""
+        first = min(mondays)
+        after_last = max(mondays) + datetime.timedelta(days=7)
+        stamps = dict((monday.strftime('%Y-%m-%d'), [0, 0]) for monday in mondays)
+        sql = self.PROBE_SQL.format(ReportHelper.format_date(first), ReportHelper.format_date(after_last))
+        for row in q.QuerySql(sql):
+            key = (first + datetime.timedelta(days=row.WeekNo * 7)).strftime('%Y-%m-%d')
+            if key in stamps:
+                stamps[key] = [row.MeetingCount or 0, row.Stamp or 0]
+        return stamps
+
+    def ensure_weeks(self, start_date, end_date):
+        """Load or build every week overlapping start_date..end_date."""
+        monday = self.week_monday(start_date)
+        last = self.week_monday(end_date)
+        missing = []
+        candidates = {}
+        while monday <= last:
+            key = monday.strftime('%Y-%m-%d')
+            if key not in self.weeks:
+                stored = self.load_month(key[:7]).get(key)
+                if isinstance(stored, dict) and self.is_closed(monday) and not self.force_rebuild:
+                    candidates[monday] = stored
+                else:
+                    missing.append(monday)
+            monday += datetime.timedelta(days=7)
+
+        if candidates:
+            stamps = self.probe_weeks(list(candidates))
+            for monday, stored in candidates.items():
+                if stored.get('stamp') == stamps[monday.strftime('%Y-%m-%d')]:
+                    self.weeks[monday.strftime('%Y-%m-%d')] = stored['rows']
+                else:
+                    missing.append(monday)
+        if missing:
+            self.build_weeks(missing)
+
+    def build_weeks(self, mondays):
+        """Query Meetings once for the given weeks and store the closed ones."""
+        performance_timer.start("weekly_rollup_build")
+        first = min(mondays)
+        after_last = max(mondays) + datetime.timedelta(days=7)
+        built = dict((monday.strftime('%Y-%m-%d'), []) for monday in mondays)
+
+        sql = self.ROLLUP_SQL.format(ReportHelper.format_date(first), ReportHelper.format_date(after_last))
+        for row in q.QuerySql(sql):
+            key = (first + datetime.timedelta(days=(row.DayNo // 7) * 7)).strftime('%Y-%m-%d')
+            if key in built:
+                built[key].append([row.OrganizationId, row.DayNo % 7, row.MeetingHour,
+                                   row.AttendCount or 0, row.MeetingCount or 0])
+
+        closed = [monday for monday in mondays if self.is_closed(monday)]
+        stamps = self.probe_weeks(closed) if closed else {}
+        changed_months = set()
+        for monday in mondays:
+            key = monday.strftime('%Y-%m-%d')
+            self.weeks[key] = built[key]
+            if key in stamps:
+                self.load_month(key[:7])[key] = {'rows': built[key], 'stamp': stamps[key]}
+                changed_months.add(key[:7])
+
+        for month_key in changed_months:
+            try:
+                model.WriteContentText(ROLLUP_CONTENT_PREFIX + month_key,
+                                       json.dumps(self.months[month_key], separators=(',', ':')))
+            except:
+                pass  # Still usable for this request
+
+        performance_timer.log("weekly_rollup_build", "{} weeks".format(len(mondays)))
+
+    def iter_rows(self, start_date, end_date):
+        """Yield (date, OrgId, DivId, ProgId, hour, attendance, meetings) between two dates (inclusive)."""
+        start = self.as_date(start_date)
+        end = self.as_date(end_date)
+        self.ensure_weeks(start, end)
+        structure = self.get_structure()
+        monday = self.week_monday(start)
+        while monday <= end:
+            for org, day, hour, attend, meetings in self.weeks[monday.strftime('%Y-%m-%d')]:
+                meeting_date = monday + datetime.timedelta(days=day)
+                if start <= meeting_date <= end:
+                    for div, prog in structure.get(org, ()):
+                        yield meeting_date, org, div, prog, hour, attend, meetings
+            monday += datetime.timedelta(days=7)
+
+    def summary_rows(self, start_date, end_date, program_id=None, division_id=None, org_id=None, by_hour=False):
+        """Per program (and hour) rows shaped like the week / 4-week / YTD Meetings queries.
+
+        AttendanceCount sums every division row, MeetingCount counts each
+        meeting once per program, and DaysWithMeetings counts distinct dates.
+        """
+        names = self.get_program_names()
+        groups = {}
+        meetings_seen = {}
+        for meeting_date, org, div, prog, hour, attend, meetings in self.iter_rows(start_date, end_date):
+            if org_id:
+                if org != int(org_id):
+                    continue
+            elif division_id:
+                if div != int(division_id):
+                    continue
+            elif program_id:
+                if prog != int(program_id):
+                    continue
+
+            name = names.get(prog, '')
+            group_key = (name, hour) if by_hour else (name,)
+            group = groups.setdefault(group_key, {'attend': 0, 'dates': set()})
+            group['attend'] += attend
+            group['dates'].add(meeting_date)
+
+            # An organization in two divisions of the same program is one meeting
+            meeting_key = group_key + (org, meeting_date, hour)
+            meetings_seen[meeting_key] = max(meetings_seen.get(meeting_key, 0), meetings)
+
+        meeting_counts = {}
+        for meeting_key, meetings in meetings_seen.items():
+            group_key = meeting_key[:2] if by_hour else meeting_key[:1]
+            meeting_counts[group_key] = meeting_counts.get(group_key, 0) + meetings
+
+        rows = []
+        for group_key, group in groups.items():
+            rows.append(ResultRow(
+                ProgramName=group_key[0],
+                MeetingHour=group_key[1] if by_hour else None,
+                AttendanceCount=group['attend'],
+                MeetingCount=meeting_counts.get(group_key, 0),
+                DaysWithMeetings=len(group['dates'])
+            ))
+        return rows
+
+    def batch_rows(self, date_ranges):
+        """Rows shaped like get_batch_attendance_data's query, one set per date range."""
+        names = self.get_program_names()
+        rows = []
+        for range_id, (start_date, end_date) in date_ranges.items():
+            groups = {}
+            for meeting_date, org, div, prog, hour, attend, meetings in self.iter_rows(start_date, end_date):
+                group = groups.setdefault((org, div, prog, hour), [0, 0])
+                group[0] += attend
+                group[1] += meetings
+            for (org, div, prog, hour), (attend, meetings) in groups.items():
+                rows.append(ResultRow(
+                    RangeId=range_id,
+                    OrganizationId=org,
+                    DivisionId=div,
+                    ProgramId=prog,
+                    ProgramName=names.get(prog, ''),
+                    MeetingHour=hour,
+                    TotalAttendance=attend,
+                    MeetingCount=meetings
+                ))
+        return rows
+
+# Shared by the web and email versions of the report within a request
+weekly_rollup = WeeklyRollup()
+
 class AttendanceReport:
     """Main class to generate the attendance dashboard"""
     
@@ -848,6 +1213,7 @@ class AttendanceReport:
             ORDER BY d.ReportLine
         '''.format(program_id=program_id)
             
+    @memoized('division_enrollment')
     def get_division_enrollment(self, division_id, report_date):
         """
         Get enrollment count for a division as of the report date.
@@ -916,6 +1282,30 @@ class AttendanceReport:
             ORDER BY o.OrganizationName
         '''.format(division_id=division_id)
 
+    @memoized('program_offsets')
+    def get_program_offsets(self, program_id):
+        """StartHoursOffset / EndHoursOffset for a program (None when not found)."""
+        program = q.QuerySqlTop1("""
+            SELECT
+                StartHoursOffset,
+                EndHoursOffset
+            FROM Program
+            WHERE Id = {}
+        """.format(program_id))
+        if not program:
+            return None
+        return ResultRow(StartHoursOffset=program.StartHoursOffset, EndHoursOffset=program.EndHoursOffset)
+
+    @memoized('program_rpt_group')
+    def get_program_rpt_group(self, program_id):
+        """RptGroup (service times) for a program."""
+        return q.QuerySqlTop1("SELECT RptGroup FROM Program WHERE Id = {}".format(program_id)).RptGroup
+
+    @memoized('division_program')
+    def get_division_program_id(self, division_id):
+        """ProgId for a division."""
+        return q.QuerySqlTop1("SELECT ProgId FROM Division WHERE Id = {}".format(division_id)).ProgId
+
     def get_program_specific_date_range(self, program, base_start_date, base_end_date):
         """Calculate program-specific date range using StartHoursOffset and EndHoursOffset."""
         # Default to the provided dates if no offsets are specified
@@ -987,6 +1377,13 @@ class AttendanceReport:
         Parameters:
             date_ranges: Dictionary with keys as range identifiers and values as (start_date, end_date) tuples
         """
+        if USE_WEEKLY_ROLLUP:
+            try:
+                return weekly_rollup.batch_rows(date_ranges)
+            except Exception as e:
+                if DEBUG_PERFORMANCE:
+                    print "<p>Weekly rollup unavailable, querying Meetings: {}</p>".format(e)
+
         # Build UNION ALL query for all date ranges
         query_parts = []
         
@@ -1045,6 +1442,16 @@ class AttendanceReport:
         
         return q.QuerySql(final_query)
 
+    def get_attendance_rows(self, sql, start_date, end_date, program_id=None, division_id=None, org_id=None, by_hour=False):
+        """Aggregated attendance rows for a date range - from the weekly rollup when enabled, otherwise from sql."""
+        if USE_WEEKLY_ROLLUP:
+            try:
+                return weekly_rollup.summary_rows(start_date, end_date, program_id, division_id, org_id, by_hour)
+            except Exception as e:
+                if DEBUG_PERFORMANCE:
+                    print "<p>Weekly rollup unavailable, querying Meetings: {}</p>".format(e)
+        return q.QuerySql(sql)
+
     def get_week_attendance_sql(self, week_start_date, week_end_date, program_id=None, division_id=None, org_id=None):
         """Get SQL for attendance within a week range, accounting for program-specific offsets."""
         # Format dates for SQL
@@ -1340,6 +1747,7 @@ class AttendanceReport:
             program_filter
         )
     
+    @memoized('week_attendance')
     def get_week_attendance_data(self, week_start_date, week_end_date, program_id=None, division_id=None, org_id=None):
         """Get attendance data for a specific week range and entity, with program-specific offsets."""
         
@@ -1356,13 +1764,7 @@ class AttendanceReport:
         
         # If this is a program-specific query, adjust dates based on program offsets
         if program_id:
-            program_info = q.QuerySqlTop1("""
-                SELECT 
-                    StartHoursOffset, 
-                    EndHoursOffset 
-                FROM Program 
-                WHERE Id = {}
-            """.format(program_id))
+            program_info = self.get_program_offsets(program_id)
             
             if program_info:
                 # Create a class-like object from the SQL results if needed
@@ -1384,9 +1786,10 @@ class AttendanceReport:
                 
         # Now call the SQL with adjusted dates
         sql = self.get_week_attendance_sql(week_start_date, week_end_date, program_id, division_id, org_id)
-        
+
         try:
-            results = q.QuerySql(sql)
+            results = self.get_attendance_rows(sql, week_start_date, week_end_date,
+                                               program_id, division_id, org_id, by_hour=True)
             #self.debug_sql(sql, "attendance")
             for row in results:
                 attendance_data['total'] += row.AttendanceCount
@@ -1408,6 +1811,7 @@ class AttendanceReport:
         performance_timer.log("get_week_attendance_data", "params: {}".format(program_id or division_id or org_id or "all"))
         
         return attendance_data
+    @memoized('four_week_attendance')
     def get_four_week_attendance_data(self, start_date, end_date, program_id=None, division_id=None, org_id=None):
         """Get attendance data for a 4-week period."""
         four_week_data = {
@@ -1421,13 +1825,7 @@ class AttendanceReport:
         
         # If this is a program-specific query, adjust end date based on program offsets
         if program_id:
-            program_info = q.QuerySqlTop1("""
-                SELECT 
-                    StartHoursOffset, 
-                    EndHoursOffset 
-                FROM Program 
-                WHERE Id = {}
-            """.format(program_id))
+            program_info = self.get_program_offsets(program_id)
             
             if program_info:
                 # Create a class-like object from the SQL results if needed
@@ -1450,9 +1848,9 @@ class AttendanceReport:
         
         # Now call the SQL with adjusted dates
         sql = self.get_four_week_attendance_sql(start_date, end_date, program_id, division_id, org_id)
-        
+
         try:
-            results = q.QuerySql(sql)
+            results = self.get_attendance_rows(sql, start_date, end_date, program_id, division_id, org_id)
             for row in results:
                 four_week_data['total'] += row.AttendanceCount or 0
                 four_week_data['meetings'] += row.MeetingCount or 0
@@ -1502,6 +1900,7 @@ class AttendanceReport:
             
         return four_week_data
         
+    @memoized('ytd_attendance')
     def get_ytd_attendance_data(self, start_date, end_date, program_id=None, division_id=None, org_id=None):
         """Get YTD attendance data between start and end dates, with program-specific offsets."""
         ytd_data = {
@@ -1515,13 +1914,7 @@ class AttendanceReport:
         
         # If this is a program-specific query, adjust dates based on program offsets
         if program_id:
-            program_info = q.QuerySqlTop1("""
-                SELECT 
-                    StartHoursOffset, 
-                    EndHoursOffset 
-                FROM Program 
-                WHERE Id = {}
-            """.format(program_id))
+            program_info = self.get_program_offsets(program_id)
             
             if program_info:
                 # Create a class-like object from the SQL results if needed
@@ -1544,9 +1937,9 @@ class AttendanceReport:
                 
         # Now call the SQL with adjusted dates
         sql = self.get_ytd_attendance_sql(start_date, end_date, program_id, division_id, org_id)
-        
+
         try:
-            results = q.QuerySql(sql)
+            results = self.get_attendance_rows(sql, start_date, end_date, program_id, division_id, org_id)
             for row in results:
                 ytd_data['total'] += row.AttendanceCount or 0
                 ytd_data['meetings'] += row.MeetingCount or 0
@@ -1595,6 +1988,7 @@ class AttendanceReport:
         
         return ytd_data
     
+    @memoized('specific_program_attendance')
     def get_specific_program_attendance_data(self, program_names, start_date, end_date):
         """Get attendance data specifically for the programs listed in AVG_WEEK_PROGRAMS."""
         program_data = {
@@ -1701,6 +2095,7 @@ class AttendanceReport:
         performance_timer.log("multiple_years_attendance_data_{}".format(org_id or division_id or program_id))
         return years_data
     
+    @memoized('unique_involvements', 'report_date')
     def get_unique_involvements_count(self, program_names):
         """Get distinct count of involvements (enrollments) for specified programs."""
         involvement_data = {
@@ -1789,6 +2184,7 @@ class AttendanceReport:
         
         return involvement_data
     
+    @memoized('unique_attendance')
     def get_unique_attendance_data(self, program_names, start_date, end_date):
         """Get distinct count of people who attended for specified programs across last 4 Sundays.
         Returns both total attendees and guest count (not enrolled in OrganizationMembers)."""
@@ -2111,9 +2507,8 @@ class AttendanceReport:
                 row_html += "<td>0</td>"
         
         # Get the division and program to determine service times
-        division = q.QuerySqlTop1("SELECT ProgId FROM Division WHERE Id = {}".format(org.DivisionId))
-        program = q.QuerySqlTop1("SELECT RptGroup FROM Program WHERE Id = {}".format(division.ProgId))
-        service_times = self.parse_service_times(program.RptGroup)
+        program_id = self.get_division_program_id(org.DivisionId)
+        service_times = self.parse_service_times(self.get_program_rpt_group(program_id))
         
         # Keep track of hours that are assigned to specific service times
         accounted_hours = set()
@@ -6184,8 +6579,7 @@ class AttendanceReport:
                 row_html += "<td>{}</td>".format(ReportHelper.format_number(value))
         
         # Get service time data from parent program
-        program = q.QuerySqlTop1("SELECT RptGroup FROM Program WHERE Id = {}".format(division.ProgId))
-        service_times = self.parse_service_times(program.RptGroup)
+        service_times = self.parse_service_times(self.get_program_rpt_group(division.ProgId))
         
         # Keep track of hours that are assigned to specific service times
         accounted_hours = set()
@@ -8241,6 +8635,10 @@ try:
         debug_param = getattr(model.Data, 'debug', None)
         if debug_param == 'performance':
             performance_timer.enabled = True
+
+        # Rebuild every stored week the report touches
+        if getattr(model.Data, 'rebuild_rollup', None) == 'yes':
+            weekly_rollup.force_rebuild = True
         
         performance_timer.start("script_execution")
         report = AttendanceReport()